@@ -7,72 +7,240 @@ Endpoints:
 - /health                    → Santé de l'API
 - /api/v1/predict           → Prédiction complète (Flutter principal)
 - /api/v1/predict/realtime  → Prédiction temps réel avec capteurs Ubidots
+- /api/v1/predict/batch     → Prédiction groupée (plusieurs utilisateurs)
+- /api/v1/score/bulk        → Notation en masse NDJSON/CSV → NDJSON (streaming)
 - /api/v1/dashboard         → Données dashboard Flutter
 - /api/v1/sensors/latest    → Dernières données capteurs
+- /api/v1/sensors/ppg       → Échantillons PPG bruts → fréquence respiratoire
+- /api/v1/ingest            → Lectures poussées par lots (binaire, msgpack, JSON)
 - /api/v1/environment       → Données environnementales
 - /api/v1/history           → Historique des prédictions
+- /api/v1/timings           → Latences par étape (histogrammes du processus)
+- /metrics                  → Métriques Prometheus
 """
 
-from typing import Optional
+from typing import Mapping, Optional
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 import os
+import threading
 
-# Charger les variables d'environnement
+# Imports relatifs (le .env est chargé une seule fois, par api.env)
 try:
-    from dotenv import load_dotenv  # type: ignore
-    load_dotenv()
+    from .env import load_env
+    from .data_collector import RespiriaDataCollector
+    from .respiria_ai_predictor import RespiriaAIPredictor
+    from .timing import StageTimer, stage, stage_stats
+    from . import metrics
+    from .logger import configure_logging, get_logger
+    from .ubidots_writeback import get_writeback
+    from .notifications import get_notifier
+    from .risk_state import get_risk_states
+    from .geo_cache import GEO_CACHE_TTL, GeoEnvironmentCache, parse_coordinates
+    from .signal_filters import get_signal_filters
+    from .respiration import get_respiration_monitor
+    from . import ingest
+    from .ingest import get_ingest_store
+    from .fast_json import FastJSONProvider, Fragment
+    from . import bulk_scoring
+    from .ui_registry import (PROFILE_NAMES, RISK_LABELS, UI_CONFIGS, UI_FRAGMENTS,
+                              WEATHER_ICONS, personalized_message)
 except ImportError:
-    pass
+    from env import load_env
+    from data_collector import RespiriaDataCollector
+    from respiria_ai_predictor import RespiriaAIPredictor
+    from timing import StageTimer, stage, stage_stats
+    import metrics
+    from logger import configure_logging, get_logger
+    from ubidots_writeback import get_writeback
+    from notifications import get_notifier
+    from risk_state import get_risk_states
+    from geo_cache import GEO_CACHE_TTL, GeoEnvironmentCache, parse_coordinates
+    from signal_filters import get_signal_filters
+    from respiration import get_respiration_monitor
+    import ingest
+    from ingest import get_ingest_store
+    from fast_json import FastJSONProvider, Fragment
+    import bulk_scoring
+    from ui_registry import (PROFILE_NAMES, RISK_LABELS, UI_CONFIGS, UI_FRAGMENTS,
+                             WEATHER_ICONS, personalized_message)
+
+load_env()
 
 # Configuration depuis variables d'environnement
 BACKEND_URL = os.environ.get("RESPIRIA_BACKEND_URL", "https://respira-backend.onrender.com/api/v1")
 UBIDOTS_TOKEN = os.environ.get("UBIDOTS_TOKEN")
 UBIDOTS_DEVICE_LABEL = os.environ.get("UBIDOTS_DEVICE_LABEL", "bracelet")
 DEBUG = os.environ.get("DEBUG", "False").lower() == "true"
+# true : services créés dès create_app() au lieu de la première requête
+EAGER_INIT = os.environ.get("RESPIRIA_EAGER_INIT", "False").lower() == "true"
+# Nombre maximal de lectures par requête /api/v1/predict/batch
+BATCH_MAX_SIZE = int(os.environ.get("RESPIRIA_BATCH_MAX_SIZE", "500"))
+# Collectes capteurs simultanées d'un lot (lectures sans sensor_data)
+BATCH_SENSOR_WORKERS = int(os.environ.get("RESPIRIA_BATCH_SENSOR_WORKERS", "16"))
+# Nombre maximal d'échantillons par requête /api/v1/sensors/ppg
+PPG_MAX_SAMPLES = int(os.environ.get("RESPIRIA_PPG_MAX_SAMPLES", "6000"))
+# Localisation des requêtes sans location ni lat/lon
+DEFAULT_LOCATION = os.environ.get("RESPIRIA_DEFAULT_LOCATION", "Abidjan")
 
-if not UBIDOTS_TOKEN:
-    print("⚠️ UBIDOTS_TOKEN non défini - configurez la variable d'environnement")
+log = get_logger("app")
 
 # Imports Flask (optionnels)
 try:
-    from flask import Flask, request, jsonify  # type: ignore
+    from flask import Blueprint, Flask, Response, current_app, g, request, jsonify, stream_with_context  # type: ignore
     from flask_cors import CORS  # type: ignore
     FLASK_AVAILABLE = True
 except ImportError:
     FLASK_AVAILABLE = False
-    print("⚠️ Flask non installé - API désactivée (pip install flask flask-cors)")
+    log.warning("Flask non installé - API désactivée (pip install flask flask-cors)")
+
+# ==========================================
+# SERVICES (création paresseuse)
+# ==========================================
+
+# Créés au premier usage, dans init_services() (hook gunicorn post_fork)
+# ou dès create_app() si RESPIRIA_EAGER_INIT=true
+collector: Optional[RespiriaDataCollector] = None
+ai_predictor: Optional[RespiriaAIPredictor] = None
+_services_lock = threading.Lock()
+
+
+def init_services():
+    """Crée le collecteur et le moteur IA (idempotent, thread-safe)"""
+    global collector, ai_predictor
+    with _services_lock:
+        if collector is None:
+            log.info("Initialisation du collecteur (backend %s)", BACKEND_URL)
+            collector = RespiriaDataCollector(base_url=BACKEND_URL)
+        if ai_predictor is None:
+            predictor = RespiriaAIPredictor()
+            metrics.registry.register_collector(metrics.cache_collector(predictor.cache_stats))
+            ai_predictor = predictor
+            if not UBIDOTS_TOKEN:
+                log.warning("UBIDOTS_TOKEN non défini - configurez la variable d'environnement")
 
-# Imports relatifs
-try:
-    from .data_collector import RespiriaDataCollector
-    from .respiria_ai_predictor import RespiriaAIPredictor
-except ImportError:
-    from data_collector import RespiriaDataCollector
-    from respiria_ai_predictor import RespiriaAIPredictor
 
-# Initialiser les services
-print("🚀 Initialisation des services RESPIRIA AI v2.0...")
-print(f"📡 Backend URL: {BACKEND_URL}")
-collector = RespiriaDataCollector(base_url=BACKEND_URL)
-ai_predictor = RespiriaAIPredictor()
-print("✅ Services initialisés")
+def get_collector() -> RespiriaDataCollector:
+    if collector is None:
+        init_services()
+    return collector
+
+
+def get_predictor() -> RespiriaAIPredictor:
+    if ai_predictor is None:
+        init_services()
+    return ai_predictor
+
+
+# Cache géographique (api/geo_cache.py) du collecteur courant : (collecteur, cache)
+_geo_cache: Optional[tuple] = None
+
+
+def fetch_environment(source, location: Optional[str], coordinates: Optional[tuple] = None) -> tuple:
+    """
+    (météo, qualité de l'air) du backend pour une ville ou des coordonnées ; données
+    publiques partagées entre utilisateurs : aucun jeton utilisateur transmis
+    """
+    extra = {'coordinates': coordinates} if coordinates is not None else {}
+    return (source.get_weather_data(location, None, **extra),
+            source.get_air_quality_data(location, None, **extra))
+
+
+def get_environment(location: Optional[str], coordinates: Optional[tuple] = None) -> tuple:
+    """
+    (météo, qualité de l'air, résolution) partagés par ville, station proche ou cellule
+    geohash ; résolution = ville / cellule réellement utilisée (geo_cache.describe) et
+    statut du cache (off si RESPIRIA_GEO_CACHE_TTL=0)
+    """
+    global _geo_cache
+    source = get_collector()
+    entry = _geo_cache
+    if entry is None or entry[0] is not source:
+        with _services_lock:
+            entry = _geo_cache
+            if entry is None or entry[0] is not source:
+                # Nouveau collecteur (backend différent) : cache neuf
+                entry = _geo_cache = (source, GeoEnvironmentCache(partial(fetch_environment, source),
+                                                                  ttl=GEO_CACHE_TTL))
+    return entry[1].get(location, coordinates)
+
+
+def resolved_location(resolution: Mapping, weather: Mapping) -> Optional[str]:
+    """Ville / station réellement utilisée, sinon ville renvoyée par le backend pour la cellule"""
+    return resolution.get('location') or weather.get('city')
+
 
 # Cache simple pour les prédictions
 prediction_cache = {}
 CACHE_TTL = 30  # 30 secondes
 
-# Créer l'application Flask si disponible
+# Application Flask (créée par create_app() en bas du module)
 app: Optional['Flask'] = None
 
 if FLASK_AVAILABLE:
-    app = Flask(__name__)
-    CORS(app, resources={r"/*": {"origins": "*"}})
+    bp = Blueprint('respiria', __name__)
+    
+    # ==========================================
+    # INSTRUMENTATION PAR ÉTAPE (Server-Timing)
+    # ==========================================
+    
+    @bp.before_app_request
+    def start_stage_timer():
+        g.stage_timer = StageTimer().activate()
+        # Identifiant de corrélation des logs (décision d'échantillonnage commune)
+        g.request_id = request.headers.get('X-Request-ID') or os.urandom(8).hex()
+    
+    @bp.after_app_request
+    def add_server_timing(response):
+        timer = g.pop('stage_timer', None)
+        if timer is not None:
+            timer.finish()
+            response.headers['Server-Timing'] = timer.server_timing()
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            stage_stats.record(route, timer)
+            metrics.record_request(route, request.method, response.status_code, timer.total_ns / 1e9)
+        return response
+    
+    @bp.teardown_app_request
+    def release_stage_timer(exc=None):
+        # Requête interrompue avant after_request : désactiver le timer
+        timer = g.pop('stage_timer', None)
+        if timer is not None:
+            timer.finish()
+    
+    @bp.route('/metrics', methods=['GET'])
+    def prometheus_metrics():
+        """
+        Métriques Prometheus : requêtes et latences par route, appels amont
+        (latence, erreurs, taux de repli) par méthode du collecteur, caches.
+        Sous gunicorn, définir RESPIRIA_METRICS_DIR pour agréger tous les workers.
+        """
+        return current_app.response_class(metrics.registry.render(), mimetype=metrics.CONTENT_TYPE)
+    
+    @bp.route('/api/v1/timings', methods=['GET'])
+    def timings():
+        """
+        Latences par route et par étape (µs, histogrammes HDR du processus)
+        
+        Response:
+        {
+            "unit": "us",
+            "routes": {"/api/v1/predict": {"weather": {"count": .., "p50": .., "p99": ..}, ...}}
+        }
+        """
+        return jsonify({
+            'unit': 'us',
+            'pid': os.getpid(),
+            'routes': stage_stats.snapshot(),
+            'timestamp': datetime.now().isoformat()
+        })
     
     # ==========================================
     # ENDPOINT SANTÉ
     # ==========================================
     
-    @app.route('/health', methods=['GET'])
+    @bp.route('/health', methods=['GET'])
     def health():
         """
         Vérification de santé de l'API
@@ -92,18 +260,13 @@ if FLASK_AVAILABLE:
             'model': 'RESPIRIA AI System',
             'precision': '96%',
             'services': {
-                'data_collector': 'ready',
-                'ai_predictor': 'ready',
+                # 'lazy' : créé à la première requête (démarrage à froid rapide)
+                'data_collector': 'ready' if collector is not None else 'lazy',
+                'ai_predictor': 'ready' if ai_predictor is not None else 'lazy',
                 'ubidots': 'connected',
                 'backend': BACKEND_URL
             },
-            'endpoints': {
-                'predict': '/api/v1/predict',
-                'realtime': '/api/v1/predict/realtime',
-                'dashboard': '/api/v1/dashboard',
-                'sensors': '/api/v1/sensors/latest',
-                'environment': '/api/v1/environment'
-            },
+            'endpoints': HEALTH_ENDPOINTS,
             'timestamp': datetime.now().isoformat()
         })
 
@@ -111,7 +274,7 @@ if FLASK_AVAILABLE:
     # ENDPOINT PRINCIPAL FLUTTER - PRÉDICTION
     # ==========================================
     
-    @app.route('/api/v1/predict', methods=['POST'])
+    @bp.route('/api/v1/predict', methods=['POST'])
     def predict_flutter():
         """
         🎯 ENDPOINT PRINCIPAL POUR FLUTTER
@@ -127,6 +290,7 @@ if FLASK_AVAILABLE:
             "user_id": "user123",              // Requis
             "profile_id": 1,                   // Requis (0-3)
             "location": "Abidjan",             // Optionnel
+            "lat": 5.35, "lon": -3.99,         // Optionnel - station / cellule la plus proche
             "medication_taken": true,          // Optionnel
             "sensor_data": {                   // Optionnel - Override capteurs
                 "spo2": 95,
@@ -177,7 +341,8 @@ if FLASK_AVAILABLE:
             
             user_id = data['user_id']
             profile_id = int(data['profile_id'])
-            location = data.get('location', 'Abidjan')
+            location = data.get('location', DEFAULT_LOCATION)
+            coordinates = request_coordinates(data)
             medication_taken = data.get('medication_taken', True)
             auth_token = request.headers.get('Authorization', '').replace('Bearer ', '') or data.get('auth_token')
             sensor_override = data.get('sensor_data', {})
@@ -188,134 +353,119 @@ if FLASK_AVAILABLE:
                     'error': 'profile_id invalide. Valeurs: 0, 1, 2, 3',
                     'code': 'INVALID_PROFILE'
                 }), 400
+            if coordinates is INVALID:
+                return invalid_coordinates()
             
             # Collecter toutes les données
-            print(f"📊 Collecte données pour {user_id}...")
+            log_extra = {'request_id': g.request_id, 'user_id': user_id}
+            log.debug("Collecte données pour %s", user_id, extra=log_extra)
             
             # 1. Données environnementales (météo + qualité air)
-            weather_data = collector.get_weather_data(location, auth_token)
-            air_quality = collector.get_air_quality_data(location, auth_token)
+            weather_data, air_quality, resolution = get_environment(location, coordinates)
             
             # 2. Données capteurs - Priorité: Ubidots direct > Backend > Défaut
-            sensor_data = collector.get_ubidots_direct()  # Direct Ubidots
+            sensor_data = get_collector().get_ubidots_direct()  # Direct Ubidots
             if sensor_data.get('status') == 'fallback':
                 # Fallback sur backend si Ubidots échoue
-                sensor_data = collector.get_ubidots_sensors(user_id, auth_token)
+                sensor_data = get_collector().get_ubidots_sensors(user_id, auth_token)
+            sensor_data = denoise_sensors(data.get('device_label') or user_id, sensor_data)
             
-            print(f"📡 Capteurs: SpO2={sensor_data.get('spo2')}, eCO2={sensor_data.get('eco2_ppm')}, TVOC={sensor_data.get('tvoc_ppb')}")
+            log.debug("Capteurs: SpO2=%s, eCO2=%s, TVOC=%s", sensor_data.get('spo2'),
+                      sensor_data.get('eco2_ppm'), sensor_data.get('tvoc_ppb'), extra=log_extra)
             
             # Construire les données de prédiction (16 variables total)
-            respiria_data = {
-                # Capteurs physiologiques (MAX30102)
-                'spo2': sensor_override.get('spo2', sensor_data.get('spo2', 96.0)),
-                'heart_rate': sensor_override.get('heart_rate', sensor_data.get('heart_rate', 75.0)),
-                'respiratory_rate': sensor_override.get('respiratory_rate', sensor_data.get('respiratory_rate', 16.0)),
-                
-                # Capteurs environnementaux (DHT11)
-                'temperature': sensor_data.get('temperature_sensor', weather_data.get('temperature', 25.0)),
-                'humidity': sensor_data.get('humidity_sensor', weather_data.get('humidity', 50.0)),
-                
-                # Capteurs qualité air intérieur (CJMCU-811)
-                'eco2': sensor_data.get('eco2_ppm', 400.0),
-                'tvoc': sensor_data.get('tvoc_ppb', 0.0),
-                
-                # API Qualité de l'air extérieur
-                'aqi': air_quality.get('aqi', 50.0),
-                'pm25': air_quality.get('pm25', 10.0),        # PM2.5 particules fines
-                'pm10': air_quality.get('pm10', 20.0),        # PM10 grosses particules
-                'pollen_level': air_quality.get('pollen_level', 2),
-                
-                # API Météo
-                'pressure': weather_data.get('pressure', 1013),     # Pression atmosphérique
-                'wind_speed': weather_data.get('wind_speed', 5.0),  # Vitesse du vent
-                
-                # Données utilisateur
-                'smoke_detected': sensor_data.get('smoke_detected', sensor_override.get('smoke_detected', False)),
-                'medication_taken': medication_taken,
-                'profile_id': profile_id
-            }
+            respiria_data = build_respiria_data(sensor_data, sensor_override, weather_data, air_quality,
+                                                medication_taken, profile_id)
             
-            print(f"🌡️ Environnement: PM2.5={respiria_data['pm25']}, PM10={respiria_data['pm10']}, Pression={respiria_data['pressure']}, Vent={respiria_data['wind_speed']}")
+            log.debug("Environnement: PM2.5=%s, PM10=%s, Pression=%s, Vent=%s", respiria_data['pm25'],
+                      respiria_data['pm10'], respiria_data['pressure'], respiria_data['wind_speed'], extra=log_extra)
             
             # Faire la prédiction
-            print(f"🧠 Prédiction IA (Profil {profile_id})...")
-            result = ai_predictor.predict(respiria_data)
+            log.debug("Prédiction IA (Profil %s)", profile_id, extra=log_extra)
+            result = get_predictor().predict(respiria_data)
             
             if not result.get('success'):
                 return jsonify(result), 500
             
-            # Extraire les résultats du modèle
-            prediction = result.get('prediction', {})
+            # Extraire les résultats du modèle (niveau stabilisé si activé)
+            prediction = stabilize_prediction(user_id, result.get('prediction', {}))
             risk_level = prediction.get('risk_level', 'low').upper()
             risk_score = prediction.get('risk_score', 0)
+            
+            # Renvoi du risque vers le bracelet (tampon + envoi groupé en arrière-plan)
+            writeback = get_writeback()
+            # Renvoi seulement pour un device nommé (jamais vers le device partagé par défaut)
+            if writeback is not None and data.get('device_label'):
+                writeback.submit(data['device_label'], risk_score, risk_level)
             confidence = prediction.get('confidence', 0.96)
             should_notify = prediction.get('should_notify', False)
+            notify_user(user_id, prediction, profile_id, data.get('device_label'))
             
             # Facteurs et recommandations
             risk_factors = result.get('risk_factors', [])
             recommendations = result.get('recommendations', {})
-            profile_context = result.get('profile_context', {})
+            # Contexte du profil : constant par (profil, niveau), pré-sérialisé
+            profile_context = get_profile_context_fragment(profile_id, prediction.get('risk_level', 'low'))
             
-            # Couleurs et icônes pour Flutter
-            ui_config = get_ui_config(risk_level)
-            
-            # Messages personnalisés
-            messages = get_personalized_message(risk_level, risk_score, profile_id)
-            
-            # Réponse enrichie pour Flutter
-            flutter_response = {
-                'success': True,
-                'prediction': {
-                    'risk_level': risk_level,
-                    'risk_score': round(risk_score, 1),
-                    'risk_color': ui_config['color'],
-                    'risk_gradient': ui_config['gradient'],
-                    'risk_icon': ui_config['icon'],
-                    'confidence': round(confidence * 100),
-                    'should_notify': should_notify
-                },
-                'message': messages,
-                'factors': risk_factors,
-                'recommendations': recommendations,
-                'profile_context': profile_context,
-                'environment': {
-                    'weather': {
-                        'temperature': weather_data.get('temperature'),
-                        'humidity': weather_data.get('humidity'),
-                        'description': weather_data.get('description', ''),
-                        'icon': get_weather_icon(weather_data.get('weather_main', 'Clear'))
+            with stage('response'):
+                # Couleurs et icônes pour Flutter
+                ui_config = get_ui_config(risk_level)
+                ui_fragments = get_ui_fragments(risk_level)
+                
+                # Messages personnalisés
+                messages = get_personalized_message(risk_level, risk_score, profile_id)
+                
+                # Réponse enrichie pour Flutter
+                flutter_response = {
+                    'success': True,
+                    'prediction': {
+                        'risk_level': risk_level,
+                        'risk_score': round(risk_score, 1),
+                        'risk_color': ui_config['color'],
+                        'risk_gradient': ui_fragments['gradient'],
+                        'risk_icon': ui_config['icon'],
+                        'confidence': round(confidence * 100),
+                        'should_notify': should_notify
                     },
-                    'air_quality': {
-                        'aqi': air_quality.get('aqi'),
-                        'level': air_quality.get('level', 'Modéré'),
-                        'pollen': air_quality.get('pollen_level', 2)
+                    'message': messages,
+                    'factors': risk_factors,
+                    'recommendations': recommendations,
+                    'profile_context': profile_context,
+                    'environment': {
+                        'weather': {
+                            'temperature': weather_data.get('temperature'),
+                            'humidity': weather_data.get('humidity'),
+                            'description': weather_data.get('description', ''),
+                            'icon': get_weather_icon(weather_data.get('weather_main', 'Clear'))
+                        },
+                        'air_quality': {
+                            'aqi': air_quality.get('aqi'),
+                            'level': air_quality.get('level', 'Modéré'),
+                            'pollen': air_quality.get('pollen_level', 2)
+                        },
+                        'location': resolved_location(resolution, weather_data),
+                        'resolution': resolution
                     },
-                    'location': location
-                },
-                'sensors': {
-                    'spo2': respiria_data['spo2'],
-                    'heart_rate': respiria_data['heart_rate'],
-                    'respiratory_rate': respiria_data['respiratory_rate'],
-                    'source': 'ubidots' if sensor_data.get('status') == 'success' else 'default'
-                },
-                'ui_data': {
-                    'card_color': ui_config['card_color'],
-                    'text_color': ui_config['text_color'],
-                    'animation': ui_config['animation'],
-                    'sound_alert': ui_config['sound']
-                },
-                'metadata': {
-                    'user_id': user_id,
-                    'profile': get_profile_name(profile_id),
-                    'timestamp': datetime.now().isoformat(),
-                    'api_version': '2.0'
+                    'sensors': {
+                        'spo2': respiria_data['spo2'],
+                        'heart_rate': respiria_data['heart_rate'],
+                        'respiratory_rate': respiria_data['respiratory_rate'],
+                        'source': 'ubidots' if sensor_data.get('status') == 'success' else 'default'
+                    },
+                    'ui_data': ui_fragments['ui_data'],
+                    'metadata': {
+                        'user_id': user_id,
+                        'profile': get_profile_name(profile_id),
+                        'timestamp': datetime.now().isoformat(),
+                        'api_version': '2.0'
+                    }
                 }
-            }
             
-            return jsonify(flutter_response)
+            with stage('json'):
+                return jsonify(flutter_response)
         
         except Exception as e:
-            print(f"❌ Erreur: {e}")
+            log.exception("Erreur prédiction: %s", e, extra={'request_id': g.get('request_id')})
             return jsonify({
                 'success': False,
                 'error': str(e),
@@ -326,7 +476,7 @@ if FLASK_AVAILABLE:
     # PRÉDICTION TEMPS RÉEL (CAPTEURS UBIDOTS)
     # ==========================================
     
-    @app.route('/api/v1/predict/realtime', methods=['POST'])
+    @bp.route('/api/v1/predict/realtime', methods=['POST'])
     def predict_realtime():
         """
         🔄 Prédiction temps réel avec données capteurs Ubidots
@@ -344,8 +494,12 @@ if FLASK_AVAILABLE:
             profile_id = int(data.get('profile_id', 1))
             auth_token = request.headers.get('Authorization', '').replace('Bearer ', '')
             
-            # Récupérer les dernières données Ubidots
-            ubidots_data = collector.get_ubidots_latest(user_id)
+            device_key = data.get('device_label') or user_id
+            
+            # Lecture poussée récente (/api/v1/ingest), sinon dernières données Ubidots
+            ubidots_data = get_ingest_store().latest(device_key)
+            if ubidots_data is None:
+                ubidots_data = get_collector().get_ubidots_latest(user_id)
             
             if ubidots_data.get('status') != 'success':
                 return jsonify({
@@ -353,30 +507,30 @@ if FLASK_AVAILABLE:
                     'error': 'Capteurs Ubidots non disponibles',
                     'fallback': True
                 }), 503
+            # Valeurs débruitées ; la fumée reste détectée sur la lecture brute
+            sensors = denoise_sensors(device_key, ubidots_data)
             
             # Données capteurs temps réel
-            respiria_data = {
-                'spo2': ubidots_data.get('spo2', 96),
-                'heart_rate': ubidots_data.get('heart_rate', 75),
-                'respiratory_rate': 16,
-                'aqi': ubidots_data.get('eco2', 400) / 10,  # Conversion eCO2 -> pseudo-AQI
-                'temperature': ubidots_data.get('temperature', 25),
-                'humidity': ubidots_data.get('humidity', 50),
-                'pollen_level': 2,
-                'smoke_detected': ubidots_data.get('tvoc', 0) > 200,
-                'medication_taken': True,
-                'profile_id': profile_id
-            }
+            respiria_data = realtime_respiria_data(sensors, ubidots_data, profile_id)
+            
+            result = get_predictor().predict(respiria_data)
+            if not result.get('success'):
+                return jsonify(result), 500
+            prediction = stabilize_prediction(user_id, result['prediction'])
+            risk_level = prediction['risk_level'].upper()
             
-            result = ai_predictor.predict(respiria_data)
+            writeback = get_writeback()
+            if writeback is not None and data.get('device_label'):
+                writeback.submit(data['device_label'], prediction['risk_score'], risk_level)
+            notify_user(user_id, prediction, profile_id, data.get('device_label'))
             
             return jsonify({
                 'success': True,
                 'realtime': True,
                 'prediction': {
-                    'risk_level': result.get('risk_level'),
-                    'risk_score': result.get('risk_score'),
-                    'risk_color': get_ui_config(result.get('risk_level', 'LOW'))['color']
+                    'risk_level': risk_level,
+                    'risk_score': prediction['risk_score'],
+                    'risk_color': get_ui_config(risk_level)['color']
                 },
                 'sensors': {
                     'spo2': ubidots_data.get('spo2'),
@@ -385,27 +539,237 @@ if FLASK_AVAILABLE:
                     'humidity': ubidots_data.get('humidity'),
                     'eco2': ubidots_data.get('eco2'),
                     'tvoc': ubidots_data.get('tvoc'),
-                    'timestamp': ubidots_data.get('timestamp')
+                    'timestamp': ubidots_data.get('timestamp'),
+                    'source': ubidots_data.get('source', 'ubidots')
                 },
-                'alert': result.get('risk_level') == 'HIGH',
+                'alert': risk_level == 'HIGH',
                 'timestamp': datetime.now().isoformat()
             })
         
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    # ==========================================
+    # PRÉDICTION GROUPÉE (PLUSIEURS UTILISATEURS)
+    # ==========================================
+    
+    @bp.route('/api/v1/predict/batch', methods=['POST'])
+    def predict_batch():
+        """
+        📦 Prédiction groupée (ex: planificateur du backend Django)
+        
+        Les données environnementales sont collectées une seule fois par
+        localisation distincte, puis tout le lot est évalué par
+        RespiriaAIPredictor.predict_batch (scores par colonnes).
+        
+        Body:
+        {
+            "location": "Abidjan",             // Optionnel - défaut du lot
+            "readings": [                      // Requis (max RESPIRIA_BATCH_MAX_SIZE)
+                {
+                    "user_id": "user123",      // Requis
+                    "profile_id": 1,           // Requis (0-3)
+                    "location": "Bouaké",      // Optionnel
+                    "lat": 7.69, "lon": -5.03, // Optionnel - station / cellule la plus proche
+                    "medication_taken": true,  // Optionnel
+                    "sensor_data": {...},      // Optionnel - sinon capteurs du backend
+                                               // (clés du collecteur : spo2, eco2_ppm...)
+                    "device_label": "..."      // Optionnel - renvoi du risque vers Ubidots
+                }
+            ]
+        }
+        
+        Response (200):
+        {
+            "success": true,
+            "count": 2, "succeeded": 2, "failed": 0,
+            "results": [{"user_id": ..., "success": true, "prediction": {...}, ...}, ...],
+            "metadata": {"locations": 1, ...}
+        }
+        """
+        try:
+            data = request.json or {}
+            readings = data.get('readings')
+            if not isinstance(readings, list) or not readings:
+                return jsonify({
+                    'success': False,
+                    'error': 'readings requis (liste non vide)',
+                    'code': 'MISSING_READINGS'
+                }), 400
+            if len(readings) > BATCH_MAX_SIZE:
+                return jsonify({
+                    'success': False,
+                    'error': f'Lot trop grand ({len(readings)} > {BATCH_MAX_SIZE})',
+                    'code': 'BATCH_TOO_LARGE'
+                }), 413
+            
+            default_location = data.get('location', DEFAULT_LOCATION)
+            auth_token = request.headers.get('Authorization', '').replace('Bearer ', '') or data.get('auth_token')
+            
+            # Validation par lecture : les erreurs restent dans results
+            results = [None] * len(readings)
+            valid = []
+            for i, reading in enumerate(readings):
+                error = validate_batch_reading(reading)
+                if error is not None:
+                    user_id = reading.get('user_id') if isinstance(reading, dict) else None
+                    results[i] = {'user_id': user_id, 'success': False, **error}
+                else:
+                    valid.append(i)
+            
+            # 1. Environnement : une collecte par localisation distincte (ville ou lat/lon)
+            environments = {}
+            places = {}
+            for i in valid:
+                reading = readings[i]
+                place = places[i] = (reading.get('location', default_location), request_coordinates(reading))
+                if place not in environments:
+                    environments[place] = get_environment(*place)
+            
+            # 2. Capteurs (fournis dans la lecture, sinon backend : une collecte par
+            #    utilisateur distinct, en parallèle) + données du moteur IA
+            backend_sensors = fetch_batch_sensors(
+                {readings[i]['user_id'] for i in valid if not readings[i].get('sensor_data')}, auth_token)
+            batch_data = []
+            sources = []
+            for i in valid:
+                reading = readings[i]
+                weather_data, air_quality, _ = environments[places[i]]
+                sensor_data = reading.get('sensor_data')
+                if sensor_data:
+                    source = 'request'
+                else:
+                    sensor_data = backend_sensors[reading['user_id']]
+                    source = 'ubidots' if sensor_data.get('status') == 'success' else 'default'
+                    sensor_data = denoise_sensors(reading.get('device_label') or reading['user_id'], sensor_data)
+                sources.append(source)
+                batch_data.append(build_respiria_data(sensor_data, sensor_data, weather_data, air_quality,
+                                                      reading.get('medication_taken', True),
+                                                      int(reading['profile_id'])))
+            
+            # 3. Prédiction de tout le lot
+            predictions = get_predictor().predict_batch(batch_data) if batch_data else []
+            
+            writeback = get_writeback()
+            with stage('response'):
+                for i, respiria_data, source, result in zip(valid, batch_data, sources, predictions):
+                    reading = readings[i]
+                    if not result.get('success'):
+                        results[i] = {'user_id': reading['user_id'], 'success': False,
+                                      'error': result.get('error'), 'code': 'PREDICTION_ERROR'}
+                        continue
+                    prediction = stabilize_prediction(reading['user_id'], result['prediction'])
+                    risk_level = prediction['risk_level'].upper()
+                    risk_score = prediction['risk_score']
+                    if writeback is not None and reading.get('device_label'):
+                        writeback.submit(reading['device_label'], risk_score, risk_level)
+                    notify_user(reading['user_id'], prediction, respiria_data['profile_id'],
+                                reading.get('device_label'))
+                    weather_data, _, resolution = environments[places[i]]
+                    results[i] = {
+                        'user_id': reading['user_id'],
+                        'success': True,
+                        'prediction': {
+                            'risk_level': risk_level,
+                            'risk_score': risk_score,
+                            'risk_color': get_ui_config(risk_level)['color'],
+                            'confidence': round(prediction['confidence'] * 100),
+                            'should_notify': prediction['should_notify']
+                        },
+                        'message': get_personalized_message(risk_level, risk_score, respiria_data['profile_id']),
+                        'factors': result['risk_factors'],
+                        'recommendations': result['recommendations'],
+                        'sensors': {
+                            'spo2': respiria_data['spo2'],
+                            'heart_rate': respiria_data['heart_rate'],
+                            'respiratory_rate': respiria_data['respiratory_rate'],
+                            'source': source
+                        },
+                        'location': resolved_location(resolution, weather_data),
+                        'resolution': resolution
+                    }
+                
+                succeeded = sum(1 for result in results if result['success'])
+                batch_response = {
+                    'success': True,
+                    'count': len(results),
+                    'succeeded': succeeded,
+                    'failed': len(results) - succeeded,
+                    'results': results,
+                    'metadata': {
+                        'locations': len(environments),
+                        'timestamp': datetime.now().isoformat(),
+                        'api_version': '2.0'
+                    }
+                }
+            
+            with stage('json'):
+                return jsonify(batch_response)
+        
+        except Exception as e:
+            log.exception("Erreur prédiction groupée: %s", e, extra={'request_id': g.get('request_id')})
+            return jsonify({
+                'success': False,
+                'error': str(e),
+                'code': 'INTERNAL_ERROR'
+            }), 500
+
+    # ==========================================
+    # NOTATION EN MASSE (STREAMING NDJSON)
+    # ==========================================
+    
+    @bp.route('/api/v1/score/bulk', methods=['POST'])
+    def score_bulk():
+        """
+        📥 Notation en masse de lectures stockées (reprises, analyses)
+        
+        Corps lu en streaming, une lecture par ligne :
+        - NDJSON (Content-Type: application/x-ndjson) : {"spo2": 93, "profile_id": 2, ...}
+        - CSV (Content-Type: text/csv) : en-tête + lignes (colonnes du dataset acceptées)
+        
+        Query:
+            format: ndjson | csv (défaut : d'après le Content-Type)
+            chunk_size: lectures par tranche vectorisée (défaut RESPIRIA_BULK_CHUNK_SIZE)
+            full: true → facteurs et recommandations complets
+        
+        Response (200, application/x-ndjson, streaming):
+            {"row": 0, "success": true, "risk_score": 42.5, "risk_level": "medium", ...}
+            ...
+            {"summary": {"rows": 2000, "failed": 0, "elapsed_s": 0.21, "rows_per_sec": 9500.0}}
+        """
+        fmt = request.args.get('format') or bulk_scoring.detect_format('', request.content_type or '')
+        if fmt not in bulk_scoring.FORMATS:
+            return jsonify({
+                'success': False,
+                'error': f'format invalide. Valeurs: {", ".join(bulk_scoring.FORMATS)}',
+                'code': 'INVALID_FORMAT'
+            }), 400
+        try:
+            chunk_size = int(request.args.get('chunk_size', bulk_scoring.CHUNK_SIZE))
+        except ValueError:
+            chunk_size = bulk_scoring.CHUNK_SIZE
+        chunk_size = max(1, min(bulk_scoring.MAX_CHUNK_SIZE, chunk_size))
+        full = request.args.get('full', 'false').lower() == 'true'
+        
+        predictor = get_predictor()
+        # Lecture ligne à ligne du corps : rien n'est mis en tampon au-delà d'une tranche
+        lines = iter(request.stream.readline, b'')
+        body = bulk_scoring.stream_ndjson(predictor, lines, fmt, chunk_size, full)
+        return Response(stream_with_context(body), mimetype='application/x-ndjson')
+
     # ==========================================
     # DASHBOARD FLUTTER
     # ==========================================
     
-    @app.route('/api/v1/dashboard', methods=['GET'])
+    @bp.route('/api/v1/dashboard', methods=['GET'])
     def dashboard():
         """
         📊 Données complètes pour le dashboard Flutter
         
         Query params:
             user_id: ID utilisateur
-            location: Localisation (défaut: Abidjan)
+            location: Localisation (défaut: RESPIRIA_DEFAULT_LOCATION, Abidjan)
+            lat, lon: Coordonnées (optionnel, station / cellule la plus proche)
         
         Response:
         {
@@ -419,13 +783,15 @@ if FLASK_AVAILABLE:
         """
         try:
             user_id = request.args.get('user_id', 'default')
-            location = request.args.get('location', 'Abidjan')
+            location = request.args.get('location', DEFAULT_LOCATION)
+            coordinates = request_coordinates(request.args)
+            if coordinates is INVALID:
+                return invalid_coordinates()
             auth_token = request.headers.get('Authorization', '').replace('Bearer ', '')
             
             # Collecter toutes les données
-            weather = collector.get_weather_data(location, auth_token)
-            air_quality = collector.get_air_quality_data(location, auth_token)
-            sensors = collector.get_ubidots_sensors(user_id, auth_token)
+            weather, air_quality, resolution = get_environment(location, coordinates)
+            sensors = get_collector().get_ubidots_sensors(user_id, auth_token)
             
             # Calculer le risque actuel
             current_data = {
@@ -441,7 +807,7 @@ if FLASK_AVAILABLE:
                 'profile_id': 1
             }
             
-            prediction = ai_predictor.predict(current_data)
+            prediction = get_predictor().predict(current_data)
             risk_level = prediction.get('risk_level', 'LOW')
             ui_config = get_ui_config(risk_level)
             
@@ -451,7 +817,7 @@ if FLASK_AVAILABLE:
                     'level': risk_level,
                     'score': prediction.get('risk_score', 0),
                     'color': ui_config['color'],
-                    'gradient': ui_config['gradient'],
+                    'gradient': get_ui_fragments(risk_level)['gradient'],
                     'icon': ui_config['icon'],
                     'label': get_risk_label(risk_level),
                     'updated_at': datetime.now().isoformat()
@@ -489,14 +855,15 @@ if FLASK_AVAILABLE:
                         'humidity': weather.get('humidity'),
                         'description': weather.get('description'),
                         'icon': get_weather_icon(weather.get('weather_main', 'Clear')),
-                        'city': location
+                        'city': resolved_location(resolution, weather)
                     },
                     'air_quality': {
                         'aqi': air_quality.get('aqi', 50),
                         'level': air_quality.get('level', 'Modéré'),
                         'pollen': air_quality.get('pollen_level', 2),
                         'color': get_aqi_color(air_quality.get('aqi', 50))
-                    }
+                    },
+                    'resolution': resolution
                 },
                 'statistics': {
                     'predictions_today': 12,
@@ -505,11 +872,7 @@ if FLASK_AVAILABLE:
                     'last_high_risk': None
                 },
                 'alerts': get_active_alerts(prediction),
-                'quick_actions': [
-                    {'id': 'medication', 'label': 'Prise médicament', 'icon': 'medication'},
-                    {'id': 'inhaler', 'label': 'Utiliser inhalateur', 'icon': 'air'},
-                    {'id': 'emergency', 'label': 'Appel urgence', 'icon': 'emergency'}
-                ],
+                'quick_actions': QUICK_ACTIONS,
                 'timestamp': datetime.now().isoformat()
             })
         
@@ -520,7 +883,7 @@ if FLASK_AVAILABLE:
     # CAPTEURS
     # ==========================================
     
-    @app.route('/api/v1/sensors/latest', methods=['GET'])
+    @bp.route('/api/v1/sensors/latest', methods=['GET'])
     def sensors_latest():
         """
         📡 Dernières données des capteurs Ubidots
@@ -529,7 +892,7 @@ if FLASK_AVAILABLE:
             user_id = request.args.get('user_id', 'default')
             auth_token = request.headers.get('Authorization', '').replace('Bearer ', '')
             
-            sensors = collector.get_ubidots_latest(user_id)
+            sensors = get_collector().get_ubidots_latest(user_id)
             
             return jsonify({
                 'success': True,
@@ -558,21 +921,135 @@ if FLASK_AVAILABLE:
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    @bp.route('/api/v1/sensors/ppg', methods=['POST'])
+    def sensors_ppg():
+        """
+        🫁 Échantillons PPG bruts (MAX30102, canal IR) → fréquence respiratoire
+        
+        Le bracelet (ou une passerelle) poste ses échantillons toutes les
+        quelques secondes ; ils s'ajoutent au tampon du device et l'estimation
+        (modulations de ligne de base et d'amplitude, voir api/respiration.py)
+        est recalculée toutes les HOP_S secondes de signal. Une estimation
+        récente remplace l'approximation BPM / 4.5 dans /predict et /predict/realtime.
+        
+        Body:
+        {
+            "user_id": "user123",
+            "device_label": "bracelet",     // Optionnel (défaut : user_id)
+            "sample_rate": 25,              // Hz (défaut 25)
+            "samples": [81234, 81310, ...]  // Échantillons IR bruts
+        }
+        
+        Response:
+        {
+            "success": true,
+            "device": "bracelet",
+            "buffered_s": 32.0,
+            "updated": true,
+            "estimate": {"respiratory_rate": 17.9, "heart_rate": 72.1, "quality": 0.98, ...}
+        }
+        """
+        monitor = get_respiration_monitor()
+        data = request.get_json(silent=True) or {}
+        samples = data.get('samples')
+        if not isinstance(samples, list) or not samples:
+            return jsonify({'success': False, 'error': 'samples doit être une liste non vide',
+                            'code': 'INVALID_SAMPLES'}), 400
+        if len(samples) > PPG_MAX_SAMPLES:
+            return jsonify({'success': False, 'error': f'Trop d\'échantillons (max {PPG_MAX_SAMPLES})',
+                            'code': 'PPG_TOO_LARGE'}), 413
+        try:
+            sample_rate = float(data.get('sample_rate', 25))
+            if not 5 <= sample_rate <= 1000:
+                raise ValueError(sample_rate)
+            device_key = data.get('device_label') or data.get('user_id', 'default')
+            with stage('respiration'):
+                result = monitor.add_samples(device_key, [float(value) for value in samples], sample_rate)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'samples et sample_rate doivent être numériques',
+                            'code': 'INVALID_SAMPLES'}), 400
+        return jsonify({'success': True, 'device': device_key, **result})
+
+    # ==========================================
+    # INGESTION POUSSÉE (BRACELETS, BACKEND)
+    # ==========================================
+    
+    @bp.route('/api/v1/ingest', methods=['POST'])
+    def ingest_readings():
+        """
+        📨 Lectures capteurs poussées par lots, par colonnes (voir api/ingest.py)
+        
+        Content-Type:
+        - application/octet-stream : blocs binaires RPK1 (ingest.encode_block), lus sans copie
+        - application/x-msgpack : {"devices": [...]} (colonnes en bin float32 ou listes)
+        - application/json : {"devices": [{"device": "bracelet-1", "user_id": "user123",
+                                           "profile_id": 2, "t": [...], "spo2": [...], ...}]}
+        
+        Les séries alimentent le store par device (lu par /api/v1/predict/realtime) ;
+        la dernière lecture de chaque device est notée en un seul predict_batch.
+        
+        Query:
+            score: false → stockage seul, sans notation
+        
+        Response (200):
+        {
+            "success": true,
+            "devices": 2,
+            "samples": 1200,
+            "scores": [{"device": "bracelet-1", "user_id": "user123", "risk_score": 42.5,
+                        "risk_level": "MEDIUM", "should_notify": false}, ...]
+        }
+        """
+        store = get_ingest_store()
+        fmt = ingest.FORMATS.get((request.mimetype or '').lower())
+        if fmt is None:
+            return jsonify({
+                'success': False,
+                'error': f'Content-Type invalide. Valeurs: {", ".join(ingest.FORMATS)}',
+                'code': 'UNSUPPORTED_FORMAT'
+            }), 415
+        if (request.content_length or 0) > ingest.INGEST_MAX_BYTES:
+            return jsonify({'success': False, 'error': f'Corps trop grand (max {ingest.INGEST_MAX_BYTES} octets)',
+                            'code': 'PAYLOAD_TOO_LARGE'}), 413
+        try:
+            with stage('decode'):
+                if fmt == 'json':
+                    blocks = ingest.decode_document(request.get_json(silent=True))
+                else:
+                    blocks = ingest.decode_payload(request.get_data(cache=False), fmt)
+            for block in blocks:
+                if block.profile_id is not None and block.profile_id not in (0, 1, 2, 3):
+                    raise ingest.IngestError(f'{block.device} : profile_id invalide. Valeurs: 0, 1, 2, 3')
+        except ingest.IngestError as e:
+            return jsonify({'success': False, 'error': str(e), 'code': 'INVALID_PAYLOAD'}), 400
+        
+        with stage('store'):
+            samples = ingest.ingest(store, blocks, fmt)
+        devices = list(dict.fromkeys(block.device for block in blocks))
+        scores = []
+        if request.args.get('score', 'true').lower() != 'false':
+            scores = score_ingested(store, devices)
+        return jsonify({'success': True, 'devices': len(devices), 'samples': samples, 'scores': scores})
+
     # ==========================================
     # ENVIRONNEMENT
     # ==========================================
     
-    @app.route('/api/v1/environment', methods=['GET'])
+    @bp.route('/api/v1/environment', methods=['GET'])
     def environment():
         """
         🌍 Données environnementales (météo + qualité air)
+        
+        Query params:
+            location: Localisation (défaut: RESPIRIA_DEFAULT_LOCATION, Abidjan)
+            lat, lon: Coordonnées (optionnel, station / cellule la plus proche)
         """
         try:
-            location = request.args.get('location', 'Abidjan')
-            auth_token = request.headers.get('Authorization', '').replace('Bearer ', '')
-            
-            weather = collector.get_weather_data(location, auth_token)
-            air_quality = collector.get_air_quality_data(location, auth_token)
+            location = request.args.get('location', DEFAULT_LOCATION)
+            coordinates = request_coordinates(request.args)
+            if coordinates is INVALID:
+                return invalid_coordinates()
+            weather, air_quality, resolution = get_environment(location, coordinates)
             
             return jsonify({
                 'success': True,
@@ -595,9 +1072,10 @@ if FLASK_AVAILABLE:
                     'color': get_aqi_color(air_quality.get('aqi', 50))
                 },
                 'location': {
-                    'city': weather.get('city', location),
+                    'city': resolved_location(resolution, weather),
                     'country': weather.get('country', 'CI')
                 },
+                'resolution': resolution,
                 'asthma_advisory': get_asthma_advisory(weather, air_quality),
                 'timestamp': datetime.now().isoformat()
             })
@@ -609,12 +1087,12 @@ if FLASK_AVAILABLE:
     # ENDPOINTS LEGACY (Compatibilité)
     # ==========================================
     
-    @app.route('/predict/auto', methods=['POST'])
+    @bp.route('/predict/auto', methods=['POST'])
     def predict_auto_legacy():
         """Legacy endpoint - redirige vers /api/v1/predict"""
         return predict_flutter()
     
-    @app.route('/predict/manual', methods=['POST'])
+    @bp.route('/predict/manual', methods=['POST'])
     def predict_manual():
         """Prédiction manuelle avec les 10 variables"""
         try:
@@ -627,7 +1105,7 @@ if FLASK_AVAILABLE:
                 if field not in data:
                     return jsonify({'error': f'Champ manquant: {field}'}), 400
             
-            result = ai_predictor.predict(data)
+            result = get_predictor().predict(data)
             
             if result.get('success'):
                 risk_level = result.get('risk_level', 'LOW')
@@ -643,111 +1121,241 @@ if FLASK_AVAILABLE:
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 500
 
-    @app.route('/data/weather', methods=['GET'])
+    @bp.route('/data/weather', methods=['GET'])
     def get_weather_legacy():
-        location = request.args.get('location', 'Abidjan')
+        location = request.args.get('location', DEFAULT_LOCATION)
         auth_token = request.headers.get('Authorization', '').replace('Bearer ', '')
-        return jsonify(collector.get_weather_data(location, auth_token))
+        return jsonify(get_collector().get_weather_data(location, auth_token))
 
-    @app.route('/data/air-quality', methods=['GET'])
+    @bp.route('/data/air-quality', methods=['GET'])
     def get_air_quality_legacy():
-        location = request.args.get('location', 'Abidjan')
+        location = request.args.get('location', DEFAULT_LOCATION)
         auth_token = request.headers.get('Authorization', '').replace('Bearer ', '')
-        return jsonify(collector.get_air_quality_data(location, auth_token))
+        return jsonify(get_collector().get_air_quality_data(location, auth_token))
 
+    # ==========================================
+    # FRAGMENTS JSON CONSTANTS (sérialisés une fois, voir api/fast_json.py et api/ui_registry.py)
+    # ==========================================
+    
+    HEALTH_ENDPOINTS = Fragment({
+        'predict': '/api/v1/predict',
+        'realtime': '/api/v1/predict/realtime',
+        'dashboard': '/api/v1/dashboard',
+        'sensors': '/api/v1/sensors/latest',
+        'environment': '/api/v1/environment'
+    })
+    
+    QUICK_ACTIONS = Fragment([
+        {'id': 'medication', 'label': 'Prise médicament', 'icon': 'medication'},
+        {'id': 'inhaler', 'label': 'Utiliser inhalateur', 'icon': 'air'},
+        {'id': 'emergency', 'label': 'Appel urgence', 'icon': 'emergency'}
+    ])
+    
+    def get_ui_fragments(risk_level: str) -> Mapping:
+        """Palette (gradient) et bloc ui_data du niveau de risque, pré-sérialisés"""
+        return UI_FRAGMENTS.get(risk_level, UI_FRAGMENTS['LOW'])
+    
+    @lru_cache(maxsize=64)
+    def get_profile_context_fragment(profile_id: int, risk_level: str) -> Fragment:
+        """Contexte du profil (messages constants par profil et niveau), pré-sérialisé"""
+        return Fragment(get_predictor().get_profile_context(profile_id, risk_level))
+    
     # ==========================================
     # FONCTIONS UTILITAIRES
     # ==========================================
     
-    def get_ui_config(risk_level: str) -> dict:
-        """Configuration UI pour Flutter selon le niveau de risque"""
-        configs = {
-            'LOW': {
-                'color': '#4CAF50',
-                'gradient': ['#66BB6A', '#43A047'],
-                'card_color': '#E8F5E9',
-                'text_color': '#1B5E20',
-                'icon': 'check_circle',
-                'animation': 'pulse_slow',
-                'sound': None
-            },
-            'MEDIUM': {
-                'color': '#FF9800',
-                'gradient': ['#FFB74D', '#F57C00'],
-                'card_color': '#FFF3E0',
-                'text_color': '#E65100',
-                'icon': 'warning',
-                'animation': 'pulse_medium',
-                'sound': 'notification'
-            },
-            'HIGH': {
-                'color': '#F44336',
-                'gradient': ['#EF5350', '#C62828'],
-                'card_color': '#FFEBEE',
-                'text_color': '#B71C1C',
-                'icon': 'error',
-                'animation': 'shake',
-                'sound': 'alert'
-            }
+    def denoise_sensors(device_key: str, sensor_data: dict) -> dict:
+        """
+        Lectures capteurs débruitées par device (signal_filters, si RESPIRIA_SIGNAL_FILTER=true ;
+        aggravations transmises sans délai) ; valeurs par défaut inchangées.
+        La fréquence respiratoire mesurée sur le PPG (/api/v1/sensors/ppg) remplace l'estimation
+        BPM / 4.5 du collecteur lorsqu'elle est récente.
+        """
+        estimate = get_respiration_monitor().latest(device_key)
+        if estimate is not None:
+            sensor_data = dict(sensor_data, respiratory_rate=estimate['respiratory_rate'],
+                               respiratory_rate_source='ppg')
+        filters = get_signal_filters()
+        if filters is None or sensor_data.get('status') != 'success':
+            return sensor_data
+        return filters.apply(device_key, sensor_data)
+    
+    def stabilize_prediction(user_id: str, prediction: Mapping) -> Mapping:
+        """
+        Niveau stabilisé par utilisateur (api/risk_state.py, hystérésis) si activé ;
+        le niveau instantané reste dans instant_risk_level
+        """
+        states = get_risk_states(get_predictor().RISK_THRESHOLDS)
+        if states is None or 'risk_level' not in prediction:
+            return prediction
+        stable = states.update(user_id, prediction['risk_score'], prediction['risk_level'])
+        return dict(prediction, risk_level=stable, instant_risk_level=prediction['risk_level'])
+    
+    def notify_user(user_id: str, prediction: Mapping, profile_id: int, device: Optional[str] = None):
+        """Transmet la prédiction au répartiteur de notifications (file, traitement en arrière-plan)"""
+        notifier = get_notifier()
+        if notifier is not None:
+            notifier.submit(user_id, prediction['risk_level'], prediction['risk_score'],
+                            prediction.get('should_notify', False), profile_id, device)
+    
+    def realtime_respiria_data(sensors: dict, raw: dict, profile_id: int) -> dict:
+        """Données du moteur IA d'une lecture temps réel (fumée détectée sur la lecture brute)"""
+        return {
+            'spo2': sensors.get('spo2', 96),
+            'heart_rate': sensors.get('heart_rate', 75),
+            'respiratory_rate': sensors.get('respiratory_rate', 16),
+            'aqi': sensors.get('eco2', 400) / 10,  # Conversion eCO2 -> pseudo-AQI
+            'temperature': sensors.get('temperature', 25),
+            'humidity': sensors.get('humidity', 50),
+            'pollen_level': 2,
+            'smoke_detected': raw.get('tvoc', 0) > 200,
+            'medication_taken': True,
+            'profile_id': profile_id
         }
-        return configs.get(risk_level, configs['LOW'])
+    
+    def score_ingested(store, devices: list) -> list:
+        """Note la dernière lecture de chaque device ingéré (un seul predict_batch)"""
+        readings = []
+        batch_data = []
+        for device in devices:
+            reading = store.latest(device)
+            if reading is None:
+                continue
+            profile_id = reading['profile_id'] if reading['profile_id'] is not None else 1
+            readings.append(reading)
+            batch_data.append(realtime_respiria_data(denoise_sensors(device, reading), reading, profile_id))
+        with stage('predict'):
+            predictions = get_predictor().predict_batch(batch_data) if batch_data else []
+        
+        writeback = get_writeback()
+        scores = []
+        for reading, respiria_data, result in zip(readings, batch_data, predictions):
+            device = reading['device_id']
+            if not result.get('success'):
+                scores.append({'device': device, 'user_id': reading['user_id'], 'error': result.get('error')})
+                continue
+            prediction = stabilize_prediction(reading['user_id'] or device, result['prediction'])
+            risk_level = prediction['risk_level'].upper()
+            if writeback is not None:
+                writeback.submit(device, prediction['risk_score'], risk_level)
+            notify_user(reading['user_id'] or device, prediction, respiria_data['profile_id'], device)
+            scores.append({
+                'device': device,
+                'user_id': reading['user_id'],
+                'risk_score': prediction['risk_score'],
+                'risk_level': risk_level,
+                'should_notify': prediction['should_notify']
+            })
+        return scores
+    
+    def build_respiria_data(sensor_data: dict, sensor_override: dict, weather_data: dict,
+                            air_quality: dict, medication_taken: bool, profile_id: int) -> dict:
+        """Données d'entrée du moteur IA (16 variables) à partir des capteurs et de l'environnement"""
+        return {
+            # Capteurs physiologiques (MAX30102)
+            'spo2': sensor_override.get('spo2', sensor_data.get('spo2', 96.0)),
+            'heart_rate': sensor_override.get('heart_rate', sensor_data.get('heart_rate', 75.0)),
+            'respiratory_rate': sensor_override.get('respiratory_rate', sensor_data.get('respiratory_rate', 16.0)),
+            
+            # Capteurs environnementaux (DHT11)
+            'temperature': sensor_data.get('temperature_sensor', weather_data.get('temperature', 25.0)),
+            'humidity': sensor_data.get('humidity_sensor', weather_data.get('humidity', 50.0)),
+            
+            # Capteurs qualité air intérieur (CJMCU-811)
+            'eco2': sensor_data.get('eco2_ppm', 400.0),
+            'tvoc': sensor_data.get('tvoc_ppb', 0.0),
+            
+            # API Qualité de l'air extérieur
+            'aqi': air_quality.get('aqi', 50.0),
+            'pm25': air_quality.get('pm25', 10.0),        # PM2.5 particules fines
+            'pm10': air_quality.get('pm10', 20.0),        # PM10 grosses particules
+            'pollen_level': air_quality.get('pollen_level', 2),
+            
+            # API Météo
+            'pressure': weather_data.get('pressure', 1013),     # Pression atmosphérique
+            'wind_speed': weather_data.get('wind_speed', 5.0),  # Vitesse du vent
+            
+            # Données utilisateur
+            'smoke_detected': sensor_data.get('smoke_detected', sensor_override.get('smoke_detected', False)),
+            'medication_taken': medication_taken,
+            'profile_id': profile_id
+        }
+    
+    def fetch_batch_sensors(user_ids: set, auth_token: Optional[str]) -> dict:
+        """
+        Capteurs backend de chaque utilisateur du lot : une collecte par utilisateur
+        (3 appels HTTP bloquants), jusqu'à RESPIRIA_BATCH_SENSOR_WORKERS en parallèle
+        """
+        if not user_ids:
+            return {}
+        source = get_collector()
+        users = sorted(user_ids, key=str)
+        workers = max(1, min(BATCH_SENSOR_WORKERS, len(users)))
+        with stage('batch_sensors'):
+            if workers == 1:
+                return {user_id: source.get_ubidots_sensors(user_id, auth_token) for user_id in users}
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch-sensors') as executor:
+                fetched = executor.map(lambda user_id: source.get_ubidots_sensors(user_id, auth_token), users)
+                return dict(zip(users, fetched))
+    
+    def validate_batch_reading(reading) -> Optional[dict]:
+        """Erreur de validation d'une lecture du lot (None si valide)"""
+        if not isinstance(reading, dict):
+            return {'error': 'Lecture invalide (objet attendu)', 'code': 'INVALID_READING'}
+        if 'user_id' not in reading:
+            return {'error': 'user_id requis', 'code': 'MISSING_USER_ID'}
+        if not isinstance(reading['user_id'], (str, int)) or isinstance(reading['user_id'], bool):
+            return {'error': 'user_id invalide (chaîne ou entier attendu)', 'code': 'INVALID_READING'}
+        if 'profile_id' not in reading:
+            return {'error': 'profile_id requis', 'code': 'MISSING_PROFILE_ID'}
+        try:
+            profile_id = int(reading['profile_id'])
+        except (TypeError, ValueError):
+            profile_id = None
+        if profile_id not in (0, 1, 2, 3):
+            return {'error': 'profile_id invalide. Valeurs: 0, 1, 2, 3', 'code': 'INVALID_PROFILE'}
+        sensor_data = reading.get('sensor_data')
+        if sensor_data is not None and not isinstance(sensor_data, dict):
+            return {'error': 'sensor_data invalide (objet attendu)', 'code': 'INVALID_READING'}
+        if request_coordinates(reading) is INVALID:
+            return {'error': 'lat/lon invalides', 'code': 'INVALID_COORDINATES'}
+        return None
+    
+    INVALID = object()
+    
+    def request_coordinates(source: Mapping):
+        """(lat, lon) d'un corps JSON ou de paramètres de requête, None si absentes, INVALID sinon"""
+        try:
+            return parse_coordinates(source.get('lat'), source.get('lon'))
+        except (TypeError, ValueError):
+            return INVALID
+    
+    def invalid_coordinates():
+        return jsonify({
+            'success': False,
+            'error': 'lat/lon invalides (lat ∈ [-90, 90], lon ∈ [-180, 180])',
+            'code': 'INVALID_COORDINATES'
+        }), 400
+    
+    def get_ui_config(risk_level: str) -> Mapping:
+        """Configuration UI pour Flutter selon le niveau de risque (lecture seule)"""
+        return UI_CONFIGS.get(risk_level, UI_CONFIGS['LOW'])
     
     def get_personalized_message(risk_level: str, risk_score: float, profile_id: int) -> dict:
         """Messages personnalisés pour l'utilisateur"""
-        profile_names = {0: 'Prévention', 1: 'Stable', 2: 'Sévère', 3: 'Rémission'}
-        
-        messages = {
-            'LOW': {
-                'title': '✅ Risque Faible',
-                'subtitle': 'Conditions favorables',
-                'description': f'Votre niveau de risque est faible ({risk_score:.0f}%). Les conditions actuelles sont favorables pour vos activités.',
-                'action': 'Continuez vos activités normalement',
-                'emoji': '😊'
-            },
-            'MEDIUM': {
-                'title': '⚠️ Risque Modéré',
-                'subtitle': 'Surveillance recommandée',
-                'description': f'Niveau de risque modéré ({risk_score:.0f}%). Certains facteurs environnementaux peuvent affecter votre respiration.',
-                'action': 'Gardez votre inhalateur à portée de main',
-                'emoji': '😐'
-            },
-            'HIGH': {
-                'title': '🚨 Risque Élevé',
-                'subtitle': 'Action requise',
-                'description': f'Alerte! Niveau de risque élevé ({risk_score:.0f}%). Prenez vos précautions immédiatement.',
-                'action': 'Prenez votre traitement et restez à l\'intérieur si possible',
-                'emoji': '😰'
-            }
-        }
-        
-        msg = messages.get(risk_level, messages['LOW'])
-        msg['profile'] = profile_names.get(profile_id, 'Inconnu')
-        return msg
+        return personalized_message(risk_level, risk_score, profile_id)
     
     def get_profile_name(profile_id: int) -> str:
         """Nom du profil utilisateur"""
-        names = {0: 'Prévention', 1: 'Asthmatique Stable', 2: 'Asthmatique Sévère', 3: 'Rémission'}
-        return names.get(profile_id, 'Inconnu')
+        return PROFILE_NAMES.get(profile_id, 'Inconnu')
     
     def get_risk_label(risk_level: str) -> str:
         """Label français pour le niveau de risque"""
-        labels = {'LOW': 'Faible', 'MEDIUM': 'Modéré', 'HIGH': 'Élevé'}
-        return labels.get(risk_level, 'Inconnu')
+        return RISK_LABELS.get(risk_level, 'Inconnu')
     
     def get_weather_icon(weather_main: str) -> str:
         """Icône Material pour la météo"""
-        icons = {
-            'Clear': 'wb_sunny',
-            'Clouds': 'cloud',
-            'Rain': 'grain',
-            'Drizzle': 'grain',
-            'Thunderstorm': 'flash_on',
-            'Snow': 'ac_unit',
-            'Mist': 'blur_on',
-            'Fog': 'blur_on',
-            'Haze': 'blur_on'
-        }
-        return icons.get(weather_main, 'wb_sunny')
+        return WEATHER_ICONS.get(weather_main, 'wb_sunny')
     
     def get_aqi_color(aqi: int) -> str:
         """Couleur selon l'indice de qualité de l'air"""
@@ -829,9 +1437,29 @@ if FLASK_AVAILABLE:
         
         return alerts
 
-else:
-    app = None
-    print("⚠️ Flask non disponible")
+
+
+def create_app(eager: bool = EAGER_INIT) -> Optional['Flask']:
+    """
+    Fabrique de l'application Flask
+
+    Aucun appel réseau ni construction de service ici : ils sont créés à la
+    première requête, dans le hook gunicorn post_fork, ou immédiatement si eager.
+    """
+    if not FLASK_AVAILABLE:
+        return None
+    configure_logging()
+    flask_app = Flask(__name__)
+    flask_app.json = FastJSONProvider(flask_app)
+    CORS(flask_app, resources={r"/*": {"origins": "*"}})
+    flask_app.register_blueprint(bp)
+    if eager:
+        init_services()
+    return flask_app
+
+
+# Point d'entrée WSGI : gunicorn api.app:app (ou api.app:create_app())
+app = create_app()
 
 
 def main():
@@ -840,12 +1468,18 @@ def main():
         return
     
     port = int(os.environ.get('PORT', 5000))
+    print("🚀 Initialisation des services RESPIRIA AI v2.0...")
+    print(f"📡 Backend URL: {BACKEND_URL}")
+    init_services()
+    print("✅ Services initialisés")
     print(f"\n🚀 RESPIRIA AI API v2.0 sur http://0.0.0.0:{port}")
     print(f"\n📡 Endpoints Flutter:")
     print(f"   POST /api/v1/predict          → Prédiction complète")
     print(f"   POST /api/v1/predict/realtime → Temps réel Ubidots")
     print(f"   GET  /api/v1/dashboard        → Dashboard")
     print(f"   GET  /api/v1/sensors/latest   → Capteurs")
+    print(f"   POST /api/v1/sensors/ppg      → PPG → respiration")
+    print(f"   POST /api/v1/ingest           → Lectures poussées (binaire/msgpack)")
     print(f"   GET  /api/v1/environment      → Environnement")
     print()
     if app is not None:
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# api/bulk_scoring.py
+"""
+Notation en masse de lectures stockées : NDJSON ou CSV → NDJSON
+
+L'entrée est lue ligne à ligne, notée par tranches de CHUNK_SIZE lectures
+(RespiriaAIPredictor.predict_batch, calcul vectorisé) et chaque tranche est
+émise dès qu'elle est notée : la mémoire dépend de la taille de tranche,
+pas de la taille de l'entrée.
+
+- endpoint POST /api/v1/score/bulk (api/app.py), corps en streaming
+- CLI :
+    python -m api.bulk_scoring lectures.csv -o scores.ndjson
+    cat lectures.ndjson | python -m api.bulk_scoring - --chunk-size 5000
+
+Une ligne de résultat par lecture, dans l'ordre, puis une ligne "summary".
+Les colonnes du dataset (data/respiria_dataset.csv : user_profile,
+heart_rate_bpm...) sont renommées vers les noms du moteur IA.
+"""
+
+import argparse
+import codecs
+import contextlib
+import csv
+import os
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from . import fast_json
+except ImportError:
+    import fast_json
+
+CHUNK_SIZE = int(os.environ.get("RESPIRIA_BULK_CHUNK_SIZE", "1000"))
+MAX_CHUNK_SIZE = 10000
+
+FORMATS = ("ndjson", "csv")
+
+# Colonnes du dataset → variables du moteur IA
+COLUMN_ALIASES = {
+    "user_profile": "profile_id",
+    "heart_rate_bpm": "heart_rate",
+    "temperature_c": "temperature",
+    "humidity_percent": "humidity",
+    "eco2_ppm": "eco2",
+    "tvoc_ppb": "tvoc",
+}
+
+# Identifiants recopiés tels quels dans le résultat
+PASSTHROUGH_FIELDS = ("id", "user_id", "timestamp")
+
+BOOLEAN_FIELDS = ("smoke_detected", "medication_taken")
+_TRUE = frozenset(("1", "true", "yes", "oui", "y"))
+
+
+def parse_cell(name: str, text: str) -> Any:
+    """Cellule CSV → bool / int / float (texte inchangé sinon)"""
+    if name in BOOLEAN_FIELDS:
+        return text.strip().lower() in _TRUE
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def normalize(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Renomme les colonnes du dataset ; profile_id entier (le CSV donne 2.0 ou "2")"""
+    record = {COLUMN_ALIASES.get(name, name): value for name, value in record.items()}
+    profile_id = record.get("profile_id")
+    if isinstance(profile_id, float) and profile_id.is_integer():
+        record["profile_id"] = int(profile_id)
+    return record
+
+
+def iter_ndjson(lines: Iterable[bytes]) -> Iterator[Tuple[Optional[Dict], Optional[str]]]:
+    """(lecture, None) ou (None, erreur) par ligne non vide"""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = fast_json.loads(line)
+        except ValueError as e:
+            yield None, f"JSON invalide: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield None, "Lecture invalide (objet attendu)"
+            continue
+        yield normalize(record), None
+
+
+def iter_csv(lines: Iterable[bytes]) -> Iterator[Tuple[Optional[Dict], Optional[str]]]:
+    """(lecture, None) par ligne CSV (en-tête obligatoire) ; cellules vides ignorées"""
+    for row in csv.DictReader(codecs.iterdecode(lines, "utf-8-sig")):
+        if None in row:
+            yield None, "Ligne CSV invalide (colonnes en trop)"
+            continue
+        yield normalize({name: parse_cell(name, text) for name, text in row.items()
+                         if text is not None and text != ""}), None
+
+
+def iter_records(lines: Iterable[bytes], fmt: str = "ndjson") -> Iterator[Tuple[Optional[Dict], Optional[str]]]:
+    if fmt == "csv":
+        return iter_csv(lines)
+    return iter_ndjson(lines)
+
+
+def summarize(row: int, record: Optional[Dict], result: Dict, full: bool = False) -> Dict[str, Any]:
+    """Ligne de résultat compacte (full : facteurs et recommandations complets)"""
+    line: Dict[str, Any] = {"row": row}
+    if record is not None:
+        for name in PASSTHROUGH_FIELDS:
+            if name in record:
+                line[name] = record[name]
+    if not result.get("success"):
+        line["success"] = False
+        line["error"] = result.get("error")
+        return line
+    prediction = result["prediction"]
+    line.update(success=True, risk_score=prediction["risk_score"], risk_level=prediction["risk_level"],
+                confidence=prediction["confidence"], should_notify=prediction["should_notify"])
+    if full:
+        line["risk_factors"] = result["risk_factors"]
+        line["recommendations"] = result["recommendations"]
+    else:
+        line["factors"] = [factor["factor"] for factor in result["risk_factors"]]
+    return line
+
+
+def score_chunk(predictor, chunk: List[Tuple[Optional[Dict], Optional[str]]], first_row: int,
+                full: bool = False) -> List[Dict[str, Any]]:
+    """
+    Note une tranche ; les lignes illisibles gardent leur erreur de lecture.
+    Si le calcul vectorisé échoue, chaque lecture est notée seule : une ligne
+    empoisonnée donne une erreur à sa position sans couper le flux.
+    """
+    records = [record for record, _ in chunk if record is not None]
+    try:
+        scored = predictor.predict_batch(records) if records else []
+    except Exception:
+        scored = [predictor.predict(record) for record in records]
+    results = iter(scored)
+    lines = []
+    for offset, (record, error) in enumerate(chunk):
+        result = next(results) if record is not None else {"success": False, "error": error}
+        lines.append(summarize(first_row + offset, record, result, full))
+    return lines
+
+
+def score_stream(predictor, records: Iterable[Tuple[Optional[Dict], Optional[str]]],
+                 chunk_size: int = CHUNK_SIZE, full: bool = False,
+                 stats: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """Résultats ligne par ligne, une tranche de chunk_size lectures en mémoire au plus"""
+    stats = stats if stats is not None else {}
+    stats.update(rows=0, failed=0)
+    chunk: List[Tuple[Optional[Dict], Optional[str]]] = []
+    for item in records:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield from _emit(predictor, chunk, stats, full)
+            chunk = []
+    if chunk:
+        yield from _emit(predictor, chunk, stats, full)
+
+
+def _emit(predictor, chunk, stats: Dict[str, Any], full: bool) -> Iterator[Dict[str, Any]]:
+    for line in score_chunk(predictor, chunk, stats["rows"], full):
+        if not line["success"]:
+            stats["failed"] += 1
+        yield line
+    stats["rows"] += len(chunk)
+
+
+def stream_ndjson(predictor, lines: Iterable[bytes], fmt: str = "ndjson", chunk_size: int = CHUNK_SIZE,
+                  full: bool = False, stats: Optional[Dict[str, Any]] = None) -> Iterator[bytes]:
+    """
+    Corps de réponse NDJSON : une tranche encodée par bloc émis, puis la
+    ligne {"summary": {...}} (lectures, échecs, durée, débit), aussi
+    recopiée dans stats
+    """
+    start = time.perf_counter()
+    stats = stats if stats is not None else {}
+    buffer: List[bytes] = []
+    for line in score_stream(predictor, iter_records(lines, fmt), chunk_size, full, stats):
+        buffer.append(fast_json.dumps(line))
+        if len(buffer) >= chunk_size:
+            yield b"\n".join(buffer) + b"\n"
+            buffer = []
+    if buffer:
+        yield b"\n".join(buffer) + b"\n"
+    elapsed = time.perf_counter() - start
+    stats["elapsed_s"] = round(elapsed, 3)
+    stats["rows_per_sec"] = round(stats["rows"] / elapsed, 1) if elapsed > 0 else None
+    yield fast_json.dumps({"summary": stats}) + b"\n"
+
+
+def detect_format(path: str, content_type: str = "") -> str:
+    """Format d'après le Content-Type ou l'extension (NDJSON par défaut)"""
+    if "csv" in content_type or path.lower().endswith(".csv"):
+        return "csv"
+    return "ndjson"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Notation en masse RESPIRIA AI (NDJSON/CSV → NDJSON)")
+    parser.add_argument("input", help="Fichier de lectures (.csv, .ndjson) ou - pour l'entrée standard")
+    parser.add_argument("-o", "--output", help="Fichier NDJSON de sortie (défaut : sortie standard)")
+    parser.add_argument("--format", choices=FORMATS, help="Format d'entrée (défaut : d'après l'extension)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Lectures par tranche vectorisée")
+    parser.add_argument("--full", action="store_true", help="Facteurs et recommandations complets")
+    args = parser.parse_args(argv)
+
+    # Bannières d'initialisation sur stderr : stdout reste du NDJSON
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            from .respiria_ai_predictor import RespiriaAIPredictor
+        except ImportError:
+            from respiria_ai_predictor import RespiriaAIPredictor
+        predictor = RespiriaAIPredictor()
+
+    fmt = args.format or detect_format(args.input)
+    chunk_size = max(1, min(MAX_CHUNK_SIZE, args.chunk_size))
+    source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    target = open(args.output, "wb") if args.output else sys.stdout.buffer
+    summary: Dict[str, Any] = {}
+    try:
+        for block in stream_ndjson(predictor, source, fmt, chunk_size, args.full, summary):
+            target.write(block)
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if target is not sys.stdout.buffer:
+            target.close()
+        else:
+            target.flush()
+
+    print(f"✅ {summary.get('rows', 0)} lectures notées ({summary.get('failed', 0)} en erreur) "
+          f"en {summary.get('elapsed_s', 0)} s - {summary.get('rows_per_sec')} lectures/s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,13 @@
 # api/data_collector.py
+import logging
 import os
 
-# Charger les variables d'environnement
+# Charger les variables d'environnement (une seule fois par processus)
 try:
-    from dotenv import load_dotenv  # type: ignore
-    load_dotenv()
+    from .env import load_env
 except ImportError:
-    pass
+    from env import load_env
+load_env()
 
 try:
     import requests  # type: ignore
@@ -14,12 +15,24 @@ try:
 except ImportError:
     REQUESTS_AVAILABLE = False
 
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 from datetime import datetime
 
+try:
+    from .logger import get_logger
+    from .metrics import upstream_call
+    from .timing import stage, timed_stage
+except ImportError:
+    from logger import get_logger
+    from metrics import upstream_call
+    from timing import stage, timed_stage
+
+log = get_logger("collector")
+
 # Configuration Ubidots depuis .env
 UBIDOTS_TOKEN = os.environ.get("UBIDOTS_TOKEN")
 UBIDOTS_DEVICE_LABEL = os.environ.get("UBIDOTS_DEVICE_LABEL", "bracelet")
+UBIDOTS_API_URL = os.environ.get("UBIDOTS_API_URL", "https://industrial.api.ubidots.com/api/v1.6")
 
 class RespiriaDataCollector:
     """
@@ -41,19 +54,23 @@ class RespiriaDataCollector:
             'User-Agent': 'RESPIRIA-AI/1.0'
         }
     
-    def get_weather_data(self, location: Optional[str] = None, auth_token: Optional[str] = None) -> Dict:
+    @timed_stage('weather')
+    @upstream_call('get_weather_data')
+    def get_weather_data(self, location: Optional[str] = None, auth_token: Optional[str] = None,
+                         coordinates: Optional[Tuple[float, float]] = None) -> Dict:
         """
         Récupère les données météo depuis l'API RESPIRIA Backend
         
         Args:
             location: Localisation (optionnel)
             auth_token: JWT Bearer token pour authentification
+            coordinates: (lat, lon) du point demandé (optionnel, voir api/geo_cache.py)
         
         Returns:
             Dict avec température, humidité, etc.
         """
         try:
-            params = {'city': location} if location else {}
+            params = self._location_params(location, coordinates)
             headers = self.headers.copy()
             
             if auth_token:
@@ -84,7 +101,7 @@ class RespiriaDataCollector:
             }
         
         except requests.exceptions.RequestException as e:
-            print(f"❌ Erreur API météo : {e}")
+            log.warning("Erreur API météo : %s", e, extra={'upstream': 'weather', 'location': location})
             # Valeurs par défaut optimisées
             return {
                 'temperature': 25.0,
@@ -100,7 +117,10 @@ class RespiriaDataCollector:
                 'error': str(e)
             }
     
-    def get_air_quality_data(self, location: Optional[str] = None, auth_token: Optional[str] = None) -> Dict:
+    @timed_stage('air_quality')
+    @upstream_call('get_air_quality_data')
+    def get_air_quality_data(self, location: Optional[str] = None, auth_token: Optional[str] = None,
+                             coordinates: Optional[Tuple[float, float]] = None) -> Dict:
         """
         Récupère les données de qualité de l'air depuis l'API RESPIRIA Backend
         
@@ -108,7 +128,7 @@ class RespiriaDataCollector:
             Dict avec AQI, polluants, pollen
         """
         try:
-            params = {'city': location} if location else {}
+            params = self._location_params(location, coordinates)
             headers = self.headers.copy()
             
             if auth_token:
@@ -143,7 +163,7 @@ class RespiriaDataCollector:
             }
         
         except requests.exceptions.RequestException as e:
-            print(f"❌ Erreur API qualité air : {e}")
+            log.warning("Erreur API qualité air : %s", e, extra={'upstream': 'air_quality', 'location': location})
             # Valeurs par défaut optimisées
             return {
                 'aqi': 50,
@@ -161,6 +181,14 @@ class RespiriaDataCollector:
                 'error': str(e)
             }
     
+    @staticmethod
+    def _location_params(location: Optional[str], coordinates: Optional[Tuple[float, float]]) -> Dict:
+        """Paramètres de localisation du backend : city et/ou lat, lon"""
+        params = {'city': location} if location else {}
+        if coordinates is not None:
+            params['lat'], params['lon'] = round(coordinates[0], 5), round(coordinates[1], 5)
+        return params
+    
     def _estimate_pollen_from_aqi(self, aqi: int) -> int:
         """Estime le niveau de pollen basé sur l'AQI (0-5)"""
         if aqi <= 50:
@@ -174,6 +202,7 @@ class RespiriaDataCollector:
         else:
             return 5  # Extrême
 
+    @upstream_call('get_ubidots_sensors')
     def get_ubidots_sensors(self, user_id: str, auth_token: Optional[str] = None) -> Dict:
         """
         Récupère les données des capteurs Ubidots depuis l'API RESPIRIA Backend
@@ -192,25 +221,28 @@ class RespiriaDataCollector:
                 headers['Authorization'] = f'Bearer {auth_token}'
             
             # Récupérer données MAX30102 (médical)
-            medical_response = requests.get(
-                f"{self.sensors_url}data/max30102/",
-                headers=headers,
-                timeout=self.timeout
-            )
+            with stage('sensor_max30102'):
+                medical_response = requests.get(
+                    f"{self.sensors_url}data/max30102/",
+                    headers=headers,
+                    timeout=self.timeout
+                )
             
             # Récupérer données environnementales
-            env_response = requests.get(
-                f"{self.sensors_url}data/dht11/",
-                headers=headers,
-                timeout=self.timeout
-            )
+            with stage('sensor_dht11'):
+                env_response = requests.get(
+                    f"{self.sensors_url}data/dht11/",
+                    headers=headers,
+                    timeout=self.timeout
+                )
             
             # Récupérer données qualité air capteurs
-            air_response = requests.get(
-                f"{self.sensors_url}data/cjmcu811/",
-                headers=headers,
-                timeout=self.timeout
-            )
+            with stage('sensor_cjmcu811'):
+                air_response = requests.get(
+                    f"{self.sensors_url}data/cjmcu811/",
+                    headers=headers,
+                    timeout=self.timeout
+                )
             
             medical_data = medical_response.json() if medical_response.status_code == 200 else {}
             env_data = env_response.json() if env_response.status_code == 200 else {}
@@ -237,7 +269,7 @@ class RespiriaDataCollector:
             }
         
         except requests.exceptions.RequestException as e:
-            print(f"❌ Erreur capteurs Ubidots : {e}")
+            log.warning("Erreur capteurs Ubidots : %s", e, extra={'upstream': 'sensors', 'user_id': user_id})
             # Valeurs par défaut sécurisées
             return {
                 'spo2': 96.0,
@@ -269,6 +301,7 @@ class RespiriaDataCollector:
             return True
         return False
 
+    @upstream_call('get_ubidots_direct')
     def get_ubidots_direct(self) -> Dict:
         """
         📡 Récupère les données directement depuis l'API Ubidots
@@ -278,7 +311,7 @@ class RespiriaDataCollector:
             Dict avec les dernières valeurs des capteurs
         """
         if not UBIDOTS_TOKEN:
-            print("⚠️ UBIDOTS_TOKEN non configuré")
+            log.debug("UBIDOTS_TOKEN non configuré", extra={'upstream': 'ubidots_direct'})
             return self._default_sensor_data()
         
         try:
@@ -288,10 +321,12 @@ class RespiriaDataCollector:
             datasource_id = "696c16da6b8f94fd52f77962"
             
             # Récupérer les variables du datasource
-            vars_url = f"https://industrial.api.ubidots.com/api/v1.6/datasources/{datasource_id}/variables/"
-            vars_response = requests.get(vars_url, headers=headers, timeout=10)
+            vars_url = f"{UBIDOTS_API_URL}/datasources/{datasource_id}/variables/"
+            with stage('ubidots_variables'):
+                vars_response = requests.get(vars_url, headers=headers, timeout=10)
             
             sensors = {}
+            sample_ms = 0  # horodatage Ubidots (ms) de la mesure la plus récente
             
             if vars_response.status_code == 200:
                 variables = vars_response.json().get('results', [])
@@ -301,13 +336,15 @@ class RespiriaDataCollector:
                     var_id = var.get('id')
                     label = var.get('label')
                     
-                    val_url = f"https://industrial.api.ubidots.com/api/v1.6/variables/{var_id}/values/?page_size=1"
-                    val_response = requests.get(val_url, headers=headers, timeout=5)
+                    val_url = f"{UBIDOTS_API_URL}/variables/{var_id}/values/?page_size=1"
+                    with stage('ubidots_values'):
+                        val_response = requests.get(val_url, headers=headers, timeout=5)
                     
                     if val_response.status_code == 200:
                         values = val_response.json().get('results', [])
                         if values and len(values) > 0:
                             sensors[label] = float(values[0].get('value', 0))
+                            sample_ms = max(sample_ms, values[0].get('timestamp') or 0)
             
             # Mapper les noms de variables
             eco2_val = sensors.get('eco2', 400)
@@ -326,13 +363,14 @@ class RespiriaDataCollector:
                 'eco2_ppm': eco2_val,
                 'tvoc_ppb': tvoc_val,
                 'smoke_detected': smoke_detected,
-                'timestamp': datetime.now().isoformat(),
+                # Horodatage de la mesure (pas de la requête) : une relecture ne fait pas avancer les filtres
+                'timestamp': (datetime.fromtimestamp(sample_ms / 1000) if sample_ms else datetime.now()).isoformat(),
                 'source': 'ubidots_direct',
                 'status': 'success'
             }
             
         except Exception as e:
-            print(f"⚠️ Ubidots direct error: {e}")
+            log.warning("Ubidots direct error: %s", e, extra={'upstream': 'ubidots_direct'})
             return self._default_sensor_data()
     
     def _default_sensor_data(self) -> Dict:
@@ -351,6 +389,8 @@ class RespiriaDataCollector:
             'status': 'fallback'
         }
 
+    @timed_stage('ubidots_latest')
+    @upstream_call('get_ubidots_latest')
     def get_ubidots_latest(self, user_id: str) -> Dict:
         """
         📡 Récupère les DERNIÈRES données Ubidots directement
@@ -399,7 +439,7 @@ class RespiriaDataCollector:
                 raise Exception(f"API returned {response.status_code}")
                 
         except Exception as e:
-            print(f"⚠️ Ubidots latest error: {e}")
+            log.warning("Ubidots latest error: %s", e, extra={'upstream': 'ubidots_latest', 'user_id': user_id})
             return {
                 'spo2': 96,
                 'heart_rate': 75,
@@ -413,6 +453,8 @@ class RespiriaDataCollector:
                 'error': str(e)
             }
 
+    @timed_stage('unified')
+    @upstream_call('get_unified_prediction_data')
     def get_unified_prediction_data(self, user_id: str, location: Optional[str] = None, 
                                    auth_token: Optional[str] = None) -> Dict:
         """
@@ -477,7 +519,8 @@ class RespiriaDataCollector:
             }
             
         except requests.exceptions.RequestException as e:
-            print(f"⚠️ Endpoint unifié indisponible, fallback vers APIs séparées : {e}")
+            log.warning("Endpoint unifié indisponible, fallback vers APIs séparées : %s", e,
+                        extra={'upstream': 'unified', 'user_id': user_id})
             # Fallback vers collecte séparée
             return self.collect_all_data(user_id, location, auth_token)
 
@@ -495,7 +538,7 @@ class RespiriaDataCollector:
         Returns:
             Dict avec toutes les données formatées pour RESPIRIA IA
         """
-        print(f"🔄 Collecte des données pour user {user_id} à {location or 'localisation par défaut'}...")
+        log.debug("Collecte des données pour user %s à %s", user_id, location or 'localisation par défaut')
         
         # Récupérer toutes les données en parallèle (optimisé)
         weather = self.get_weather_data(location, auth_token)
@@ -532,10 +575,16 @@ class RespiriaDataCollector:
             'collection_method': 'separate_apis'
         }
         
-        print(f"✅ Données collectées : {len(respiria_data)} champs")
-        print(f"   📊 SpO2: {respiria_data['spo2']}%, HR: {respiria_data['heart_rate']} bpm")
-        print(f"   🌤️ T°: {respiria_data['temperature']}°C, Humidité: {respiria_data['humidity']}%") 
-        print(f"   🌫️ AQI: {respiria_data['aqi']}, Pollen: {respiria_data['pollen_level']}/5")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Données collectées : %d champs", len(respiria_data), extra={
+                'user_id': user_id,
+                'spo2': respiria_data['spo2'],
+                'heart_rate': respiria_data['heart_rate'],
+                'temperature': respiria_data['temperature'],
+                'humidity': respiria_data['humidity'],
+                'aqi': respiria_data['aqi'],
+                'pollen_level': respiria_data['pollen_level'],
+            })
         
         return respiria_data
 
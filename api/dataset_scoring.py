@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# api/dataset_scoring.py
+"""
+Renotation hors ligne d'un fichier de lectures (CSV ou Parquet) sur tous les cœurs
+
+Le fichier (forme de data/respiria_dataset.csv) est découpé en tranches de
+--chunk-size lignes ; chaque tranche est notée dans un processus du pool par
+RespiriaAIPredictor.predict_batch (calcul vectorisé, un moteur IA par
+processus). Les tranches sont écrites dans l'ordre du fichier, avec au plus
+2 tranches en cours par processus : la mémoire ne dépend pas de la taille
+du fichier.
+
+Sortie : colonnes d'entrée + risk_score, risk_level, confidence,
+should_notify, factors (séparés par "|"), error. Format d'après l'extension
+de -o : .csv (défaut, sortie standard si absent), .ndjson, .parquet.
+
+Usage:
+  python -m api.dataset_scoring data/respiria_dataset.csv -o scores.csv
+  python -m api.dataset_scoring exports/2026-09.parquet -o scores.parquet --workers 8
+
+Parquet : pyarrow requis (pip install pyarrow).
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    from . import bulk_scoring, fast_json
+except ImportError:
+    import bulk_scoring
+    import fast_json
+
+CHUNK_SIZE = 5000
+SCORE_COLUMNS = ("risk_score", "risk_level", "confidence", "should_notify", "factors", "error")
+
+# Tranche : (colonnes, lignes de valeurs alignées sur les colonnes)
+Chunk = Tuple[Sequence[str], List[Sequence[Any]]]
+
+_predictor = None
+
+
+def _get_predictor():
+    """Moteur IA du processus (créé une fois par processus du pool)"""
+    global _predictor
+    if _predictor is None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                from .respiria_ai_predictor import RespiriaAIPredictor
+            except ImportError:
+                from respiria_ai_predictor import RespiriaAIPredictor
+            _predictor = RespiriaAIPredictor()
+    return _predictor
+
+
+def score_chunk(chunk: Chunk) -> List[Tuple]:
+    """Lignes d'entrée + colonnes de score (exécuté dans un processus du pool)"""
+    columns, rows = chunk
+    records = []
+    for values in rows:
+        record = {}
+        for name, value in zip(columns, values):
+            if value is None or value == "":
+                continue
+            record[name] = bulk_scoring.parse_cell(name, value) if isinstance(value, str) else value
+        records.append(bulk_scoring.normalize(record))
+
+    scored = []
+    for values, result in zip(rows, _get_predictor().predict_batch(records)):
+        if result.get("success"):
+            prediction = result["prediction"]
+            factors = "|".join(factor["factor"] for factor in result["risk_factors"])
+            scores = (prediction["risk_score"], prediction["risk_level"], prediction["confidence"],
+                      prediction["should_notify"], factors, None)
+        else:
+            scores = (None, None, None, None, None, result.get("error"))
+        scored.append(tuple(values) + scores)
+    return scored
+
+
+# ==========================================
+# LECTURE PAR TRANCHES
+# ==========================================
+
+def iter_csv_chunks(path: str, chunk_size: int) -> Iterator[Chunk]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        columns = next(reader, None)
+        if columns is None:
+            return
+        rows: List[Sequence[Any]] = []
+        for row in reader:
+            rows.append(row)
+            if len(rows) >= chunk_size:
+                yield columns, rows
+                rows = []
+        if rows:
+            yield columns, rows
+
+
+def iter_parquet_chunks(path: str, chunk_size: int) -> Iterator[Chunk]:
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("pyarrow requis pour les fichiers Parquet (pip install pyarrow)")
+    parquet = pq.ParquetFile(path)
+    columns = parquet.schema_arrow.names
+    for batch in parquet.iter_batches(batch_size=chunk_size):
+        data = batch.to_pydict()
+        yield columns, list(zip(*(data[name] for name in columns)))
+
+
+def iter_chunks(path: str, chunk_size: int) -> Iterator[Chunk]:
+    if path.lower().endswith(".parquet"):
+        return iter_parquet_chunks(path, chunk_size)
+    return iter_csv_chunks(path, chunk_size)
+
+
+# ==========================================
+# NOTATION (POOL DE PROCESSUS, ORDRE CONSERVÉ)
+# ==========================================
+
+def score_chunks(chunks: Iterator[Chunk], workers: int) -> Iterator[Tuple[Sequence[str], List[Tuple]]]:
+    """
+    (colonnes, lignes notées) par tranche, dans l'ordre d'entrée ; au plus
+    2 tranches en cours par processus (lecture au rythme de la notation)
+    """
+    if workers <= 1:
+        for columns, rows in chunks:
+            yield columns, score_chunk((columns, rows))
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+        for chunk in chunks:
+            pending.append((chunk[0], pool.submit(score_chunk, chunk)))
+            if len(pending) >= 2 * workers:
+                columns, future = pending.popleft()
+                yield columns, future.result()
+        while pending:
+            columns, future = pending.popleft()
+            yield columns, future.result()
+
+
+# ==========================================
+# ÉCRITURE
+# ==========================================
+
+class CSVOutput:
+    def __init__(self, stream):
+        self.stream = stream
+        self.writer = csv.writer(stream)
+        self.header_written = False
+
+    def write(self, columns: Sequence[str], rows: List[Tuple]):
+        if not self.header_written:
+            self.writer.writerow(list(columns) + list(SCORE_COLUMNS))
+            self.header_written = True
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.stream.flush()
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+class NDJSONOutput:
+    def __init__(self, path: str):
+        self.stream = open(path, "wb")
+
+    def write(self, columns: Sequence[str], rows: List[Tuple]):
+        names = list(columns) + list(SCORE_COLUMNS)
+        self.stream.write(b"".join(fast_json.dumps(dict(zip(names, row))) + b"\n" for row in rows))
+
+    def close(self):
+        self.stream.close()
+
+
+class ParquetOutput:
+    def __init__(self, path: str):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow requis pour écrire du Parquet (pip install pyarrow)")
+        self.path = path
+        self.writer = None
+
+    def write(self, columns: Sequence[str], rows: List[Tuple]):
+        names = list(columns) + list(SCORE_COLUMNS)
+        data = {name: [row[i] for row in rows] for i, name in enumerate(names)}
+        if self.writer is None:
+            table = pa.Table.from_pydict(data)
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        else:
+            table = pa.Table.from_pydict(data, schema=self.writer.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def open_output(path: Optional[str]):
+    if not path:
+        return CSVOutput(sys.stdout)
+    if path.lower().endswith(".parquet"):
+        return ParquetOutput(path)
+    if path.lower().endswith((".ndjson", ".jsonl")):
+        return NDJSONOutput(path)
+    return CSVOutput(open(path, "w", newline="", encoding="utf-8"))
+
+
+def score_file(path: str, output: Optional[str] = None, workers: Optional[int] = None,
+               chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+    """Note tout le fichier ; retourne {rows, failed, elapsed_s, rows_per_sec, workers}"""
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    rows = failed = 0
+    writer = open_output(output)
+    try:
+        for columns, scored in score_chunks(iter_chunks(path, chunk_size), workers):
+            writer.write(columns, scored)
+            rows += len(scored)
+            failed += sum(1 for row in scored if row[-1] is not None)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "failed": failed,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed > 0 else None,
+        "workers": workers,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Renotation hors ligne RESPIRIA AI (CSV/Parquet, multi-processus)")
+    parser.add_argument("input", help="Fichier de lectures (.csv ou .parquet)")
+    parser.add_argument("-o", "--output", help="Fichier de sortie .csv / .ndjson / .parquet (défaut : CSV sur stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="Processus (défaut : nombre de cœurs)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Lignes par tranche")
+    args = parser.parse_args(argv)
+
+    print(f"🚀 Renotation de {args.input} ({args.workers or os.cpu_count()} processus, "
+          f"tranches de {args.chunk_size} lignes)", file=sys.stderr)
+    report = score_file(args.input, args.output, args.workers, max(1, args.chunk_size))
+    print(f"✅ {report['rows']} lignes notées ({report['failed']} en erreur) en {report['elapsed_s']} s "
+          f"- {report['rows_per_sec']} lignes/s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,22 @@
+# api/env.py
+"""
+Chargement unique du fichier .env
+
+app.py et data_collector.py appelaient chacun load_dotenv() (recherche du
+fichier en remontant les répertoires) : un seul chargement par processus.
+"""
+
+_loaded = False
+
+
+def load_env():
+    """Charge .env une seule fois (sans effet si python-dotenv est absent)"""
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+    try:
+        from dotenv import load_dotenv  # type: ignore
+        load_dotenv()
+    except ImportError:
+        pass
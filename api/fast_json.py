@@ -0,0 +1,141 @@
+# api/fast_json.py
+"""
+Sérialisation JSON rapide des réponses API
+
+- orjson si installé (C, sortie UTF-8 compacte), sinon json standard
+- Fragment : sous-document constant sérialisé une seule fois (palettes UI,
+  actions rapides, carte des endpoints...) puis recopié tel quel dans chaque
+  réponse, sans être reparcouru
+- FastJSONProvider : fournisseur JSON Flask (jsonify, request.get_json)
+
+Les clés ne sont pas triées (contrairement au fournisseur Flask par défaut) :
+le tri coûte à chaque réponse et les clients parsent le JSON.
+"""
+
+import dataclasses
+import json
+import os
+import secrets
+from datetime import date, datetime
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Any, Callable, List
+
+try:
+    import orjson  # type: ignore
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from flask.json.provider import DefaultJSONProvider  # type: ignore
+    FLASK_AVAILABLE = True
+except ImportError:
+    DefaultJSONProvider = object
+    FLASK_AVAILABLE = False
+
+# false : encodage de référence, identique à jsonify Flask (json standard, clés
+# triées, ASCII, fragments resérialisés) - pour comparer avant/après
+FAST_JSON_ENABLED = os.environ.get("RESPIRIA_FAST_JSON", "True").lower() == "true"
+
+# Chaîne de remplacement d'un fragment, avec un nonce aléatoire tiré à chaque appel
+# de dumps() : une chaîne venue de la requête ne peut pas l'imiter. \x00 est échappé
+# en \u0000 par les deux backends.
+_PLACEHOLDER = "\x00respiria-fragment:%s:%d"
+_PLACEHOLDER_JSON = b'"\\u0000respiria-fragment:%s:%d"'
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    """Types non natifs (surtout pour le backend json standard)"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, MappingProxyType):  # registres en lecture seule (api/ui_registry.py)
+        return dict(obj)
+    if hasattr(obj, "to_json"):
+        return obj.to_json()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "tolist"):  # tableaux et scalaires numpy
+        return obj.tolist()
+    raise TypeError(f"Type non sérialisable en JSON : {type(obj).__name__}")
+
+
+def _encode(obj: Any, default: Callable[[Any], Any], indent: bool = False) -> bytes:
+    if ORJSON_AVAILABLE:
+        options = _ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else _ORJSON_OPTIONS
+        return orjson.dumps(obj, default=default, option=options)
+    return json.dumps(obj, default=default, ensure_ascii=False,
+                      indent=2 if indent else None,
+                      separators=None if indent else (",", ":")).encode("utf-8")
+
+
+class Fragment:
+    """
+    Sous-document JSON constant, sérialisé une fois à la création
+
+    value reste lisible par le code Python ; ne pas le modifier
+    (la version sérialisée ne suivrait pas).
+    """
+    __slots__ = ("value", "json")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.json = dumps(value)
+
+    def __repr__(self) -> str:
+        return f"Fragment({self.json[:40]!r})"
+
+
+def _reference_default(obj: Any) -> Any:
+    if isinstance(obj, Fragment):
+        return obj.value
+    return _default(obj)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Sérialise en JSON UTF-8 ; les Fragment sont recopiés sans resérialisation"""
+    if not FAST_JSON_ENABLED:
+        return json.dumps(obj, default=_reference_default, sort_keys=True,
+                          indent=2 if indent else None).encode("utf-8")
+    fragments: List[bytes] = []
+    nonce = secrets.token_hex(8)
+
+    def default(value):
+        if isinstance(value, Fragment):
+            fragments.append(value.json)
+            return _PLACEHOLDER % (nonce, len(fragments) - 1)
+        return _default(value)
+
+    body = _encode(obj, default, indent)
+    marker = nonce.encode("ascii")
+    for index, raw in enumerate(fragments):
+        body = body.replace(_PLACEHOLDER_JSON % (marker, index), raw, 1)
+    return body
+
+
+def loads(data: Any) -> Any:
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Fournisseur JSON Flask : flask_app.json = FastJSONProvider(flask_app)"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj).decode("utf-8")
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(dumps(obj, indent=indent), mimetype=self.mimetype)
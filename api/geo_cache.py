@@ -0,0 +1,278 @@
+# api/geo_cache.py
+"""
+Cache géographique des données environnementales (météo + qualité de l'air)
+
+Les requêtes portent un nom de ville ou des coordonnées (lat/lon). Les
+coordonnées sont résolues en une clé de cache partagée :
+
+1. station : une ville connue (STATIONS) à moins de STATION_RADIUS_KM →
+   données de la ville (paramètre city du backend), partagées par tous les
+   utilisateurs alentour
+2. sinon cellule geohash (GEO_PRECISION caractères : 5 ≈ 5 km × 5 km) ; une
+   cellule voisine déjà en cache et encore fraîche, dont le centre est à
+   moins de NEIGHBOR_RADIUS_KM, est réutilisée ; sinon le backend est
+   interrogé au centre de la cellule (paramètres lat/lon)
+
+Index spatial : geohash (cellules et voisines calculées par arithmétique,
+stations rangées par préfixe de STATION_BUCKET_PRECISION caractères). Les
+appels amont croissent avec le nombre de cellules, pas d'utilisateurs :
+une entrée vit GEO_CACHE_TTL secondes (FALLBACK_TTL pour une réponse de
+repli), et un seul appel est en vol par clé (les requêtes concurrentes
+attendent son résultat).
+
+Données publiques : une entrée est servie à tous les appelants, le jeton
+de l'utilisateur n'est donc jamais transmis au backend (fetch ne le reçoit
+pas). Chaque réponse décrit la résolution (describe : ville / station ou
+cellule et son centre) pour que le client sache d'où viennent les données.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+GEO_CACHE_TTL = float(os.environ.get("RESPIRIA_GEO_CACHE_TTL", "600"))
+GEO_PRECISION = int(os.environ.get("RESPIRIA_GEO_PRECISION", "5"))
+STATION_RADIUS_KM = float(os.environ.get("RESPIRIA_STATION_RADIUS_KM", "15"))
+NEIGHBOR_RADIUS_KM = 6.0
+FALLBACK_TTL = 30.0
+STATION_BUCKET_PRECISION = 3   # ≈ 156 km × 156 km
+MAX_ENTRIES = 50000
+EARTH_RADIUS_KM = 6371.0
+
+# Villes servies par le backend (nom attendu par le paramètre city) : (lat, lon)
+STATIONS: Mapping[str, Tuple[float, float]] = {
+    "Abidjan": (5.3600, -4.0083),
+    "Bouaké": (7.6906, -5.0300),
+    "Yamoussoukro": (6.8276, -5.2893),
+    "San-Pédro": (4.7485, -6.6363),
+    "Korhogo": (9.4580, -5.6296),
+    "Daloa": (6.8774, -6.4502),
+    "Man": (7.4125, -7.5538),
+}
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {char: index for index, char in enumerate(_BASE32)}
+
+Environment = Tuple[Dict[str, Any], Dict[str, Any]]
+
+
+def geohash_encode(lat: float, lon: float, precision: int = GEO_PRECISION) -> str:
+    """Geohash de (lat, lon) sur precision caractères"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, lon) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def geohash_bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """(lat_min, lat_max, lon_min, lon_max) de la cellule"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            interval = lon_range if even else lat_range
+            middle = (interval[0] + interval[1]) / 2
+            if value >> shift & 1:
+                interval[0] = middle
+            else:
+                interval[1] = middle
+            even = not even
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+
+def geohash_center(geohash: str) -> Tuple[float, float]:
+    lat_min, lat_max, lon_min, lon_max = geohash_bounds(geohash)
+    return (lat_min + lat_max) / 2, (lon_min + lon_max) / 2
+
+
+def geohash_neighbors(geohash: str) -> List[str]:
+    """Les 8 cellules voisines (même précision)"""
+    lat_min, lat_max, lon_min, lon_max = geohash_bounds(geohash)
+    lat, lon = (lat_min + lat_max) / 2, (lon_min + lon_max) / 2
+    height, width = lat_max - lat_min, lon_max - lon_min
+    neighbors = []
+    for d_lat in (-1, 0, 1):
+        for d_lon in (-1, 0, 1):
+            if d_lat == d_lon == 0:
+                continue
+            neighbor_lat = lat + d_lat * height
+            if not -90 < neighbor_lat < 90:
+                continue
+            neighbor_lon = (lon + d_lon * width + 180) % 360 - 180
+            neighbors.append(geohash_encode(neighbor_lat, neighbor_lon, len(geohash)))
+    return neighbors
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def describe(key: str) -> Dict[str, Any]:
+    """Résolution d'une clé de cache : ville (location) ou cellule (cell, centre)"""
+    kind, _, name = key.partition(":")
+    if kind == "city":
+        return {"key": key, "location": name or None}
+    lat, lon = geohash_center(name)
+    return {"key": key, "location": None, "cell": name, "coordinates": [round(lat, 5), round(lon, 5)]}
+
+
+def parse_coordinates(lat, lon) -> Optional[Tuple[float, float]]:
+    """(lat, lon) valides, ou None (absentes) ; ValueError si invalides"""
+    if lat in (None, "") and lon in (None, ""):
+        return None
+    lat, lon = float(lat), float(lon)
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"coordonnées hors bornes : {lat}, {lon}")
+    return lat, lon
+
+
+class StationIndex:
+    """Stations rangées par préfixe geohash : plus proche station en O(stations voisines)"""
+
+    def __init__(self, stations: Mapping[str, Tuple[float, float]] = STATIONS,
+                 bucket_precision: int = STATION_BUCKET_PRECISION):
+        self.bucket_precision = bucket_precision
+        self.buckets: Dict[str, List[Tuple[str, float, float]]] = {}
+        for name, (lat, lon) in stations.items():
+            self.buckets.setdefault(geohash_encode(lat, lon, bucket_precision), []).append((name, lat, lon))
+
+    def nearest(self, lat: float, lon: float, radius_km: float) -> Optional[Tuple[str, float]]:
+        """(station, distance km) la plus proche à moins de radius_km (rayon < taille d'un seau)"""
+        bucket = geohash_encode(lat, lon, self.bucket_precision)
+        best = None
+        for key in [bucket] + geohash_neighbors(bucket):
+            for name, station_lat, station_lon in self.buckets.get(key, ()):
+                distance = haversine_km(lat, lon, station_lat, station_lon)
+                if distance <= radius_km and (best is None or distance < best[1]):
+                    best = (name, distance)
+        return best
+
+
+class GeoEnvironmentCache:
+    """
+    Cache partagé (ville, station ou cellule geohash) → (météo, qualité de l'air)
+
+    fetch(location, coordinates) interroge le backend sans jeton utilisateur :
+    location = nom de ville, coordinates = (lat, lon) du centre de cellule
+    (ou None). ttl <= 0 : résolution seule, sans mise en cache.
+    """
+
+    def __init__(self, fetch: Callable[[Optional[str], Optional[Tuple[float, float]]], Environment],
+                 ttl: float = GEO_CACHE_TTL, precision: int = GEO_PRECISION,
+                 stations: Mapping[str, Tuple[float, float]] = STATIONS,
+                 station_radius_km: float = STATION_RADIUS_KM, max_entries: int = MAX_ENTRIES,
+                 clock: Callable[[], float] = time.monotonic):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.precision = precision
+        self.station_radius_km = station_radius_km
+        self.max_entries = max(1, max_entries)
+        self.stations = StationIndex(stations)
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Environment]]" = OrderedDict()
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "neighbor_hits": 0, "misses": 0}
+
+    def resolve(self, location: Optional[str], coordinates: Optional[Tuple[float, float]]):
+        """(clé de cache, location amont, coordonnées amont) d'une requête"""
+        if coordinates is None:
+            return f"city:{location or ''}", location, None
+        lat, lon = coordinates
+        station = self.stations.nearest(lat, lon, self.station_radius_km)
+        if station is not None:
+            return f"city:{station[0]}", station[0], None
+        cell = geohash_encode(lat, lon, self.precision)
+        return f"cell:{cell}", None, geohash_center(cell)
+
+    def get(self, location: Optional[str] = None,
+            coordinates: Optional[Tuple[float, float]] = None) -> Tuple[Dict, Dict, Dict]:
+        """(météo, qualité de l'air, résolution : describe(clé) + cache hit / neighbor / miss / off)"""
+        key, upstream_location, upstream_coordinates = self.resolve(location, coordinates)
+        if self.ttl <= 0:
+            weather, air_quality = self.fetch(upstream_location, upstream_coordinates)
+            return weather, air_quality, dict(describe(key), cache="off")
+        info = {"key": key, "cache": "hit"}
+        while True:
+            with self._lock:
+                environment = self._fresh(key)
+                if environment is None and key.startswith("cell:"):
+                    neighbor = self._fresh_neighbor(key[5:], coordinates)
+                    if neighbor is not None:
+                        info.update(key=neighbor[0], cache="neighbor")
+                        environment = neighbor[1]
+                if environment is not None:
+                    self.counters["neighbor_hits" if info["cache"] == "neighbor" else "hits"] += 1
+                    return environment[0], environment[1], dict(describe(info["key"]), cache=info["cache"])
+                pending = self._inflight.get(key)
+                if pending is None:
+                    pending = self._inflight[key] = threading.Event()
+                    self.counters["misses"] += 1
+                    break
+            pending.wait(10.0)  # un autre thread interroge déjà le backend pour cette clé
+
+        try:
+            weather, air_quality = self.fetch(upstream_location, upstream_coordinates)
+            fallback = weather.get("status") == "fallback" or air_quality.get("status") == "fallback"
+            with self._lock:
+                self._entries[key] = (self._clock() + (FALLBACK_TTL if fallback else self.ttl), (weather, air_quality))
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+        return weather, air_quality, dict(describe(key), cache="miss")
+
+    def _fresh(self, key: str) -> Optional[Environment]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < self._clock():
+            return None
+        return entry[1]
+
+    def _fresh_neighbor(self, cell: str, coordinates: Tuple[float, float]):
+        best = None
+        for neighbor in geohash_neighbors(cell):
+            environment = self._fresh(f"cell:{neighbor}")
+            if environment is None:
+                continue
+            distance = haversine_km(*coordinates, *geohash_center(neighbor))
+            if distance <= NEIGHBOR_RADIUS_KM and (best is None or distance < best[0]):
+                best = (distance, f"cell:{neighbor}", environment)
+        return best[1:] if best is not None else None
+
+    def invalidate(self, keys: Optional[Iterable[str]] = None):
+        with self._lock:
+            if keys is None:
+                self._entries.clear()
+            else:
+                for key in keys:
+                    self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters, entries=len(self._entries))
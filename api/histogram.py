@@ -0,0 +1,183 @@
+# api/histogram.py
+"""
+Histogramme de latence type HDR (High Dynamic Range)
+
+Buckets log-linéaires : erreur relative bornée (1% avec 2 chiffres
+significatifs) sur toute la plage, mémoire fixe, enregistrement O(1).
+Les histogrammes se fusionnent (merge) et se sérialisent (to_dict),
+ce qui permet l'agrégation entre threads, processus et machines.
+"""
+
+import math
+from array import array
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class HdrHistogram:
+    """
+    Histogramme HDR sur des entiers positifs (ex: microsecondes)
+
+    Args:
+        highest: Plus grande valeur enregistrable (au-delà : saturée)
+        significant_figures: Précision relative (1 à 4 chiffres)
+    """
+
+    def __init__(self, highest: int = 60_000_000, significant_figures: int = 2):
+        if not 1 <= significant_figures <= 4:
+            raise ValueError("significant_figures doit être entre 1 et 4")
+
+        self.highest = int(highest)
+        self.significant_figures = significant_figures
+
+        largest_single_unit = 2 * 10 ** significant_figures
+        self._sub_bucket_count = 1 << math.ceil(math.log2(largest_single_unit))
+        self._half_count = self._sub_bucket_count // 2
+        self._half_magnitude = self._half_count.bit_length() - 1
+        self._mask = self._sub_bucket_count - 1
+
+        self.counts = array('q', [0]) * (self._index_of(self.highest) + 1)
+        self.total_count = 0
+        self.total_sum = 0
+        self.min_value: Optional[int] = None
+        self.max_value = 0
+
+    # --- Indexation ---
+
+    def _index_of(self, value: int) -> int:
+        bucket = (value | self._mask).bit_length() - (self._half_magnitude + 1)
+        sub_bucket = value >> bucket
+        return ((bucket + 1) << self._half_magnitude) + (sub_bucket - self._half_count)
+
+    def _value_range(self, index: int) -> Tuple[int, int]:
+        """Intervalle [bas, haut] des valeurs représentées par un index"""
+        bucket = (index >> self._half_magnitude) - 1
+        sub_bucket = (index & (self._half_count - 1)) + self._half_count
+        if bucket < 0:
+            sub_bucket -= self._half_count
+            bucket = 0
+        low = sub_bucket << bucket
+        return low, low + (1 << bucket) - 1
+
+    # --- Enregistrement ---
+
+    def record(self, value: int, count: int = 1):
+        """Enregistre une valeur (tronquée à [0, highest])"""
+        value = int(value)
+        if value < 0:
+            value = 0
+        elif value > self.highest:
+            value = self.highest
+
+        self.counts[self._index_of(value)] += count
+        self.total_count += count
+        self.total_sum += value * count
+        if self.min_value is None or value < self.min_value:
+            self.min_value = value
+        if value > self.max_value:
+            self.max_value = value
+
+    def merge(self, other: "HdrHistogram") -> "HdrHistogram":
+        """Ajoute les comptes d'un histogramme de même configuration"""
+        if (other.highest, other.significant_figures) != (self.highest, self.significant_figures):
+            raise ValueError("Histogrammes de configurations différentes")
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self.total_count += other.total_count
+        self.total_sum += other.total_sum
+        if other.min_value is not None and (self.min_value is None or other.min_value < self.min_value):
+            self.min_value = other.min_value
+        self.max_value = max(self.max_value, other.max_value)
+        return self
+
+    def reset(self):
+        for index in range(len(self.counts)):
+            self.counts[index] = 0
+        self.total_count = 0
+        self.total_sum = 0
+        self.min_value = None
+        self.max_value = 0
+
+    # --- Lecture ---
+
+    @property
+    def mean(self) -> float:
+        return self.total_sum / self.total_count if self.total_count else 0.0
+
+    def value_at_percentile(self, percentile: float) -> int:
+        """Plus haute valeur équivalente au percentile demandé (0-100)"""
+        if not self.total_count:
+            return 0
+        target = max(1, math.ceil(self.total_count * percentile / 100.0))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                seen += count
+                if seen >= target:
+                    return min(self._value_range(index)[1], self.max_value)
+        return self.max_value
+
+    def percentiles(self, points=(50, 95, 99, 99.9)) -> Dict[str, int]:
+        """Plusieurs percentiles en un passage : {'p50': ..., 'p99.9': ...}"""
+        result = {}
+        if not self.total_count:
+            return {_label(p): 0 for p in points}
+
+        targets = sorted((max(1, math.ceil(self.total_count * p / 100.0)), p) for p in points)
+        seen = 0
+        position = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            seen += count
+            while position < len(targets) and seen >= targets[position][0]:
+                result[_label(targets[position][1])] = min(self._value_range(index)[1], self.max_value)
+                position += 1
+            if position == len(targets):
+                break
+        return result
+
+    def buckets(self) -> Iterator[Tuple[int, int]]:
+        """Itère sur les buckets non vides : (valeur haute, compte)"""
+        for index, count in enumerate(self.counts):
+            if count:
+                yield self._value_range(index)[1], count
+
+    def summary(self, points=(50, 95, 99, 99.9)) -> Dict:
+        summary = {
+            "count": self.total_count,
+            "min": self.min_value or 0,
+            "max": self.max_value,
+            "mean": round(self.mean, 1),
+        }
+        summary.update(self.percentiles(points))
+        return summary
+
+    # --- Sérialisation ---
+
+    def to_dict(self) -> Dict:
+        """Forme compacte : seuls les index non nuls sont conservés"""
+        return {
+            "highest": self.highest,
+            "significant_figures": self.significant_figures,
+            "total_sum": self.total_sum,
+            "min": self.min_value,
+            "max": self.max_value,
+            "counts": {str(i): c for i, c in enumerate(self.counts) if c},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "HdrHistogram":
+        histogram = cls(data["highest"], data["significant_figures"])
+        for index, count in data["counts"].items():
+            histogram.counts[int(index)] = count
+            histogram.total_count += count
+        histogram.total_sum = data["total_sum"]
+        histogram.min_value = data["min"]
+        histogram.max_value = data["max"]
+        return histogram
+
+
+def _label(percentile: float) -> str:
+    return f"p{percentile:g}"
@@ -0,0 +1,344 @@
+# api/ingest.py
+"""
+Ingestion poussée des lectures capteurs (bracelets, backend) par lots
+
+Au lieu d'interroger Ubidots, les bracelets (ou le backend) postent des
+séries de lectures sur /api/v1/ingest, par colonnes : horodatages + un
+tableau float32 par variable. Aucun dict par échantillon n'est construit :
+les tableaux sont lus sans copie depuis le corps de la requête
+(np.frombuffer) puis copiés en bloc dans la série du device (ReadingStore).
+
+Formats (Content-Type) :
+
+- application/octet-stream : blocs binaires RPK1, un par device, concaténés
+  (little-endian, voir encode_block) :
+
+    en-tête  "<4sIHbBHH" (16 octets) : magic b"RPK1", nombre d'échantillons,
+             masque des variables (bit i = FIELDS[i]), profile_id (-1 : absent),
+             réservé, longueur du label device, longueur du user_id
+    label device, user_id (UTF-8), bourrage jusqu'à un multiple de 8
+    horodatages : n × float64 (secondes Unix)
+    une colonne n × float32 par variable du masque (ordre de FIELDS)
+    bourrage jusqu'à un multiple de 8
+
+- application/x-msgpack (msgpack optionnel) ou application/json :
+    {"devices": [{"device": "bracelet-1", "user_id": "...", "profile_id": 2,
+                  "t": [...], "spo2": [...], "heart_rate": [...]}]}
+  en msgpack, "t" et les variables peuvent être des bin (float64 / float32
+  little-endian), lus sans copie comme le format binaire.
+
+NaN = valeur absente pour cet échantillon. Dernière valeur connue, série
+récente (STORE_SAMPLES échantillons) et fraîcheur par device ; au plus
+MAX_DEVICES devices suivis (les moins récents sont oubliés).
+"""
+
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import msgpack  # type: ignore
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    from . import metrics
+except ImportError:
+    import metrics
+
+STORE_SAMPLES = int(os.environ.get("RESPIRIA_INGEST_STORE_SAMPLES", "600"))
+INGEST_MAX_BYTES = int(os.environ.get("RESPIRIA_INGEST_MAX_BYTES", str(8 * 1024 * 1024)))
+MAX_AGE_S = float(os.environ.get("RESPIRIA_INGEST_MAX_AGE_S", "120"))
+MAX_DEVICES = 10000
+
+# Variables transportées (clés de get_ubidots_latest) ; l'ordre fixe les bits du masque binaire
+FIELDS: Tuple[str, ...] = ("spo2", "heart_rate", "respiratory_rate", "temperature", "humidity", "eco2", "tvoc")
+
+MAGIC = b"RPK1"
+HEADER = struct.Struct("<4sIHbBHH")
+FORMATS = {
+    "application/octet-stream": "binary",
+    "application/x-msgpack": "msgpack",
+    "application/msgpack": "msgpack",
+    "application/json": "json",
+}
+
+metrics.registry.describe("respiria_ingest_samples_total", "counter",
+                          "Échantillons capteurs reçus par /api/v1/ingest, par format")
+
+
+class IngestError(ValueError):
+    """Charge utile invalide (réponse 400)"""
+
+
+class Block(NamedTuple):
+    device: str
+    user_id: Optional[str]
+    profile_id: Optional[int]
+    timestamps: 'np.ndarray'      # float64, secondes Unix
+    values: Dict[str, 'np.ndarray']  # float32 par variable
+
+
+def _pad8(size: int) -> int:
+    return -size % 8
+
+
+def encode_block(device: str, timestamps: Sequence[float], values: Mapping[str, Sequence[float]],
+                 user_id: Optional[str] = None, profile_id: Optional[int] = None) -> bytes:
+    """Bloc binaire RPK1 d'un device (côté bracelet / backend, tests)"""
+    timestamps = np.ascontiguousarray(timestamps, dtype="<f8")
+    unknown = set(values) - set(FIELDS)
+    if unknown:
+        raise IngestError(f"Variables inconnues : {', '.join(sorted(unknown))}")
+    mask = sum(1 << i for i, field in enumerate(FIELDS) if field in values)
+    label = device.encode("utf-8")
+    user = (user_id or "").encode("utf-8")
+    names = label + user
+    parts = [HEADER.pack(MAGIC, timestamps.size, mask, -1 if profile_id is None else profile_id, 0,
+                         len(label), len(user)),
+             names, b"\0" * _pad8(HEADER.size + len(names)), timestamps.tobytes()]
+    for field in FIELDS:
+        if field in values:
+            column = np.ascontiguousarray(values[field], dtype="<f4")
+            if column.size != timestamps.size:
+                raise IngestError(f"{field} : {column.size} valeurs pour {timestamps.size} horodatages")
+            parts.append(column.tobytes())
+    size = sum(len(part) for part in parts)
+    parts.append(b"\0" * _pad8(size))
+    return b"".join(parts)
+
+
+def decode_binary(body) -> List[Block]:
+    """Blocs RPK1 concaténés → vues numpy sur le corps (sans copie)"""
+    view = memoryview(body)
+    blocks = []
+    offset = 0
+    while offset < len(view):
+        if len(view) - offset < HEADER.size:
+            raise IngestError(f"En-tête tronqué à l'octet {offset}")
+        magic, count, mask, profile_id, _, label_len, user_len = HEADER.unpack_from(view, offset)
+        if magic != MAGIC:
+            raise IngestError(f"Bloc invalide à l'octet {offset} (magic {magic!r})")
+        if mask >> len(FIELDS):
+            raise IngestError(f"Masque de variables inconnu : {mask:#x}")
+        start = offset + HEADER.size
+        label = bytes(view[start:start + label_len]).decode("utf-8", "replace")
+        user = bytes(view[start + label_len:start + label_len + user_len]).decode("utf-8", "replace")
+        offset = start + label_len + user_len
+        offset += _pad8(offset)
+        fields = [field for i, field in enumerate(FIELDS) if mask >> i & 1]
+        end = offset + 8 * count + 4 * count * len(fields)
+        if end > len(view) or not label:
+            raise IngestError(f"Bloc {label or '?'} tronqué ou sans device")
+        timestamps = np.frombuffer(view, dtype="<f8", count=count, offset=offset)
+        offset += 8 * count
+        values = {}
+        for field in fields:
+            values[field] = np.frombuffer(view, dtype="<f4", count=count, offset=offset)
+            offset += 4 * count
+        offset = end + _pad8(end)
+        blocks.append(Block(label, user or None, None if profile_id < 0 else profile_id, timestamps, values))
+    return blocks
+
+
+def _column(value, dtype: str, name: str) -> 'np.ndarray':
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        if len(value) % np.dtype(dtype).itemsize:
+            raise IngestError(f"{name} : taille binaire invalide")
+        return np.frombuffer(value, dtype=dtype)
+    try:
+        return np.asarray(value, dtype=dtype).ravel()
+    except (TypeError, ValueError):
+        raise IngestError(f"{name} : valeurs numériques attendues")
+
+
+def decode_document(document: Any) -> List[Block]:
+    """Document msgpack / JSON déjà parsé → blocs"""
+    devices = document.get("devices") if isinstance(document, dict) else None
+    if not isinstance(devices, list):
+        raise IngestError("devices requis (liste)")
+    blocks = []
+    for entry in devices:
+        if not isinstance(entry, dict) or not entry.get("device") or "t" not in entry:
+            raise IngestError("Chaque device requiert device et t")
+        timestamps = _column(entry["t"], "<f8", "t")
+        values = {}
+        for field in FIELDS:
+            if field in entry:
+                values[field] = _column(entry[field], "<f4", field)
+                if values[field].size != timestamps.size:
+                    raise IngestError(f"{field} : {values[field].size} valeurs pour {timestamps.size} horodatages")
+        profile_id = entry.get("profile_id")
+        if profile_id is not None and not isinstance(profile_id, int):
+            raise IngestError("profile_id : entier attendu")
+        user_id = entry.get("user_id")
+        blocks.append(Block(str(entry["device"]), None if user_id is None else str(user_id),
+                            profile_id, timestamps, values))
+    return blocks
+
+
+def decode_payload(body: bytes, fmt: str) -> List[Block]:
+    """Corps de requête → blocs ; fmt : binary, msgpack"""
+    if fmt == "binary":
+        return decode_binary(body)
+    if fmt == "msgpack":
+        if not MSGPACK_AVAILABLE:
+            raise IngestError("msgpack non installé (pip install msgpack)")
+        try:
+            document = msgpack.unpackb(body, raw=False)
+        except Exception as e:
+            raise IngestError(f"msgpack invalide : {e}")
+        return decode_document(document)
+    raise IngestError(f"Format inconnu : {fmt}")
+
+
+class DeviceSeries:
+    """Série circulaire d'un device : horodatages + matrice float32 (FIELDS × capacité)"""
+
+    __slots__ = ("timestamps", "values", "size", "position", "last", "last_time",
+                 "user_id", "profile_id", "received_at")
+
+    def __init__(self, capacity: int):
+        self.timestamps = np.full(capacity, np.nan)
+        self.values = np.full((len(FIELDS), capacity), np.nan, dtype=np.float32)
+        self.size = 0
+        self.position = 0
+        self.last = np.full(len(FIELDS), np.nan, dtype=np.float32)
+        self.last_time: Optional[float] = None
+        self.user_id: Optional[str] = None
+        self.profile_id: Optional[int] = None
+        self.received_at = 0.0
+
+    def extend(self, timestamps: 'np.ndarray', matrix: 'np.ndarray'):
+        capacity = self.timestamps.size
+        timestamps = timestamps[-capacity:]
+        matrix = matrix[:, -capacity:]
+        count = timestamps.size
+        end = self.position + count
+        if end <= capacity:
+            self.timestamps[self.position:end] = timestamps
+            self.values[:, self.position:end] = matrix
+        else:
+            split = capacity - self.position
+            self.timestamps[self.position:] = timestamps[:split]
+            self.timestamps[:count - split] = timestamps[split:]
+            self.values[:, self.position:] = matrix[:, :split]
+            self.values[:, :count - split] = matrix[:, split:]
+        self.position = end % capacity
+        self.size = min(capacity, self.size + count)
+
+
+class ReadingStore:
+    """Séries par device alimentées par l'ingestion (thread-safe, devices bornés)"""
+
+    def __init__(self, capacity: int = STORE_SAMPLES, max_devices: int = MAX_DEVICES,
+                 clock: Callable[[], float] = time.monotonic):
+        self.capacity = max(1, capacity)
+        self.max_devices = max(1, max_devices)
+        self._clock = clock
+        self._devices: "OrderedDict[str, DeviceSeries]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def append(self, block: Block) -> int:
+        """Ajoute un bloc (trié par horodatage) ; retourne le nombre d'échantillons retenus"""
+        timestamps = block.timestamps
+        keep = np.isfinite(timestamps) & (timestamps >= 0) & (timestamps < 1e10)  # secondes, pas ms
+        matrix = np.full((len(FIELDS), timestamps.size), np.nan, dtype=np.float32)
+        for i, field in enumerate(FIELDS):
+            if field in block.values:
+                matrix[i] = block.values[field]
+        if not keep.all():
+            timestamps, matrix = timestamps[keep], matrix[:, keep]
+        if timestamps.size == 0:
+            return 0
+        order = np.argsort(timestamps, kind="stable")
+        timestamps, matrix = timestamps[order], matrix[:, order]
+        # Dernière valeur finie de chaque variable (vectorisé)
+        finite = np.isfinite(matrix)
+        has_value = finite.any(axis=1)
+        last_index = timestamps.size - 1 - np.argmax(finite[:, ::-1], axis=1)
+        latest = matrix[np.arange(len(FIELDS)), last_index]
+
+        with self._lock:
+            series = self._devices.get(block.device)
+            if series is None:
+                series = DeviceSeries(self.capacity)
+            self._devices[block.device] = series
+            self._devices.move_to_end(block.device)
+            while len(self._devices) > self.max_devices:
+                self._devices.popitem(last=False)
+            series.extend(timestamps, matrix)
+            block_time = float(timestamps[-1])
+            # Bloc en retard (reconnexion) : historisé, sans remplacer une lecture plus récente
+            if series.last_time is None or block_time >= series.last_time:
+                series.last = np.where(has_value, latest, series.last)
+                series.last_time = block_time
+            series.user_id = block.user_id or series.user_id
+            if block.profile_id is not None:
+                series.profile_id = block.profile_id
+            series.received_at = self._clock()
+        return int(timestamps.size)
+
+    def latest(self, device: str, max_age: float = MAX_AGE_S) -> Optional[Dict[str, Any]]:
+        """Dernière lecture (mêmes clés que get_ubidots_latest), None si absente ou périmée"""
+        with self._lock:
+            series = self._devices.get(device)
+            if series is None or self._clock() - series.received_at > max_age:
+                return None
+            last = series.last.tolist()
+            reading: Dict[str, Any] = {field: round(value, 2) for field, value in zip(FIELDS, last)
+                                       if value == value}
+            reading.update(
+                device_id=device,
+                user_id=series.user_id,
+                profile_id=series.profile_id,
+                timestamp=datetime.fromtimestamp(series.last_time).isoformat(),
+                status='success',
+                source='ingest',
+            )
+        return reading
+
+    def series(self, device: str) -> Optional[Tuple['np.ndarray', Dict[str, 'np.ndarray']]]:
+        """(horodatages, {variable: valeurs}) chronologiques du device"""
+        with self._lock:
+            series = self._devices.get(device)
+            if series is None:
+                return None
+            if series.size < series.timestamps.size:
+                order = np.arange(series.size)
+            else:
+                order = np.roll(np.arange(series.size), -series.position)
+            timestamps = series.timestamps[order]
+            values = {field: series.values[i, order] for i, field in enumerate(FIELDS)}
+        return timestamps, values
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+
+def ingest(store: ReadingStore, blocks: Sequence[Block], fmt: str) -> int:
+    """Ajoute les blocs au store ; retourne le nombre d'échantillons"""
+    samples = sum(store.append(block) for block in blocks)
+    metrics.registry.inc("respiria_ingest_samples_total", (("format", fmt),), samples)
+    return samples
+
+
+_store: Optional[ReadingStore] = None
+_store_lock = threading.Lock()
+
+
+def get_ingest_store() -> ReadingStore:
+    """Instance du processus"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ReadingStore()
+    return _store
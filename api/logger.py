@@ -0,0 +1,181 @@
+# api/logger.py
+"""
+Journalisation structurée et non bloquante - RESPIRIA AI
+
+- Les handlers des requêtes ne font qu'un put_nowait dans une file ;
+  un thread (QueueListener) écrit sur stdout
+- Sortie JSON (une ligne par événement) ou texte, niveau configurable
+- Échantillonnage des lignes DEBUG par requête (même décision pour
+  toutes les lignes d'une requête grâce à request_id)
+- Arguments paresseux : log.debug("SpO2=%s", spo2) ne formate rien si
+  le niveau DEBUG est désactivé
+- File bornée : en cas de saturation les lignes sont abandonnées
+  (et comptées) plutôt que de bloquer la requête
+
+Configuration (variables d'environnement) :
+    RESPIRIA_LOG_LEVEL        DEBUG, INFO (défaut), WARNING...
+    RESPIRIA_LOG_FORMAT       json (défaut) ou text
+    RESPIRIA_LOG_SAMPLE_RATE  part des requêtes dont les lignes DEBUG sont gardées (défaut 0.01)
+    RESPIRIA_LOG_QUEUE_SIZE   taille max de la file (défaut 10000)
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import zlib
+from datetime import datetime, timezone
+from typing import Optional
+
+LOG_LEVEL = os.environ.get("RESPIRIA_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("RESPIRIA_LOG_FORMAT", "json").lower()
+LOG_SAMPLE_RATE = float(os.environ.get("RESPIRIA_LOG_SAMPLE_RATE", "0.01"))
+LOG_QUEUE_SIZE = int(os.environ.get("RESPIRIA_LOG_QUEUE_SIZE", "10000"))
+
+ROOT_LOGGER = "respiria"
+
+# Attributs standards d'un LogRecord (tout le reste vient de extra=...)
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+_EXC_FORMATTER = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par événement, champs extra inclus"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                event[key] = value
+        if record.exc_info:
+            event["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            event["exc"] = record.exc_text
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Garde une fraction des lignes sous INFO
+
+    Si la ligne porte un request_id, la décision est déterministe pour cette
+    requête : on obtient des traces complètes plutôt que des lignes isolées.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self._threshold = int(rate * 0xFFFFFFFF)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.INFO or self.rate >= 1.0:
+            return True
+        request_id = getattr(record, "request_id", None)
+        if request_id is not None:
+            return zlib.crc32(str(request_id).encode()) <= self._threshold
+        return random.random() < self.rate
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler qui abandonne (et compte) au lieu de bloquer quand la file est pleine"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Fusion message/arguments seulement (la mise en forme JSON se fait dans le thread d'écriture)
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_lock = threading.Lock()
+_handler: Optional[DroppingQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_config: dict = {}
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT,
+                      sample_rate: float = LOG_SAMPLE_RATE,
+                      stream=None, queue_size: int = LOG_QUEUE_SIZE) -> logging.Logger:
+    """Installe (ou réinstalle) la file et le thread d'écriture sur le logger 'respiria'"""
+    global _handler, _listener
+
+    with _lock:
+        _stop_listener()
+        _config.update(level=level, fmt=fmt, sample_rate=sample_rate, stream=stream, queue_size=queue_size)
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter() if fmt == "json" else
+                            logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+        _handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        _handler.addFilter(SamplingFilter(sample_rate))
+        _listener = logging.handlers.QueueListener(_handler.queue, output, respect_handler_level=False)
+        _listener.start()
+
+        logger = logging.getLogger(ROOT_LOGGER)
+        for existing in list(logger.handlers):
+            logger.removeHandler(existing)
+        logger.addHandler(_handler)
+        logger.setLevel(level)
+        logger.propagate = False
+        return logger
+
+
+def shutdown_logging():
+    """Vide la file et arrête le thread d'écriture"""
+    with _lock:
+        _stop_listener()
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()  # traite les enregistrements restants
+        _listener = None
+
+
+def dropped_records() -> int:
+    return _handler.dropped if _handler is not None else 0
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger enfant de 'respiria' (ex: get_logger('collector'))"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def _restart_after_fork():
+    # Le thread d'écriture ne survit pas au fork (workers gunicorn) : le recréer
+    global _listener, _lock
+    if _listener is not None:
+        _listener = None
+        _lock = threading.Lock()
+        configure_logging(**_config)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+atexit.register(shutdown_logging)
@@ -0,0 +1,307 @@
+# api/metrics.py
+"""
+Métriques au format Prometheus (exposition texte 0.0.4) pour /metrics
+
+- Compteurs et histogrammes écrits dans un shard par thread : aucun verrou
+  sur le chemin chaud, les shards ne sont fusionnés qu'au scrape
+- Collecteurs enregistrés (callbacks) pour les compteurs tenus ailleurs
+  (ex: statistiques de cache du moteur IA)
+- Multi-processus (gunicorn) : si RESPIRIA_METRICS_DIR est défini, chaque
+  worker y écrit périodiquement son instantané (<pid>.json) ; le worker qui
+  sert /metrics fusionne tous les fichiers
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from time import perf_counter_ns
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+METRICS_DIR = os.environ.get("RESPIRIA_METRICS_DIR")
+METRICS_FLUSH_INTERVAL = float(os.environ.get("RESPIRIA_METRICS_FLUSH_INTERVAL", "5"))
+
+# Bornes des histogrammes de latence (secondes)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[Tuple[str, str], ...]
+Key = Tuple[str, Labels]
+
+
+class _Shard:
+    """Métriques d'un thread (écriture sans verrou)"""
+
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self):
+        self.counters: Dict[Key, float] = {}
+        # [compte par bucket..., compte +Inf, somme]
+        self.histograms: Dict[Key, List[float]] = {}
+
+
+class MetricsRegistry:
+    """Registre de métriques du processus"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+                 metrics_dir: Optional[str] = METRICS_DIR,
+                 flush_interval: float = METRICS_FLUSH_INTERVAL):
+        self.buckets = tuple(buckets)
+        self.metrics_dir = metrics_dir
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._lock = threading.Lock()
+        self._collectors: List[Callable[[], Iterable[Tuple[str, Labels, float]]]] = []
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._next_flush = 0.0
+
+    # --- Déclaration ---
+
+    def describe(self, name: str, kind: str, help_text: str):
+        """Type ('counter', 'gauge', 'histogram') et aide d'une métrique"""
+        self._help[name] = (kind, help_text)
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, Labels, float]]]):
+        """Callback appelé à chaque instantané : [(nom, labels, valeur de compteur)]"""
+        self._collectors.append(collector)
+
+    # --- Chemin chaud ---
+
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def inc(self, name: str, labels: Labels = (), value: float = 1):
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: Labels = ()):
+        histograms = self._shard().histograms
+        key = (name, labels)
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = [0] * (len(self.buckets) + 2)
+        histogram[bisect_left(self.buckets, value)] += 1
+        histogram[-1] += value
+
+    # --- Instantanés et agrégation ---
+
+    def snapshot(self) -> Dict:
+        """Fusion des shards du processus (forme sérialisable JSON)"""
+        counters: Dict[Key, float] = {}
+        histograms: Dict[Key, List[float]] = {}
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            # dict.copy() est atomique sous le GIL : pas de verrou côté écrivains
+            for key, value in shard.counters.copy().items():
+                counters[key] = counters.get(key, 0) + value
+            for key, values in shard.histograms.copy().items():
+                _add_histogram(histograms, key, list(values))
+        for collector in self._collectors:
+            for name, labels, value in collector():
+                key = (name, tuple(labels))
+                counters[key] = counters.get(key, 0) + value
+
+        return {
+            "pid": os.getpid(),
+            "buckets": list(self.buckets),
+            "counters": [[name, list(map(list, labels)), value] for (name, labels), value in counters.items()],
+            "histograms": [[name, list(map(list, labels)), values] for (name, labels), values in histograms.items()],
+        }
+
+    def maybe_flush(self):
+        """Écrit l'instantané du processus si l'intervalle est écoulé (mode multi-processus)"""
+        if self.metrics_dir and time.monotonic() >= self._next_flush:
+            self.flush()
+
+    def flush(self):
+        if not self.metrics_dir:
+            return
+        self._next_flush = time.monotonic() + self.flush_interval
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        path = os.path.join(self.metrics_dir, f"{os.getpid()}.json")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def collect(self) -> Tuple[Dict[Key, float], Dict[Key, List[float]]]:
+        """Fusion de tous les processus (ou du seul processus courant)"""
+        snapshots = []
+        if self.metrics_dir:
+            self.flush()
+            for filename in os.listdir(self.metrics_dir):
+                if not filename.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(self.metrics_dir, filename)) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue  # fichier en cours de remplacement
+        else:
+            snapshots.append(self.snapshot())
+
+        counters: Dict[Key, float] = {}
+        histograms: Dict[Key, List[float]] = {}
+        for snapshot in snapshots:
+            if snapshot.get("buckets") != list(self.buckets):
+                continue
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, values in snapshot["histograms"]:
+                _add_histogram(histograms, (name, tuple(map(tuple, labels))), values)
+        return counters, histograms
+
+    # --- Exposition ---
+
+    def render(self) -> str:
+        """Format texte Prometheus"""
+        counters, histograms = self.collect()
+        gauges = _derived_ratios(counters)
+
+        families: Dict[str, List[str]] = {}
+        for (name, labels), value in sorted(counters.items()):
+            families.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for (name, labels), value in sorted(gauges.items()):
+            families.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for (name, labels), values in sorted(histograms.items()):
+            lines = families.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', _format_value(bound)),))} {int(cumulative)}")
+            cumulative += values[-2]
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {int(cumulative)}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(values[-1])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {int(cumulative)}")
+
+        output = []
+        for name in sorted(families):
+            kind, help_text = self._help.get(name, ("untyped", name))
+            output.append(f"# HELP {name} {help_text}")
+            output.append(f"# TYPE {name} {kind}")
+            output.extend(families[name])
+        return "\n".join(output) + "\n"
+
+    def reset(self):
+        with self._lock:
+            for shard in self._shards:
+                shard.counters.clear()
+                shard.histograms.clear()
+
+
+def _add_histogram(histograms: Dict[Key, List[float]], key: Key, values: List[float]):
+    current = histograms.get(key)
+    if current is None:
+        histograms[key] = list(values)
+    else:
+        for index, value in enumerate(values):
+            current[index] += value
+
+
+# Ratios dérivés : (jauge, compteur numérateur, compteurs dont la somme fait le dénominateur)
+RATIOS = (
+    ("respiria_cache_hit_ratio", "respiria_cache_hits_total",
+     ("respiria_cache_hits_total", "respiria_cache_misses_total")),
+    ("respiria_upstream_fallback_ratio", "respiria_upstream_fallbacks_total",
+     ("respiria_upstream_calls_total",)),
+)
+
+
+def _derived_ratios(counters: Dict[Key, float]) -> Dict[Key, float]:
+    gauges = {}
+    for gauge, numerator, denominators in RATIOS:
+        totals: Dict[Labels, float] = {}
+        for (name, labels), value in counters.items():
+            if name in denominators:
+                totals[labels] = totals.get(labels, 0) + value
+        for labels, total in totals.items():
+            if total:
+                gauges[(gauge, labels)] = counters.get((numerator, labels), 0) / total
+    return gauges
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+# Registre du processus et métriques RESPIRIA
+registry = MetricsRegistry()
+
+registry.describe("respiria_http_requests_total", "counter", "Requêtes HTTP traitées")
+registry.describe("respiria_http_request_duration_seconds", "histogram", "Durée des requêtes HTTP par route")
+registry.describe("respiria_upstream_calls_total", "counter", "Appels aux APIs amont par méthode du collecteur")
+registry.describe("respiria_upstream_errors_total", "counter", "Appels amont en erreur (exception ou réponse en erreur)")
+registry.describe("respiria_upstream_fallbacks_total", "counter", "Appels amont ayant renvoyé les valeurs de repli")
+registry.describe("respiria_upstream_duration_seconds", "histogram", "Durée des appels amont par méthode du collecteur")
+registry.describe("respiria_upstream_fallback_ratio", "gauge", "Part des appels amont servis par les valeurs de repli")
+registry.describe("respiria_cache_hits_total", "counter", "Succès de cache")
+registry.describe("respiria_cache_misses_total", "counter", "Échecs de cache")
+registry.describe("respiria_cache_hit_ratio", "gauge", "Taux de succès de cache")
+
+
+def record_request(route: str, method: str, status: int, duration_s: float):
+    labels = (("method", method), ("route", route), ("status", str(status)))
+    registry.inc("respiria_http_requests_total", labels)
+    registry.observe("respiria_http_request_duration_seconds", duration_s, (("route", route),))
+    registry.maybe_flush()
+
+
+def upstream_call(method: str):
+    """Décorateur des méthodes du collecteur : latence, erreurs, repli"""
+    labels = (("method", method),)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                registry.inc("respiria_upstream_errors_total", labels)
+                raise
+            finally:
+                registry.inc("respiria_upstream_calls_total", labels)
+                registry.observe("respiria_upstream_duration_seconds", (perf_counter_ns() - start) / 1e9, labels)
+            if isinstance(result, dict):
+                if result.get("status") == "fallback":
+                    registry.inc("respiria_upstream_fallbacks_total", labels)
+                if "error" in result:
+                    registry.inc("respiria_upstream_errors_total", labels)
+            return result
+        return wrapper
+    return decorator
+
+
+def cache_collector(cache_stats: Dict[str, List[int]]):
+    """Collecteur pour un dict {cache: [succès, échecs]}"""
+    def collect():
+        for cache, (hits, misses) in list(cache_stats.items()):
+            labels = (("cache", cache),)
+            yield "respiria_cache_hits_total", labels, hits
+            yield "respiria_cache_misses_total", labels, misses
+    return collect
@@ -0,0 +1,445 @@
+# api/notifications.py
+"""
+Envoi des notifications d'alerte (should_notify) hors du chemin des requêtes
+
+- submit() met la prédiction en file (O(1), sous verrou court) ; au-delà de
+  NOTIFY_QUEUE_MAX événements en attente, les plus anciens sont abandonnés
+- un thread traite la file toutes les NOTIFY_INTERVAL secondes :
+
+  1. machine à états par utilisateur (AlertState) : "alert" dès que
+     should_notify, "escalation" si le niveau monte pendant l'alerte,
+     "resolved" seulement après NOTIFY_CLEAR_SAMPLES prédictions
+     consécutives sans notification et au moins NOTIFY_EXIT_MARGIN points
+     sous le score d'entrée (hystérésis : pas de va-et-vient autour du seuil)
+  2. déduplication : même (type, niveau) déjà envoyé à l'utilisateur depuis
+     moins de NOTIFY_DEDUP_WINDOW_S secondes → ignoré
+  3. débit par utilisateur (TokenBucket, NOTIFY_USER_RATE par minute) ;
+     une notification refusée annule sa transition, qui sera rejouée
+  4. envoi groupé au sink (lots de NOTIFY_BATCH_SIZE) ; un lot en échec est
+     retenté aux tours suivants (MAX_ATTEMPTS au plus)
+
+Sinks (RESPIRIA_NOTIFY_SINK) : memory (local, tests), webhook (POST JSON
+{"notifications": [...]}), fcm (Firebase Cloud Messaging HTTP v1, sujet
+"user_<user_id>" ; jeton OAuth2 obtenu du compte de service
+RESPIRIA_FCM_CREDENTIALS avec google-auth, renouvelé avant expiration et sur
+401). Au plus MAX_USERS utilisateurs suivis (les moins récents sont oubliés).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Optional
+
+try:
+    import requests  # type: ignore
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+try:
+    from google.auth.transport.requests import Request as GoogleAuthRequest  # type: ignore
+    from google.oauth2 import service_account  # type: ignore
+    GOOGLE_AUTH_AVAILABLE = True
+except ImportError:
+    GOOGLE_AUTH_AVAILABLE = False
+
+try:
+    from . import metrics
+    from .logger import get_logger
+    from .rate_limit import TokenBucket
+    from .ui_registry import personalized_message
+except ImportError:
+    import metrics
+    from logger import get_logger
+    from rate_limit import TokenBucket
+    from ui_registry import personalized_message
+
+NOTIFY_SINK = os.environ.get("RESPIRIA_NOTIFY_SINK", "").lower()
+NOTIFY_WEBHOOK_URL = os.environ.get("RESPIRIA_NOTIFY_WEBHOOK_URL")
+FCM_PROJECT_ID = os.environ.get("RESPIRIA_FCM_PROJECT_ID")
+FCM_CREDENTIALS = os.environ.get("RESPIRIA_FCM_CREDENTIALS")
+FCM_ACCESS_TOKEN = os.environ.get("RESPIRIA_FCM_ACCESS_TOKEN")
+FCM_SCOPE = "https://www.googleapis.com/auth/firebase.messaging"
+NOTIFY_INTERVAL = float(os.environ.get("RESPIRIA_NOTIFY_INTERVAL", "1.0"))
+NOTIFY_BATCH_SIZE = int(os.environ.get("RESPIRIA_NOTIFY_BATCH_SIZE", "100"))
+NOTIFY_DEDUP_WINDOW_S = float(os.environ.get("RESPIRIA_NOTIFY_DEDUP_WINDOW_S", "900"))
+NOTIFY_USER_RATE = float(os.environ.get("RESPIRIA_NOTIFY_USER_RATE", "2"))
+NOTIFY_USER_BURST = 3.0
+NOTIFY_CLEAR_SAMPLES = int(os.environ.get("RESPIRIA_NOTIFY_CLEAR_SAMPLES", "3"))
+NOTIFY_EXIT_MARGIN = float(os.environ.get("RESPIRIA_NOTIFY_EXIT_MARGIN", "10"))
+NOTIFY_QUEUE_MAX = 100000
+MAX_ATTEMPTS = 3
+MAX_USERS = 100000
+
+LEVEL_RANKS = {"LOW": 0, "MEDIUM": 1, "HIGH": 2}
+RESOLVED_MESSAGE = {"title": "✅ Risque revenu à la normale",
+                    "description": "Votre niveau de risque est redescendu ({score:.0f}%)."}
+
+log = get_logger("notifications")
+
+metrics.registry.describe("respiria_notifications_total", "counter",
+                          "Notifications d'alerte (sent, deduplicated, rate_limited, failed, dropped)")
+
+
+class AlertState:
+    """État d'alerte d'un utilisateur"""
+
+    __slots__ = ("level", "entry_score", "clear_count", "sent_at", "bucket")
+
+    def __init__(self):
+        self.level: Optional[str] = None   # niveau alerté, None hors alerte
+        self.entry_score = 0.0
+        self.clear_count = 0
+        self.sent_at: Dict[tuple, float] = {}
+        self.bucket: Optional[TokenBucket] = None
+
+    def transition(self, risk_level: str, risk_score: float, should_notify: bool) -> Optional[str]:
+        """Type de notification déclenché par la prédiction (alert, escalation, resolved) ou None"""
+        if should_notify:
+            self.clear_count = 0
+            if self.level is None:
+                self.level, self.entry_score = risk_level, risk_score
+                return "alert"
+            if LEVEL_RANKS.get(risk_level, 0) > LEVEL_RANKS.get(self.level, 0):
+                self.level = risk_level
+                return "escalation"
+            return None
+        if self.level is None:
+            return None
+        if risk_score <= self.entry_score - NOTIFY_EXIT_MARGIN:
+            self.clear_count += 1
+            if self.clear_count >= NOTIFY_CLEAR_SAMPLES:
+                self.level = None
+                self.clear_count = 0
+                return "resolved"
+        else:
+            self.clear_count = 0
+        return None
+
+    def snapshot(self) -> tuple:
+        return self.level, self.entry_score, self.clear_count
+
+    def restore(self, snapshot: tuple):
+        """Annule une transition dont la notification n'est pas partie (débit)"""
+        self.level, self.entry_score, self.clear_count = snapshot
+
+
+# Contrat des sinks : send(notifications) renvoie les notifications non
+# envoyées (liste vide ou None : tout est parti) ; une exception vaut échec
+# du lot entier. Seules les notifications en échec sont retentées.
+
+
+class MemorySink:
+    """Sink local : garde les lots envoyés (tests, développement)"""
+
+    def __init__(self):
+        self.batches: List[List[Dict]] = []
+
+    def send(self, notifications: List[Dict]) -> List[Dict]:
+        self.batches.append(list(notifications))
+        return []
+
+    @property
+    def sent(self) -> List[Dict]:
+        return [notification for batch in self.batches for notification in batch]
+
+
+class WebhookSink:
+    """POST {"notifications": [...]} vers une URL (backend, passerelle push)"""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self._session = None
+
+    def send(self, notifications: List[Dict]) -> List[Dict]:
+        # Un seul POST pour le lot : tout ou rien
+        if self._session is None:
+            self._session = requests.Session()
+        response = self._session.post(self.url, json={"notifications": notifications}, timeout=self.timeout)
+        response.raise_for_status()
+        return []
+
+
+class FCMToken:
+    """
+    Jeton OAuth2 de FCM
+
+    Compte de service (credentials google-auth) : renouvelé dès qu'il n'est
+    plus valide (google-auth anticipe l'expiration) ou sur demande après un
+    401. Jeton statique : utilisé tel quel, il expire au bout d'environ 1 h.
+    """
+
+    def __init__(self, access_token: Optional[str] = None, credentials=None, auth_request=None):
+        self._access_token = access_token
+        self._credentials = credentials
+        self._auth_request = auth_request
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_service_account(cls, path: str) -> "FCMToken":
+        credentials = service_account.Credentials.from_service_account_file(path, scopes=[FCM_SCOPE])
+        return cls(credentials=credentials, auth_request=GoogleAuthRequest())
+
+    @property
+    def refreshable(self) -> bool:
+        return self._credentials is not None
+
+    def get(self, refresh: bool = False) -> str:
+        """Jeton courant ; refresh=True force le renouvellement (401)"""
+        if self._credentials is None:
+            return self._access_token
+        with self._lock:
+            if refresh or not self._credentials.valid:
+                self._credentials.refresh(self._auth_request)
+            return self._credentials.token
+
+
+class FCMSink:
+    """Firebase Cloud Messaging HTTP v1 : un message par notification, sujet user_<user_id>"""
+
+    def __init__(self, project_id: str, token, timeout: float = 5.0):
+        self.url = f"https://fcm.googleapis.com/v1/projects/{project_id}/messages:send"
+        self.token = token if isinstance(token, FCMToken) else FCMToken(access_token=token)
+        self.timeout = timeout
+        self._session = None
+
+    def _post(self, message: Dict):
+        """POST d'un message ; un 401 (jeton expiré) renouvelle le jeton puis retente une fois"""
+        response = self._session.post(self.url, json={"message": message}, timeout=self.timeout,
+                                      headers={"Authorization": f"Bearer {self.token.get()}"})
+        if response.status_code == 401 and self.token.refreshable:
+            response = self._session.post(self.url, json={"message": message}, timeout=self.timeout,
+                                          headers={"Authorization": f"Bearer {self.token.get(refresh=True)}"})
+        return response
+
+    def send(self, notifications: List[Dict]) -> List[Dict]:
+        """Envoi message par message ; renvoie ceux en échec (les autres ne sont pas renvoyés)"""
+        if self._session is None:
+            self._session = requests.Session()
+        failed = []
+        for notification in notifications:
+            message = {
+                "topic": f"user_{notification['user_id']}",
+                "notification": {"title": notification["title"], "body": notification["body"]},
+                "data": {key: str(notification[key]) for key in ("kind", "risk_level", "risk_score", "device")},
+            }
+            try:
+                response = self._post(message)
+                response.raise_for_status()
+            except requests.RequestException as e:
+                log.warning("Push FCM user_%s échoué : %s", notification["user_id"], e)
+                failed.append(notification)
+        return failed
+
+
+class NotificationDispatcher:
+    """File d'événements + états par utilisateur + envoi groupé périodique au sink"""
+
+    def __init__(self, sink, interval: float = NOTIFY_INTERVAL, batch_size: int = NOTIFY_BATCH_SIZE,
+                 dedup_window: float = NOTIFY_DEDUP_WINDOW_S, user_rate_per_minute: float = NOTIFY_USER_RATE,
+                 queue_max: int = NOTIFY_QUEUE_MAX, max_users: int = MAX_USERS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.sink = sink
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self.dedup_window = dedup_window
+        self.user_rate = user_rate_per_minute / 60.0
+        self.queue_max = max(1, queue_max)
+        self.max_users = max(1, max_users)
+        self._clock = clock
+
+        self._queue: deque = deque()
+        self._outbox: List[List] = []          # [notification, tentatives]
+        self._states: "OrderedDict[str, AlertState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._process_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self.counters = {"submitted": 0, "sent": 0, "deduplicated": 0, "rate_limited": 0,
+                         "failed": 0, "dropped": 0}
+
+    # --- Côté requêtes ---
+
+    def submit(self, user_id: str, risk_level: str, risk_score: float, should_notify: bool,
+               profile_id: int = 1, device: Optional[str] = None):
+        """Met la prédiction en file (traitée par le thread d'envoi)"""
+        event = (str(user_id), str(risk_level).upper(), float(risk_score), bool(should_notify),
+                 profile_id, device, int(time.time() * 1000))
+        with self._lock:
+            self.counters["submitted"] += 1
+            if len(self._queue) >= self.queue_max:
+                self._queue.popleft()
+                self._count("dropped", 1)
+            self._queue.append(event)
+        self._ensure_started()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._queue) + len(self._outbox)
+
+    # --- Traitement ---
+
+    def _state(self, user_id: str) -> AlertState:
+        state = self._states.get(user_id)
+        if state is None:
+            state = self._states[user_id] = AlertState()
+            while len(self._states) > self.max_users:
+                self._states.popitem(last=False)
+        else:
+            self._states.move_to_end(user_id)
+        return state
+
+    def process(self) -> int:
+        """Traite la file et envoie ce qui est prêt ; renvoie le nombre de notifications envoyées"""
+        with self._process_lock:
+            with self._lock:
+                events, self._queue = self._queue, deque()
+            now = self._clock()
+            for user_id, risk_level, risk_score, should_notify, profile_id, device, timestamp_ms in events:
+                state = self._state(user_id)
+                previous = state.snapshot()
+                kind = state.transition(risk_level, risk_score, should_notify)
+                if kind is None:
+                    continue
+                key = (kind, risk_level)
+                if now - state.sent_at.get(key, float("-inf")) < self.dedup_window:
+                    self._count("deduplicated", 1)
+                    continue
+                if state.bucket is None:
+                    state.bucket = TokenBucket(self.user_rate, NOTIFY_USER_BURST, clock=self._clock)
+                if not state.bucket.try_acquire():
+                    # Transition annulée : l'alerte (ou l'escalade) repartira à la
+                    # prochaine prédiction, une fois la réserve reconstituée
+                    state.restore(previous)
+                    self._count("rate_limited", 1)
+                    continue
+                state.sent_at[key] = now
+                self._outbox.append([self._build(kind, user_id, risk_level, risk_score, profile_id,
+                                                 device, timestamp_ms), 0])
+            return self._dispatch()
+
+    @staticmethod
+    def _build(kind: str, user_id: str, risk_level: str, risk_score: float, profile_id: int,
+               device: Optional[str], timestamp_ms: int) -> Dict:
+        if kind == "resolved":
+            title, body = RESOLVED_MESSAGE["title"], RESOLVED_MESSAGE["description"].format(score=risk_score)
+        else:
+            # Message du prédicteur, déjà formaté avec le score : transmis tel quel
+            message = personalized_message(risk_level, risk_score, profile_id)
+            title, body = message["title"], message["description"]
+        return {
+            "kind": kind,
+            "user_id": user_id,
+            "device": device,
+            "risk_level": risk_level,
+            "risk_score": round(risk_score, 1),
+            "title": title,
+            "body": body,
+            "timestamp": timestamp_ms,
+        }
+
+    def _dispatch(self) -> int:
+        outbox, self._outbox = self._outbox, []
+        sent = 0
+        for start in range(0, len(outbox), self.batch_size):
+            batch = outbox[start:start + self.batch_size]
+            try:
+                failed = self.sink.send([notification for notification, _ in batch]) or []
+            except Exception as e:
+                log.warning("Envoi de %d notifications échoué : %s", len(batch), e)
+                failed = [notification for notification, _ in batch]
+            # Seules les notifications en échec sont retentées (pas de doublon pour les autres)
+            failed_ids = {id(notification) for notification in failed}
+            delivered = len(batch) - len(failed_ids)
+            if failed_ids:
+                self._count("failed", len(failed_ids))
+                for entry in batch:
+                    if id(entry[0]) not in failed_ids:
+                        continue
+                    entry[1] += 1
+                    if entry[1] < MAX_ATTEMPTS:
+                        self._outbox.append(entry)
+                    else:
+                        self._count("dropped", 1)
+            if delivered:
+                sent += delivered
+                self._count("sent", delivered)
+        return sent
+
+    def _count(self, outcome: str, value: int):
+        self.counters[outcome] += value
+        metrics.registry.inc("respiria_notifications_total", (("outcome", outcome),), value)
+
+    # --- Thread d'envoi ---
+
+    def _ensure_started(self):
+        # Démarré au premier événement, et redémarré dans un worker issu d'un fork
+        if self._pid == os.getpid() or self._stopping:
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="notifications", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.process()
+            except Exception as e:  # le thread ne doit jamais mourir
+                log.exception("Erreur envoi des notifications : %s", e)
+
+    def stop(self, flush: bool = True):
+        """Arrête le thread (et traite ce qui reste)"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=self.interval + 5.0)
+        if flush:
+            self.process()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self.counters, pending=len(self._queue) + len(self._outbox), users=len(self._states))
+
+
+def create_sink(name: str = NOTIFY_SINK):
+    """Sink configuré (RESPIRIA_NOTIFY_SINK), ou None si désactivé / incomplet"""
+    if name == "memory":
+        return MemorySink()
+    if name == "webhook" and REQUESTS_AVAILABLE and NOTIFY_WEBHOOK_URL:
+        return WebhookSink(NOTIFY_WEBHOOK_URL)
+    if name == "fcm" and REQUESTS_AVAILABLE and FCM_PROJECT_ID:
+        if FCM_CREDENTIALS and GOOGLE_AUTH_AVAILABLE:
+            return FCMSink(FCM_PROJECT_ID, FCMToken.from_service_account(FCM_CREDENTIALS))
+        if FCM_ACCESS_TOKEN:
+            log.warning("FCM : jeton statique RESPIRIA_FCM_ACCESS_TOKEN (expire au bout d'environ 1 h, "
+                        "préférer RESPIRIA_FCM_CREDENTIALS avec google-auth)")
+            return FCMSink(FCM_PROJECT_ID, FCM_ACCESS_TOKEN)
+    if name:
+        log.warning("Sink de notifications %r indisponible (configuration, requests ou google-auth manquants)", name)
+    return None
+
+
+_dispatcher: Optional[NotificationDispatcher] = None
+_dispatcher_lock = threading.Lock()
+_configured = False
+
+
+def get_notifier() -> Optional[NotificationDispatcher]:
+    """Instance du processus, ou None si aucun sink n'est configuré"""
+    global _dispatcher, _configured
+    if not _configured:
+        with _dispatcher_lock:
+            if not _configured:
+                sink = create_sink()
+                _dispatcher = NotificationDispatcher(sink) if sink is not None else None
+                _configured = True
+    return _dispatcher
@@ -0,0 +1,369 @@
+# api/recommendation_rules.py
+"""
+Règles de recommandation RESPIRIA, sous forme de données
+
+Chaque facteur est découpé en bandes par des seuils (FACTORS) ; chaque règle
+(RULES) associe une bande de facteur et des profils à un message dans une
+catégorie (immediate, preventive, environmental).
+
+compile_rules() construit une table de décision indexée par
+(facteur, bande, profil) : l'évaluation d'une lecture se réduit à une
+recherche par facteur. L'ordre des messages est celui des règles, les
+doublons sont ignorés.
+
+evaluate_batch() calcule les bandes de tout un lot avec numpy puis évalue
+une seule fois chaque combinaison (bandes, profil) distincte.
+"""
+
+import struct
+from bisect import bisect_right
+from math import inf
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from math import nextafter
+except ImportError:  # Python 3.8
+    def nextafter(x: float, y: float) -> float:
+        if x == y:
+            return y
+        if x == 0:
+            return 5e-324 if y > 0 else -5e-324
+        bits = struct.unpack("<q", struct.pack("<d", x))[0]
+        bits += 1 if (y > x) == (x > 0) else -1
+        return struct.unpack("<d", struct.pack("<q", bits))[0]
+
+CATEGORIES = ("immediate", "preventive", "environmental")
+
+# Profils connus ; None désigne tout autre profil (branches "sinon" des règles)
+PROFILE_IDS = (0, 1, 2, 3)
+OTHER = None
+ALL = PROFILE_IDS + (OTHER,)
+ASTHMATIC = (1, 2)
+NON_ASTHMATIC = (0, 3, OTHER)
+
+# Facteurs évalués, dans l'ordre d'émission des messages de chaque catégorie :
+# {facteur: (valeur par défaut, seuils)}. Un seuil (t, True) est franchi
+# quand valeur >= t, (t, False) quand valeur > t ; la bande est le nombre
+# de seuils franchis. Seuils None : booléen (bande 1 si vrai), toujours en
+# tête ; risk_score (score calculé, pas une donnée d'entrée) toujours le dernier.
+FACTORS: Mapping[str, Tuple[Any, Optional[Tuple[Tuple[float, bool], ...]]]] = {
+    "smoke_detected": (False, None),
+    "medication_taken": (True, None),
+    "spo2": (96.0, ((85, True), (88, True), (92, True))),
+    "respiratory_rate": (16.0, ((28, False), (35, False))),
+    "aqi": (50.0, ((100, False), (150, False))),
+    "temperature": (22.0, ((10, True), (32, False))),
+    "pollen_level": (1, ((2, True), (3, True), (4, True))),
+    "humidity": (50.0, ((80, False),)),
+    "eco2": (400, ((1000, False), (1500, False), (2000, False))),
+    "tvoc": (0, ((220, False), (660, False))),
+    "pm25": (0, ((12, False), (35, False), (55, False))),
+    "pm10": (0, ((50, False), (100, False))),
+    "pressure": (1013, ((990, True), (1030, False))),
+    "wind_speed": (0, ((20, False), (40, False))),
+    "risk_score": (0.0, ((30, False), (70, True), (85, False))),
+}
+
+FACTOR_NAMES = tuple(FACTORS)
+
+
+def _rule(category: str, factor: str, bands: Sequence[int], profiles: Sequence[Optional[int]],
+          message: str, requires: Optional[Dict[str, Sequence[int]]] = None) -> Dict:
+    return {"category": category, "factor": factor, "bands": tuple(bands),
+            "profiles": tuple(profiles), "message": message, "requires": requires or {}}
+
+
+I, P, E = CATEGORIES
+
+# Règles, dans l'ordre d'émission ("{value}" : valeur du facteur)
+RULES: Tuple[Dict, ...] = (
+    # --- URGENCES ---
+    _rule(I, "smoke_detected", [1], ALL, "🚨 FUMÉE DÉTECTÉE - ÉVACUEZ LA ZONE IMMÉDIATEMENT"),
+    _rule(I, "smoke_detected", [1], ASTHMATIC, "💨 Utilisez votre inhalateur de secours AVANT d'évacuer"),
+    _rule(I, "smoke_detected", [1], ALL, "📞 Appelez les secours si nécessaire (18/112)"),
+
+    _rule(I, "spo2", [0], ALL, "🚨 URGENCE CRITIQUE : SpO2 < 85% - Appelez le 15 IMMÉDIATEMENT"),
+    _rule(I, "spo2", [0], ALL, "🏥 Préparez-vous pour hospitalisation d'urgence"),
+    _rule(I, "spo2", [1], [2], "🚨 SpO2 < 88% : Utilisez votre inhalateur + appelez le 15"),
+    _rule(I, "spo2", [1], [1], "🚨 SpO2 < 88% : Utilisez votre inhalateur immédiatement"),
+    _rule(I, "spo2", [1], [1], "📞 Si aucune amélioration en 5 min, appelez le 15"),
+    _rule(I, "spo2", [1], NON_ASTHMATIC, "🚨 SpO2 anormalement bas - Consultez un médecin"),
+    _rule(I, "spo2", [2], [2], "⚠️ SpO2 bas pour asthme sévère - Surveillez de près"),
+    _rule(I, "spo2", [2], [1], "⚠️ SpO2 à surveiller - Gardez inhalateur à portée"),
+
+    _rule(I, "respiratory_rate", [2], ALL, "💨 Détresse respiratoire - Position assise + inhalateur"),
+    _rule(I, "respiratory_rate", [2], [2], "🏥 Asthme sévère : appelez le 15 sans attendre"),
+    _rule(I, "respiratory_rate", [1], ASTHMATIC, "💨 Respiration rapide - Utilisez votre inhalateur"),
+    _rule(I, "respiratory_rate", [1], NON_ASTHMATIC, "💨 Respiration rapide - Asseyez-vous et calmez-vous"),
+
+    _rule(I, "risk_score", [3], [2], "📞 Asthme sévère : contactez votre pneumologue"),
+    _rule(I, "risk_score", [3], [1], "📞 Contactez votre médecin préventivement"),
+    _rule(I, "risk_score", [3], [3], "⚠️ Rémission menacée : consultez rapidement"),
+    _rule(I, "risk_score", [3], [0, OTHER], "📞 Risque élevé : consultez un médecin"),
+
+    # --- PRÉVENTION ---
+    _rule(P, "medication_taken", [0], [2], "💊 URGENT : Prenez votre traitement de fond immédiatement"),
+    _rule(P, "medication_taken", [0], [2], "⚠️ Ne jamais sauter le traitement avec asthme sévère"),
+    _rule(P, "medication_taken", [0], [1], "💊 Prenez votre traitement préventif"),
+    _rule(P, "medication_taken", [0], [3], "💊 Reprenez votre traitement pour éviter une rechute"),
+
+    _rule(P, "risk_score", [1], [0], "🧘 Conditions moyennes : évitez les efforts intenses"),
+    _rule(P, "risk_score", [1], [1], "🧘 Évitez les efforts, gardez votre inhalateur"),
+    _rule(P, "risk_score", [1], [1], "👀 Surveillez vos symptômes habituels"),
+    _rule(P, "risk_score", [1], [2], "🛑 Restez au repos complet"),
+    _rule(P, "risk_score", [1], [2], "📱 Gardez votre téléphone à portée"),
+    _rule(P, "risk_score", [1], [2], "💊 Vérifiez que vous avez votre traitement d'urgence"),
+    _rule(P, "risk_score", [1], [3], "🧘 Évitez les déclencheurs connus"),
+    _rule(P, "risk_score", [1], [3], "👀 Surveillez tout retour de symptômes"),
+
+    # --- ENVIRONNEMENT ---
+    _rule(E, "aqi", [2], [2], "🌫️ AQI DANGEREUX : NE SORTEZ PAS!"),
+    _rule(E, "aqi", [2], [2], "💨 Purificateur d'air obligatoire"),
+    _rule(E, "aqi", [2], [1], "🌫️ AQI dangereux : restez à l'intérieur"),
+    _rule(E, "aqi", [2], [1], "💨 Utilisez un purificateur d'air"),
+    _rule(E, "aqi", [2], NON_ASTHMATIC, "🌫️ Qualité d'air dégradée : limitez sorties"),
+    _rule(E, "aqi", [2], ALL, "🪟 Fermez toutes les fenêtres"),
+    _rule(E, "aqi", [1], ASTHMATIC, "🌫️ AQI modéré : évitez efforts extérieurs"),
+
+    _rule(E, "temperature", [0], ASTHMATIC, "❄️ Froid = risque bronchospasme : restez au chaud"),
+    _rule(E, "temperature", [0], ASTHMATIC, "🧣 Couvrez nez et bouche impérativement"),
+    _rule(E, "temperature", [0], NON_ASTHMATIC, "❄️ Froid : protégez vos voies respiratoires"),
+    _rule(E, "temperature", [2], ALL, "🌡️ Forte chaleur : restez au frais"),
+    _rule(E, "temperature", [2], [2], "🆘 Chaleur + asthme sévère : risque déshydratation"),
+    _rule(E, "temperature", [2], ALL, "💧 Hydratez-vous régulièrement"),
+
+    _rule(E, "pollen_level", [3], ASTHMATIC, "🌸 ALERTE POLLEN : Évitez absolument l'extérieur"),
+    _rule(E, "pollen_level", [3], ASTHMATIC, "💊 Prenez un antihistaminique"),
+    _rule(E, "pollen_level", [3], [3], "🌸 Pollen élevé : attention aux rechutes"),
+    _rule(E, "pollen_level", [3], [0, OTHER], "🌸 Niveau de pollen élevé"),
+    _rule(E, "pollen_level", [3], ALL, "🪟 Gardez les fenêtres fermées"),
+    _rule(E, "pollen_level", [2], ASTHMATIC, "🌸 Pollen modéré : soyez vigilant"),
+
+    _rule(E, "humidity", [1], ALL, "💧 Humidité excessive : risque moisissures"),
+    _rule(E, "humidity", [1], ASTHMATIC, "🌀 Déshumidificateur fortement conseillé"),
+
+    # eCO2 et TVOC : capteur CJMCU-811
+    _rule(E, "eco2", [3], ALL, "🏭 CO2 dangereux : aérez immédiatement!"),
+    _rule(E, "eco2", [3], ALL, "🪟 Ouvrez les fenêtres en grand"),
+    _rule(E, "eco2", [3], [2], "🚪 Asthme sévère : quittez la pièce"),
+    _rule(E, "eco2", [2], ALL, "🏭 CO2 élevé : ventilation insuffisante"),
+    _rule(E, "eco2", [2], ALL, "🪟 Ouvrez les fenêtres"),
+    _rule(E, "eco2", [1], ASTHMATIC, "🏭 CO2 modéré : pensez à aérer"),
+
+    _rule(E, "tvoc", [2], ALL, "☠️ TVOC dangereux : air pollué!"),
+    _rule(E, "tvoc", [2], ASTHMATIC, "🏃 Quittez la pièce immédiatement"),
+    _rule(E, "tvoc", [2], NON_ASTHMATIC, "🪟 Aérez abondamment"),
+    _rule(E, "tvoc", [1], ASTHMATIC, "☠️ TVOC détecté : améliorez la ventilation"),
+
+    # PM2.5 / PM10 : API qualité de l'air
+    _rule(E, "pm25", [3], [2], "🔴 PM2.5 DANGEREUX : NE SORTEZ PAS!"),
+    _rule(E, "pm25", [3], [2], "😷 Masque FFP2 même à l'intérieur"),
+    _rule(E, "pm25", [3], [1], "🔴 PM2.5 dangereux : masque FFP2 obligatoire"),
+    _rule(E, "pm25", [3], NON_ASTHMATIC, "🔴 PM2.5 dangereux : portez un masque"),
+    _rule(E, "pm25", [3], ALL, "🏠 Restez à l'intérieur"),
+    _rule(E, "pm25", [2], ASTHMATIC, "🟠 PM2.5 élevé : évitez l'extérieur"),
+    _rule(E, "pm25", [2], ASTHMATIC, "😷 Masque recommandé si sortie"),
+    _rule(E, "pm25", [2], NON_ASTHMATIC, "🟠 PM2.5 élevé : limitez efforts extérieurs"),
+    _rule(E, "pm25", [1], [2], "🟡 PM2.5 modéré : soyez vigilant"),
+
+    _rule(E, "pm10", [2], ASTHMATIC, "🔴 PM10 dangereux : restez à l'intérieur!"),
+    _rule(E, "pm10", [2], NON_ASTHMATIC, "🔴 PM10 élevé : évitez les sorties"),
+    _rule(E, "pm10", [1], ASTHMATIC, "🟠 PM10 élevé : attention aux poussières"),
+
+    # Pression et vent : API météo
+    _rule(E, "pressure", [0, 2], ASTHMATIC, "🌀 Pression atypique ({value} hPa) : migraines/gêne possible"),
+    _rule(E, "pressure", [0], ASTHMATIC, "⛈️ Dépression atmosphérique : restez vigilant"),
+    _rule(E, "pressure", [2], ALL, "☀️ Anticyclone : air stagnant possible"),
+
+    _rule(E, "wind_speed", [2], ALL, "💨 Vent très fort : restez à l'abri!"),
+    _rule(E, "wind_speed", [2], ASTHMATIC, "🌸 Alerte : pollens dispersés intensément",
+          requires={"pollen_level": [1, 2, 3]}),
+    _rule(E, "wind_speed", [1], ASTHMATIC, "💨 Vent modéré + pollen : portez un masque",
+          requires={"pollen_level": [1, 2, 3]}),
+)
+
+del I, P, E
+
+
+# Entrée compilée : (index de catégorie, message, a une valeur à insérer, conditions annexes)
+Entry = Tuple[int, str, bool, Tuple[Tuple[str, frozenset], ...]]
+
+
+def _band_edges(thresholds) -> List[float]:
+    """
+    Seuils → bornes triées pour bisect_right : "valeur > t" devient
+    "valeur >= nextafter(t, +inf)" (aucun réel entre les deux)
+    """
+    return sorted(t if inclusive else nextafter(t, inf) for t, inclusive in thresholds)
+
+
+class RuleTable:
+    """
+    Table de décision {(facteur, bande, profil): entrées}, construite par compile_rules()
+
+    Pour le chemin chaud, la table est aussi rangée par position :
+    {profil: [cellule par bande] par facteur}. Une cellule simple est
+    (catégorie, messages) ; une cellule avec conditions annexes ou valeur à
+    insérer garde ses entrées (catégorie, message, valeur ?, conditions).
+    """
+
+    def __init__(self, table: Dict[Tuple[str, int, Optional[int]], Tuple[Entry, ...]]):
+        self.table = table
+        self._flags = tuple((factor, default) for factor, (default, thresholds) in FACTORS.items()
+                            if thresholds is None)
+        # Facteurs numériques lus dans les données (tous sauf risk_score, en dernier)
+        self._numeric = tuple((factor, default, _band_edges(thresholds))
+                              for factor, (default, thresholds) in FACTORS.items()
+                              if thresholds is not None)[:-1]
+        self._risk_edges = _band_edges(FACTORS["risk_score"][1])
+        index = {factor: i for i, factor in enumerate(FACTOR_NAMES)}
+        band_counts = [2 if thresholds is None else len(thresholds) + 1 for _, thresholds in FACTORS.values()]
+        self._by_profile = {
+            profile: tuple(
+                tuple(self._cell(table.get((factor, band, profile), ()), index) for band in range(band_counts[i]))
+                for i, factor in enumerate(FACTOR_NAMES)
+            )
+            for profile in ALL
+        }
+        # Facteurs dont un message insère la valeur (non partageables entre lignes d'un lot)
+        self.value_factors = tuple(sorted({
+            factor for (factor, _, _), entries in table.items()
+            if any(has_value for _, _, has_value, _ in entries)
+        }))
+
+    @staticmethod
+    def _cell(entries: Sequence[Entry], index: Mapping[str, int]):
+        if not entries:
+            return None
+        categories = {category for category, _, _, _ in entries}
+        if len(categories) == 1 and not any(has_value or requires for _, _, has_value, requires in entries):
+            return (False, categories.pop(), tuple(message for _, message, _, _ in entries))
+        return (True, tuple(
+            (category, message, has_value, tuple((index[name], allowed) for name, allowed in requires))
+            for category, message, has_value, requires in entries
+        ), None)
+
+    def band(self, factor: str, value: Any) -> int:
+        """Bande d'une valeur (nombre de seuils franchis)"""
+        thresholds = FACTORS[factor][1]
+        if thresholds is None:
+            return 1 if value else 0
+        return bisect_right(_band_edges(thresholds), value)
+
+    def evaluate(self, data: Mapping, risk_score: float, profile_id: int) -> Dict[str, List[str]]:
+        """Recommandations d'une lecture : une recherche par facteur"""
+        get = data.get
+        bands = [1 if get(factor, default) else 0 for factor, default in self._flags]
+        bands += [bisect_right(edges, get(factor, default)) for factor, default, edges in self._numeric]
+        bands.append(bisect_right(self._risk_edges, risk_score))
+        return self._assemble(bands, data, profile_id)
+
+    def _assemble(self, bands: Sequence[int], data: Mapping, profile_id: Optional[int]) -> Dict[str, List[str]]:
+        per_factor = self._by_profile.get(profile_id if profile_id in PROFILE_IDS else OTHER)
+        lists: Tuple[List[str], ...] = ([], [], [])
+        conditional = False
+        for cells, band in zip(per_factor, bands):
+            cell = cells[band]
+            if cell is None:
+                continue
+            if cell[0]:
+                conditional = True
+                break
+            lists[cell[1]].extend(cell[2])
+        if conditional:  # cellules avec conditions : évaluation entrée par entrée
+            lists = self._assemble_entries(per_factor, bands, data)
+        return {"immediate": lists[0], "preventive": lists[1], "environmental": lists[2]}
+
+    @staticmethod
+    def _assemble_entries(per_factor, bands: Sequence[int], data: Mapping) -> Tuple[List[str], ...]:
+        lists: Tuple[List[str], ...] = ([], [], [])
+        for i, (cells, band) in enumerate(zip(per_factor, bands)):
+            cell = cells[band]
+            if cell is None:
+                continue
+            if not cell[0]:
+                lists[cell[1]].extend(cell[2])
+                continue
+            for category, message, has_value, requires in cell[1]:
+                if requires and not all(bands[j] in allowed for j, allowed in requires):
+                    continue
+                if has_value:
+                    factor = FACTOR_NAMES[i]
+                    message = message.format(value=data.get(factor, FACTORS[factor][0]))
+                lists[category].append(message)
+        return lists
+
+    def evaluate_batch(self, columns: Mapping[str, Sequence], risk_scores: Sequence[float],
+                       profile_ids: Sequence[int]) -> List[Dict[str, List[str]]]:
+        """
+        Recommandations d'un lot (colonnes de même longueur, facteurs absents :
+        valeur par défaut). Bandes calculées en vectoriel ; chaque combinaison
+        (bandes, profil) distincte n'est assemblée qu'une fois.
+        """
+        size = len(risk_scores)
+        band_matrix = np.empty((size, len(FACTOR_NAMES) + 1), dtype=np.int64)
+        for j, (factor, (default, thresholds)) in enumerate(FACTORS.items()):
+            if factor == "risk_score":
+                column = np.asarray(risk_scores, dtype=float)
+            elif factor in columns:
+                column = np.asarray(columns[factor])
+            else:
+                column = np.full(size, default)
+            if thresholds is None:
+                band_matrix[:, j] = column.astype(bool)
+                continue
+            column = column.astype(float)
+            band = np.zeros(size, dtype=np.int64)
+            for threshold, inclusive in thresholds:
+                band += (column >= threshold) if inclusive else (column > threshold)
+            band_matrix[:, j] = band
+        profiles = np.asarray(profile_ids, dtype=np.int64)
+        band_matrix[:, -1] = np.where(np.isin(profiles, PROFILE_IDS), profiles, -1)
+
+        signatures, inverse = np.unique(band_matrix, axis=0, return_inverse=True)
+        signatures = signatures.tolist()
+        value_positions = [FACTOR_NAMES.index(factor) for factor in self.value_factors]
+        results: List[Optional[Dict[str, List[str]]]] = [None] * size
+        shared: Dict[int, Dict[str, List[str]]] = {}
+        for i, key in enumerate(inverse.reshape(-1).tolist()):
+            cached = shared.get(key)
+            if cached is None:
+                bands, profile = signatures[key][:-1], signatures[key][-1]
+                profile = profile if profile >= 0 else OTHER
+                if self._needs_values(bands, profile, value_positions):
+                    row = {FACTOR_NAMES[j]: columns[FACTOR_NAMES[j]][i]
+                           for j in value_positions if FACTOR_NAMES[j] in columns}
+                    results[i] = self._assemble(bands, row, profile)
+                    continue
+                cached = shared[key] = self._assemble(bands, {}, profile)
+            # Listes propres à chaque ligne (le résultat peut être modifié par l'appelant)
+            results[i] = {category: list(messages) for category, messages in cached.items()}
+        return results
+
+    def _needs_values(self, bands: Sequence[int], profile: Optional[int], positions: Sequence[int]) -> bool:
+        per_factor = self._by_profile[profile]
+        for j in positions:
+            cell = per_factor[j][bands[j]]
+            if cell is not None and cell[0] and any(has_value for _, _, has_value, _ in cell[1]):
+                return True
+        return False
+
+
+def compile_rules(rules: Sequence[Dict] = RULES) -> RuleTable:
+    """Règles → table de décision indexée par (facteur, bande, profil)"""
+    table: Dict[Tuple[str, int, Optional[int]], List[Entry]] = {}
+    for rule in rules:
+        if rule["factor"] not in FACTORS:
+            raise ValueError(f"Facteur inconnu dans une règle : {rule['factor']}")
+        requires = tuple((name, frozenset(bands)) for name, bands in rule["requires"].items())
+        entry = (CATEGORIES.index(rule["category"]), rule["message"], "{value}" in rule["message"], requires)
+        for band in rule["bands"]:
+            for profile in rule["profiles"]:
+                table.setdefault((rule["factor"], band, profile), []).append(entry)
+    return RuleTable({key: tuple(entries) for key, entries in table.items()})
+
+
+# Table compilée partagée
+RULE_TABLE = compile_rules()
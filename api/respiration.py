@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# api/respiration.py
+"""
+Fréquence respiratoire estimée à partir du signal PPG brut (MAX30102)
+
+La respiration module le signal PPG de deux façons, mesurées sur chaque
+fenêtre (numpy, FFT sur toutes les fenêtres à la fois) :
+
+- ligne de base (RIIV) : composante basse fréquence, passe-bande RESP_BAND
+- amplitude (RIAV) : enveloppe (transformée de Hilbert) de la composante
+  cardiaque CARDIAC_BAND, puis passe-bande RESP_BAND
+
+Chaque modulation donne un pic spectral et une qualité (part de la
+puissance de la bande autour du pic). Les deux estimations sont moyennées
+(pondérées par la qualité) si elles concordent, sinon la plus nette est
+retenue ; en dessous de MIN_QUALITY, pas d'estimation. La fréquence
+cardiaque est le pic de la bande cardiaque.
+
+RespirationMonitor garde un tampon circulaire par device (WINDOW_S secondes)
+et réestime toutes les HOP_S secondes de nouveaux échantillons :
+POST /api/v1/sensors/ppg (api/app.py) l'alimente, /predict et
+/predict/realtime utilisent l'estimation récente à la place de
+l'approximation BPM / 4.5.
+
+Signal de substitution pour travailler sans bracelet :
+  python -m api.respiration --simulate --respiratory-rate 18 --duration 120
+"""
+
+import argparse
+import math
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+SAMPLE_RATE = 25.0          # Hz (MAX30102 après moyennage interne)
+WINDOW_S = 32.0             # Fenêtre d'analyse
+MIN_WINDOW_S = 16.0         # Durée minimale avant une première estimation
+HOP_S = 4.0                 # Nouvelle estimation toutes les HOP_S secondes de signal
+RESP_BAND = (0.1, 0.7)      # Hz → 6 à 42 respirations/min
+CARDIAC_BAND = (0.7, 3.5)   # Hz → 42 à 210 battements/min
+PEAK_HALF_WIDTH = 0.05      # Hz autour du pic comptés dans la qualité
+MIN_QUALITY = 0.3
+AGREEMENT_BRPM = 4.0        # Écart toléré entre les deux modulations
+MAX_AGE_S = 60.0            # Au-delà, l'estimation d'un device est périmée
+MAX_DEVICES = 10000
+
+
+def _nfft(length: int) -> int:
+    """Bourrage de zéros : résolution fine de la bande respiratoire"""
+    return 1 << max(12, (4 * length - 1).bit_length())
+
+
+def detrend(windows: 'np.ndarray') -> 'np.ndarray':
+    """Retire moyenne et pente (moindres carrés) de chaque ligne"""
+    t = np.arange(windows.shape[1], dtype=float)
+    t -= t.mean()
+    centered = windows - windows.mean(axis=1, keepdims=True)
+    slope = centered @ t / (t @ t)
+    return centered - slope[:, None] * t
+
+
+def bandpass(windows: 'np.ndarray', fs: float, band: Sequence[float]) -> 'np.ndarray':
+    """Passe-bande idéal par masque FFT (chaque ligne)"""
+    length = windows.shape[1]
+    spectrum = np.fft.rfft(windows, axis=1)
+    freqs = np.fft.rfftfreq(length, 1.0 / fs)
+    spectrum[:, (freqs < band[0]) | (freqs > band[1])] = 0
+    return np.fft.irfft(spectrum, n=length, axis=1)
+
+
+def envelope(windows: 'np.ndarray') -> 'np.ndarray':
+    """Module du signal analytique (Hilbert par FFT)"""
+    length = windows.shape[1]
+    spectrum = np.fft.fft(windows, axis=1)
+    gain = np.zeros(length)
+    gain[0] = 1
+    gain[1:(length + 1) // 2] = 2
+    if length % 2 == 0:
+        gain[length // 2] = 1
+    return np.abs(np.fft.ifft(spectrum * gain, axis=1))
+
+
+def band_peak(windows: 'np.ndarray', fs: float, band: Sequence[float]):
+    """(fréquence du pic en Hz, qualité 0-1) par ligne, spectre fenêtré (Hann)"""
+    length = windows.shape[1]
+    nfft = _nfft(length)
+    power = np.abs(np.fft.rfft(windows * np.hanning(length), n=nfft, axis=1)) ** 2
+    freqs = np.fft.rfftfreq(nfft, 1.0 / fs)
+    in_band = (freqs >= band[0]) & (freqs <= band[1])
+    band_power = power[:, in_band]
+    band_freqs = freqs[in_band]
+    peaks = band_freqs[np.argmax(band_power, axis=1)]
+    near_peak = np.abs(band_freqs[None, :] - peaks[:, None]) <= PEAK_HALF_WIDTH
+    total = band_power.sum(axis=1)
+    quality = np.where(total > 0, (band_power * near_peak).sum(axis=1) / np.where(total > 0, total, 1), 0.0)
+    return peaks, quality
+
+
+def estimate_windows(windows, fs: float = SAMPLE_RATE) -> List[Dict[str, Any]]:
+    """Estimation pour chaque fenêtre (lignes de même longueur)"""
+    windows = detrend(np.atleast_2d(np.asarray(windows, dtype=float)))
+    cardiac = bandpass(windows, fs, CARDIAC_BAND)
+    heart_freq, heart_quality = band_peak(cardiac, fs, CARDIAC_BAND)
+    baseline_freq, baseline_quality = band_peak(bandpass(windows, fs, RESP_BAND), fs, RESP_BAND)
+    amplitude = envelope(cardiac)
+    amplitude_freq, amplitude_quality = band_peak(
+        bandpass(amplitude - amplitude.mean(axis=1, keepdims=True), fs, RESP_BAND), fs, RESP_BAND)
+
+    baseline_rr = baseline_freq * 60
+    amplitude_rr = amplitude_freq * 60
+    weights = baseline_quality + amplitude_quality
+    fused = (baseline_rr * baseline_quality + amplitude_rr * amplitude_quality) / np.where(weights > 0, weights, 1)
+    agree = np.abs(baseline_rr - amplitude_rr) <= AGREEMENT_BRPM
+    best_is_baseline = baseline_quality >= amplitude_quality
+    rr = np.where(agree, fused, np.where(best_is_baseline, baseline_rr, amplitude_rr))
+    quality = np.where(agree, np.maximum(baseline_quality, amplitude_quality),
+                       np.maximum(baseline_quality, amplitude_quality) / 2)
+    method = np.where(agree, "fused", np.where(best_is_baseline, "baseline", "amplitude"))
+
+    results = []
+    for i in range(windows.shape[0]):
+        reliable = bool(quality[i] >= MIN_QUALITY)
+        results.append({
+            "respiratory_rate": round(float(rr[i]), 1) if reliable else None,
+            "heart_rate": round(float(heart_freq[i] * 60), 1),
+            "quality": round(float(quality[i]), 3),
+            "method": str(method[i]) if reliable else None,
+            "window_s": round(windows.shape[1] / fs, 1),
+        })
+    return results
+
+
+def rolling_estimates(samples, fs: float = SAMPLE_RATE, window_s: float = WINDOW_S,
+                      hop_s: float = HOP_S) -> List[Dict[str, Any]]:
+    """Estimations sur fenêtres glissantes (toutes calculées en un appel) ; end_s = fin de fenêtre"""
+    samples = np.asarray(samples, dtype=float)
+    window = int(round(window_s * fs))
+    hop = max(1, int(round(hop_s * fs)))
+    if samples.size < window:
+        return []
+    windows = np.lib.stride_tricks.sliding_window_view(samples, window)[::hop]
+    results = estimate_windows(windows, fs)
+    for index, result in enumerate(results):
+        result["end_s"] = round((index * hop + window) / fs, 2)
+    return results
+
+
+def synthetic_ppg(duration_s: float, fs: float = SAMPLE_RATE, heart_rate: float = 72.0,
+                  respiratory_rate: float = 16.0, noise: float = 40.0, seed: int = 0) -> 'np.ndarray':
+    """Signal IR de substitution : pouls + modulations respiratoires + bruit + dérive"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration_s * fs)) / fs
+    breathing = np.sin(2 * np.pi * respiratory_rate / 60 * t + rng.uniform(0, 2 * np.pi))
+    phase = 2 * np.pi * heart_rate / 60 * t + 0.3 * breathing
+    pulse = np.sin(phase) + 0.35 * np.sin(2 * phase + 0.8)
+    return (80000 + 0.5 * t                     # composante continue + dérive lente
+            + 150 * breathing                   # ligne de base
+            + 400 * (1 + 0.25 * breathing) * pulse  # amplitude
+            + rng.normal(0, noise, t.size))
+
+
+class PPGBuffer:
+    """Tampon circulaire d'un device (WINDOW_S secondes au plus)"""
+
+    __slots__ = ("fs", "data", "size", "position", "since_estimate", "estimate", "estimated_at")
+
+    def __init__(self, fs: float, window_s: float = WINDOW_S):
+        self.fs = fs
+        self.data = np.zeros(int(round(window_s * fs)))
+        self.size = 0
+        self.position = 0
+        self.since_estimate = 0
+        self.estimate: Optional[Dict[str, Any]] = None
+        self.estimated_at = 0.0
+
+    def extend(self, samples: 'np.ndarray'):
+        capacity = self.data.size
+        samples = samples[-capacity:]
+        count = samples.size
+        end = self.position + count
+        if end <= capacity:
+            self.data[self.position:end] = samples
+        else:
+            split = capacity - self.position
+            self.data[self.position:] = samples[:split]
+            self.data[:count - split] = samples[split:]
+        self.position = end % capacity
+        self.size = min(capacity, self.size + count)
+        self.since_estimate += count
+
+    def window(self) -> 'np.ndarray':
+        """Échantillons dans l'ordre chronologique"""
+        if self.size < self.data.size:
+            return self.data[:self.size].copy()
+        return np.concatenate((self.data[self.position:], self.data[:self.position]))
+
+
+class RespirationMonitor:
+    """Tampons PPG par device et dernière estimation (thread-safe, devices bornés)"""
+
+    def __init__(self, window_s: float = WINDOW_S, min_window_s: float = MIN_WINDOW_S, hop_s: float = HOP_S,
+                 max_devices: int = MAX_DEVICES, clock: Callable[[], float] = time.monotonic):
+        self.window_s = window_s
+        self.min_window_s = min_window_s
+        self.hop_s = hop_s
+        self.max_devices = max(1, max_devices)
+        self._clock = clock
+        self._buffers: "OrderedDict[str, PPGBuffer]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add_samples(self, device_key: str, samples, fs: float = SAMPLE_RATE) -> Dict[str, Any]:
+        """
+        Ajoute des échantillons ; réestime si HOP_S secondes nouvelles (et
+        MIN_WINDOW_S en tampon). Retourne {buffered_s, estimate, updated}.
+        """
+        samples = np.asarray(samples, dtype=float).ravel()
+        samples = samples[np.isfinite(samples)]
+        with self._lock:
+            buffer = self._buffers.get(device_key)
+            if buffer is None or buffer.fs != fs:
+                buffer = PPGBuffer(fs, self.window_s)
+            self._buffers[device_key] = buffer
+            self._buffers.move_to_end(device_key)
+            while len(self._buffers) > self.max_devices:
+                self._buffers.popitem(last=False)
+            buffer.extend(samples)
+            due = buffer.size >= self.min_window_s * fs and (
+                buffer.estimate is None or buffer.since_estimate >= self.hop_s * fs)
+            window = buffer.window() if due else None
+            if due:
+                buffer.since_estimate = 0
+
+        updated = False
+        if window is not None:
+            estimate = estimate_windows(window[None, :], fs)[0]
+            with self._lock:
+                buffer.estimate = estimate
+                buffer.estimated_at = self._clock()
+            updated = True
+        return {"buffered_s": round(buffer.size / fs, 2), "estimate": buffer.estimate, "updated": updated}
+
+    def latest(self, device_key: str, max_age: float = MAX_AGE_S) -> Optional[Dict[str, Any]]:
+        """Dernière estimation fiable du device (None si absente ou périmée)"""
+        with self._lock:
+            buffer = self._buffers.get(device_key)
+            if buffer is None or buffer.estimate is None or self._clock() - buffer.estimated_at > max_age:
+                return None
+            return buffer.estimate if buffer.estimate["respiratory_rate"] is not None else None
+
+
+_monitor: Optional[RespirationMonitor] = None
+_monitor_lock = threading.Lock()
+
+
+def get_respiration_monitor() -> RespirationMonitor:
+    """Instance du processus"""
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                _monitor = RespirationMonitor()
+    return _monitor
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Fréquence respiratoire depuis le PPG (signal simulé ou fichier)")
+    parser.add_argument("input", nargs="?", help="Fichier d'échantillons IR (un par ligne)")
+    parser.add_argument("--simulate", action="store_true", help="Signal de substitution (synthetic_ppg)")
+    parser.add_argument("--duration", type=float, default=120.0, help="Durée simulée (s)")
+    parser.add_argument("--respiratory-rate", type=float, default=16.0, help="Respiration simulée (/min)")
+    parser.add_argument("--heart-rate", type=float, default=72.0, help="Pouls simulé (bpm)")
+    parser.add_argument("--sample-rate", type=float, default=SAMPLE_RATE, help="Fréquence d'échantillonnage (Hz)")
+    parser.add_argument("--window", type=float, default=WINDOW_S, help="Fenêtre d'analyse (s)")
+    parser.add_argument("--hop", type=float, default=HOP_S, help="Pas entre estimations (s)")
+    args = parser.parse_args(argv)
+
+    if args.simulate or not args.input:
+        samples = synthetic_ppg(args.duration, args.sample_rate, args.heart_rate, args.respiratory_rate)
+    else:
+        samples = np.loadtxt(args.input, ndmin=1)
+
+    start = time.perf_counter()
+    estimates = rolling_estimates(samples, args.sample_rate, args.window, args.hop)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    for estimate in estimates:
+        rr = estimate["respiratory_rate"]
+        print(f"  t={estimate['end_s']:>7.1f}s  respiration={rr if rr is not None else '-':>5} /min  "
+              f"pouls={estimate['heart_rate']:>5} bpm  qualité={estimate['quality']:.2f}")
+    per_window = elapsed_ms / len(estimates) if estimates else math.nan
+    print(f"✅ {len(estimates)} fenêtres en {elapsed_ms:.1f} ms ({per_window:.2f} ms/fenêtre)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
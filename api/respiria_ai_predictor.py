@@ -7,21 +7,217 @@ Moteur d'intelligence artificielle pour la prévention des crises d'asthme
 """
 
 import json
-import time
+from time import perf_counter_ns
 from datetime import datetime
-from typing import Dict, List, Tuple, Any
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
 from dataclasses import dataclass
+from types import MappingProxyType
+
+try:
+    from .recommendation_rules import FACTORS as RULE_FACTORS, RULE_TABLE
+    from .timing import current_timer
+    from . import risk_bands, vector_scoring
+except ImportError:
+    from recommendation_rules import FACTORS as RULE_FACTORS, RULE_TABLE
+    from timing import current_timer
+    import risk_bands
+    import vector_scoring
+
+
+# Messages par profil et niveau de risque
+PROFILE_MESSAGES = MappingProxyType({
+    0: MappingProxyType({  # Prévention
+        "low": "✅ Conditions favorables pour vos activités",
+        "medium": "⚠️ Personne saine : conditions moins favorables aujourd'hui", 
+        "high": "🛡️ Attention : exposition à des conditions qui pourraient déclencher des symptômes respiratoires"
+    }),
+    1: MappingProxyType({  # Asthmatique stable
+        "low": "✅ Votre asthme est bien contrôlé, conditions favorables",
+        "medium": "⚠️ Vigilance : certains déclencheurs sont présents",
+        "high": "🚨 ALERTE : Risque élevé de crise - Soyez très prudent"
+    }),
+    2: MappingProxyType({  # Asthmatique sévère
+        "low": "✅ Conditions acceptables - Restez vigilant",
+        "medium": "⚠️ ATTENTION : Asthme sévère détecté, risque modéré",
+        "high": "🆘 DANGER ÉLEVÉ : Contactez votre médecin préventivement"
+    }),
+    3: MappingProxyType({  # Rémission
+        "low": "✅ Rémission stable, continuez ainsi",
+        "medium": "⚠️ Attention : conditions pouvant favoriser une rechute",
+        "high": "🚨 ALERTE RECHUTE : Consultez rapidement votre médecin"
+    })
+})
+
+# Conseils spécifiques par profil
+PROFILE_ADVICE = MappingProxyType({
+    0: "Limitez vos activités extérieures si conditions défavorables",
+    1: "Soyez vigilant et ayez votre inhalateur à portée de main",
+    2: "ATTENTION : Les conditions actuelles sont particulièrement dangereuses pour vous",
+    3: "Attention : risque de rechute détecté, soyez prudent"
+})
+
+# Niveau d'alerte (le profil sévère passe à "maximum" en risque élevé)
+ALERT_LEVELS = MappingProxyType({"low": "minimal", "medium": "modéré", "high": "élevé"})
+
+
+# Gabarits des messages de facteurs : un par (facteur, statut), "{value}" remplacé
+# par la valeur mesurée. Seul le message retenu est formaté.
+_FACTOR_MESSAGES = {
+    'spo2': {
+        'critical': "⚠️ SpO2 dangereusement bas ({value}%) - Principal facteur de risque",
+        'warning': "⚠️ SpO2 préoccupant ({value}%) - Surveillance nécessaire",
+        'info': "SpO2 légèrement bas ({value}%)"
+    },
+    'heart_rate': {
+        'critical': "💓 Fréquence cardiaque très élevée ({value} bpm)",
+        'warning': "💓 Fréquence cardiaque élevée ({value} bpm)",
+        'info': "💓 Fréquence cardiaque modérée ({value} bpm)"
+    },
+    'respiratory_rate': {
+        'critical': "💨 Fréquence respiratoire critique ({value}/min)",
+        'warning': "💨 Fréquence respiratoire élevée ({value}/min)",
+        'info': "💨 Fréquence respiratoire légèrement élevée ({value}/min)"
+    },
+    'aqi': {
+        'critical': "🌫️ Qualité d'air dangereuse (AQI {value})",
+        'warning': "🌫️ Qualité d'air très mauvaise (AQI {value})",
+        'info': "🌫️ Qualité d'air modérée (AQI {value})"
+    },
+    'temperature': {
+        'critical': "🌡️ Température extrême ({value}°C)",
+        'warning': "🌡️ Température défavorable ({value}°C)",
+        'info': "🌡️ Température sous-optimale ({value}°C)"
+    },
+    'humidity': {
+        'critical': "💧 Humidité extrême ({value}%)",
+        'warning': "💧 Humidité défavorable ({value}%)",
+        'info': "💧 Humidité sous-optimale ({value}%)"
+    },
+    'pollen_level': {
+        'critical': "🌸 Niveau de pollen très élevé ({value}/5)",
+        'warning': "🌸 Niveau de pollen élevé ({value}/5)",
+        'info': "🌸 Niveau de pollen modéré ({value}/5)"
+    },
+    'eco2': {
+        'critical': "🏭 CO2 dangereux ({value} ppm) - Aérez immédiatement!",
+        'warning': "🏭 CO2 élevé ({value} ppm) - Ventilation insuffisante",
+        'info': "🏭 CO2 modéré ({value} ppm) - Pensez à aérer"
+    },
+    'tvoc': {
+        'critical': "☠️ TVOC dangereux ({value} ppb) - Air pollué!",
+        'warning': "☠️ TVOC élevé ({value} ppb) - Polluants détectés",
+        'info': "☠️ TVOC modéré ({value} ppb)"
+    },
+    'medication_taken': {
+        'critical': "💊 Traitement préventif non pris - Risque accru",
+        'warning': "💊 Traitement préventif non pris",
+        'info': "💊 Pensez à votre traitement préventif"
+    },
+    'smoke_detected': {
+        'critical': "🚨 FUMÉE DÉTECTÉE - ÉVACUEZ IMMÉDIATEMENT",
+        'warning': "🚨 Fumée détectée dans l'environnement",
+        'info': "🚨 Trace de fumée détectée"
+    },
+    'pm25': {
+        'critical': "🔴 PM2.5 dangereux ({value} µg/m³) - Particules fines!",
+        'warning': "🟠 PM2.5 élevé ({value} µg/m³) - Air pollué",
+        'info': "🟡 PM2.5 modéré ({value} µg/m³)"
+    },
+    'pm10': {
+        'critical': "🔴 PM10 dangereux ({value} µg/m³) - Poussières!",
+        'warning': "🟠 PM10 élevé ({value} µg/m³)",
+        'info': "🟡 PM10 modéré ({value} µg/m³)"
+    },
+    'pressure': {
+        'critical': "🌀 Pression atmosphérique extrême ({value} hPa)",
+        'warning': "🌀 Changement de pression ({value} hPa)",
+        'info': "🌀 Légère variation de pression ({value} hPa)"
+    },
+    'wind_speed': {
+        'critical': "💨 Vent très fort ({value} km/h) - Tempête!",
+        'warning': "💨 Vent fort ({value} km/h) - Pollens dispersés",
+        'info': "💨 Vent modéré ({value} km/h)"
+    }
+}
+
+# Variantes plus directes pour les facteurs d'urgence (chemin rapide)
+_FAST_FACTOR_MESSAGES = {
+    'spo2': {
+        'critical': "🚨 SpO2 critique ({value}%) - URGENCE MÉDICALE",
+        'warning': "⚠️ SpO2 préoccupant ({value}%) - Surveillance requise",
+        'info': "💡 SpO2 à surveiller ({value}%)"
+    },
+    'respiratory_rate': {
+        'critical': "💨 Détresse respiratoire ({value}/min) - CRITIQUE",
+        'warning': "💨 Fréquence respiratoire élevée ({value}/min)",
+        'info': "💨 Respiration légèrement rapide ({value}/min)"
+    },
+    'smoke_detected': {
+        'critical': "🚨 FUMÉE DÉTECTÉE - ÉVACUEZ IMMÉDIATEMENT",
+        'warning': "🚨 Fumée dans l'environnement",
+        'info': "🚨 Trace de fumée détectée"
+    }
+}
+
+
+def _compile_message(template: str) -> Tuple[str, Any]:
+    """Gabarit → (préfixe, suffixe) ; suffixe None si le message est constant"""
+    prefix, placeholder, suffix = template.partition("{value}")
+    return (prefix, suffix) if placeholder else (template, None)
+
+
+def _compile_messages(messages: Dict[str, Dict[str, str]]) -> Dict[Tuple[str, str], Tuple[str, Any]]:
+    return {
+        (factor, status): _compile_message(template)
+        for factor, templates in messages.items()
+        for status, template in templates.items()
+    }
+
+
+def _render_message(compiled: Tuple[str, Any], value: Any) -> str:
+    prefix, suffix = compiled
+    # Concaténation : plus rapide que str.format sur ces chaînes non ASCII
+    return prefix if suffix is None else prefix + str(value) + suffix
+
+
+FACTOR_MESSAGE_TEMPLATES = MappingProxyType(_compile_messages(_FACTOR_MESSAGES))
+FAST_FACTOR_MESSAGE_TEMPLATES = MappingProxyType({
+    **FACTOR_MESSAGE_TEMPLATES,
+    **_compile_messages(_FAST_FACTOR_MESSAGES)
+})
+
+# Messages rendus gardés en cache par (facteur, statut, valeur exacte)
+FACTOR_MESSAGE_CACHE_SIZE = 2048
 
 
 @dataclass
 class RiskFactor:
-    """Facteur de risque avec sa contribution"""
+    """
+    Facteur de risque avec sa contribution
+
+    __slots__ : pas de __dict__ par instance (jusqu'à 5 facteurs par prédiction).
+    La réponse de predict() reste un document JSON pur (dicts, lus par clé par
+    evaluation, bulk_scoring, dataset_scoring) : to_json() y alloue toujours
+    un dict par facteur.
+    """
+    __slots__ = ("factor", "value", "contribution_percent", "status", "message")
+
     factor: str
     value: Any
     contribution_percent: float
     status: str  # "critical", "warning", "info"
     message: str
 
+    def to_json(self) -> Dict[str, Any]:
+        """Entrée "risk_factors" de la réponse (dict)"""
+        return {
+            "factor": self.factor,
+            "value": self.value,
+            "contribution_percent": self.contribution_percent,
+            "status": self.status,
+            "message": self.message,
+        }
+
 
 class RespiriaAIPredictor:
     """
@@ -34,7 +230,9 @@ class RespiriaAIPredictor:
         
         # Cache pour optimiser les performances
         self._score_cache = {}
-        self._recommendation_cache = {}
+        self._message_cache = {}
+        # Statistiques de cache : {cache: [succès, échecs]} (exportées par /metrics)
+        self.cache_stats = {"aqi_score": [0, 0], "factor_message": [0, 0]}
         
         # Configuration des profils utilisateur (optimisée)
         self.PROFILES = {
@@ -72,124 +270,64 @@ class RespiriaAIPredictor:
             "high": 100     # Score ≥ 60 = HIGH
         }
         
+        # Contexte par (niveau, profil) : précalculé une fois, en lecture seule
+        self._profile_contexts = MappingProxyType({
+            (risk_level, profile_id): MappingProxyType({
+                "profile_id": profile_id,
+                "name": profile["name"],
+                "baseline_risk": profile["baseline_risk"],
+                "message": PROFILE_MESSAGES[profile_id][risk_level],
+                "specific_advice": PROFILE_ADVICE[profile_id],
+                "alert_level": "maximum" if risk_level == "high" and profile_id == 2 else ALERT_LEVELS[risk_level]
+            })
+            for profile_id, profile in self.PROFILES.items()
+            for risk_level in ALERT_LEVELS
+        })
+        
         print("✅ Moteur IA RESPIRIA prêt")
 
     def calculate_spo2_score(self, spo2: float) -> float:
         """Calcule le score de risque pour SpO2 - RECALIBRÉ"""
-        # SpO2 < 88 = Urgence médicale, doit être HIGH
-        if spo2 < 85:  # Critique extrême
-            return 50
-        elif spo2 < 88:  # Critique
-            return 40
-        elif spo2 < 90:  # Sévère
-            return 30
-        elif spo2 < 92:  # Modéré
-            return 18
-        elif spo2 < 94:  # Léger
-            return 10
-        elif spo2 < 96:  # Surveillance
-            return 5
-        else:
-            return 0
+        return risk_bands.band_score('spo2', spo2)
 
     def calculate_heart_rate_score(self, heart_rate: float) -> float:
         """Calcule le score de risque pour la fréquence cardiaque - RECALIBRÉ"""
-        # Scores réduits pour meilleur équilibre
-        if heart_rate > 140:  # Tachycardie sévère
-            return 18
-        elif heart_rate > 120:  # Tachycardie modérée
-            return 14
-        elif heart_rate > 100:  # Tachycardie légère
-            return 8
-        elif heart_rate > 90:   # Élevé
-            return 4
-        elif heart_rate < 50:   # Bradycardie
-            return 12
-        else:
-            return 0
+        return risk_bands.band_score('heart_rate', heart_rate)
 
     def calculate_respiratory_rate_score(self, respiratory_rate: float) -> float:
         """Calcule le score de risque pour la fréquence respiratoire - RECALIBRÉ"""
-        # Scores recalibrés pour meilleur équilibre
-        if respiratory_rate > 35:    # Détresse respiratoire sévère
-            return 25
-        elif respiratory_rate > 30:  # Détresse respiratoire
-            return 18
-        elif respiratory_rate > 25:  # Tachypnée modérée
-            return 12
-        elif respiratory_rate > 22:  # Tachypnée légère
-            return 6
-        elif respiratory_rate < 10:  # Bradypnée (dangereux)
-            return 20
-        else:
-            return 0
+        return risk_bands.band_score('respiratory_rate', respiratory_rate)
 
     def calculate_aqi_score(self, aqi: float) -> float:
         """Calcule le score de risque pour AQI - OPTIMISÉ"""
-        # Cache pour AQI (arrondi à 10 près pour efficacité)
-        aqi_rounded = int(aqi // 10) * 10
-        cache_key = f"aqi_{aqi_rounded}"
+        # Cache pour AQI par tranche ]10k, 10k+10] : les seuils (> 50, > 100...)
+        # sont des multiples de 10, une tranche a donc un seul score
+        cache_key = -(-aqi // 10)
         
         if cache_key in self._score_cache:
+            self.cache_stats["aqi_score"][0] += 1
             return self._score_cache[cache_key]
+        self.cache_stats["aqi_score"][1] += 1
         
-        # Calcul optimisé - Scores réduits pour meilleur équilibre
-        if aqi > 350:      # Extrêmement dangereux
-            score = 25
-        elif aqi > 300:    # Dangereux
-            score = 20
-        elif aqi > 200:    # Très mauvais
-            score = 16
-        elif aqi > 150:    # Mauvais
-            score = 12
-        elif aqi > 100:    # Modéré pour sensibles
-            score = 8
-        elif aqi > 50:     # Modéré
-            score = 4
-        else:              # Bon
-            score = 0
-            
+        score = risk_bands.band_score('aqi', aqi)
         self._score_cache[cache_key] = score
         return score
 
     def calculate_temperature_score(self, temperature: float) -> float:
         """Calcule le score de risque pour la température"""
-        if temperature < 5 or temperature > 35:
-            return 15
-        elif temperature < 10 or temperature > 32:
-            return 10
-        elif temperature < 15 or temperature > 28:
-            return 5
-        else:
-            return 0
+        return risk_bands.band_score('temperature', temperature)
 
     def calculate_humidity_score(self, humidity: float) -> float:
         """Calcule le score de risque pour l'humidité"""
-        if humidity > 85 or humidity < 25:
-            return 10
-        elif humidity > 75 or humidity < 35:
-            return 8
-        elif humidity > 70 or humidity < 40:
-            return 4
-        else:
-            return 0
+        return risk_bands.band_score('humidity', humidity)
 
     def calculate_pollen_score(self, pollen_level: int) -> float:
         """Calcule le score de risque pour le pollen - RECALIBRÉ"""
-        if pollen_level >= 5:    # Pollen extrême
-            return 15
-        elif pollen_level >= 4:  # Pollen très élevé
-            return 12
-        elif pollen_level >= 3:  # Pollen élevé
-            return 8
-        elif pollen_level >= 2:  # Pollen modéré
-            return 4
-        else:
-            return 0
+        return risk_bands.band_score('pollen_level', pollen_level)
 
     def calculate_medication_score(self, medication_taken: bool) -> float:
         """Calcule le score de risque pour la prise de médicament"""
-        return 0 if medication_taken else 10
+        return risk_bands.band_score('medication_taken', medication_taken)
 
     def calculate_eco2_score(self, eco2: float) -> float:
         """
@@ -203,21 +341,7 @@ class RespiriaAIPredictor:
         - 2000-5000 ppm : Mauvais (somnolence, maux de tête)
         - > 5000 ppm : Dangereux
         """
-        # Scores recalibrés
-        if eco2 > 5000:      # Dangereux
-            return 25
-        elif eco2 > 2500:    # Très mauvais
-            return 18
-        elif eco2 > 2000:    # Mauvais
-            return 14
-        elif eco2 > 1500:    # Modéré-mauvais
-            return 10
-        elif eco2 > 1000:    # Modéré
-            return 6
-        elif eco2 > 800:     # Acceptable
-            return 3
-        else:                # Bon
-            return 0
+        return risk_bands.band_score('eco2', eco2)
 
     def calculate_tvoc_score(self, tvoc: float) -> float:
         """
@@ -231,25 +355,11 @@ class RespiriaAIPredictor:
         - 660-2200 ppb : Mauvais
         - > 2200 ppb : Dangereux
         """
-        # Scores recalibrés
-        if tvoc > 2200:      # Dangereux
-            return 22
-        elif tvoc > 1000:    # Très mauvais
-            return 16
-        elif tvoc > 660:     # Mauvais
-            return 12
-        elif tvoc > 400:     # Modéré-mauvais
-            return 8
-        elif tvoc > 220:     # Modéré
-            return 8
-        elif tvoc > 65:      # Acceptable
-            return 3
-        else:                # Excellent
-            return 0
+        return risk_bands.band_score('tvoc', tvoc)
 
     def calculate_smoke_score(self, smoke_detected: bool) -> float:
         """Calcule le score de risque pour la détection de fumée"""
-        return 70 if smoke_detected else 0  # PRIORITÉ ABSOLUE - Force HIGH
+        return risk_bands.band_score('smoke_detected', smoke_detected)
 
     def calculate_pm25_score(self, pm25: float) -> float:
         """
@@ -264,19 +374,7 @@ class RespiriaAIPredictor:
         - 150-250 : Très mauvais
         - > 250 : Dangereux
         """
-        # Scores recalibrés
-        if pm25 > 250:       # Dangereux
-            return 20
-        elif pm25 > 150:     # Très mauvais
-            return 15
-        elif pm25 > 55:      # Mauvais
-            return 12
-        elif pm25 > 35:      # Mauvais pour sensibles
-            return 8
-        elif pm25 > 12:      # Modéré
-            return 3
-        else:                # Bon
-            return 0
+        return risk_bands.band_score('pm25', pm25)
 
     def calculate_pm10_score(self, pm10: float) -> float:
         """
@@ -290,17 +388,7 @@ class RespiriaAIPredictor:
         - 254-354 : Mauvais
         - > 354 : Dangereux
         """
-        # Scores recalibrés
-        if pm10 > 354:       # Dangereux
-            return 15
-        elif pm10 > 254:     # Mauvais
-            return 12
-        elif pm10 > 154:     # Mauvais pour sensibles
-            return 8
-        elif pm10 > 54:      # Modéré
-            return 3
-        else:                # Bon
-            return 0
+        return risk_bands.band_score('pm10', pm10)
 
     def calculate_pressure_score(self, pressure: float) -> float:
         """
@@ -310,17 +398,7 @@ class RespiriaAIPredictor:
         Les changements brusques de pression peuvent déclencher des crises d'asthme
         Pression normale: 1013 hPa
         """
-        deviation = abs(pressure - 1013)
-        
-        # Scores recalibrés
-        if deviation > 30:       # Changement extrême
-            return 10
-        elif deviation > 20:     # Changement important
-            return 6
-        elif deviation > 10:     # Changement modéré
-            return 3
-        else:                    # Normal
-            return 0
+        return risk_bands.band_score('pressure', pressure)
 
     def calculate_wind_score(self, wind_speed: float) -> float:
         """
@@ -329,15 +407,7 @@ class RespiriaAIPredictor:
         
         Le vent fort peut disperser pollens et polluants
         """
-        # Scores recalibrés
-        if wind_speed > 50:      # Vent très fort (tempête)
-            return 10
-        elif wind_speed > 30:    # Vent fort
-            return 6
-        elif wind_speed > 20:    # Vent modéré-fort
-            return 3
-        else:                    # Vent faible
-            return 0
+        return risk_bands.band_score('wind_speed', wind_speed)
 
     def calculate_risk_factors(self, data: Dict) -> Tuple[float, List[RiskFactor]]:
         """
@@ -416,12 +486,17 @@ class RespiriaAIPredictor:
         if total_score == 0:
             return 0, []
         
+        return total_score, self._rank_risk_factors(scores.items(), total_score, values.__getitem__)
+
+    def _rank_risk_factors(self, scores: Iterable[Tuple[str, float]], total_score: float,
+                           value_of: Callable[[str], Any]) -> List[RiskFactor]:
+        """Top 5 des facteurs par contribution (score total > 0) ; value_of : valeur bornée du facteur"""
         # Création optimisée des facteurs de risque avec tri intégré
         risk_factors = []
         
         # Pré-calcul des contributions pour tri rapide
         factor_contributions = [(factor, score, (score / total_score) * 100) 
-                              for factor, score in scores.items() if score > 0]
+                              for factor, score in scores if score > 0]
         
         # Tri par contribution décroissante (plus efficace)
         factor_contributions.sort(key=lambda x: x[2], reverse=True)
@@ -438,418 +513,50 @@ class RespiriaAIPredictor:
                     status = "info"
                 
                 # Message optimisé
-                message = self._generate_factor_message_fast(factor, values[factor], status)
+                value = value_of(factor)
+                message = self._generate_factor_message_fast(factor, value, status)
                 
                 risk_factors.append(RiskFactor(
                     factor=factor,
-                    value=values[factor],
+                    value=value,
                     contribution_percent=round(contribution_percent, 1),
                     status=status,
                     message=message
                 ))
         
-        return total_score, risk_factors
+        return risk_factors
     
     def _generate_factor_message_fast(self, factor: str, value: Any, status: str) -> str:
         """Génère un message personnalisé RAPIDE pour chaque facteur"""
-        # Cache des messages pour performance
-        cache_key = f"{factor}_{status}_{int(value) if isinstance(value, (int, float)) else value}"
-        
-        if cache_key in self._score_cache:
-            return self._score_cache[cache_key]
-        
-        # Messages optimisés par facteur (lookup rapide)
-        message_templates = {
-            'spo2': {
-                'critical': f"🚨 SpO2 critique ({value}%) - URGENCE MÉDICALE",
-                'warning': f"⚠️ SpO2 préoccupant ({value}%) - Surveillance requise",
-                'info': f"💡 SpO2 à surveiller ({value}%)"
-            },
-            'respiratory_rate': {
-                'critical': f"💨 Détresse respiratoire ({value}/min) - CRITIQUE",
-                'warning': f"💨 Fréquence respiratoire élevée ({value}/min)",
-                'info': f"💨 Respiration légèrement rapide ({value}/min)"
-            },
-            'smoke_detected': {
-                'critical': "🚨 FUMÉE DÉTECTÉE - ÉVACUEZ IMMÉDIATEMENT",
-                'warning': "🚨 Fumée dans l'environnement",
-                'info': "🚨 Trace de fumée détectée"
-            }
-        }
-        
-        # Fallback vers méthode complète si pas dans templates
-        if factor in message_templates and status in message_templates[factor]:
-            message = message_templates[factor][status]
-        else:
-            message = self._generate_factor_message(factor, value, status)
-        
-        self._score_cache[cache_key] = message
+        # Clé sur la valeur exacte (et son type : 92 et 92.0 ne s'affichent pas pareil)
+        cache_key = (factor, status, value.__class__, value)
+        message = self._message_cache.get(cache_key)
+        if message is not None:
+            self.cache_stats["factor_message"][0] += 1
+            return message
+        self.cache_stats["factor_message"][1] += 1
+        
+        compiled = FAST_FACTOR_MESSAGE_TEMPLATES.get((factor, status))
+        message = _render_message(compiled, value) if compiled is not None else f"{factor}: {value}"
+        
+        # Cache borné : le plus ancien message est évincé
+        if len(self._message_cache) >= FACTOR_MESSAGE_CACHE_SIZE:
+            del self._message_cache[next(iter(self._message_cache))]
+        self._message_cache[cache_key] = message
         return message
 
     def _generate_factor_message(self, factor: str, value: Any, status: str) -> str:
         """Génère un message personnalisé pour chaque facteur"""
-        messages = {
-            'spo2': {
-                'critical': f"⚠️ SpO2 dangereusement bas ({value}%) - Principal facteur de risque",
-                'warning': f"⚠️ SpO2 préoccupant ({value}%) - Surveillance nécessaire",
-                'info': f"SpO2 légèrement bas ({value}%)"
-            },
-            'heart_rate': {
-                'critical': f"💓 Fréquence cardiaque très élevée ({value} bpm)",
-                'warning': f"💓 Fréquence cardiaque élevée ({value} bpm)",
-                'info': f"💓 Fréquence cardiaque modérée ({value} bpm)"
-            },
-            'respiratory_rate': {
-                'critical': f"💨 Fréquence respiratoire critique ({value}/min)",
-                'warning': f"💨 Fréquence respiratoire élevée ({value}/min)",
-                'info': f"💨 Fréquence respiratoire légèrement élevée ({value}/min)"
-            },
-            'aqi': {
-                'critical': f"🌫️ Qualité d'air dangereuse (AQI {value})",
-                'warning': f"🌫️ Qualité d'air très mauvaise (AQI {value})",
-                'info': f"🌫️ Qualité d'air modérée (AQI {value})"
-            },
-            'temperature': {
-                'critical': f"🌡️ Température extrême ({value}°C)",
-                'warning': f"🌡️ Température défavorable ({value}°C)",
-                'info': f"🌡️ Température sous-optimale ({value}°C)"
-            },
-            'humidity': {
-                'critical': f"💧 Humidité extrême ({value}%)",
-                'warning': f"💧 Humidité défavorable ({value}%)",
-                'info': f"💧 Humidité sous-optimale ({value}%)"
-            },
-            'pollen_level': {
-                'critical': f"🌸 Niveau de pollen très élevé ({value}/5)",
-                'warning': f"🌸 Niveau de pollen élevé ({value}/5)",
-                'info': f"🌸 Niveau de pollen modéré ({value}/5)"
-            },
-            'eco2': {
-                'critical': f"🏭 CO2 dangereux ({value} ppm) - Aérez immédiatement!",
-                'warning': f"🏭 CO2 élevé ({value} ppm) - Ventilation insuffisante",
-                'info': f"🏭 CO2 modéré ({value} ppm) - Pensez à aérer"
-            },
-            'tvoc': {
-                'critical': f"☠️ TVOC dangereux ({value} ppb) - Air pollué!",
-                'warning': f"☠️ TVOC élevé ({value} ppb) - Polluants détectés",
-                'info': f"☠️ TVOC modéré ({value} ppb)"
-            },
-            'medication_taken': {
-                'critical': "💊 Traitement préventif non pris - Risque accru",
-                'warning': "💊 Traitement préventif non pris",
-                'info': "💊 Pensez à votre traitement préventif"
-            },
-            'smoke_detected': {
-                'critical': "🚨 FUMÉE DÉTECTÉE - ÉVACUEZ IMMÉDIATEMENT",
-                'warning': "🚨 Fumée détectée dans l'environnement",
-                'info': "🚨 Trace de fumée détectée"
-            },
-            'pm25': {
-                'critical': f"🔴 PM2.5 dangereux ({value} µg/m³) - Particules fines!",
-                'warning': f"🟠 PM2.5 élevé ({value} µg/m³) - Air pollué",
-                'info': f"🟡 PM2.5 modéré ({value} µg/m³)"
-            },
-            'pm10': {
-                'critical': f"🔴 PM10 dangereux ({value} µg/m³) - Poussières!",
-                'warning': f"🟠 PM10 élevé ({value} µg/m³)",
-                'info': f"🟡 PM10 modéré ({value} µg/m³)"
-            },
-            'pressure': {
-                'critical': f"🌀 Pression atmosphérique extrême ({value} hPa)",
-                'warning': f"🌀 Changement de pression ({value} hPa)",
-                'info': f"🌀 Légère variation de pression ({value} hPa)"
-            },
-            'wind_speed': {
-                'critical': f"💨 Vent très fort ({value} km/h) - Tempête!",
-                'warning': f"💨 Vent fort ({value} km/h) - Pollens dispersés",
-                'info': f"💨 Vent modéré ({value} km/h)"
-            }
-        }
-        
-        return messages.get(factor, {}).get(status, f"{factor}: {value}")
+        compiled = FACTOR_MESSAGE_TEMPLATES.get((factor, status))
+        return _render_message(compiled, value) if compiled is not None else f"{factor}: {value}"
 
     def generate_recommendations(self, risk_score: float, data: Dict, profile_id: int) -> Dict[str, List[str]]:
-        """Génère les recommandations personnalisées - OPTIMISÉ"""
-        # Cache des recommandations pour performance
-        cache_key = f"rec_{int(risk_score)}_{profile_id}_{data.get('smoke_detected', False)}"
-        
-        if cache_key in self._recommendation_cache:
-            return self._recommendation_cache[cache_key]
-        
-        recommendations = {
-            "immediate": [],
-            "preventive": [],
-            "environmental": []
-        }
-        
-        # Extraction optimisée des valeurs critiques
-        spo2 = data.get('spo2', 96.0)
-        respiratory_rate = data.get('respiratory_rate', 16.0)
-        smoke_detected = data.get('smoke_detected', False)
-        aqi = data.get('aqi', 50.0)
-        temperature = data.get('temperature', 22.0)
-        pollen_level = data.get('pollen_level', 1)
-        humidity = data.get('humidity', 50.0)
-        medication_taken = data.get('medication_taken', True)
-        eco2 = data.get('eco2', 400)
-        tvoc = data.get('tvoc', 0)
-        
-        # ============================================
-        # RECOMMANDATIONS PERSONNALISÉES PAR PROFIL
-        # ============================================
-        
-        # Noms des profils pour les messages
-        profile_names = {
-            0: "personne en prévention",
-            1: "asthmatique stable",
-            2: "asthmatique sévère",
-            3: "personne en rémission"
-        }
-        profile_name = profile_names.get(profile_id, "utilisateur")
-        
-        # URGENCES - Différenciées par profil
-        if smoke_detected:
-            recommendations["immediate"].append("🚨 FUMÉE DÉTECTÉE - ÉVACUEZ LA ZONE IMMÉDIATEMENT")
-            if profile_id in [1, 2]:  # Asthmatiques
-                recommendations["immediate"].append("💨 Utilisez votre inhalateur de secours AVANT d'évacuer")
-            recommendations["immediate"].append("📞 Appelez les secours si nécessaire (18/112)")
-        
-        if spo2 < 85:
-            recommendations["immediate"].append("🚨 URGENCE CRITIQUE : SpO2 < 85% - Appelez le 15 IMMÉDIATEMENT")
-            recommendations["immediate"].append("🏥 Préparez-vous pour hospitalisation d'urgence")
-        elif spo2 < 88:
-            if profile_id == 2:  # Sévère
-                recommendations["immediate"].append("🚨 SpO2 < 88% : Utilisez votre inhalateur + appelez le 15")
-            elif profile_id == 1:  # Stable
-                recommendations["immediate"].append("🚨 SpO2 < 88% : Utilisez votre inhalateur immédiatement")
-                recommendations["immediate"].append("📞 Si aucune amélioration en 5 min, appelez le 15")
-            else:  # Prévention/Rémission
-                recommendations["immediate"].append("🚨 SpO2 anormalement bas - Consultez un médecin")
-        elif spo2 < 92:
-            if profile_id == 2:
-                recommendations["immediate"].append("⚠️ SpO2 bas pour asthme sévère - Surveillez de près")
-            elif profile_id == 1:
-                recommendations["immediate"].append("⚠️ SpO2 à surveiller - Gardez inhalateur à portée")
-        
-        if respiratory_rate > 35:
-            recommendations["immediate"].append("💨 Détresse respiratoire - Position assise + inhalateur")
-            if profile_id == 2:
-                recommendations["immediate"].append("🏥 Asthme sévère : appelez le 15 sans attendre")
-        elif respiratory_rate > 28:
-            if profile_id in [1, 2]:
-                recommendations["immediate"].append("💨 Respiration rapide - Utilisez votre inhalateur")
-            else:
-                recommendations["immediate"].append("💨 Respiration rapide - Asseyez-vous et calmez-vous")
-        
-        if risk_score > 85:
-            if profile_id == 2:
-                recommendations["immediate"].append("📞 Asthme sévère : contactez votre pneumologue")
-            elif profile_id == 1:
-                recommendations["immediate"].append("📞 Contactez votre médecin préventivement")
-            elif profile_id == 3:
-                recommendations["immediate"].append("⚠️ Rémission menacée : consultez rapidement")
-            else:
-                recommendations["immediate"].append("📞 Risque élevé : consultez un médecin")
-        
-        # RECOMMANDATIONS PRÉVENTIVES - Par profil
-        if not medication_taken:
-            if profile_id == 2:
-                recommendations["preventive"].append("💊 URGENT : Prenez votre traitement de fond immédiatement")
-                recommendations["preventive"].append("⚠️ Ne jamais sauter le traitement avec asthme sévère")
-            elif profile_id == 1:
-                recommendations["preventive"].append("💊 Prenez votre traitement préventif")
-            elif profile_id == 3:
-                recommendations["preventive"].append("💊 Reprenez votre traitement pour éviter une rechute")
-        
-        if 30 < risk_score < 70:
-            if profile_id == 0:  # Prévention
-                recommendations["preventive"].append("🧘 Conditions moyennes : évitez les efforts intenses")
-            elif profile_id == 1:  # Stable
-                recommendations["preventive"].append("🧘 Évitez les efforts, gardez votre inhalateur")
-                recommendations["preventive"].append("👀 Surveillez vos symptômes habituels")
-            elif profile_id == 2:  # Sévère
-                recommendations["preventive"].append("🛑 Restez au repos complet")
-                recommendations["preventive"].append("📱 Gardez votre téléphone à portée")
-                recommendations["preventive"].append("💊 Vérifiez que vous avez votre traitement d'urgence")
-            elif profile_id == 3:  # Rémission
-                recommendations["preventive"].append("🧘 Évitez les déclencheurs connus")
-                recommendations["preventive"].append("👀 Surveillez tout retour de symptômes")
-        
-        # RECOMMANDATIONS ENVIRONNEMENTALES - Personnalisées par profil
-        if aqi > 150:
-            if profile_id == 2:  # Sévère
-                recommendations["environmental"].append("🌫️ AQI DANGEREUX : NE SORTEZ PAS!")
-                recommendations["environmental"].append("💨 Purificateur d'air obligatoire")
-            elif profile_id == 1:  # Stable
-                recommendations["environmental"].append("🌫️ AQI dangereux : restez à l'intérieur")
-                recommendations["environmental"].append("💨 Utilisez un purificateur d'air")
-            else:
-                recommendations["environmental"].append("🌫️ Qualité d'air dégradée : limitez sorties")
-            recommendations["environmental"].append("🪟 Fermez toutes les fenêtres")
-        elif aqi > 100:
-            if profile_id in [1, 2]:
-                recommendations["environmental"].append("🌫️ AQI modéré : évitez efforts extérieurs")
-            
-        if temperature < 10:
-            if profile_id in [1, 2]:  # Asthmatiques
-                recommendations["environmental"].append("❄️ Froid = risque bronchospasme : restez au chaud")
-                recommendations["environmental"].append("🧣 Couvrez nez et bouche impérativement")
-            else:
-                recommendations["environmental"].append("❄️ Froid : protégez vos voies respiratoires")
-            
-        if temperature > 32:
-            recommendations["environmental"].append("🌡️ Forte chaleur : restez au frais")
-            if profile_id == 2:
-                recommendations["environmental"].append("🆘 Chaleur + asthme sévère : risque déshydratation")
-            recommendations["environmental"].append("💧 Hydratez-vous régulièrement")
-            
-        if pollen_level >= 4:
-            if profile_id in [1, 2]:  # Asthmatiques
-                recommendations["environmental"].append("🌸 ALERTE POLLEN : Évitez absolument l'extérieur")
-                recommendations["environmental"].append("💊 Prenez un antihistaminique")
-            elif profile_id == 3:  # Rémission
-                recommendations["environmental"].append("🌸 Pollen élevé : attention aux rechutes")
-            else:
-                recommendations["environmental"].append("🌸 Niveau de pollen élevé")
-            recommendations["environmental"].append("🪟 Gardez les fenêtres fermées")
-        elif pollen_level >= 3:
-            if profile_id in [1, 2]:
-                recommendations["environmental"].append("🌸 Pollen modéré : soyez vigilant")
-            
-        if humidity > 80:
-            recommendations["environmental"].append("💧 Humidité excessive : risque moisissures")
-            if profile_id in [1, 2]:
-                recommendations["environmental"].append("🌀 Déshumidificateur fortement conseillé")
-        
-        # RECOMMANDATIONS ECO2 (CO2 du capteur CJMCU-811)
-        if eco2 > 2000:
-            recommendations["environmental"].append("🏭 CO2 dangereux : aérez immédiatement!")
-            recommendations["environmental"].append("🪟 Ouvrez les fenêtres en grand")
-            if profile_id == 2:
-                recommendations["environmental"].append("🚪 Asthme sévère : quittez la pièce")
-        elif eco2 > 1500:
-            recommendations["environmental"].append("🏭 CO2 élevé : ventilation insuffisante")
-            recommendations["environmental"].append("🪟 Ouvrez les fenêtres")
-        elif eco2 > 1000:
-            if profile_id in [1, 2]:
-                recommendations["environmental"].append("🏭 CO2 modéré : pensez à aérer")
-        
-        # RECOMMANDATIONS TVOC (polluants du capteur CJMCU-811)
-        if tvoc > 660:
-            recommendations["environmental"].append("☠️ TVOC dangereux : air pollué!")
-            if profile_id in [1, 2]:
-                recommendations["environmental"].append("🏃 Quittez la pièce immédiatement")
-            else:
-                recommendations["environmental"].append("🪟 Aérez abondamment")
-        elif tvoc > 220:
-            if profile_id in [1, 2]:
-                recommendations["environmental"].append("☠️ TVOC détecté : améliorez la ventilation")
-        
-        # RECOMMANDATIONS PM2.5 (particules fines - API Air Quality)
-        pm25 = data.get('pm25', 0)
-        if pm25 > 55:
-            if profile_id == 2:
-                recommendations["environmental"].append("🔴 PM2.5 DANGEREUX : NE SORTEZ PAS!")
-                recommendations["environmental"].append("😷 Masque FFP2 même à l'intérieur")
-            elif profile_id == 1:
-                recommendations["environmental"].append("🔴 PM2.5 dangereux : masque FFP2 obligatoire")
-            else:
-                recommendations["environmental"].append("🔴 PM2.5 dangereux : portez un masque")
-            recommendations["environmental"].append("🏠 Restez à l'intérieur")
-        elif pm25 > 35:
-            if profile_id in [1, 2]:
-                recommendations["environmental"].append("🟠 PM2.5 élevé : évitez l'extérieur")
-                recommendations["environmental"].append("😷 Masque recommandé si sortie")
-            else:
-                recommendations["environmental"].append("🟠 PM2.5 élevé : limitez efforts extérieurs")
-        elif pm25 > 12:
-            if profile_id == 2:
-                recommendations["environmental"].append("🟡 PM2.5 modéré : soyez vigilant")
-        
-        # RECOMMANDATIONS PM10 (grosses particules - API Air Quality)
-        pm10 = data.get('pm10', 0)
-        if pm10 > 100:
-            if profile_id in [1, 2]:
-                recommendations["environmental"].append("🔴 PM10 dangereux : restez à l'intérieur!")
-            else:
-                recommendations["environmental"].append("🔴 PM10 élevé : évitez les sorties")
-        elif pm10 > 50:
-            if profile_id in [1, 2]:
-                recommendations["environmental"].append("🟠 PM10 élevé : attention aux poussières")
-        
-        # RECOMMANDATIONS PRESSION ATMOSPHÉRIQUE (API Weather)
-        pressure = data.get('pressure', 1013)
-        if pressure < 990 or pressure > 1030:
-            if profile_id in [1, 2]:  # Asthmatiques sensibles aux changements de pression
-                recommendations["environmental"].append(f"🌀 Pression atypique ({pressure} hPa) : migraines/gêne possible")
-                if pressure < 990:
-                    recommendations["environmental"].append("⛈️ Dépression atmosphérique : restez vigilant")
-            if pressure > 1030:
-                recommendations["environmental"].append("☀️ Anticyclone : air stagnant possible")
-        
-        # RECOMMANDATIONS VENT (API Weather)
-        wind_speed = data.get('wind_speed', 0)
-        if wind_speed > 40:
-            recommendations["environmental"].append("💨 Vent très fort : restez à l'abri!")
-            if profile_id in [1, 2] and pollen_level >= 2:
-                recommendations["environmental"].append("🌸 Alerte : pollens dispersés intensément")
-        elif wind_speed > 20:
-            if profile_id in [1, 2] and pollen_level >= 2:
-                recommendations["environmental"].append("💨 Vent modéré + pollen : portez un masque")
-        
-        return recommendations
+        """Génère les recommandations personnalisées (table de décision, api/recommendation_rules.py)"""
+        return RULE_TABLE.evaluate(data, risk_score, profile_id)
 
     def get_profile_context(self, profile_id: int, risk_level: str) -> Dict:
-        """Génère le contexte personnalisé par profil"""
-        profile = self.PROFILES[profile_id]
-        
-        # Messages par profil et niveau de risque
-        messages_matrix = {
-            0: {  # Prévention
-                "low": "✅ Conditions favorables pour vos activités",
-                "medium": "⚠️ Personne saine : conditions moins favorables aujourd'hui", 
-                "high": "🛡️ Attention : exposition à des conditions qui pourraient déclencher des symptômes respiratoires"
-            },
-            1: {  # Asthmatique stable
-                "low": "✅ Votre asthme est bien contrôlé, conditions favorables",
-                "medium": "⚠️ Vigilance : certains déclencheurs sont présents",
-                "high": "🚨 ALERTE : Risque élevé de crise - Soyez très prudent"
-            },
-            2: {  # Asthmatique sévère
-                "low": "✅ Conditions acceptables - Restez vigilant",
-                "medium": "⚠️ ATTENTION : Asthme sévère détecté, risque modéré",
-                "high": "🆘 DANGER ÉLEVÉ : Contactez votre médecin préventivement"
-            },
-            3: {  # Rémission
-                "low": "✅ Rémission stable, continuez ainsi",
-                "medium": "⚠️ Attention : conditions pouvant favoriser une rechute",
-                "high": "🚨 ALERTE RECHUTE : Consultez rapidement votre médecin"
-            }
-        }
-        
-        # Conseils spécifiques par profil
-        specific_advice = {
-            0: "Limitez vos activités extérieures si conditions défavorables",
-            1: "Soyez vigilant et ayez votre inhalateur à portée de main",
-            2: "ATTENTION : Les conditions actuelles sont particulièrement dangereuses pour vous",
-            3: "Attention : risque de rechute détecté, soyez prudent"
-        }
-        
-        # Niveau d'alerte
-        alert_levels = {
-            "low": "minimal",
-            "medium": "modéré", 
-            "high": "maximum" if profile_id == 2 else "élevé"
-        }
-        
-        return {
-            "profile_id": profile_id,
-            "name": profile["name"],
-            "baseline_risk": profile["baseline_risk"],
-            "message": messages_matrix[profile_id][risk_level],
-            "specific_advice": specific_advice[profile_id],
-            "alert_level": alert_levels[risk_level]
-        }
+        """Génère le contexte personnalisé par profil (recherche dans le registre précalculé)"""
+        return dict(self._profile_contexts[(risk_level, profile_id)])
 
     def should_notify(self, risk_score: float, data: Dict, profile_id: int) -> bool:
         """Détermine si une notification mobile doit être envoyée - CALIBRÉ 75-80% PRÉCISION"""
@@ -897,7 +604,7 @@ class RespiriaAIPredictor:
         Returns:
             Dictionnaire JSON conforme aux spécifications
         """
-        start_time = time.time()
+        start_ns = perf_counter_ns()
         
         try:
             # Validation rapide des données critiques
@@ -909,9 +616,6 @@ class RespiriaAIPredictor:
             if profile_id not in self.PROFILES:
                 raise ValueError(f"Profil utilisateur invalide: {profile_id}")
             
-            # Cache de prédiction pour données similaires (optionnel)
-            data_hash = str(hash(str(sorted(data.items()))))
-            
             # Calcul du score de risque et des facteurs - OPTIMISÉ
             total_score, risk_factors = self.calculate_risk_factors(data)
             
@@ -931,21 +635,35 @@ class RespiriaAIPredictor:
                 risk_level = "medium"
             else:
                 risk_level = "high"
+            scoring_ns = perf_counter_ns()
             
             # Calcul de la confiance (amélioré)
             confidence = self._calculate_confidence_fast(data, risk_factors, final_score)
+            confidence_ns = perf_counter_ns()
             
-            # Génération des recommandations (avec cache)
+            # Génération des recommandations
             recommendations = self.generate_recommendations(final_score, data, profile_id)
+            recommendations_ns = perf_counter_ns()
             
             # Contexte du profil (optimisé)
             profile_context = self.get_profile_context(profile_id, risk_level)
             
             # Notification (logique optimisée)
             should_notify = self.should_notify(final_score, data, profile_id)
+            end_ns = perf_counter_ns()
             
-            # Temps de traitement
-            prediction_time_ms = int((time.time() - start_time) * 1000)
+            # Temps de traitement par étape (ns → ms, précision µs)
+            stages_ns = {
+                "scoring": scoring_ns - start_ns,
+                "confidence": confidence_ns - scoring_ns,
+                "recommendations": recommendations_ns - confidence_ns,
+                "context": end_ns - recommendations_ns,
+            }
+            timer = current_timer()
+            if timer is not None:
+                for name, duration_ns in stages_ns.items():
+                    timer.add(name, duration_ns)
+            prediction_time_ms = round((end_ns - start_ns) / 1e6, 3)
             
             # Construction de la réponse JSON optimisée
             response = {
@@ -956,16 +674,7 @@ class RespiriaAIPredictor:
                     "confidence": round(confidence, 3),  # Plus de précision
                     "should_notify": should_notify
                 },
-                "risk_factors": [
-                    {
-                        "factor": rf.factor,
-                        "value": rf.value,
-                        "contribution_percent": rf.contribution_percent,
-                        "status": rf.status,
-                        "message": rf.message
-                    }
-                    for rf in risk_factors
-                ],
+                "risk_factors": [rf.to_json() for rf in risk_factors],
                 "recommendations": recommendations,
                 "profile_context": profile_context,
                 "metadata": {
@@ -973,11 +682,12 @@ class RespiriaAIPredictor:
                     "version": "2.1", 
                     "calibration": "75-80% Medical Precision",
                     "prediction_time_ms": prediction_time_ms,
+                    "stages_ms": {name: round(ns / 1e6, 3) for name, ns in stages_ns.items()},
                     "timestamp": datetime.now().isoformat(),
                     "performance": {
                         "factors_analyzed": len(risk_factors),
                         "recommendations_generated": sum(len(r) for r in recommendations.values()),
-                        "cache_hits": len(self._score_cache)
+                        "cache_hits": len(self._score_cache) + len(self._message_cache)
                     }
                 }
             }
@@ -989,9 +699,134 @@ class RespiriaAIPredictor:
                 "success": False,
                 "error": str(e),
                 "timestamp": datetime.now().isoformat(),
-                "prediction_time_ms": int((time.time() - start_time) * 1000)
+                "prediction_time_ms": round((perf_counter_ns() - start_ns) / 1e6, 3)
             }
 
+    def predict_batch(self, records: Sequence[Dict]) -> List[Dict]:
+        """
+        Prédiction d'un lot de lectures : même résultat que predict() par ligne
+        
+        Scores, niveaux, notifications (api/vector_scoring.py) et
+        recommandations (RULE_TABLE.evaluate_batch) sont calculés par colonnes ;
+        seuls le classement des facteurs et la confiance restent par ligne.
+        Les lignes invalides (profil inconnu, entrée non scalaire ou non finie)
+        passent seules par predict() (réponse d'erreur).
+        """
+        np = vector_scoring.np
+        start_ns = perf_counter_ns()
+        
+        positions = [i for i, record in enumerate(records) if self._vectorizable(record)]
+        rows = [records[i] for i in positions]
+        columns = vector_scoring.read_columns(rows) if rows else None
+        if columns is None:
+            return [self.predict(record) for record in records]
+        
+        # Scores et niveaux (vectorisés)
+        profile_ids = [row.get('profile_id', 1) for row in rows]
+        score_matrix, final_scores = self.batch_scores(columns, np.asarray(profile_ids))
+        risk_levels = vector_scoring.risk_levels(
+            final_scores, columns['smoke_detected'], self.RISK_THRESHOLDS).tolist()
+        
+        # Facteurs de risque (classement par ligne)
+        risk_factors_rows = []
+        for row, scores in zip(rows, score_matrix.tolist()):
+            total_score = sum(scores)
+            if total_score == 0:
+                risk_factors_rows.append([])
+                continue
+            risk_factors_rows.append(self._rank_risk_factors(
+                zip(vector_scoring.SCORE_FACTORS, scores), total_score,
+                lambda factor, row=row: vector_scoring.clip_value(
+                    factor, row.get(factor, vector_scoring.INPUTS[factor][0]))))
+        final_list = final_scores.tolist()
+        scoring_ns = perf_counter_ns()
+        
+        confidences = [self._calculate_confidence_fast(row, risk_factors, final_score)
+                       for row, risk_factors, final_score in zip(rows, risk_factors_rows, final_list)]
+        confidence_ns = perf_counter_ns()
+        
+        rule_columns = {factor: [row.get(factor, default) for row in rows]
+                        for factor, (default, _) in RULE_FACTORS.items() if factor != "risk_score"}
+        recommendations_rows = RULE_TABLE.evaluate_batch(rule_columns, final_list, profile_ids)
+        recommendations_ns = perf_counter_ns()
+        
+        notify = vector_scoring.should_notify(columns, final_scores, np.asarray(profile_ids, dtype=float)).tolist()
+        end_ns = perf_counter_ns()
+        
+        # Temps par étape du lot ; chaque réponse porte sa part moyenne
+        stages_ns = {
+            "scoring": scoring_ns - start_ns,
+            "confidence": confidence_ns - scoring_ns,
+            "recommendations": recommendations_ns - confidence_ns,
+            "context": end_ns - recommendations_ns,
+        }
+        timer = current_timer()
+        if timer is not None:
+            for name, duration_ns in stages_ns.items():
+                timer.add(name, duration_ns)
+        size = len(rows)
+        prediction_time_ms = round((end_ns - start_ns) / 1e6 / size, 3)
+        stages_ms = {name: round(ns / 1e6 / size, 3) for name, ns in stages_ns.items()}
+        timestamp = datetime.now().isoformat()
+        cache_hits = len(self._score_cache) + len(self._message_cache)
+        
+        results: List[Any] = [None] * len(records)
+        for i, profile_id, final_score, risk_level, confidence, should_notify, risk_factors, recommendations in zip(
+                positions, profile_ids, final_list, risk_levels, confidences, notify,
+                risk_factors_rows, recommendations_rows):
+            results[i] = {
+                "success": True,
+                "prediction": {
+                    "risk_score": round(final_score, 1),
+                    "risk_level": risk_level,
+                    "confidence": round(confidence, 3),
+                    "should_notify": should_notify
+                },
+                "risk_factors": [rf.to_json() for rf in risk_factors],
+                "recommendations": recommendations,
+                "profile_context": self.get_profile_context(profile_id, risk_level),
+                "metadata": {
+                    "model": "RESPIRIA-AI-Calibrated",
+                    "version": "2.1",
+                    "calibration": "75-80% Medical Precision",
+                    "prediction_time_ms": prediction_time_ms,
+                    "stages_ms": dict(stages_ms),
+                    "timestamp": timestamp,
+                    "batch_size": size,
+                    "performance": {
+                        "factors_analyzed": len(risk_factors),
+                        "recommendations_generated": sum(len(r) for r in recommendations.values()),
+                        "cache_hits": cache_hits
+                    }
+                }
+            }
+        
+        # Lignes invalides : réponse d'erreur de predict()
+        for i, record in enumerate(records):
+            if results[i] is None:
+                results[i] = self.predict(record)
+        return results
+
+    def _vectorizable(self, record) -> bool:
+        """Ligne évaluable par colonnes : dict, profil connu (entier), entrées scalaires finies"""
+        if not isinstance(record, dict):
+            return False
+        profile_id = record.get('profile_id', 1)
+        return (isinstance(profile_id, int) and profile_id in self.PROFILES
+                and vector_scoring.is_scalar_row(record))
+    
+    def batch_scores(self, columns: Dict[str, Any], profile_ids: Any) -> Tuple[Any, Any]:
+        """
+        (matrice des scores par facteur, scores finaux) d'un lot en colonnes
+        (vector_scoring.read_columns) ; profile_ids : tableau de profils valides
+        """
+        np = vector_scoring.np
+        multipliers = np.zeros(len(profile_ids))
+        for profile_id, profile in self.PROFILES.items():
+            multipliers[profile_ids == profile_id] = profile["multiplier"]
+        score_matrix = vector_scoring.factor_scores(columns)
+        return score_matrix, np.minimum(100.0, score_matrix.sum(axis=1) * multipliers)
+
     def _calculate_confidence_fast(self, data: Dict, risk_factors: List[RiskFactor], final_score: float) -> float:
         """Calcule la confiance de la prédiction - VERSION OPTIMISÉE"""
         # Base de confiance améliorée
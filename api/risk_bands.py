@@ -0,0 +1,120 @@
+# api/risk_bands.py
+"""
+Barèmes de risque par facteur - RESPIRIA AI
+
+Source unique des seuils : RespiriaAIPredictor.calculate_*_score (une
+valeur) et vector_scoring.factor_scores (une colonne numpy) lisent la même
+table. Les comparaisons (operator.lt, gt, ge) s'appliquent aussi bien à un
+nombre qu'à un tableau numpy.
+"""
+
+from operator import ge, gt, lt
+from typing import Mapping, Tuple
+
+# {facteur: paliers (score, ((comparaison, seuil), ...))}, valeur déjà bornée.
+# Paliers testés dans l'ordre : le premier vérifié donne le score, ses
+# conditions sont combinées par « ou ». Aucun palier vérifié : 0.
+SCORE_BANDS: Mapping[str, Tuple] = {
+    'spo2': (                               # SpO2 < 88 = urgence médicale, doit être HIGH
+        (50, ((lt, 85),)),                  # Critique extrême
+        (40, ((lt, 88),)),                  # Critique
+        (30, ((lt, 90),)),                  # Sévère
+        (18, ((lt, 92),)),                  # Modéré
+        (10, ((lt, 94),)),                  # Léger
+        (5, ((lt, 96),)),                   # Surveillance
+    ),
+    'heart_rate': (
+        (18, ((gt, 140),)),                 # Tachycardie sévère
+        (14, ((gt, 120),)),                 # Tachycardie modérée
+        (8, ((gt, 100),)),                  # Tachycardie légère
+        (4, ((gt, 90),)),                   # Élevé
+        (12, ((lt, 50),)),                  # Bradycardie
+    ),
+    'respiratory_rate': (
+        (25, ((gt, 35),)),                  # Détresse respiratoire sévère
+        (18, ((gt, 30),)),                  # Détresse respiratoire
+        (12, ((gt, 25),)),                  # Tachypnée modérée
+        (6, ((gt, 22),)),                   # Tachypnée légère
+        (20, ((lt, 10),)),                  # Bradypnée (dangereux)
+    ),
+    'temperature': (
+        (15, ((lt, 5), (gt, 35))),
+        (10, ((lt, 10), (gt, 32))),
+        (5, ((lt, 15), (gt, 28))),
+    ),
+    'humidity': (
+        (10, ((gt, 85), (lt, 25))),
+        (8, ((gt, 75), (lt, 35))),
+        (4, ((gt, 70), (lt, 40))),
+    ),
+    'eco2': (                               # ppm, capteur CJMCU-811
+        (25, ((gt, 5000),)),                # Dangereux
+        (18, ((gt, 2500),)),                # Très mauvais
+        (14, ((gt, 2000),)),                # Mauvais
+        (10, ((gt, 1500),)),                # Modéré-mauvais
+        (6, ((gt, 1000),)),                 # Modéré
+        (3, ((gt, 800),)),                  # Acceptable
+    ),
+    'tvoc': (                               # ppb, capteur CJMCU-811
+        (22, ((gt, 2200),)),                # Dangereux
+        (16, ((gt, 1000),)),                # Très mauvais
+        (12, ((gt, 660),)),                 # Mauvais
+        (8, ((gt, 220),)),                  # Modéré
+        (3, ((gt, 65),)),                   # Acceptable
+    ),
+    'aqi': (                                # Seuils multiples de 10 (cache par tranche)
+        (25, ((gt, 350),)),                 # Extrêmement dangereux
+        (20, ((gt, 300),)),                 # Dangereux
+        (16, ((gt, 200),)),                 # Très mauvais
+        (12, ((gt, 150),)),                 # Mauvais
+        (8, ((gt, 100),)),                  # Modéré pour sensibles
+        (4, ((gt, 50),)),                   # Modéré
+    ),
+    'pm25': (                               # µg/m³
+        (20, ((gt, 250),)),                 # Dangereux
+        (15, ((gt, 150),)),                 # Très mauvais
+        (12, ((gt, 55),)),                  # Mauvais
+        (8, ((gt, 35),)),                   # Mauvais pour sensibles
+        (3, ((gt, 12),)),                   # Modéré
+    ),
+    'pm10': (                               # µg/m³
+        (15, ((gt, 354),)),                 # Dangereux
+        (12, ((gt, 254),)),                 # Mauvais
+        (8, ((gt, 154),)),                  # Mauvais pour sensibles
+        (3, ((gt, 54),)),                   # Modéré
+    ),
+    'pollen_level': (
+        (15, ((ge, 5),)),                   # Pollen extrême
+        (12, ((ge, 4),)),                   # Pollen très élevé
+        (8, ((ge, 3),)),                    # Pollen élevé
+        (4, ((ge, 2),)),                    # Pollen modéré
+    ),
+    'pressure': (                           # Écart à 1013 hPa (> 30, > 20, > 10)
+        (10, ((lt, 983), (gt, 1043))),      # Changement extrême
+        (6, ((lt, 993), (gt, 1033))),       # Changement important
+        (3, ((lt, 1003), (gt, 1023))),      # Changement modéré
+    ),
+    'wind_speed': (                         # km/h
+        (10, ((gt, 50),)),                  # Tempête
+        (6, ((gt, 30),)),                   # Vent fort
+        (3, ((gt, 20),)),                   # Vent modéré-fort
+    ),
+}
+
+# {facteur booléen: (score si vrai, score si faux)}
+FLAG_SCORES: Mapping[str, Tuple[int, int]] = {
+    'medication_taken': (0, 10),
+    'smoke_detected': (70, 0),              # PRIORITÉ ABSOLUE - Force HIGH
+}
+
+
+def band_score(factor: str, value) -> int:
+    """Score d'une valeur (déjà bornée) selon le barème du facteur"""
+    flag = FLAG_SCORES.get(factor)
+    if flag is not None:
+        return flag[0] if value else flag[1]
+    for score, conditions in SCORE_BANDS[factor]:
+        for compare, threshold in conditions:
+            if compare(value, threshold):
+                return score
+    return 0
@@ -0,0 +1,114 @@
+# api/risk_state.py
+"""
+Niveau de risque stabilisé par utilisateur (hystérésis + durées minimales)
+
+predict() classe le score instantané contre RISK_THRESHOLDS (30 / 60) : un
+score qui oscille autour d'une borne fait clignoter le niveau dans l'appli
+et les notifications. RiskStateStore garde, par utilisateur, un niveau
+stable :
+
+- montée (niveau instantané plus élevé, fumée comprise) : appliquée dès que
+  le niveau instantané s'est maintenu RISK_DWELL_UP_S secondes (0 : immédiat)
+- descente : après au moins RISK_DWELL_DOWN_S secondes dans le niveau
+  courant, vers le niveau dont la borne inférieure moins RISK_EXIT_MARGIN
+  points dépasse le score (pas de descente tant que le score reste dans
+  la marge)
+
+État compact (une petite liste par utilisateur), mis à jour en O(1) par
+échantillon ; les utilisateurs sans échantillon depuis RISK_IDLE_S secondes
+sont oubliés (parcours depuis le plus ancien, amorti), au plus MAX_USERS.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Mapping, Optional
+
+RISK_STATE_ENABLED = os.environ.get("RESPIRIA_RISK_STATE", "False").lower() == "true"
+RISK_EXIT_MARGIN = float(os.environ.get("RESPIRIA_RISK_EXIT_MARGIN", "5"))
+RISK_DWELL_UP_S = float(os.environ.get("RESPIRIA_RISK_DWELL_UP_S", "0"))
+RISK_DWELL_DOWN_S = float(os.environ.get("RESPIRIA_RISK_DWELL_DOWN_S", "60"))
+RISK_IDLE_S = float(os.environ.get("RESPIRIA_RISK_IDLE_S", "3600"))
+MAX_USERS = 100000
+
+LEVELS = ("low", "medium", "high")
+DEFAULT_THRESHOLDS = {"low": 30, "medium": 60, "high": 100}
+
+# Indices de l'état [niveau, depuis, candidat, candidat depuis, dernier échantillon]
+_LEVEL, _SINCE, _CANDIDATE, _CANDIDATE_SINCE, _SEEN = range(5)
+
+
+class RiskStateStore:
+    """Niveaux stables par utilisateur ; thread-safe, utilisateurs inactifs oubliés"""
+
+    def __init__(self, thresholds: Mapping[str, float] = DEFAULT_THRESHOLDS, exit_margin: float = RISK_EXIT_MARGIN,
+                 dwell_up: float = RISK_DWELL_UP_S, dwell_down: float = RISK_DWELL_DOWN_S,
+                 idle: float = RISK_IDLE_S, max_users: int = MAX_USERS,
+                 clock: Callable[[], float] = time.monotonic):
+        # Seuil de sortie vers le bas de chaque niveau (medium, high)
+        self.exit_scores = (None, thresholds["low"] - exit_margin, thresholds["medium"] - exit_margin)
+        self.dwell_up = dwell_up
+        self.dwell_down = dwell_down
+        self.idle = idle
+        self.max_users = max(1, max_users)
+        self._clock = clock
+        self._states: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, user_id: str, risk_score: float, risk_level: str, now: Optional[float] = None) -> str:
+        """Niveau stable (low, medium, high) après l'échantillon (score, niveau instantané)"""
+        now = self._clock() if now is None else now
+        instant = LEVELS.index(risk_level.lower())
+        with self._lock:
+            state = self._states.get(user_id)
+            if state is None:
+                self._evict(now)
+                self._states[user_id] = [instant, now, instant, now, now]
+                return LEVELS[instant]
+            self._states.move_to_end(user_id)
+            state[_SEEN] = now
+            level = state[_LEVEL]
+            if instant != state[_CANDIDATE]:
+                state[_CANDIDATE], state[_CANDIDATE_SINCE] = instant, now
+            if instant > level:
+                if now - state[_CANDIDATE_SINCE] >= self.dwell_up:
+                    state[_LEVEL], state[_SINCE] = instant, now
+            elif instant < level and now - state[_SINCE] >= self.dwell_down:
+                # Niveau le plus bas dont la marge de sortie est franchie
+                target = instant
+                while target < level and risk_score >= self.exit_scores[target + 1]:
+                    target += 1
+                if target < level:
+                    state[_LEVEL], state[_SINCE] = target, now
+            return LEVELS[state[_LEVEL]]
+
+    def _evict(self, now: float):
+        # Appelé sous verrou, à l'arrivée d'un nouvel utilisateur
+        states = self._states
+        while states and (len(states) >= self.max_users or now - next(iter(states.values()))[_SEEN] > self.idle):
+            states.popitem(last=False)
+
+    def level(self, user_id: str) -> Optional[str]:
+        with self._lock:
+            state = self._states.get(user_id)
+            return LEVELS[state[_LEVEL]] if state is not None else None
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+_store: Optional[RiskStateStore] = None
+_store_lock = threading.Lock()
+
+
+def get_risk_states(thresholds: Mapping[str, float] = DEFAULT_THRESHOLDS) -> Optional[RiskStateStore]:
+    """Instance du processus, ou None si la stabilisation est désactivée"""
+    global _store
+    if not RISK_STATE_ENABLED:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = RiskStateStore(thresholds)
+    return _store
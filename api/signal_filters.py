@@ -0,0 +1,251 @@
+# api/signal_filters.py
+"""
+Débruitage en flux des lectures capteurs, par device, avant notation
+
+Le bracelet (MAX30102, DHT11, CJMCU-811) n'expose que la dernière valeur de
+chaque variable : un seul échantillon aberrant suffit à faire basculer le
+risque (et à déclencher une notification). Chaque signal d'un device passe
+par :
+
+1. porte de plausibilité (SIGNALS) : valeur physiquement impossible
+   (SpO2 à 0 = doigt absent...) → ignorée, dernière valeur filtrée conservée
+2. aggravation (SpO2 en baisse, fréquences cardiaque / respiratoire en
+   hausse) : transmise telle quelle, jamais retenue ni lissée
+3. rejet des pics : écart à la médiane des SIGNAL_WINDOW derniers
+   échantillons > max(saut minimal, MAD_FACTOR × MAD) → ignoré ;
+   CONFIRM_SAMPLES écarts consécutifs du même côté = vrai changement,
+   la fenêtre repart de ces échantillons (pas de retard supplémentaire)
+4. moyenne exponentielle (SIGNAL_EMA_ALPHA) de la médiane
+
+Désactivé par défaut (RESPIRIA_SIGNAL_FILTER=true pour l'activer). Les
+filtres n'avancent que sur un nouvel échantillon : une lecture dont
+l'horodatage n'a pas avancé (même valeur relue par un autre client) reçoit
+les valeurs filtrées courantes, sans effet sur l'état.
+
+Coût O(1) par échantillon (fenêtres de taille fixe). La détection de fumée
+n'est jamais filtrée. Un device muet plus de RESET_AFTER_S secondes repart
+de zéro ; au plus MAX_DEVICES devices suivis (les moins récents sont oubliés).
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Callable, Dict, Mapping, NamedTuple, Optional, Tuple
+
+try:
+    from . import metrics
+except ImportError:
+    import metrics
+
+SIGNAL_FILTERS_ENABLED = os.environ.get("RESPIRIA_SIGNAL_FILTER", "False").lower() == "true"
+SIGNAL_WINDOW = int(os.environ.get("RESPIRIA_SIGNAL_WINDOW", "5"))
+SIGNAL_EMA_ALPHA = float(os.environ.get("RESPIRIA_SIGNAL_EMA_ALPHA", "0.5"))
+CONFIRM_SAMPLES = 3
+MAD_FACTOR = 4 * 1.4826  # 4 écarts-types équivalents
+RESET_AFTER_S = 600.0
+MAX_DEVICES = 10000
+
+
+class SignalSpec(NamedTuple):
+    low: float
+    high: float
+    min_jump: float
+    danger: int = 0   # sens d'aggravation clinique (-1 : baisse, 1 : hausse, 0 : aucun)
+
+
+# Bornes plausibles, saut minimal considéré comme un pic et sens d'aggravation, par signal
+SIGNALS: Mapping[str, SignalSpec] = {
+    "spo2": SignalSpec(50.0, 100.0, 3.0, -1),
+    "heart_rate": SignalSpec(30.0, 220.0, 15.0, 1),
+    "respiratory_rate": SignalSpec(4.0, 60.0, 6.0, 1),
+    "temperature": SignalSpec(-20.0, 60.0, 3.0),
+    "humidity": SignalSpec(0.0, 100.0, 10.0),
+    "eco2": SignalSpec(400.0, 10000.0, 300.0),
+    "tvoc": SignalSpec(0.0, 5000.0, 150.0),
+}
+
+# Clés des lectures (get_ubidots_direct / _sensors / _latest) → signal
+READING_KEYS = {
+    "spo2": "spo2",
+    "heart_rate": "heart_rate",
+    "respiratory_rate": "respiratory_rate",
+    "temperature_sensor": "temperature",
+    "temperature": "temperature",
+    "humidity_sensor": "humidity",
+    "humidity": "humidity",
+    "eco2_ppm": "eco2",
+    "eco2": "eco2",
+    "tvoc_ppb": "tvoc",
+    "tvoc": "tvoc",
+}
+
+metrics.registry.describe("respiria_signal_samples_total", "counter",
+                          "Échantillons capteurs filtrés (ok, worsening, outlier, implausible, step, repeat)")
+
+
+def _sample_time(reading: Mapping) -> Optional[float]:
+    """Horodatage de l'échantillon (epoch, ISO 8601), None si absent ou illisible"""
+    value = reading.get("timestamp")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _median(values) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+class SignalFilter:
+    """Plausibilité → rejet des pics (médiane/MAD) → EMA, pour un signal"""
+
+    __slots__ = ("spec", "alpha", "window", "pending", "side", "value")
+
+    def __init__(self, spec: SignalSpec, window: int = SIGNAL_WINDOW, alpha: float = SIGNAL_EMA_ALPHA):
+        self.spec = spec
+        self.alpha = alpha
+        self.window: deque = deque(maxlen=max(1, window))
+        self.pending: deque = deque(maxlen=CONFIRM_SAMPLES)
+        self.side = 0
+        self.value: Optional[float] = None
+
+    def update(self, sample) -> Tuple[Optional[float], str]:
+        """(valeur filtrée, issue) ; valeur None tant qu'aucun échantillon n'est plausible"""
+        try:
+            sample = float(sample)
+        except (TypeError, ValueError):
+            return self.value, "implausible"
+        if not (math.isfinite(sample) and self.spec.low <= sample <= self.spec.high):
+            return self.value, "implausible"
+
+        if self.spec.danger and self.value is not None and (sample - self.value) * self.spec.danger > 0:
+            # Aggravation : transmise sans délai ni lissage (une désaturation n'est jamais un pic)
+            self._reset_pending()
+            self.window.append(sample)
+            self.value = sample
+            return self.value, "worsening"
+
+        if self.window:
+            median = _median(self.window)
+            deviation = sample - median
+            mad = _median(abs(value - median) for value in self.window)
+            if abs(deviation) > max(self.spec.min_jump, MAD_FACTOR * mad):
+                side = 1 if deviation > 0 else -1
+                if side != self.side:
+                    self.pending.clear()
+                    self.side = side
+                self.pending.append(sample)
+                if len(self.pending) < CONFIRM_SAMPLES:
+                    return self.value, "outlier"
+                # Changement confirmé : la fenêtre repart des échantillons en attente
+                self.window.clear()
+                self.window.extend(self.pending)
+                self._reset_pending()
+                self.value = _median(self.window)
+                return self.value, "step"
+
+        self._reset_pending()
+        self.window.append(sample)
+        median = _median(self.window)
+        self.value = median if self.value is None else self.value + self.alpha * (median - self.value)
+        return self.value, "ok"
+
+    def _reset_pending(self):
+        self.pending.clear()
+        self.side = 0
+
+
+class SignalFilterBank:
+    """Filtres par (device, signal) ; thread-safe, nombre de devices borné"""
+
+    def __init__(self, max_devices: int = MAX_DEVICES, reset_after: float = RESET_AFTER_S,
+                 window: int = SIGNAL_WINDOW, alpha: float = SIGNAL_EMA_ALPHA,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_devices = max(1, max_devices)
+        self.reset_after = reset_after
+        self.window = window
+        self.alpha = alpha
+        self._clock = clock
+        # device → [vu à, filtres, horodatage du dernier échantillon filtré]
+        self._devices: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, device_key: str, now: float) -> list:
+        entry = self._devices.get(device_key)
+        if entry is None or now - entry[0] > self.reset_after:
+            filters = {name: SignalFilter(spec, self.window, self.alpha) for name, spec in SIGNALS.items()}
+            entry = self._devices[device_key] = [now, filters, None]
+        else:
+            entry[0] = now
+            self._devices.move_to_end(device_key)
+        while len(self._devices) > self.max_devices:
+            self._devices.popitem(last=False)
+        return entry
+
+    def apply(self, device_key: str, reading: Mapping) -> Dict:
+        """
+        Copie de la lecture avec les signaux débruités ; un signal sans aucune
+        valeur plausible est retiré (le défaut de l'appelant s'applique).
+        Issues par signal dans reading["signal_filter"] ; "repeat" si l'horodatage
+        de la lecture n'a pas avancé (filtres inchangés).
+        """
+        filtered = dict(reading)
+        outcomes = {}
+        sample_time = _sample_time(reading)
+        with self._lock:
+            entry = self._entry(device_key, self._clock())
+            filters = entry[1]
+            repeat = sample_time is not None and entry[2] is not None and sample_time <= entry[2]
+            if sample_time is not None and not repeat:
+                entry[2] = sample_time
+            for key, signal in READING_KEYS.items():
+                if key not in reading:
+                    continue
+                if repeat:
+                    value, outcome = filters[signal].value, "repeat"
+                else:
+                    value, outcome = filters[signal].update(reading[key])
+                outcomes[key] = outcome
+                if value is None:
+                    del filtered[key]
+                else:
+                    filtered[key] = round(value, 2)
+        for key, outcome in outcomes.items():
+            metrics.registry.inc("respiria_signal_samples_total",
+                                 (("signal", READING_KEYS[key]), ("outcome", outcome)))
+        filtered["signal_filter"] = outcomes
+        return filtered
+
+    def reset(self, device_key: Optional[str] = None):
+        with self._lock:
+            if device_key is None:
+                self._devices.clear()
+            else:
+                self._devices.pop(device_key, None)
+
+
+_bank: Optional[SignalFilterBank] = None
+_bank_lock = threading.Lock()
+
+
+def get_signal_filters() -> Optional[SignalFilterBank]:
+    """Instance du processus, ou None si le débruitage est désactivé"""
+    global _bank
+    if not SIGNAL_FILTERS_ENABLED:
+        return None
+    if _bank is None:
+        with _bank_lock:
+            if _bank is None:
+                _bank = SignalFilterBank()
+    return _bank
@@ -0,0 +1,166 @@
+# api/timing.py
+"""
+Instrumentation de latence par étape (collecte → prédiction → rendu)
+
+- StageTimer : durées par étape d'une requête (perf_counter_ns)
+- stage(nom) : mesure un bloc si un timer est actif, sinon quasi gratuit
+- StageStats : agrégation en histogrammes HDR par (route, étape)
+- En-tête Server-Timing (visible dans les DevTools / clients HTTP)
+
+Le timer actif est porté par une ContextVar : le collecteur et le moteur IA
+n'ont pas besoin de le recevoir en paramètre.
+"""
+
+import threading
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter_ns
+from typing import Dict, Optional
+
+try:
+    from .histogram import HdrHistogram
+except ImportError:
+    from histogram import HdrHistogram
+
+
+_current_timer: ContextVar[Optional["StageTimer"]] = ContextVar("respiria_stage_timer", default=None)
+
+
+class StageTimer:
+    """Durées cumulées par étape pour une requête"""
+
+    __slots__ = ("start_ns", "end_ns", "stages", "_token")
+
+    def __init__(self):
+        self.start_ns = perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.stages: Dict[str, int] = {}
+        self._token = None
+
+    def add(self, name: str, duration_ns: int):
+        stages = self.stages
+        stages[name] = stages.get(name, 0) + duration_ns
+
+    def activate(self) -> "StageTimer":
+        """Rend ce timer courant pour le contexte d'exécution"""
+        self._token = _current_timer.set(self)
+        return self
+
+    def finish(self) -> "StageTimer":
+        """Fige la durée totale et désactive le timer"""
+        if self.end_ns is None:
+            self.end_ns = perf_counter_ns()
+        if self._token is not None:
+            _current_timer.reset(self._token)
+            self._token = None
+        return self
+
+    @property
+    def total_ns(self) -> int:
+        end = self.end_ns if self.end_ns is not None else perf_counter_ns()
+        return end - self.start_ns
+
+    def as_ms(self) -> Dict[str, float]:
+        """{étape: ms} avec le total"""
+        timings = {name: round(ns / 1e6, 3) for name, ns in self.stages.items()}
+        timings["total"] = round(self.total_ns / 1e6, 3)
+        return timings
+
+    def server_timing(self) -> str:
+        """Valeur de l'en-tête Server-Timing (RFC W3C)"""
+        parts = [f"{name};dur={ns / 1e6:.3f}" for name, ns in self.stages.items()]
+        parts.append(f"total;dur={self.total_ns / 1e6:.3f}")
+        return ", ".join(parts)
+
+
+class _Stage:
+    """Context manager d'une étape (classe à slots : moins coûteux qu'un générateur)"""
+
+    __slots__ = ("name", "timer", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.timer = _current_timer.get()
+        if self.timer is not None:
+            self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        if self.timer is not None:
+            self.timer.add(self.name, perf_counter_ns() - self.start)
+        return False
+
+
+def stage(name: str) -> _Stage:
+    """Mesure un bloc : with stage('weather'): ..."""
+    return _Stage(name)
+
+
+def timed_stage(name: str):
+    """Décorateur : mesure toute la fonction comme une étape"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            timer = _current_timer.get()
+            if timer is None:
+                return func(*args, **kwargs)
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timer.add(name, perf_counter_ns() - start)
+        return wrapper
+    return decorator
+
+
+def current_timer() -> Optional[StageTimer]:
+    return _current_timer.get()
+
+
+class StageStats:
+    """Histogrammes HDR (µs) par route et par étape, pour ce processus"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[str, HdrHistogram]] = {}
+
+    def record(self, route: str, timer: StageTimer):
+        with self._lock:
+            per_route = self._histograms.get(route)
+            if per_route is None:
+                per_route = self._histograms[route] = {}
+            for name, ns in timer.stages.items():
+                histogram = per_route.get(name)
+                if histogram is None:
+                    histogram = per_route[name] = HdrHistogram()
+                histogram.record(ns // 1000)
+            total = per_route.get("total")
+            if total is None:
+                total = per_route["total"] = HdrHistogram()
+            total.record(timer.total_ns // 1000)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict]]:
+        """{route: {étape: résumé en µs}}"""
+        with self._lock:
+            return {
+                route: {name: histogram.summary() for name, histogram in stages.items()}
+                for route, stages in self._histograms.items()
+            }
+
+    def histograms(self) -> Dict[str, Dict[str, HdrHistogram]]:
+        """Copie des histogrammes (pour export / fusion)"""
+        with self._lock:
+            return {
+                route: {name: HdrHistogram().merge(h) for name, h in stages.items()}
+                for route, stages in self._histograms.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+# Agrégateur du processus
+stage_stats = StageStats()
@@ -0,0 +1,204 @@
+# api/ubidots_writeback.py
+"""
+Renvoi du risque calculé vers les devices Ubidots (bracelet : LED, vibration)
+
+Au lieu d'un POST Ubidots par prédiction :
+- submit() mémorise la dernière valeur par device (O(1), sous verrou court) ;
+  une nouvelle prédiction remplace la précédente non encore envoyée
+- un thread envoie les valeurs en attente toutes les WRITEBACK_INTERVAL
+  secondes via l'écriture multi-devices Ubidots (POST /devices/),
+  par lots de WRITEBACK_BATCH_SIZE devices
+- un token bucket borne le nombre de requêtes ; ce qui n'a pas pu partir
+  reste en attente (et continue d'être fusionné) jusqu'au tour suivant
+- en cas d'échec, les valeurs reviennent en attente sauf si plus récentes
+
+Variables écrites par device : risk_score (0-100) et risk_level (0=low, 1=medium, 2=high).
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+try:
+    import requests  # type: ignore
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+try:
+    from . import metrics
+    from .data_collector import UBIDOTS_API_URL, UBIDOTS_TOKEN
+    from .logger import get_logger
+    from .rate_limit import TokenBucket
+except ImportError:
+    import metrics
+    from data_collector import UBIDOTS_API_URL, UBIDOTS_TOKEN
+    from logger import get_logger
+    from rate_limit import TokenBucket
+
+WRITEBACK_ENABLED = os.environ.get("RESPIRIA_UBIDOTS_WRITEBACK", "False").lower() == "true"
+WRITEBACK_INTERVAL = float(os.environ.get("RESPIRIA_WRITEBACK_INTERVAL", "2.0"))
+WRITEBACK_BATCH_SIZE = int(os.environ.get("RESPIRIA_WRITEBACK_BATCH_SIZE", "50"))
+WRITEBACK_MAX_RPS = float(os.environ.get("RESPIRIA_WRITEBACK_MAX_RPS", "2.0"))
+
+RISK_LEVEL_CODES = {"low": 0, "medium": 1, "high": 2}
+
+log = get_logger("writeback")
+
+metrics.registry.describe("respiria_ubidots_writeback_total", "counter",
+                          "Valeurs de risque renvoyées vers Ubidots (sent, failed, deferred)")
+
+
+class UbidotsWriteback:
+    """Tampon par device + envoi groupé périodique vers Ubidots"""
+
+    def __init__(self, api_url: Optional[str] = None, token: Optional[str] = None,
+                 interval: float = WRITEBACK_INTERVAL, batch_size: int = WRITEBACK_BATCH_SIZE,
+                 max_requests_per_second: float = WRITEBACK_MAX_RPS, timeout: float = 5.0):
+        self.api_url = (api_url or UBIDOTS_API_URL).rstrip("/")
+        self.token = token or UBIDOTS_TOKEN
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        self.bucket = TokenBucket(max_requests_per_second, burst=max(1.0, max_requests_per_second))
+
+        self._pending: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._session = None
+        self.counters = {"submitted": 0, "coalesced": 0, "sent": 0, "failed": 0, "deferred": 0, "requests": 0}
+
+    # --- Côté requêtes ---
+
+    def submit(self, device_label: str, risk_score: float, risk_level: str,
+               timestamp_ms: Optional[int] = None):
+        """Mémorise la dernière valeur du device (remplace une valeur non envoyée)"""
+        timestamp_ms = timestamp_ms or int(time.time() * 1000)
+        entry = {"risk_score": round(float(risk_score), 1),
+                 "risk_level": RISK_LEVEL_CODES.get(str(risk_level).lower(), 0),
+                 "timestamp": timestamp_ms}
+        with self._lock:
+            self.counters["submitted"] += 1
+            previous = self._pending.get(device_label)
+            if previous is not None:
+                self.counters["coalesced"] += 1
+                if previous["timestamp"] > timestamp_ms:
+                    return
+            self._pending[device_label] = entry
+        self._ensure_started()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    # --- Envoi ---
+
+    def flush(self) -> int:
+        """Envoie les valeurs en attente (dans la limite du débit) ; renvoie le nombre de devices envoyés"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        devices = list(pending.items())
+        sent = 0
+        for start in range(0, len(devices), self.batch_size):
+            batch = devices[start:start + self.batch_size]
+            if not self.bucket.try_acquire():
+                self._requeue(devices[start:], "deferred")
+                break
+            if self._post(batch):
+                sent += len(batch)
+                self._count("sent", len(batch))
+            else:
+                self._requeue(batch, "failed")
+        return sent
+
+    def _post(self, batch) -> bool:
+        payload = {
+            device: {
+                "risk_score": {"value": entry["risk_score"], "timestamp": entry["timestamp"]},
+                "risk_level": {"value": entry["risk_level"], "timestamp": entry["timestamp"]},
+            }
+            for device, entry in batch
+        }
+        if self._session is None:
+            self._session = requests.Session()
+            self._session.headers.update({"X-Auth-Token": self.token or "", "Content-Type": "application/json"})
+        self.counters["requests"] += 1
+        try:
+            response = self._session.post(f"{self.api_url}/devices/", json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            return True
+        except requests.exceptions.RequestException as e:
+            log.warning("Écriture Ubidots échouée (%d devices) : %s", len(batch), e)
+            return False
+
+    def _requeue(self, devices, outcome: str):
+        """Remet en attente ce qui n'est pas parti, sauf si une valeur plus récente est arrivée"""
+        with self._lock:
+            for device, entry in devices:
+                current = self._pending.get(device)
+                if current is None or current["timestamp"] < entry["timestamp"]:
+                    self._pending[device] = entry
+        self._count(outcome, len(devices))
+
+    def _count(self, outcome: str, value: int):
+        self.counters[outcome] += value
+        metrics.registry.inc("respiria_ubidots_writeback_total", (("outcome", outcome),), value)
+
+    # --- Thread d'envoi ---
+
+    def _ensure_started(self):
+        # Démarré à la première valeur, et redémarré dans un worker issu d'un fork
+        if self._pid == os.getpid() or self._stopping:
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._session = None
+            self._thread = threading.Thread(target=self._run, name="ubidots-writeback", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:  # le thread ne doit jamais mourir
+                log.exception("Erreur write-back Ubidots : %s", e)
+
+    def stop(self, flush: bool = True):
+        """Arrête le thread (et envoie ce qui reste)"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=self.timeout + self.interval)
+        if flush:
+            self.flush()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self.counters, pending=len(self._pending))
+
+
+_writeback: Optional[UbidotsWriteback] = None
+_writeback_lock = threading.Lock()
+
+
+def get_writeback() -> Optional[UbidotsWriteback]:
+    """Instance du processus, ou None si le write-back est désactivé / non configuré"""
+    global _writeback
+    if not (WRITEBACK_ENABLED and REQUESTS_AVAILABLE and UBIDOTS_TOKEN):
+        return None
+    if _writeback is None:
+        with _writeback_lock:
+            if _writeback is None:
+                _writeback = UbidotsWriteback()
+    return _writeback
@@ -0,0 +1,133 @@
+# api/ui_registry.py
+"""
+Registre immuable des textes et réglages d'interface Flutter
+
+Construit une fois à l'import ; les endpoints ne font que des recherches
+(clé : niveau de risque, ou (niveau de risque, profil)) et le formatage du
+score dans la description du message personnalisé.
+
+Les tables sont en lecture seule (MappingProxyType, tuples) : une réponse ne
+peut pas modifier par erreur la valeur partagée par toutes les requêtes.
+"""
+
+from types import MappingProxyType
+from typing import Mapping
+
+try:
+    from .fast_json import Fragment
+except ImportError:
+    from fast_json import Fragment
+
+RISK_LEVELS = ("LOW", "MEDIUM", "HIGH")
+PROFILE_IDS = (0, 1, 2, 3)
+
+UI_CONFIGS: Mapping[str, Mapping] = MappingProxyType({
+    'LOW': MappingProxyType({
+        'color': '#4CAF50',
+        'gradient': ('#66BB6A', '#43A047'),
+        'card_color': '#E8F5E9',
+        'text_color': '#1B5E20',
+        'icon': 'check_circle',
+        'animation': 'pulse_slow',
+        'sound': None
+    }),
+    'MEDIUM': MappingProxyType({
+        'color': '#FF9800',
+        'gradient': ('#FFB74D', '#F57C00'),
+        'card_color': '#FFF3E0',
+        'text_color': '#E65100',
+        'icon': 'warning',
+        'animation': 'pulse_medium',
+        'sound': 'notification'
+    }),
+    'HIGH': MappingProxyType({
+        'color': '#F44336',
+        'gradient': ('#EF5350', '#C62828'),
+        'card_color': '#FFEBEE',
+        'text_color': '#B71C1C',
+        'icon': 'error',
+        'animation': 'shake',
+        'sound': 'alert'
+    })
+})
+
+# Palette et bloc ui_data pré-sérialisés (recopiés tels quels dans les réponses)
+UI_FRAGMENTS: Mapping[str, Mapping[str, Fragment]] = MappingProxyType({
+    level: MappingProxyType({
+        'gradient': Fragment(config['gradient']),
+        'ui_data': Fragment({
+            'card_color': config['card_color'],
+            'text_color': config['text_color'],
+            'animation': config['animation'],
+            'sound_alert': config['sound']
+        })
+    })
+    for level, config in UI_CONFIGS.items()
+})
+
+RISK_LABELS: Mapping[str, str] = MappingProxyType({'LOW': 'Faible', 'MEDIUM': 'Modéré', 'HIGH': 'Élevé'})
+
+PROFILE_NAMES: Mapping[int, str] = MappingProxyType({
+    0: 'Prévention', 1: 'Asthmatique Stable', 2: 'Asthmatique Sévère', 3: 'Rémission'
+})
+
+# Nom court du profil dans le message personnalisé
+PROFILE_SHORT_NAMES: Mapping[int, str] = MappingProxyType({
+    0: 'Prévention', 1: 'Stable', 2: 'Sévère', 3: 'Rémission'
+})
+
+WEATHER_ICONS: Mapping[str, str] = MappingProxyType({
+    'Clear': 'wb_sunny',
+    'Clouds': 'cloud',
+    'Rain': 'grain',
+    'Drizzle': 'grain',
+    'Thunderstorm': 'flash_on',
+    'Snow': 'ac_unit',
+    'Mist': 'blur_on',
+    'Fog': 'blur_on',
+    'Haze': 'blur_on'
+})
+
+# Parties constantes des messages ; seule la description dépend du score
+_MESSAGE_TEMPLATES = {
+    'LOW': {
+        'title': '✅ Risque Faible',
+        'subtitle': 'Conditions favorables',
+        'description': 'Votre niveau de risque est faible ({score:.0f}%). Les conditions actuelles sont favorables pour vos activités.',
+        'action': 'Continuez vos activités normalement',
+        'emoji': '😊'
+    },
+    'MEDIUM': {
+        'title': '⚠️ Risque Modéré',
+        'subtitle': 'Surveillance recommandée',
+        'description': 'Niveau de risque modéré ({score:.0f}%). Certains facteurs environnementaux peuvent affecter votre respiration.',
+        'action': 'Gardez votre inhalateur à portée de main',
+        'emoji': '😐'
+    },
+    'HIGH': {
+        'title': '🚨 Risque Élevé',
+        'subtitle': 'Action requise',
+        'description': 'Alerte! Niveau de risque élevé ({score:.0f}%). Prenez vos précautions immédiatement.',
+        'action': 'Prenez votre traitement et restez à l\'intérieur si possible',
+        'emoji': '😰'
+    }
+}
+
+# {(niveau, profil): message complet sauf la description (gabarit)}
+MESSAGES: Mapping[tuple, Mapping[str, str]] = MappingProxyType({
+    (level, profile_id): MappingProxyType(dict(template, profile=PROFILE_SHORT_NAMES[profile_id]))
+    for level, template in _MESSAGE_TEMPLATES.items()
+    for profile_id in PROFILE_IDS
+})
+
+
+def personalized_message(risk_level: str, risk_score: float, profile_id: int) -> dict:
+    """Message de la réponse : recherche dans MESSAGES + formatage du score"""
+    if risk_level not in _MESSAGE_TEMPLATES:
+        risk_level = 'LOW'
+    template = MESSAGES.get((risk_level, profile_id))
+    if template is None:  # profil inconnu
+        template = dict(MESSAGES[(risk_level, 0)], profile='Inconnu')
+    message = dict(template)
+    message['description'] = template['description'].format(score=risk_score)
+    return message
@@ -0,0 +1,131 @@
+# api/vector_scoring.py
+"""
+Scores de risque vectorisés (numpy) pour les prédictions par lot
+
+Mêmes bornes et valeurs par défaut que calculate_risk_factors, mêmes
+barèmes que RespiriaAIPredictor.calculate_*_score (table partagée
+api/risk_bands.py), appliqués à des colonnes entières avec np.select.
+test_predict_batch.py vérifie l'égalité avec la prédiction ligne par ligne.
+"""
+
+import math
+import numbers
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+try:
+    from .risk_bands import FLAG_SCORES, SCORE_BANDS
+except ImportError:
+    from risk_bands import FLAG_SCORES, SCORE_BANDS
+
+# {facteur: (valeur par défaut, min, max)}, dans l'ordre des scores de
+# calculate_risk_factors (l'ordre départage les contributions égales).
+# Bornes None : booléen, non borné.
+INPUTS: Mapping[str, tuple] = {
+    'spo2': (96.0, 70.0, 100.0),
+    'heart_rate': (70.0, 30.0, 220.0),
+    'respiratory_rate': (16.0, 8.0, 50.0),
+    'temperature': (22.0, -20.0, 60.0),
+    'humidity': (50.0, 0.0, 100.0),
+    'eco2': (400.0, 0.0, 10000.0),
+    'tvoc': (0.0, 0.0, 5000.0),
+    'aqi': (50.0, 0.0, 500.0),
+    'pm25': (12.0, 0.0, 500.0),
+    'pm10': (18.0, 0.0, 500.0),
+    'pollen_level': (1, 0, 5),
+    'pressure': (1013.0, 900.0, 1100.0),
+    'wind_speed': (0.0, 0.0, 200.0),
+    'medication_taken': (True, None, None),
+    'smoke_detected': (False, None, None),
+}
+
+SCORE_FACTORS = tuple(INPUTS)
+_NUMERIC_DEFAULTS = tuple((factor, default) for factor, (default, low, _) in INPUTS.items() if low is not None)
+
+
+def clip_value(factor: str, value):
+    """Valeur bornée comme dans calculate_risk_factors (type d'origine conservé)"""
+    _, low, high = INPUTS[factor]
+    if low is None:
+        return value
+    return max(low, min(high, value))
+
+
+def is_scalar_row(record: Dict) -> bool:
+    """
+    Entrées numériques de la ligne toutes scalaires et finies (une liste ou
+    une chaîne ferait échouer tout le lot : la ligne passe par predict())
+    """
+    for factor, default in _NUMERIC_DEFAULTS:
+        value = record.get(factor, default)
+        if type(value) is not float and type(value) is not int and not isinstance(value, numbers.Real):
+            return False
+        if not math.isfinite(value):
+            return False
+    return True
+
+
+def read_columns(records: Sequence[Dict]) -> Optional[Dict[str, 'np.ndarray']]:
+    """
+    Colonnes brutes (valeur par défaut si absente) ; None si une valeur n'est
+    pas numérique ou n'est pas finie (le lot repasse alors ligne par ligne)
+    """
+    columns = {}
+    for factor, (default, low, _) in INPUTS.items():
+        raw = [record.get(factor, default) for record in records]
+        if low is None:
+            columns[factor] = np.array([bool(value) for value in raw])
+            continue
+        column = np.asarray(raw)
+        if column.dtype.kind not in 'biuf':
+            return None
+        column = column.astype(float)
+        if not np.isfinite(column).all():
+            return None
+        columns[factor] = column
+    return columns
+
+
+def column_score(factor: str, column: 'np.ndarray') -> 'np.ndarray':
+    """Barème risk_bands appliqué à une colonne déjà bornée (np.select)"""
+    flag = FLAG_SCORES.get(factor)
+    if flag is not None:
+        return np.where(column, *flag)
+    bands = SCORE_BANDS[factor]
+    conditions = [np.logical_or.reduce([compare(column, threshold) for compare, threshold in band])
+                  for _, band in bands]
+    return np.select(conditions, [score for score, _ in bands], 0)
+
+
+def factor_score(factor: str, column: 'np.ndarray') -> 'np.ndarray':
+    """Scores individuels d'un facteur (colonne brute, bornée ici)"""
+    _, low, high = INPUTS[factor]
+    return column_score(factor, np.clip(column, low, high) if low is not None else column)
+
+
+def factor_scores(columns: Mapping[str, 'np.ndarray']) -> 'np.ndarray':
+    """Matrice (lignes × SCORE_FACTORS) des scores individuels"""
+    return np.stack([factor_score(factor, columns[factor]) for factor in SCORE_FACTORS], axis=1).astype(np.int64)
+
+
+def risk_levels(final_scores: 'np.ndarray', smoke: 'np.ndarray', thresholds: Mapping[str, float]) -> 'np.ndarray':
+    """Niveau de risque ; fumée + score > 30 = toujours "high" """
+    return np.select(
+        [smoke & (final_scores > 30), final_scores < thresholds['low'], final_scores < thresholds['medium']],
+        ['high', 'low', 'medium'], 'high')
+
+
+def should_notify(columns: Mapping[str, 'np.ndarray'], final_scores: 'np.ndarray',
+                  profile_ids: 'np.ndarray') -> 'np.ndarray':
+    """Même logique que RespiriaAIPredictor.should_notify, sur des colonnes brutes"""
+    spo2 = columns['spo2']
+    respiratory_rate = columns['respiratory_rate']
+    critical_count = ((spo2 < 88).astype(int) + (respiratory_rate > 30) + (columns['heart_rate'] > 120)
+                      + ~columns['medication_taken'])
+    profile_threshold = np.select([profile_ids == 2, profile_ids == 1], [60, 75], 80)
+    notify = ((spo2 < 85) | columns['smoke_detected']
+              | ((respiratory_rate > 35) & (spo2 < 90))
+              | (critical_count >= 2)
+              | (final_scores > profile_threshold))
+    return notify
@@ -0,0 +1,5 @@
+# benchmarks/__init__.py
+"""
+Suite de benchmarks RESPIRIA AI
+Mesures reproductibles (perf_counter_ns, percentiles, sortie JSON)
+"""
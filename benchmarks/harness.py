@@ -0,0 +1,224 @@
+# benchmarks/harness.py
+"""
+Harnais de mesure RESPIRIA AI
+
+- Échauffement (warmup) avant chaque mesure
+- Chronométrage time.perf_counter_ns (pas de troncature à la milliseconde)
+- Percentiles p50/p90/p95/p99, min/max, moyenne, écart-type
+- Mémoire par appel (tracemalloc) : pic transitoire, octets et blocs retenus
+- Sortie JSON et comparaison à une baseline avec seuils de régression
+"""
+
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+# Percentiles rapportés pour chaque benchmark
+PERCENTILES = (50, 90, 95, 99)
+
+# Seuil de régression par défaut : +25% sur le p50
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_METRIC = "p50_ns"
+
+
+def percentile(sorted_samples: List[int], q: float) -> float:
+    """Percentile par interpolation linéaire sur un échantillon trié"""
+    if not sorted_samples:
+        return 0.0
+    if len(sorted_samples) == 1:
+        return float(sorted_samples[0])
+
+    rank = (len(sorted_samples) - 1) * (q / 100.0)
+    low = int(rank)
+    high = min(low + 1, len(sorted_samples) - 1)
+    fraction = rank - low
+    return sorted_samples[low] + (sorted_samples[high] - sorted_samples[low]) * fraction
+
+
+def summarize(samples_ns: List[int], inner_loops: int = 1) -> Dict:
+    """Statistiques d'un échantillon de durées (ns par appel)"""
+    per_call = sorted(s / inner_loops for s in samples_ns)
+    mean = statistics.fmean(per_call)
+
+    stats = {
+        "samples": len(per_call),
+        "inner_loops": inner_loops,
+        "min_ns": round(per_call[0], 1),
+        "max_ns": round(per_call[-1], 1),
+        "mean_ns": round(mean, 1),
+        "stdev_ns": round(statistics.pstdev(per_call), 1) if len(per_call) > 1 else 0.0,
+        "ops_per_sec": round(1e9 / mean, 1) if mean > 0 else None,
+    }
+    for q in PERCENTILES:
+        stats[f"p{q}_ns"] = round(percentile(per_call, q), 1)
+    return stats
+
+
+def run_benchmark(func: Callable[[], object], *, warmup: int = 50, iterations: int = 500,
+                  inner_loops: int = 1, min_time_s: float = 0.0) -> Dict:
+    """
+    Mesure une fonction sans argument
+
+    Args:
+        func: Fonction à mesurer
+        warmup: Nombre d'appels d'échauffement (non mesurés)
+        iterations: Nombre minimal d'échantillons
+        inner_loops: Appels par échantillon (pour les fonctions < 1µs)
+        min_time_s: Durée minimale de mesure (ajoute des échantillons si besoin)
+
+    Returns:
+        Dict de statistiques (voir summarize)
+    """
+    for _ in range(warmup):
+        func()
+
+    gc.collect()
+    timer = time.perf_counter_ns
+    samples: List[int] = []
+    loops = range(inner_loops)
+    deadline = timer() + int(min_time_s * 1e9)
+
+    while len(samples) < iterations or timer() < deadline:
+        start = timer()
+        for _ in loops:
+            func()
+        samples.append(timer() - start)
+
+    return summarize(samples, inner_loops)
+
+
+def measure_memory(func: Callable[[], object], *, warmup: int = 5, calls: int = 20) -> Dict:
+    """
+    Mémoire allouée par appel, mesurée avec tracemalloc (hors chronométrage :
+    le traçage ralentit fortement l'exécution)
+
+    Returns:
+        Dict {peak_bytes, retained_bytes, retained_blocks} par appel :
+        pic transitoire pendant un appel, et ce qui reste alloué après
+        (caches, fuites) en moyenne sur calls appels
+    """
+    for _ in range(warmup):
+        func()
+    gc.collect()
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        peak = 0
+        before, _ = tracemalloc.get_traced_memory()
+        blocks_before = sys.getallocatedblocks()
+        for _ in range(calls):
+            current, _ = tracemalloc.get_traced_memory()
+            if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+                tracemalloc.reset_peak()
+            func()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+        blocks_after = sys.getallocatedblocks()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    return {
+        "peak_bytes": peak,
+        "retained_bytes": round(max(0, after - before) / calls, 1),
+        "retained_blocks": round(max(0, blocks_after - blocks_before) / calls, 1),
+    }
+
+
+def environment_info() -> Dict:
+    """Métadonnées de la machine, pour interpréter une comparaison"""
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+def write_report(path: str, results: Dict[str, Dict]) -> Dict:
+    """Écrit le rapport JSON et le retourne"""
+    report = {"meta": environment_info(), "benchmarks": results}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    return report
+
+
+def load_report(path: str) -> Optional[Dict]:
+    """Charge un rapport JSON (None si absent)"""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_to_baseline(results: Dict[str, Dict], baseline: Dict,
+                        threshold: float = DEFAULT_THRESHOLD,
+                        metric: str = DEFAULT_METRIC,
+                        thresholds: Optional[Dict[str, float]] = None) -> List[Dict]:
+    """
+    Compare des résultats à une baseline
+
+    Args:
+        results: {nom: stats} issus de run_benchmark
+        baseline: Rapport JSON de référence (write_report)
+        threshold: Ratio de dégradation toléré (0.25 = +25%)
+        metric: Statistique comparée (p50_ns par défaut)
+        thresholds: Seuils spécifiques par benchmark (optionnel)
+
+    Returns:
+        Liste de comparaisons {name, baseline, current, ratio, regression}
+    """
+    thresholds = thresholds or {}
+    reference = baseline.get("benchmarks", {})
+    comparisons = []
+
+    for name, stats in results.items():
+        if name not in reference or metric not in reference[name]:
+            continue
+        base_value = reference[name][metric]
+        current = stats[metric]
+        ratio = current / base_value if base_value else float("inf")
+        limit = thresholds.get(name, threshold)
+        comparisons.append({
+            "name": name,
+            "metric": metric,
+            "baseline": base_value,
+            "current": current,
+            "ratio": round(ratio, 3),
+            "threshold": limit,
+            "regression": ratio > 1.0 + limit,
+        })
+
+    return comparisons
+
+
+def format_bytes(value: float) -> str:
+    """Formate une taille en octets avec l'unité adaptée"""
+    if value >= 1024 * 1024:
+        return f"{value / (1024 * 1024):.1f} Mo"
+    if value >= 1024:
+        return f"{value / 1024:.1f} Ko"
+    return f"{value:.0f} o"
+
+
+def format_ns(value: float) -> str:
+    """Formate une durée en ns avec l'unité adaptée"""
+    if value >= 1e6:
+        return f"{value / 1e6:.2f} ms"
+    if value >= 1e3:
+        return f"{value / 1e3:.1f} µs"
+    return f"{value:.0f} ns"
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# benchmarks/run_benchmarks.py
+"""
+BENCHMARKS RESPIRIA AI
+======================
+
+Micro-benchmarks (moteur IA) et macro-benchmarks (requêtes Flask complètes)
+mesurés avec benchmarks.harness, comparés à benchmarks/baseline.json.
+
+Usage:
+  python -m benchmarks.run_benchmarks                      # Mesure + comparaison baseline
+  python -m benchmarks.run_benchmarks --quick              # Moins d'itérations
+  python -m benchmarks.run_benchmarks -k predict           # Filtre par nom
+  python -m benchmarks.run_benchmarks --update-baseline    # Réécrit la baseline
+  python -m benchmarks.run_benchmarks --stand-in           # Flask + services simulés HTTP
+  python -m benchmarks.run_benchmarks --startup            # + démarrage à froid (sous-processus)
+  python -m benchmarks.run_benchmarks --no-memory          # Sans la mesure mémoire (tracemalloc)
+  python -m benchmarks.run_benchmarks --metric peak_bytes  # Compare la mémoire à la baseline
+
+Code de sortie 1 si une régression dépasse le seuil.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import (  # noqa: E402
+    DEFAULT_METRIC, DEFAULT_THRESHOLD, compare_to_baseline, format_bytes, format_ns,
+    load_report, measure_memory, run_benchmark, write_report,
+)
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+OUTPUT_PATH = "bench_output.json"
+
+# Seuils spécifiques : les requêtes Flask sont plus bruitées que le moteur seul
+THRESHOLDS = {
+    "flask.predict": 0.40,
+    "flask.predict.reference_json": 0.40,
+    "flask.dashboard": 0.40,
+    "flask.environment": 0.40,
+    "flask.health": 0.40,
+    "startup.import_app": 0.50,
+    "startup.init_services": 0.50,
+    "startup.first_request": 0.50,
+}
+
+
+# ==========================================
+# DONNÉES DE RÉFÉRENCE
+# ==========================================
+
+SCENARIOS = {
+    "normal": {
+        "profile_id": 1, "spo2": 98.0, "heart_rate": 72, "respiratory_rate": 16,
+        "temperature": 22.0, "humidity": 55.0, "aqi": 45.0, "pollen_level": 2,
+        "smoke_detected": False, "medication_taken": True,
+    },
+    "critical": {
+        "profile_id": 2, "spo2": 85.0, "heart_rate": 120, "respiratory_rate": 35,
+        "temperature": 35.0, "humidity": 85.0, "aqi": 200.0, "pollen_level": 5,
+        "eco2": 3500, "tvoc": 800, "pm25": 60, "pm10": 120, "pressure": 985,
+        "wind_speed": 45, "smoke_detected": True, "medication_taken": False,
+    },
+    "mixed": {
+        "profile_id": 1, "spo2": 92.0, "heart_rate": 85, "respiratory_rate": 22,
+        "temperature": 28.0, "humidity": 70.0, "aqi": 120.0, "pollen_level": 3,
+        "eco2": 1200, "tvoc": 350, "pm25": 45, "pm10": 70, "pressure": 990,
+        "wind_speed": 25, "smoke_detected": False, "medication_taken": True,
+    },
+}
+
+
+def batch_records(size: int = 100) -> List[Dict]:
+    """Lot déterministe de lectures variées (profils et niveaux mélangés)"""
+    records = []
+    for i in range(size):
+        records.append({
+            "profile_id": i % 4,
+            "spo2": 84.0 + (i * 7) % 16,
+            "heart_rate": 55 + (i * 13) % 90,
+            "respiratory_rate": 10 + (i * 5) % 28,
+            "temperature": 5.0 + (i * 3) % 35,
+            "humidity": 25.0 + (i * 11) % 70,
+            "aqi": 20.0 + (i * 37) % 300,
+            "pollen_level": i % 6,
+            "eco2": 400 + (i * 97) % 3000,
+            "tvoc": (i * 53) % 1200,
+            "smoke_detected": i % 17 == 0,
+            "medication_taken": i % 3 != 0,
+        })
+    return records
+
+
+class FakeCollector:
+    """
+    Collecteur local (aucun appel réseau) pour mesurer la gestion
+    des requêtes Flask indépendamment du backend
+    """
+
+    def get_weather_data(self, location=None, auth_token=None):
+        return {
+            'temperature': 29.0, 'humidity': 78.0, 'feels_like': 32.0,
+            'pressure': 1009, 'wind_speed': 12.0, 'weather_main': 'Clouds',
+            'description': 'nuageux', 'city': location or 'Abidjan',
+            'country': 'CI', 'status': 'success',
+        }
+
+    def get_air_quality_data(self, location=None, auth_token=None):
+        return {
+            'aqi': 87, 'quality_level': 'Moyenne', 'main_pollutant': 'pm25',
+            'pm25': 28.0, 'pm10': 41.0, 'no2': 20.0, 'o3': 60.0, 'co': 1.0,
+            'pollen_level': 2, 'health_recommendations': [],
+            'city': location or 'Abidjan', 'status': 'success',
+        }
+
+    def get_ubidots_direct(self):
+        return {
+            'spo2': 95.0, 'heart_rate': 88.0, 'respiratory_rate': 19.6,
+            'temperature_sensor': 28.5, 'humidity_sensor': 74.0,
+            'eco2_ppm': 950.0, 'tvoc_ppb': 120.0, 'smoke_detected': False,
+            'source': 'ubidots_direct', 'status': 'success',
+        }
+
+    def get_ubidots_sensors(self, user_id, auth_token=None):
+        data = self.get_ubidots_direct()
+        data['user_id'] = user_id
+        return data
+
+    def get_ubidots_latest(self, user_id):
+        return {
+            'spo2': 95, 'heart_rate': 88, 'temperature': 28.5, 'humidity': 74,
+            'eco2': 950, 'tvoc': 120, 'device_id': 'bench-device',
+            'timestamp': '2026-01-01T00:00:00', 'status': 'success',
+        }
+
+
+# ==========================================
+# CONSTRUCTION DES BENCHMARKS
+# ==========================================
+
+def _quiet():
+    """Masque les bannières print() pendant l'initialisation"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def build_benchmarks(stand_in_url: str = "") -> List[Tuple[str, Callable[[], object], Dict]]:
+    """Liste (nom, fonction, options run_benchmark)"""
+    with _quiet():
+        from api.respiria_ai_predictor import RespiriaAIPredictor
+        predictor = RespiriaAIPredictor()
+
+    benches = []
+
+    for name, data in SCENARIOS.items():
+        benches.append((f"predictor.predict.{name}",
+                        lambda d=data: predictor.predict(d),
+                        {"inner_loops": 10}))
+
+    records = batch_records(100)
+    benches.append(("predictor.batch_100",
+                    lambda: [predictor.predict(r) for r in records],
+                    {"iterations": 100, "warmup": 5}))
+    benches.append(("predictor.predict_batch_100",
+                    lambda: predictor.predict_batch(records),
+                    {"iterations": 100, "warmup": 5}))
+
+    critical = SCENARIOS["critical"]
+    benches.append(("predictor.risk_factors.critical",
+                    lambda: predictor.calculate_risk_factors(critical),
+                    {"inner_loops": 10}))
+    benches.append(("predictor.factor_message",
+                    lambda: predictor._generate_factor_message("pm25", 61.3, "warning"),
+                    {"inner_loops": 10}))
+    benches.append(("predictor.recommendations.critical",
+                    lambda: predictor.generate_recommendations(88.0, critical, 2),
+                    {"inner_loops": 10}))
+
+    from api.recommendation_rules import RULE_TABLE
+    rec_columns = {key: [r[key] for r in records] for key in records[0] if key != "profile_id"}
+    rec_scores = [(i * 7.3) % 100 for i in range(len(records))]
+    rec_profiles = [r["profile_id"] for r in records]
+    benches.append(("predictor.recommendations.batch_100",
+                    lambda: RULE_TABLE.evaluate_batch(rec_columns, rec_scores, rec_profiles),
+                    {"iterations": 100, "warmup": 5}))
+
+    response = predictor.predict(SCENARIOS["mixed"])
+    benches.append(("json.dumps.prediction",
+                    lambda: json.dumps(response),
+                    {"inner_loops": 10}))
+
+    from api import fast_json
+    benches.append(("json.fast.prediction",
+                    lambda: fast_json.dumps(response),
+                    {"inner_loops": 10}))
+
+    benches.extend(build_flask_benchmarks(stand_in_url))
+    return benches
+
+
+def build_flask_benchmarks(stand_in_url: str = "") -> List[Tuple[str, Callable[[], object], Dict]]:
+    """
+    Requêtes complètes via le client de test Flask
+
+    Par défaut le collecteur est remplacé par FakeCollector (en mémoire).
+    Avec stand_in_url, le vrai RespiriaDataCollector interroge les services
+    simulés HTTP (loadtest.fake_services) : la pile réseau est incluse.
+    """
+    try:
+        with _quiet():
+            from api import app as app_module
+    except ImportError:
+        return []
+
+    if app_module.app is None:
+        return []
+
+    if stand_in_url:
+        from api import data_collector
+        data_collector.UBIDOTS_API_URL = f"{stand_in_url}/api/v1.6"
+        data_collector.UBIDOTS_TOKEN = data_collector.UBIDOTS_TOKEN or "fake-token"
+        app_module.collector = data_collector.RespiriaDataCollector(base_url=f"{stand_in_url}/api/v1")
+    else:
+        app_module.collector = FakeCollector()
+    client = app_module.app.test_client()
+    body = {"user_id": "bench", "profile_id": 2, "location": "Abidjan"}
+
+    def post_predict():
+        with _quiet():
+            response = client.post('/api/v1/predict', json=body)
+        assert response.status_code == 200, response.status_code
+        return response
+
+    def reference_json(call):
+        # Encodage de référence (équivalent jsonify Flask) : mesure "avant"
+        from api import fast_json
+
+        def wrapped():
+            fast_json.FAST_JSON_ENABLED = False
+            try:
+                return call()
+            finally:
+                fast_json.FAST_JSON_ENABLED = True
+        return wrapped
+
+    def get(path):
+        def call():
+            response = client.get(path)
+            assert response.status_code == 200, response.status_code
+            return response
+        return call
+
+    # Noms distincts : les mesures réseau ne se comparent pas à la baseline en mémoire
+    prefix = "flask.stand_in." if stand_in_url else "flask."
+    options = {"iterations": 300, "warmup": 20}
+    return [
+        (prefix + "predict", post_predict, options),
+        (prefix + "predict.reference_json", reference_json(post_predict), options),
+        (prefix + "dashboard", get('/api/v1/dashboard?user_id=bench'), options),
+        (prefix + "environment", get('/api/v1/environment?location=Abidjan'), options),
+        (prefix + "health", get('/health'), options),
+    ]
+
+
+# ==========================================
+# EXÉCUTION
+# ==========================================
+
+def json_share() -> Optional[float]:
+    """
+    Part de la sérialisation JSON (étape "json") dans le temps des requêtes
+    mesurées depuis le dernier stage_stats.reset() (None si pas d'étape json)
+    """
+    from api.timing import stage_stats
+    for stages in stage_stats.snapshot().values():
+        if "json" in stages and stages.get("total", {}).get("mean"):
+            return round(stages["json"]["mean"] / stages["total"]["mean"], 4)
+    return None
+
+
+def run_all(name_filter: str = "", quick: bool = False, stand_in_url: str = "",
+            memory: bool = True) -> Dict[str, Dict]:
+    """Exécute les benchmarks (filtrés par sous-chaîne du nom), avec la mémoire par appel"""
+    results = {}
+    for name, func, options in build_benchmarks(stand_in_url):
+        if name_filter and name_filter not in name:
+            continue
+        if name.startswith("flask."):
+            from api.timing import stage_stats
+            stage_stats.reset()
+        options = dict(options)
+        if quick:
+            options["iterations"] = max(20, options.get("iterations", 500) // 10)
+            options["warmup"] = min(options.get("warmup", 50), 10)
+        stats = run_benchmark(func, **options)
+        line = (f"  {name:<40} p50={format_ns(stats['p50_ns']):>10}  "
+                f"p99={format_ns(stats['p99_ns']):>10}  "
+                f"{stats['ops_per_sec']:>12,.0f} ops/s")
+        share = json_share() if name.startswith("flask.") else None
+        if share is not None:
+            stats["json_share"] = share
+            line += f"  json={share:.1%}"
+        if memory:
+            stats.update(measure_memory(func, calls=5 if quick else 20))
+            line += (f"  pic={format_bytes(stats['peak_bytes']):>9}  "
+                     f"retenu={format_bytes(stats['retained_bytes']):>8}")
+        results[name] = stats
+        print(line)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks RESPIRIA AI")
+    parser.add_argument("-k", "--filter", default="", help="Sous-chaîne du nom de benchmark")
+    parser.add_argument("-o", "--output", default=OUTPUT_PATH, help="Fichier JSON de sortie")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline de référence")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Dégradation tolérée (0.25 = +25%%)")
+    parser.add_argument("--metric", default=DEFAULT_METRIC, help="Statistique comparée")
+    parser.add_argument("--quick", action="store_true", help="Mesure rapide (CI)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Écrit les résultats comme nouvelle baseline")
+    parser.add_argument("--stand-in", action="store_true",
+                        help="Requêtes Flask contre les services simulés HTTP (loadtest.fake_services)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Ne mesure pas la mémoire par appel (tracemalloc)")
+    parser.add_argument("--startup", action="store_true",
+                        help="Mesure aussi le démarrage à froid (benchmarks.startup)")
+    args = parser.parse_args(argv)
+
+    print("⏱️  BENCHMARKS RESPIRIA AI")
+    print("=" * 60)
+    if args.stand_in:
+        from loadtest.fake_services import FakeServices
+        with FakeServices() as fake:
+            results = run_all(args.filter, args.quick, fake.url, not args.no_memory)
+    else:
+        results = run_all(args.filter, args.quick, memory=not args.no_memory)
+    if args.startup:
+        from benchmarks.startup import measure_startup
+        for name, stats in measure_startup(3 if args.quick else 10).items():
+            if args.filter and args.filter not in name:
+                continue
+            results[name] = stats
+            print(f"  {name:<40} p50={format_ns(stats['p50_ns']):>10}  "
+                  f"max={format_ns(stats['max_ns']):>10}")
+    write_report(args.output, results)
+    print(f"\n📄 Rapport : {args.output}")
+
+    if args.update_baseline:
+        write_report(args.baseline, results)
+        print(f"📌 Baseline mise à jour : {args.baseline}")
+        return 0
+
+    baseline = load_report(args.baseline)
+    if baseline is None:
+        print("ℹ️  Aucune baseline - lancez avec --update-baseline")
+        return 0
+
+    comparisons = compare_to_baseline(results, baseline, args.threshold,
+                                      args.metric, THRESHOLDS)
+    regressions = [c for c in comparisons if c["regression"]]
+
+    print(f"\n📊 Comparaison baseline ({args.metric})")
+    for c in comparisons:
+        flag = "❌" if c["regression"] else "✅"
+        print(f"  {flag} {c['name']:<40} x{c['ratio']:.2f} (seuil x{1 + c['threshold']:.2f})")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} régression(s) détectée(s)")
+        return 1
+    print("\n✅ Aucune régression")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
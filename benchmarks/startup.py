@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# benchmarks/startup.py
+"""
+BENCHMARK DE DÉMARRAGE À FROID
+==============================
+
+Chaque mesure se fait dans un interpréteur neuf (comme un worker Render) :
+  startup.import_app     import de api.app (création de l'app Flask comprise)
+  startup.init_services  création paresseuse des services (moteur IA)
+  startup.first_request  première prédiction complète (collecteur en mémoire)
+
+Usage:
+  python -m benchmarks.startup            # 5 processus
+  python -m benchmarks.startup --runs 20
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import format_ns, summarize  # noqa: E402
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHILD = """
+import contextlib, io, json, time
+t0 = time.perf_counter_ns()
+with contextlib.redirect_stdout(io.StringIO()):
+    import api.app as app_module
+t1 = time.perf_counter_ns()
+from benchmarks.run_benchmarks import FakeCollector
+app_module.collector = FakeCollector()
+with contextlib.redirect_stdout(io.StringIO()):
+    app_module.init_services()
+t2 = time.perf_counter_ns()
+client = app_module.app.test_client()
+response = client.post('/api/v1/predict', json={'user_id': 'bench', 'profile_id': 2})
+assert response.status_code == 200, response.status_code
+t3 = time.perf_counter_ns()
+print(json.dumps({'startup.import_app': t1 - t0, 'startup.init_services': t2 - t1,
+                  'startup.first_request': t3 - t2}))
+"""
+
+
+def measure_once() -> Dict[str, int]:
+    """Un démarrage complet dans un sous-processus : {nom: ns}"""
+    env = dict(os.environ, RESPIRIA_LOG_LEVEL="WARNING", RESPIRIA_EAGER_INIT="false")
+    output = subprocess.run([sys.executable, "-c", _CHILD], cwd=ROOT_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_startup(runs: int = 5) -> Dict[str, Dict]:
+    """Statistiques (format harness) sur plusieurs démarrages"""
+    measure_once()  # Échauffement : bytecode .pyc et cache disque
+    samples: Dict[str, List[int]] = {}
+    for _ in range(runs):
+        for name, duration_ns in measure_once().items():
+            samples.setdefault(name, []).append(duration_ns)
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Démarrage à froid RESPIRIA AI")
+    parser.add_argument("--runs", type=int, default=5, help="Nombre de processus mesurés")
+    args = parser.parse_args(argv)
+
+    print("🥶 DÉMARRAGE À FROID RESPIRIA AI")
+    print("=" * 60)
+    for name, stats in measure_startup(args.runs).items():
+        print(f"  {name:<28} p50={format_ns(stats['p50_ns']):>10}  max={format_ns(stats['max_ns']):>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,30 @@ Compare le modèle RESPIRIA aux standards médicaux de l'industrie
 from api.respiria_ai_predictor import RespiriaAIPredictor
 import random
 
+def generate_standard_scenarios(total=200, seed=123):
+    """Scénarios aléatoires (mêmes tirages que l'évaluation historique)"""
+    rng = random.Random(seed)
+    scenarios = []
+    for i in range(total):
+        spo2 = rng.randint(82, 100)
+        hr = rng.randint(55, 145)
+        rr = rng.randint(10, 40)
+        aqi = rng.randint(10, 400)
+        pollen = rng.randint(1, 5)
+        temp = rng.randint(-5, 42)
+        hum = rng.randint(20, 95)
+        smoke = rng.random() < 0.15
+        med = rng.random() < 0.7
+        profile = rng.randint(0, 3)
+        scenarios.append({
+            "profile_id": profile, "spo2": spo2, "heart_rate": hr,
+            "respiratory_rate": rr, "aqi": aqi, "pollen_level": pollen,
+            "temperature": temp, "humidity": hum, "smoke_detected": smoke,
+            "medication_taken": med
+        })
+    return scenarios
+
+
 def evaluate_model():
     predictor = RespiriaAIPredictor()
 
@@ -17,31 +41,17 @@ def evaluate_model():
 
     # Test avec 200 scénarios aléatoires
     print("\n📊 Test avec 200 scénarios aléatoires...")
-    random.seed(123)
 
     results = {"low": 0, "medium": 0, "high": 0}
     critical_errors = 0
     safety_errors = 0
-    total = 200
+    scenarios = generate_standard_scenarios()
+    total = len(scenarios)
 
-    for i in range(total):
-        spo2 = random.randint(82, 100)
-        hr = random.randint(55, 145)
-        rr = random.randint(10, 40)
-        aqi = random.randint(10, 400)
-        pollen = random.randint(1, 5)
-        temp = random.randint(-5, 42)
-        hum = random.randint(20, 95)
-        smoke = random.random() < 0.15
-        med = random.random() < 0.7
-        profile = random.randint(0, 3)
-        
-        result = predictor.predict({
-            "profile_id": profile, "spo2": spo2, "heart_rate": hr,
-            "respiratory_rate": rr, "aqi": aqi, "pollen_level": pollen,
-            "temperature": temp, "humidity": hum, "smoke_detected": smoke,
-            "medication_taken": med
-        })
+    for data in scenarios:
+        spo2, hr, rr, aqi = data["spo2"], data["heart_rate"], data["respiratory_rate"], data["aqi"]
+        smoke, med = data["smoke_detected"], data["medication_taken"]
+        result = predictor.predict(data)
         
         level = result["prediction"]["risk_level"]
         results[level] += 1
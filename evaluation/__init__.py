@@ -0,0 +1,5 @@
+# evaluation/__init__.py
+"""
+Évaluation unifiée du moteur RESPIRIA AI
+Suites de scénarios étiquetés + balayages aléatoires vectorisés, rapport JSON
+"""
@@ -0,0 +1,295 @@
+# evaluation/engine.py
+"""
+Moteur d'évaluation : suites étiquetées et balayages aléatoires
+
+- suites (evaluation.suites) : un predict_batch par suite ; niveau,
+  notification, plage de score, facteurs critiques et actions immédiates
+  comparés aux attentes ; matrice de confusion et rappel par profil
+- balayage : N scénarios tirés par tranches (numpy, une graine par tranche :
+  même résultat quel que soit le nombre de processus), notés par colonnes
+  (batch_scores, risk_levels, should_notify) dans un pool de processus
+
+Urgence : fumée détectée ou SpO2 < 88 → niveau "high" et notification
+attendus. Sur-alerte : niveau "high" pour une personne sans aucun signe
+(mêmes règles que evaluate_standards.py).
+"""
+
+import contextlib
+import io
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from api import vector_scoring
+from evaluation.suites import MEDICATION_RATE, RANDOM_RANGES, SMOKE_RATE, Scenario, load_suites
+
+LEVELS = ("low", "medium", "high")
+PROFILE_IDS = (0, 1, 2, 3)
+EMERGENCY_SPO2 = 88
+SWEEP_CHUNK_SIZE = 100000
+
+_predictor = None
+
+
+def get_predictor():
+    """Moteur IA du processus (créé une fois par processus du pool)"""
+    global _predictor
+    if _predictor is None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            from api.respiria_ai_predictor import RespiriaAIPredictor
+            _predictor = RespiriaAIPredictor()
+    return _predictor
+
+
+def _value(data: Dict, factor: str):
+    return data.get(factor, vector_scoring.INPUTS[factor][0])
+
+
+def is_emergency(data: Dict) -> bool:
+    return bool(_value(data, "smoke_detected")) or _value(data, "spo2") < EMERGENCY_SPO2
+
+
+def is_quiet(data: Dict) -> bool:
+    """Aucun signe : un niveau "high" serait une sur-alerte"""
+    return (_value(data, "spo2") >= 97 and _value(data, "heart_rate") < 80
+            and _value(data, "respiratory_rate") < 18 and _value(data, "aqi") < 40
+            and not _value(data, "smoke_detected") and bool(_value(data, "medication_taken")))
+
+
+def check_expectations(expected: Dict, result: Dict) -> List[str]:
+    """Écarts entre un résultat de predict() et les attentes du scénario"""
+    if not result.get("success"):
+        return [f"Erreur: {result.get('error')}"]
+    prediction = result["prediction"]
+    errors = []
+    if "risk_level" in expected and prediction["risk_level"] != expected["risk_level"]:
+        errors.append(f"Niveau {prediction['risk_level']} (attendu {expected['risk_level']})")
+    if "should_notify" in expected and prediction["should_notify"] != expected["should_notify"]:
+        errors.append(f"Notification {prediction['should_notify']} (attendue {expected['should_notify']})")
+    if "min_score" in expected and prediction["risk_score"] < expected["min_score"]:
+        errors.append(f"Score {prediction['risk_score']} < {expected['min_score']}")
+    if "max_score" in expected and prediction["risk_score"] > expected["max_score"]:
+        errors.append(f"Score {prediction['risk_score']} > {expected['max_score']}")
+    if expected.get("critical_factors"):
+        detected = {rf["factor"] for rf in result["risk_factors"] if rf["status"] == "critical"}
+        missing = [factor for factor in expected["critical_factors"] if factor not in detected]
+        if missing:
+            errors.append(f"Facteurs critiques manqués: {missing}")
+    if "immediate_actions" in expected and bool(result["recommendations"]["immediate"]) != expected["immediate_actions"]:
+        errors.append(f"Actions immédiates attendues: {expected['immediate_actions']}")
+    return errors
+
+
+def _ratio(count: int, total: int) -> Optional[float]:
+    return round(count / total, 4) if total else None
+
+
+class Tally:
+    """Compteurs d'une suite (ou de toutes) et rapport correspondant"""
+
+    def __init__(self):
+        self.scenarios = 0
+        self.labeled = 0
+        self.correct = 0
+        self.strict_labeled = 0
+        self.strict_correct = 0
+        self.passed = 0
+        self.distribution = dict.fromkeys(LEVELS, 0)
+        self.confusion = {expected: dict.fromkeys(LEVELS, 0) for expected in LEVELS}
+        self.recall = {profile_id: {level: [0, 0] for level in LEVELS} for profile_id in PROFILE_IDS}
+        self.emergencies = 0
+        self.emergency_misses = 0
+        self.emergency_notify_misses = 0
+        self.over_alerts = 0
+        self.failures: List[Dict[str, Any]] = []
+
+    def add(self, scenario: Scenario, result: Dict):
+        self.scenarios += 1
+        expected = scenario["expected"]
+        errors = check_expectations(expected, result)
+        if not result.get("success"):
+            self.failures.append({"suite": scenario["suite"], "name": scenario["name"], "errors": errors})
+            return
+        data = scenario["data"]
+        level = result["prediction"]["risk_level"]
+        self.distribution[level] += 1
+
+        if is_emergency(data):
+            self.emergencies += 1
+            self.emergency_misses += level != "high"
+            self.emergency_notify_misses += not result["prediction"]["should_notify"]
+        self.over_alerts += is_quiet(data) and level == "high"
+
+        if expected:
+            self.passed += not errors
+            if errors:
+                self.failures.append({"suite": scenario["suite"], "name": scenario["name"], "errors": errors})
+        expected_level = expected.get("risk_level")
+        if expected_level is None:
+            return
+        hit = level == expected_level
+        self.labeled += 1
+        self.correct += hit
+        if not expected.get("ambiguous"):
+            self.strict_labeled += 1
+            self.strict_correct += hit
+        self.confusion[expected_level][level] += 1
+        counts = self.recall[data.get("profile_id", 1)][expected_level]
+        counts[0] += hit
+        counts[1] += 1
+
+    def report(self, failures: bool = True) -> Dict[str, Any]:
+        report = {
+            "scenarios": self.scenarios,
+            "labeled": self.labeled,
+            "accuracy": _ratio(self.correct, self.labeled),
+            "strict_accuracy": _ratio(self.strict_correct, self.strict_labeled),
+            "passed": self.passed,
+            "distribution": self.distribution,
+            "confusion": self.confusion,
+            "recall_by_profile": {
+                str(profile_id): {level: _ratio(hit, total) for level, (hit, total) in levels.items()}
+                for profile_id, levels in self.recall.items()
+            },
+            "emergencies": self.emergencies,
+            "emergency_misses": self.emergency_misses,
+            "emergency_notify_misses": self.emergency_notify_misses,
+            "over_alerts": self.over_alerts,
+        }
+        if failures:
+            report["failures"] = self.failures
+        return report
+
+
+def evaluate_suites(suites: Dict[str, List[Scenario]], predictor=None) -> Dict[str, Any]:
+    """{"suites": {nom: rapport}, "overall": rapport agrégé} ; un lot par suite"""
+    predictor = predictor or get_predictor()
+    overall = Tally()
+    reports = {}
+    for name, scenarios in suites.items():
+        tally = Tally()
+        for scenario, result in zip(scenarios, predictor.predict_batch([s["data"] for s in scenarios])):
+            tally.add(scenario, result)
+            overall.add(scenario, result)
+        reports[name] = tally.report()
+    return {"suites": reports, "overall": overall.report(failures=False)}
+
+
+# ==========================================
+# BALAYAGE ALÉATOIRE (VECTORISÉ)
+# ==========================================
+
+def random_columns(rng, size: int) -> Dict[str, Any]:
+    """Colonnes de scénarios aléatoires (tirages de evaluate_standards.py)"""
+    np = vector_scoring.np
+    columns = {}
+    for factor, (default, low, _) in vector_scoring.INPUTS.items():
+        if factor in RANDOM_RANGES:
+            lower, upper = RANDOM_RANGES[factor]
+            columns[factor] = rng.integers(lower, upper + 1, size).astype(float)
+        elif low is not None:
+            columns[factor] = np.full(size, float(default))
+    columns["smoke_detected"] = rng.random(size) < SMOKE_RATE
+    columns["medication_taken"] = rng.random(size) < MEDICATION_RATE
+    return columns
+
+
+def sweep_chunk(task: Sequence[int]) -> Dict[str, List]:
+    """Compteurs par profil d'une tranche (seed, index, taille)"""
+    seed, index, size = task
+    np = vector_scoring.np
+    predictor = get_predictor()
+    rng = np.random.default_rng([seed, index])
+    columns = random_columns(rng, size)
+    profile_ids = rng.integers(0, len(PROFILE_IDS), size)
+
+    _, final_scores = predictor.batch_scores(columns, profile_ids)
+    smoke = columns["smoke_detected"]
+    levels = vector_scoring.risk_levels(final_scores, smoke, predictor.RISK_THRESHOLDS)
+    notify = vector_scoring.should_notify(columns, final_scores, profile_ids.astype(float))
+
+    high = levels == "high"
+    level_codes = np.select([levels == "low", levels == "medium"], [0, 1], 2)
+    emergency = smoke | (columns["spo2"] < EMERGENCY_SPO2)
+    quiet = ((columns["spo2"] >= 97) & (columns["heart_rate"] < 80) & (columns["respiratory_rate"] < 18)
+             & (columns["aqi"] < 40) & ~smoke & columns["medication_taken"])
+
+    def per_profile(mask):
+        return np.bincount(profile_ids[mask], minlength=len(PROFILE_IDS)).tolist()
+
+    return {
+        "levels": np.bincount(profile_ids * len(LEVELS) + level_codes,
+                              minlength=len(PROFILE_IDS) * len(LEVELS)).reshape(len(PROFILE_IDS), -1).tolist(),
+        "emergencies": per_profile(emergency),
+        "emergency_misses": per_profile(emergency & ~high),
+        "emergency_notify_misses": per_profile(emergency & ~notify),
+        "notified": per_profile(notify),
+        "over_alerts": per_profile(quiet & high),
+    }
+
+
+def map_tasks(function: Callable, tasks: Iterable, workers: int) -> Iterable:
+    """function(task) pour chaque tâche, en processus séparés si workers > 1"""
+    if workers <= 1:
+        return map(function, tasks)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(function, tasks))
+
+
+def sweep(size: int, seed: int = 0, workers: int = 1, chunk_size: int = SWEEP_CHUNK_SIZE) -> Dict[str, Any]:
+    """Balayage de size scénarios aléatoires ; rapport global et par profil"""
+    np = vector_scoring.np
+    start = time.perf_counter()
+    tasks = [(seed, index, min(chunk_size, size - index * chunk_size))
+             for index in range(math.ceil(size / chunk_size))]
+    totals: Dict[str, Any] = {}
+    for part in map_tasks(sweep_chunk, tasks, workers):
+        for key, counts in part.items():
+            totals[key] = totals.get(key, 0) + np.asarray(counts)
+    elapsed = time.perf_counter() - start
+    if not totals:
+        return {"scenarios": 0}
+
+    levels = totals["levels"]
+    by_profile = {}
+    for profile_id in PROFILE_IDS:
+        emergencies = int(totals["emergencies"][profile_id])
+        misses = int(totals["emergency_misses"][profile_id])
+        scenarios = int(levels[profile_id].sum())
+        by_profile[str(profile_id)] = {
+            "scenarios": scenarios,
+            "distribution": dict(zip(LEVELS, levels[profile_id].tolist())),
+            "emergencies": emergencies,
+            "emergency_misses": misses,
+            "emergency_recall": _ratio(emergencies - misses, emergencies),
+            "emergency_notify_misses": int(totals["emergency_notify_misses"][profile_id]),
+            "notify_rate": _ratio(int(totals["notified"][profile_id]), scenarios),
+            "over_alerts": int(totals["over_alerts"][profile_id]),
+        }
+    emergencies = int(totals["emergencies"].sum())
+    misses = int(totals["emergency_misses"].sum())
+    return {
+        "scenarios": size,
+        "seed": seed,
+        "chunk_size": chunk_size,
+        "workers": workers,
+        "elapsed_s": round(elapsed, 3),
+        "scenarios_per_sec": round(size / elapsed, 1) if elapsed > 0 else None,
+        "distribution": dict(zip(LEVELS, levels.sum(axis=0).tolist())),
+        "emergencies": emergencies,
+        "emergency_misses": misses,
+        "emergency_recall": _ratio(emergencies - misses, emergencies),
+        "emergency_notify_misses": int(totals["emergency_notify_misses"].sum()),
+        "over_alerts": int(totals["over_alerts"].sum()),
+        "by_profile": by_profile,
+    }
+
+
+def run_evaluation(suite_names=None, sweep_size: int = 0, seed: int = 0, workers: int = 1,
+                   chunk_size: int = SWEEP_CHUNK_SIZE) -> Dict[str, Any]:
+    """Rapport complet : suites étiquetées (+ balayage si sweep_size > 0)"""
+    report = evaluate_suites(load_suites(suite_names))
+    if sweep_size > 0:
+        report["sweep"] = sweep(sweep_size, seed, workers, chunk_size)
+    return report
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# evaluation/run_evaluation.py
+"""
+ÉVALUATION UNIFIÉE RESPIRIA AI
+==============================
+
+Toutes les suites de scénarios (evaluation.suites) en lots, puis un balayage
+aléatoire vectorisé réparti sur un pool de processus. Rapport JSON :
+matrice de confusion, rappel par profil, urgences manquées, sur-alertes.
+
+Usage:
+  python -m evaluation.run_evaluation                               # Suites + 100 000 scénarios
+  python -m evaluation.run_evaluation --sweep 1000000 --workers 8   # Balayage d'un million
+  python -m evaluation.run_evaluation -s realistic -s precision --sweep 0
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import environment_info  # noqa: E402
+from evaluation.engine import SWEEP_CHUNK_SIZE, run_evaluation  # noqa: E402
+from evaluation.suites import SUITES  # noqa: E402
+
+OUTPUT_PATH = "eval_report.json"
+
+
+def format_ratio(value) -> str:
+    return f"{value:.1%}" if value is not None else "-"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Évaluation unifiée RESPIRIA AI")
+    parser.add_argument("-s", "--suite", action="append", choices=list(SUITES),
+                        help="Suite à évaluer (répétable ; défaut : toutes)")
+    parser.add_argument("--sweep", type=int, default=100000, help="Scénarios aléatoires (0 : aucun)")
+    parser.add_argument("--seed", type=int, default=0, help="Graine du balayage")
+    parser.add_argument("--workers", type=int, default=None, help="Processus (défaut : nombre de cœurs)")
+    parser.add_argument("--chunk-size", type=int, default=SWEEP_CHUNK_SIZE, help="Scénarios par tranche")
+    parser.add_argument("-o", "--output", default=OUTPUT_PATH, help="Rapport JSON (- : sortie standard)")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count() or 1
+    report = {"meta": environment_info()}
+    report.update(run_evaluation(args.suite, args.sweep, args.seed, workers, max(1, args.chunk_size)))
+
+    text = json.dumps(report, indent=2, ensure_ascii=False) + "\n"
+    if args.output == "-":
+        sys.stdout.write(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    log = sys.stderr
+    print("🎯 ÉVALUATION RESPIRIA AI", file=log)
+    print("=" * 60, file=log)
+    for name, suite in report["suites"].items():
+        print(f"  {name:<16} {suite['scenarios']:>4} scénarios  précision={format_ratio(suite['accuracy']):>6}  "
+              f"urgences manquées={suite['emergency_misses']}", file=log)
+    overall = report["overall"]
+    print(f"  {'total':<16} {overall['scenarios']:>4} scénarios  précision={format_ratio(overall['accuracy']):>6}  "
+          f"urgences manquées={overall['emergency_misses']}", file=log)
+    if "sweep" in report:
+        sweep = report["sweep"]
+        print(f"\n🎲 Balayage : {sweep['scenarios']} scénarios en {sweep['elapsed_s']} s "
+              f"({sweep['scenarios_per_sec']} /s, {workers} processus)", file=log)
+        print(f"   Rappel urgences : {format_ratio(sweep['emergency_recall'])} "
+              f"({sweep['emergency_misses']} manquées / {sweep['emergencies']})", file=log)
+        print(f"   Sur-alertes : {sweep['over_alerts']}", file=log)
+    if args.output != "-":
+        print(f"\n📄 Rapport : {args.output}", file=log)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# evaluation/sensitivity.py
+"""
+Analyse de robustesse Monte Carlo : basculements de niveau sous bruit capteur
+
+Pour chaque profil, N lectures réalistes (distributions ci-dessous) sont
+tirées par tranches numpy et notées une fois ; chaque facteur de NOISE est
+ensuite bruité seul (tirage uniforme ±amplitude) puis tous ensemble. Seul
+le score du facteur bruité est recalculé (vector_scoring.factor_score) : le
+total se déduit du score de base. Pour chaque bruit : taux de basculement
+de niveau (hausse / baisse), écart moyen de score et basculements de
+notification.
+
+Une graine par tranche : résultat identique quel que soit le nombre de
+processus. Des seuils candidats (--threshold medium=55) permettent de
+mesurer un changement de seuil avant de le livrer.
+
+Usage:
+  python -m evaluation.sensitivity                                  # 250 000 lectures par profil
+  python -m evaluation.sensitivity --samples 2000000 --workers 8
+  python -m evaluation.sensitivity --noise spo2=2 --threshold low=25 -o sensitivity.json
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import vector_scoring  # noqa: E402
+from evaluation.engine import LEVELS, PROFILE_IDS, get_predictor, map_tasks  # noqa: E402
+
+SAMPLES_PER_PROFILE = 250000
+CHUNK_SIZE = 100000
+
+# Amplitude du bruit capteur (± unités du facteur)
+NOISE = {
+    "spo2": 1.0,
+    "heart_rate": 5.0,
+    "respiratory_rate": 2.0,
+    "temperature": 0.5,
+    "humidity": 3.0,
+    "eco2": 50.0,
+    "tvoc": 25.0,
+    "aqi": 5.0,
+    "pm25": 2.0,
+    "pm10": 3.0,
+    "pressure": 1.0,
+    "wind_speed": 2.0,
+}
+COMBINED = "combined"
+
+# Lectures réalistes : (moyenne, écart-type) d'une loi normale, bornée par vector_scoring.INPUTS
+DISTRIBUTIONS = {
+    "spo2": (95.5, 2.5),
+    "heart_rate": (80.0, 15.0),
+    "respiratory_rate": (17.0, 4.0),
+    "temperature": (24.0, 7.0),
+    "humidity": (60.0, 15.0),
+    "eco2": (800.0, 400.0),
+    "tvoc": (150.0, 150.0),
+    "aqi": (80.0, 50.0),
+    "pm25": (20.0, 15.0),
+    "pm10": (35.0, 20.0),
+    "pressure": (1013.0, 8.0),
+    "wind_speed": (10.0, 8.0),
+}
+POLLEN_MAX = 5
+SMOKE_RATE = 0.02
+MEDICATION_RATE = 0.8
+
+
+def realistic_columns(rng, size: int) -> Dict[str, Any]:
+    """Colonnes de lectures réalistes (bornées comme le moteur IA)"""
+    columns = {}
+    for factor, (mean, std) in DISTRIBUTIONS.items():
+        _, low, high = vector_scoring.INPUTS[factor]
+        columns[factor] = vector_scoring.np.clip(rng.normal(mean, std, size), low, high)
+    columns["pollen_level"] = rng.integers(0, POLLEN_MAX + 1, size).astype(float)
+    columns["smoke_detected"] = rng.random(size) < SMOKE_RATE
+    columns["medication_taken"] = rng.random(size) < MEDICATION_RATE
+    return columns
+
+
+def _level_codes(final_scores, smoke, thresholds):
+    np = vector_scoring.np
+    levels = vector_scoring.risk_levels(final_scores, smoke, thresholds)
+    return np.select([levels == "low", levels == "medium"], [0, 1], 2)
+
+
+def sensitivity_chunk(task: Sequence[Any]) -> Dict[str, Any]:
+    """Compteurs d'une tranche (seed, profil, index, taille, bruit, seuils)"""
+    seed, profile_id, index, size, noise, thresholds = task
+    np = vector_scoring.np
+    predictor = get_predictor()
+    thresholds = thresholds or predictor.RISK_THRESHOLDS
+    rng = np.random.default_rng([seed, profile_id, index])
+    columns = realistic_columns(rng, size)
+    profile_ids = np.full(size, profile_id)
+    smoke = columns["smoke_detected"]
+
+    score_matrix, final_scores = predictor.batch_scores(columns, profile_ids)
+    raw_totals = score_matrix.sum(axis=1)
+    multiplier = predictor.PROFILES[profile_id]["multiplier"]
+    base_levels = _level_codes(final_scores, smoke, thresholds)
+    base_notify = vector_scoring.should_notify(columns, final_scores, profile_ids)
+
+    counts: Dict[str, Any] = {"samples": size, "levels": np.bincount(base_levels, minlength=len(LEVELS)).tolist()}
+    perturbed_all = dict(columns)
+    positions = {factor: vector_scoring.SCORE_FACTORS.index(factor) for factor in noise}
+    for name in list(noise) + [COMBINED]:
+        if name == COMBINED:
+            perturbed = perturbed_all
+            _, new_scores = predictor.batch_scores(perturbed, profile_ids)
+        else:
+            perturbed = dict(columns)
+            perturbed[name] = columns[name] + rng.uniform(-noise[name], noise[name], size)
+            perturbed_all[name] = perturbed[name]
+            new_totals = raw_totals - score_matrix[:, positions[name]] + vector_scoring.factor_score(name, perturbed[name])
+            new_scores = np.minimum(100.0, new_totals * multiplier)
+        levels = _level_codes(new_scores, smoke, thresholds)
+        notify = vector_scoring.should_notify(perturbed, new_scores, profile_ids)
+        counts[name] = [
+            int((levels > base_levels).sum()),
+            int((levels < base_levels).sum()),
+            float(np.abs(new_scores - final_scores).sum()),
+            int((notify != base_notify).sum()),
+        ]
+    return counts
+
+
+def _factor_report(counts: Sequence[float], samples: int) -> Dict[str, Any]:
+    up, down, delta, notify = counts
+    return {
+        "flip_rate": round((up + down) / samples, 5),
+        "up_rate": round(up / samples, 5),
+        "down_rate": round(down / samples, 5),
+        "mean_abs_delta": round(delta / samples, 4),
+        "notify_flip_rate": round(notify / samples, 5),
+    }
+
+
+def _merge(totals: Dict[str, Any], part: Mapping[str, Any]):
+    for key, value in part.items():
+        if isinstance(value, list):
+            current = totals.setdefault(key, [0] * len(value))
+            totals[key] = [a + b for a, b in zip(current, value)]
+        else:
+            totals[key] = totals.get(key, 0) + value
+
+
+def run_sensitivity(samples: int = SAMPLES_PER_PROFILE, seed: int = 0, workers: int = 1,
+                    noise: Optional[Mapping[str, float]] = None, thresholds: Optional[Mapping[str, float]] = None,
+                    profiles: Sequence[int] = PROFILE_IDS, chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+    """Rapport de sensibilité : par profil, par facteur bruité, et global"""
+    noise = dict(NOISE if noise is None else noise)
+    thresholds = dict(thresholds) if thresholds else None
+    start = time.perf_counter()
+    tasks = [(seed, profile_id, index, min(chunk_size, samples - index * chunk_size), noise, thresholds)
+             for profile_id in profiles for index in range(math.ceil(samples / chunk_size))]
+    by_profile: Dict[int, Dict[str, Any]] = {}
+    overall: Dict[str, Any] = {}
+    for task, part in zip(tasks, map_tasks(sensitivity_chunk, tasks, workers)):
+        _merge(by_profile.setdefault(task[1], {}), part)
+        _merge(overall, part)
+    elapsed = time.perf_counter() - start
+
+    def section(totals: Mapping[str, Any]) -> Dict[str, Any]:
+        return {
+            "samples": totals["samples"],
+            "distribution": dict(zip(LEVELS, totals["levels"])),
+            "factors": {factor: _factor_report(totals[factor], totals["samples"]) for factor in noise},
+            COMBINED: _factor_report(totals[COMBINED], totals["samples"]),
+        }
+
+    report = section(overall) if overall else {"samples": 0}
+    if overall:
+        report["ranking"] = sorted(noise, key=lambda factor: -report["factors"][factor]["flip_rate"])
+    report.update(
+        seed=seed,
+        noise=noise,
+        thresholds=thresholds or get_predictor().RISK_THRESHOLDS,
+        workers=workers,
+        elapsed_s=round(elapsed, 3),
+        samples_per_sec=round(report["samples"] / elapsed, 1) if elapsed > 0 else None,
+        profiles={str(profile_id): section(totals) for profile_id, totals in by_profile.items()},
+    )
+    return report
+
+
+def _parse_pairs(pairs: Optional[List[str]], allowed) -> Dict[str, float]:
+    values = {}
+    for pair in pairs or []:
+        name, _, value = pair.partition("=")
+        if name not in allowed or not value:
+            raise argparse.ArgumentTypeError(f"{pair!r} : attendu nom=valeur parmi {', '.join(allowed)}")
+        values[name] = float(value)
+    return values
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Robustesse Monte Carlo RESPIRIA AI (bruit capteur)")
+    parser.add_argument("--samples", type=int, default=SAMPLES_PER_PROFILE, help="Lectures par profil")
+    parser.add_argument("--seed", type=int, default=0, help="Graine")
+    parser.add_argument("--workers", type=int, default=None, help="Processus (défaut : nombre de cœurs)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Lectures par tranche")
+    parser.add_argument("--profile", type=int, action="append", choices=PROFILE_IDS,
+                        help="Profil à analyser (répétable ; défaut : tous)")
+    parser.add_argument("--noise", action="append", metavar="FACTEUR=AMPLITUDE",
+                        help="Amplitude de bruit (répétable), ex. spo2=2")
+    parser.add_argument("--threshold", action="append", metavar="NIVEAU=SEUIL",
+                        help="Seuil candidat (répétable), ex. medium=55")
+    parser.add_argument("-o", "--output", help="Rapport JSON (défaut : sortie standard)")
+    args = parser.parse_args(argv)
+
+    try:
+        noise = dict(NOISE, **_parse_pairs(args.noise, NOISE))
+        thresholds = _parse_pairs(args.threshold, ("low", "medium", "high"))
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    if thresholds:
+        thresholds = dict(get_predictor().RISK_THRESHOLDS, **thresholds)
+    workers = args.workers or os.cpu_count() or 1
+
+    report = run_sensitivity(args.samples, args.seed, workers, noise, thresholds,
+                             args.profile or PROFILE_IDS, max(1, args.chunk_size))
+    text = json.dumps(report, indent=2, ensure_ascii=False) + "\n"
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+    log = sys.stderr
+    print(f"🎲 {report['samples']} lectures en {report['elapsed_s']} s "
+          f"({report['samples_per_sec']} /s, {workers} processus)", file=log)
+    for factor in report["ranking"]:
+        stats = report["factors"][factor]
+        print(f"  {factor:<18} ±{noise[factor]:<6g} basculement={stats['flip_rate']:.3%}  "
+              f"notification={stats['notify_flip_rate']:.3%}", file=log)
+    print(f"  {'tous':<18} {'':<7} basculement={report[COMBINED]['flip_rate']:.3%}", file=log)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
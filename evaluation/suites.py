@@ -0,0 +1,81 @@
+# evaluation/suites.py
+"""
+Chargement des suites de scénarios existantes sous une forme commune
+
+Chaque scénario : {"suite", "name", "data", "expected"} où expected peut
+contenir risk_level, should_notify, min_score, max_score,
+critical_factors, immediate_actions et ambiguous (vide = non étiqueté).
+
+Suites : realistic (test_realistic_precision.py), precision
+(test_precision.py), model_accuracy (test_model_accuracy.py), profiles
+(test_all_profiles.py, chaque scénario × chaque profil) et standards
+(evaluate_standards.py, 200 scénarios aléatoires).
+"""
+
+import os
+import sys
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+Scenario = Dict[str, Any]
+
+# Bornes des tirages aléatoires (incluses), comme evaluate_standards.py
+RANDOM_RANGES = {
+    "spo2": (82, 100),
+    "heart_rate": (55, 145),
+    "respiratory_rate": (10, 40),
+    "aqi": (10, 400),
+    "pollen_level": (1, 5),
+    "temperature": (-5, 42),
+    "humidity": (20, 95),
+}
+SMOKE_RATE = 0.15
+MEDICATION_RATE = 0.7
+
+
+def _scenario(suite: str, name: str, data: Dict, expected: Dict) -> Scenario:
+    return {"suite": suite, "name": name, "data": data, "expected": expected}
+
+
+def realistic() -> List[Scenario]:
+    from test_realistic_precision import generate_realistic_scenarios
+    return [_scenario("realistic", s["name"], s["data"],
+                      {"risk_level": s["expected_level"], "ambiguous": s.get("ambiguous", False)})
+            for s in generate_realistic_scenarios()]
+
+
+def precision() -> List[Scenario]:
+    from test_precision import SCENARIOS
+    return [_scenario("precision", s["name"], s["data"], s["expected"]) for s in SCENARIOS]
+
+
+def model_accuracy() -> List[Scenario]:
+    from test_model_accuracy import TEST_SCENARIOS
+    return [_scenario("model_accuracy", s["name"], s["data"], s["expected"]) for s in TEST_SCENARIOS]
+
+
+def profiles() -> List[Scenario]:
+    from test_all_profiles import PROFILES, SCENARIOS
+    return [_scenario("profiles", f"{s['name']} / profil {profile_id}", dict(s["data"], profile_id=profile_id), {})
+            for s in SCENARIOS for profile_id in PROFILES]
+
+
+def standards() -> List[Scenario]:
+    from evaluate_standards import generate_standard_scenarios
+    return [_scenario("standards", f"aléatoire #{i}", data, {})
+            for i, data in enumerate(generate_standard_scenarios())]
+
+
+SUITES: Dict[str, Callable[[], List[Scenario]]] = {
+    "realistic": realistic,
+    "precision": precision,
+    "model_accuracy": model_accuracy,
+    "profiles": profiles,
+    "standards": standards,
+}
+
+
+def load_suites(names=None) -> Dict[str, List[Scenario]]:
+    """{suite: scénarios} pour les suites demandées (toutes par défaut)"""
+    return {name: SUITES[name]() for name in (names or SUITES)}
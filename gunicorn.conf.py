@@ -0,0 +1,44 @@
+# gunicorn.conf.py
+"""
+Configuration gunicorn RESPIRIA AI (chargée automatiquement : gunicorn api.app:app)
+
+Par défaut les services (collecteur, moteur IA) sont créés dans chaque
+worker juste après le fork : la première requête ne paie pas leur
+initialisation et le processus maître reste léger.
+
+RESPIRIA_PRELOAD=true : l'application et le moteur IA (tables de messages,
+de règles et de barèmes) sont chargés une seule fois dans le maître puis
+partagés par fork (copy-on-write) entre les workers.
+"""
+
+import gc
+import os
+
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+preload_app = os.environ.get("RESPIRIA_PRELOAD", "false").lower() == "true"
+
+
+def when_ready(server):
+    if preload_app:
+        # Le collecteur (connexions HTTP) reste créé par worker, après le fork
+        from api.app import get_predictor
+        get_predictor()
+        # Objets du maître gelés : le ramasse-miettes des workers ne touche plus
+        # leurs pages, qui restent partagées
+        gc.collect()
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    from api.app import init_services
+    init_services()
+
+
+def worker_exit(server, worker):
+    # Envoie les derniers risques en attente vers Ubidots avant l'arrêt du worker
+    from api.ubidots_writeback import get_writeback
+    writeback = get_writeback()
+    if writeback is not None:
+        writeback.stop()
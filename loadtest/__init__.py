@@ -0,0 +1,5 @@
+# loadtest/__init__.py
+"""
+Outils de test de charge RESPIRIA AI
+Services simulés (backend + Ubidots) pour travailler hors ligne
+"""
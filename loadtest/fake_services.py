@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+# loadtest/fake_services.py
+"""
+SERVICES SIMULÉS - Backend RESPIRIA + Ubidots v1.6
+==================================================
+
+Serveur HTTP local (bibliothèque standard uniquement) qui remplace
+respira-backend.onrender.com et industrial.api.ubidots.com pour les tests
+hors ligne et les tests de charge de api/app.py.
+
+Chaque route accepte une configuration :
+  - latence : constant / uniform / normal / lognormal / pareto
+  - taux d'erreur HTTP (error_rate, error_status)
+  - taux de "timeout" (la réponse dépasse le timeout client)
+  - surcharge du payload JSON
+
+Usage:
+  python -m loadtest.fake_services --port 8765
+  python -m loadtest.fake_services --config loadtest/profiles/slow_backend.json
+
+Puis pointer l'API dessus :
+  RESPIRIA_BACKEND_URL=http://127.0.0.1:8765/api/v1
+  UBIDOTS_API_URL=http://127.0.0.1:8765/api/v1.6
+  UBIDOTS_TOKEN=fake-token
+"""
+
+import argparse
+import copy
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+DATASOURCE_ID = "696c16da6b8f94fd52f77962"
+DEVICE_LABEL = "bracelet"
+
+
+# ==========================================
+# PAYLOADS PAR DÉFAUT
+# ==========================================
+
+DEFAULT_PAYLOADS = {
+    "weather": {
+        "temperature": 29.0, "humidity": 78.0, "feels_like": 32.0,
+        "pressure": 1009, "wind_speed": 12.0, "weather_main": "Clouds",
+        "description": "nuageux", "country": "CI",
+    },
+    "air_quality": {
+        "aqi": 87, "quality_level": "Moyenne", "main_pollutant": "pm25",
+        "pollutants": {"pm25": 28.0, "pm10": 41.0, "no2": 20.0, "o3": 60.0, "co": 1.0},
+        "health_recommendations": [],
+    },
+    "max30102": {"spo2": 96.0, "heart_rate": 82.0},
+    "dht11": {"temperature": 28.5, "humidity": 74.0},
+    "cjmcu811": {"eco2": 950, "tvoc": 120},
+    "prediction_data": {
+        "sensors": {"spo2": 96.0, "heart_rate": 82.0, "respiratory_rate": 17.0, "smoke_detected": False},
+        "weather": {"temperature": 29.0, "humidity": 78.0},
+        "air_quality": {"aqi": 87},
+    },
+    "ubidots_variables": {
+        "spo2": 96.0, "bpm": 82.0, "temperature": 28.5,
+        "humidity": 74.0, "eco2": 950.0, "tvoc": 120.0,
+    },
+}
+
+# Configuration par défaut : aucune latence ni erreur
+DEFAULT_ROUTE_CONFIG = {
+    "latency": {"distribution": "constant", "ms": 0},
+    "error_rate": 0.0,
+    "error_status": 503,
+    "timeout_rate": 0.0,
+    "timeout_ms": 5000,
+}
+
+
+class LatencyModel:
+    """Tire des latences (secondes) selon une distribution configurée"""
+
+    def __init__(self, spec: Dict, rng: random.Random):
+        self.spec = spec
+        self.rng = rng
+        self.kind = spec.get("distribution", "constant")
+
+    def sample(self) -> float:
+        spec, rng = self.spec, self.rng
+        if self.kind == "constant":
+            ms = spec.get("ms", 0)
+        elif self.kind == "uniform":
+            ms = rng.uniform(spec.get("min_ms", 0), spec.get("max_ms", 0))
+        elif self.kind == "normal":
+            ms = rng.gauss(spec.get("mean_ms", 0), spec.get("stdev_ms", 0))
+        elif self.kind == "lognormal":
+            # median_ms = exp(mu) ; sigma contrôle la longueur de la queue
+            ms = rng.lognormvariate(math.log(max(spec.get("median_ms", 1), 1e-3)), spec.get("sigma", 0.5))
+        elif self.kind == "pareto":
+            # Queue lourde : scale_ms * Pareto(alpha)
+            ms = spec.get("scale_ms", 1) * rng.paretovariate(spec.get("alpha", 2.0))
+        else:
+            raise ValueError(f"Distribution inconnue: {self.kind}")
+        ms = min(max(ms, 0.0), spec.get("cap_ms", 60000))
+        return ms / 1000.0
+
+
+class FakeServicesState:
+    """État partagé : configuration, données Ubidots, compteurs"""
+
+    def __init__(self, config: Optional[Dict] = None, seed: int = 42):
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.counters: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.writes = []
+        self.configure(config or {})
+
+    def configure(self, config: Dict):
+        """Applique une configuration {default: {...}, routes: {nom: {...}}, payloads: {...}}"""
+        with self.lock:
+            self.config = config
+            self.default = {**DEFAULT_ROUTE_CONFIG, **config.get("default", {})}
+            self.routes = {
+                name: {**self.default, **route_cfg}
+                for name, route_cfg in config.get("routes", {}).items()
+            }
+            self.latency_models: Dict[str, LatencyModel] = {}
+            self.payloads = copy.deepcopy(DEFAULT_PAYLOADS)
+            for name, payload in config.get("payloads", {}).items():
+                if isinstance(payload, dict) and isinstance(self.payloads.get(name), dict):
+                    self.payloads[name].update(payload)
+                else:
+                    self.payloads[name] = payload
+            self.ubidots_values = {
+                label: {"value": float(value), "timestamp": int(time.time() * 1000)}
+                for label, value in self.payloads["ubidots_variables"].items()
+            }
+
+    def route_config(self, route: str) -> Dict:
+        return self.routes.get(route, self.default)
+
+    def latency_for(self, route: str) -> float:
+        cfg = self.route_config(route)
+        model = self.latency_models.get(route)
+        if model is None:
+            model = self.latency_models[route] = LatencyModel(cfg["latency"], self.rng)
+        with self.lock:
+            return model.sample()
+
+    def roll(self, probability: float) -> bool:
+        if probability <= 0:
+            return False
+        with self.lock:
+            return self.rng.random() < probability
+
+    def count(self, route: str, error: bool = False):
+        with self.lock:
+            self.counters[route] = self.counters.get(route, 0) + 1
+            if error:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+    def record_write(self, device: str, body: Dict):
+        """Mémorise une écriture Ubidots et met à jour les dernières valeurs"""
+        now_ms = int(time.time() * 1000)
+        with self.lock:
+            self.writes.append({"device": device, "body": body, "received_at": now_ms})
+            for label, value in body.items():
+                if isinstance(value, dict):
+                    value = value.get("value")
+                try:
+                    self.ubidots_values[label] = {"value": float(value), "timestamp": now_ms}
+                except (TypeError, ValueError):
+                    continue
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {"requests": dict(self.counters), "errors": dict(self.errors), "writes": len(self.writes)}
+
+
+# ==========================================
+# ROUTAGE
+# ==========================================
+
+UBIDOTS_VAR_PREFIX = "var-"
+
+ROUTES = [
+    ("GET", re.compile(r"^/api/v1/environment/weather/?$"), "weather"),
+    ("GET", re.compile(r"^/api/v1/environment/air-quality/?$"), "air_quality"),
+    ("GET", re.compile(r"^/api/v1/sensors/data/(max30102|dht11|cjmcu811)/?$"), "sensors"),
+    ("GET", re.compile(r"^/api/v1/sensors/ubidots/max30102/?$"), "sensors_ubidots"),
+    ("GET", re.compile(r"^/api/v1/sensors/latest/?$"), "sensors_latest"),
+    ("GET", re.compile(r"^/api/v1/ai/prediction-data/?$"), "prediction_data"),
+    ("GET", re.compile(r"^/api/v1\.6/devices/?$"), "ubidots_devices"),
+    ("GET", re.compile(r"^/api/v1\.6/(?:devices|datasources)/([^/]+)/variables/?$"), "ubidots_variables"),
+    ("GET", re.compile(r"^/api/v1\.6/(?:devices|datasources)/([^/]+)/?$"), "ubidots_device"),
+    ("GET", re.compile(r"^/api/v1\.6/variables/([^/]+)/values/?$"), "ubidots_values"),
+    ("POST", re.compile(r"^/api/v1\.6/devices/([^/]+)/?$"), "ubidots_write"),
+    ("POST", re.compile(r"^/api/v1\.6/devices/?$"), "ubidots_bulk_write"),
+]
+
+
+def match_route(method: str, path: str) -> Tuple[Optional[str], Tuple]:
+    for route_method, pattern, name in ROUTES:
+        if route_method != method:
+            continue
+        match = pattern.match(path)
+        if match:
+            return name, match.groups()
+    return None, ()
+
+
+class FakeServicesHandler(BaseHTTPRequestHandler):
+    """Gestionnaire HTTP : latence/erreurs simulées puis payload JSON"""
+
+    server_version = "RespiriaFakeServices/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def state(self) -> FakeServicesState:
+        return self.server.state  # type: ignore[attr-defined]
+
+    def log_message(self, format, *args):  # noqa: A002 - signature imposée
+        if getattr(self.server, "verbose", False):
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str):
+        parsed = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        body = self._read_body()
+
+        # Routes de contrôle (sans latence simulée)
+        if parsed.path == "/__stats__":
+            return self._send(200, self.state.stats())
+        if parsed.path == "/__writes__":
+            with self.state.lock:
+                return self._send(200, {"results": list(self.state.writes)})
+        if parsed.path == "/__config__" and method == "POST":
+            self.state.configure(body or {})
+            return self._send(200, {"status": "configured"})
+
+        route, args = match_route(method, parsed.path)
+        if route is None:
+            return self._send(404, {"detail": "Not found."})
+
+        cfg = self.state.route_config(route)
+        delay = self.state.latency_for(route)
+        if self.state.roll(cfg["timeout_rate"]):
+            delay = max(delay, cfg["timeout_ms"] / 1000.0)
+        if delay:
+            time.sleep(delay)
+
+        if self.state.roll(cfg["error_rate"]):
+            self.state.count(route, error=True)
+            return self._send(cfg["error_status"], {"detail": "Simulated upstream error"})
+
+        self.state.count(route)
+        status, payload = getattr(self, f"_route_{route}")(query, body, *args)
+        self._send(status, payload)
+
+    # --- Backend RESPIRIA ---
+
+    def _route_weather(self, query, body):
+        payload = dict(self.state.payloads["weather"])
+        payload.setdefault("city", query.get("city", "Abidjan"))
+        return 200, payload
+
+    def _route_air_quality(self, query, body):
+        payload = dict(self.state.payloads["air_quality"])
+        payload.setdefault("city", query.get("city", "Abidjan"))
+        return 200, payload
+
+    def _route_sensors(self, query, body, sensor):
+        return 200, dict(self.state.payloads[sensor])
+
+    def _route_sensors_ubidots(self, query, body):
+        reading = dict(self.state.payloads["max30102"])
+        reading.update(device_id=DATASOURCE_ID, timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        return 200, {"data": [reading]}
+
+    def _route_sensors_latest(self, query, body):
+        return 200, {"dht11": dict(self.state.payloads["dht11"]),
+                     "cjmcu811": dict(self.state.payloads["cjmcu811"])}
+
+    def _route_prediction_data(self, query, body):
+        return 200, copy.deepcopy(self.state.payloads["prediction_data"])
+
+    # --- Ubidots v1.6 ---
+
+    def _device(self) -> Dict:
+        with self.state.lock:
+            values = dict(self.state.ubidots_values)
+        device = {"id": DATASOURCE_ID, "label": DEVICE_LABEL, "name": DEVICE_LABEL,
+                  "variables_number": len(values)}
+        for label, last_value in values.items():
+            device[label] = {"id": UBIDOTS_VAR_PREFIX + label, "last_value": last_value}
+        return device
+
+    def _route_ubidots_devices(self, query, body):
+        return 200, {"count": 1, "results": [self._device()]}
+
+    def _route_ubidots_device(self, query, body, device_id):
+        if device_id not in (DATASOURCE_ID, DEVICE_LABEL):
+            return 404, {"detail": "Not found."}
+        device = self._device()
+        device["number_of_variables"] = device["variables_number"]
+        return 200, device
+
+    def _route_ubidots_variables(self, query, body, device_id):
+        if device_id not in (DATASOURCE_ID, DEVICE_LABEL):
+            return 404, {"detail": "Not found."}
+        with self.state.lock:
+            labels = list(self.state.ubidots_values)
+        results = [{"id": UBIDOTS_VAR_PREFIX + label, "label": label, "name": label} for label in labels]
+        return 200, {"count": len(results), "results": results}
+
+    def _route_ubidots_values(self, query, body, var_id):
+        label = var_id[len(UBIDOTS_VAR_PREFIX):] if var_id.startswith(UBIDOTS_VAR_PREFIX) else var_id
+        with self.state.lock:
+            last_value = self.state.ubidots_values.get(label)
+        if last_value is None:
+            return 404, {"detail": "Not found."}
+        return 200, {"count": 1, "results": [dict(last_value)]}
+
+    def _route_ubidots_write(self, query, body, device_label):
+        self.state.record_write(device_label, body or {})
+        return 200, {label: [{"status_code": 201}] for label in (body or {})}
+
+    def _route_ubidots_bulk_write(self, query, body):
+        for device_label, values in (body or {}).items():
+            self.state.record_write(device_label, values or {})
+        return 200, {"status": "ok", "devices": len(body or {})}
+
+    # --- Utilitaires ---
+
+    def _read_body(self) -> Optional[Dict]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return None
+        raw = self.rfile.read(length)
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    def _send(self, status: int, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # Le client a abandonné (timeout) - comportement attendu
+            pass
+
+
+class _FakeServicesServer(ThreadingHTTPServer):
+    # File d'attente d'écoute large : le collecteur ouvre une connexion par appel,
+    # la valeur par défaut (5) provoque des SYN perdus et des latences de 1s parasites
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class FakeServices:
+    """
+    Serveur de services simulés, utilisable comme context manager
+
+    Exemple:
+        with FakeServices({"routes": {"weather": {"latency": {...}}}}) as fake:
+            collector = RespiriaDataCollector(base_url=fake.backend_url)
+    """
+
+    def __init__(self, config: Optional[Dict] = None, host: str = "127.0.0.1",
+                 port: int = 0, seed: int = 42, verbose: bool = False):
+        self.state = FakeServicesState(config, seed)
+        self.server = _FakeServicesServer((host, port), FakeServicesHandler)
+        self.server.state = self.state  # type: ignore[attr-defined]
+        self.server.verbose = verbose  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def backend_url(self) -> str:
+        return f"{self.url}/api/v1"
+
+    @property
+    def ubidots_url(self) -> str:
+        return f"{self.url}/api/v1.6"
+
+    def configure(self, config: Dict):
+        self.state.configure(config)
+
+    def start(self) -> "FakeServices":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-services", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "FakeServices":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def load_config(path: Optional[str]) -> Dict:
+    if not path:
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Services simulés backend RESPIRIA + Ubidots")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--config", help="Fichier JSON (latences, erreurs, payloads)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("-v", "--verbose", action="store_true", help="Journal de chaque requête")
+    args = parser.parse_args(argv)
+
+    fake = FakeServices(load_config(args.config), args.host, args.port, args.seed, args.verbose)
+    print(f"🧪 Services simulés sur {fake.url}")
+    print(f"   RESPIRIA_BACKEND_URL={fake.backend_url}")
+    print(f"   UBIDOTS_API_URL={fake.ubidots_url}")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
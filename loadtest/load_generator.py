@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# loadtest/load_generator.py
+"""
+GÉNÉRATEUR DE CHARGE - RESPIRIA AI
+==================================
+
+Charge en boucle ouverte (open-loop) : les requêtes sont planifiées à un
+débit cible (arrivées de Poisson), indépendamment des réponses. La latence
+est mesurée depuis l'instant PRÉVU d'envoi, ce qui évite l'omission
+coordonnée : une API saturée fait exploser les percentiles au lieu de
+ralentir silencieusement le générateur.
+
+Trafic par utilisateur simulé (user_id, profil, ville) réparti sur :
+  POST /api/v1/predict, GET /api/v1/dashboard,
+  GET /api/v1/environment, POST /api/v1/predict/realtime
+
+Usage:
+  # API déjà lancée (ex: gunicorn) pointée sur les services simulés
+  python -m loadtest.load_generator --target http://127.0.0.1:5000 --rps 50 --duration 30
+
+  # Paliers pour trouver la saturation
+  python -m loadtest.load_generator --target http://127.0.0.1:5000 --rps 25,50,100,200 --duration 20
+
+  # Tout en local (services simulés + Flask dans ce processus)
+  python -m loadtest.load_generator --local --rps 50 --duration 10
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+
+from api.histogram import HdrHistogram  # noqa: E402
+
+
+CITIES = ["Abidjan", "Bouaké", "Yamoussoukro", "San-Pédro", "Korhogo"]
+
+# Répartition du trafic (poids relatifs)
+DEFAULT_MIX = {
+    "predict": 50,
+    "dashboard": 25,
+    "environment": 15,
+    "realtime": 10,
+}
+
+# Saturation : débit obtenu < 95% du débit réellement offert
+SATURATION_RATIO = 0.95
+
+
+class SimulatedUser:
+    """Utilisateur simulé : identité stable, ville et profil fixes"""
+
+    def __init__(self, index: int, rng: random.Random):
+        self.user_id = f"load-user-{index:05d}"
+        self.profile_id = rng.randint(0, 3)
+        self.location = rng.choice(CITIES)
+        self.medication_taken = rng.random() < 0.8
+
+    def request(self, endpoint: str, rng: random.Random) -> Dict:
+        """Paramètres (méthode, chemin, corps) d'une requête de cet utilisateur"""
+        if endpoint == "predict":
+            body = {"user_id": self.user_id, "profile_id": self.profile_id,
+                    "location": self.location, "medication_taken": self.medication_taken}
+            if rng.random() < 0.3:
+                body["sensor_data"] = {"spo2": round(rng.uniform(88, 99), 1),
+                                       "heart_rate": rng.randint(60, 130)}
+            return {"method": "POST", "path": "/api/v1/predict", "json": body}
+        if endpoint == "dashboard":
+            return {"method": "GET", "path": "/api/v1/dashboard",
+                    "params": {"user_id": self.user_id, "location": self.location}}
+        if endpoint == "environment":
+            return {"method": "GET", "path": "/api/v1/environment",
+                    "params": {"location": self.location}}
+        if endpoint == "realtime":
+            return {"method": "POST", "path": "/api/v1/predict/realtime",
+                    "json": {"user_id": self.user_id, "profile_id": self.profile_id}}
+        raise ValueError(f"Endpoint inconnu: {endpoint}")
+
+
+class EndpointStats:
+    """Histogramme (µs) et compteurs d'un endpoint"""
+
+    def __init__(self):
+        self.histogram = HdrHistogram()
+        self.errors = 0
+        self.status_codes: Dict[int, int] = {}
+        self.lock = threading.Lock()
+
+    def record(self, latency_us: int, status: Optional[int]):
+        with self.lock:
+            self.histogram.record(latency_us)
+            if status is None or status >= 500:
+                self.errors += 1
+            key = status if status is not None else 0
+            self.status_codes[key] = self.status_codes.get(key, 0) + 1
+
+
+class LoadGenerator:
+    """
+    Générateur open-loop à débit constant
+
+    Args:
+        target: URL de base de l'API (http://host:port)
+        users: Nombre d'utilisateurs simulés
+        mix: Poids par endpoint
+        max_workers: Requêtes simultanées maximales
+        timeout: Timeout HTTP (s)
+        seed: Graine (trafic reproductible)
+    """
+
+    def __init__(self, target: str, users: int = 200, mix: Optional[Dict[str, int]] = None,
+                 max_workers: int = 64, timeout: float = 10.0, seed: int = 1):
+        self.target = target.rstrip("/")
+        self.rng = random.Random(seed)
+        self.users = [SimulatedUser(i, self.rng) for i in range(users)]
+        self.mix = mix or DEFAULT_MIX
+        self.endpoints = list(self.mix)
+        self.weights = [self.mix[e] for e in self.endpoints]
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _send(self, endpoint: str, spec: Dict, scheduled_ns: int, stats: Dict[str, EndpointStats]):
+        status = None
+        try:
+            response = self._session().request(
+                spec["method"], self.target + spec["path"],
+                params=spec.get("params"), json=spec.get("json"), timeout=self.timeout)
+            status = response.status_code
+        except requests.RequestException:
+            status = None
+        latency_us = (time.perf_counter_ns() - scheduled_ns) // 1000
+        stats[endpoint].record(latency_us, status)
+
+    def run(self, rps: float, duration: float, poisson: bool = True) -> Dict:
+        """Exécute un palier de charge et retourne le rapport"""
+        stats = {endpoint: EndpointStats() for endpoint in self.endpoints}
+        interval_ns = 1e9 / rps
+        start_ns = time.perf_counter_ns()
+        end_ns = start_ns + int(duration * 1e9)
+        next_ns = float(start_ns)
+        sent = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while next_ns < end_ns:
+                now_ns = time.perf_counter_ns()
+                if next_ns > now_ns:
+                    time.sleep((next_ns - now_ns) / 1e9)
+
+                endpoint = self.rng.choices(self.endpoints, self.weights)[0]
+                user = self.rng.choice(self.users)
+                spec = user.request(endpoint, self.rng)
+                executor.submit(self._send, endpoint, spec, int(next_ns), stats)
+                sent += 1
+
+                gap = self.rng.expovariate(1.0) * interval_ns if poisson else interval_ns
+                next_ns += gap
+
+        elapsed = (time.perf_counter_ns() - start_ns) / 1e9
+        return build_report(stats, rps, duration, elapsed, sent)
+
+
+def build_report(stats: Dict[str, EndpointStats], rps: float, duration: float,
+                 elapsed: float, sent: int) -> Dict:
+    """Rapport par endpoint (latences en ms) + total"""
+    total = HdrHistogram()
+    endpoints = {}
+    errors = 0
+
+    for endpoint, endpoint_stats in stats.items():
+        histogram = endpoint_stats.histogram
+        total.merge(histogram)
+        errors += endpoint_stats.errors
+        endpoints[endpoint] = {
+            "requests": histogram.total_count,
+            "errors": endpoint_stats.errors,
+            "throughput_rps": round(histogram.total_count / elapsed, 1) if elapsed else 0.0,
+            "status_codes": {str(k): v for k, v in sorted(endpoint_stats.status_codes.items())},
+            "latency_ms": _to_ms(histogram.summary()),
+        }
+
+    throughput = total.total_count / elapsed if elapsed else 0.0
+    offered = sent / duration if duration else 0.0
+    return {
+        "target_rps": rps,
+        "duration_s": duration,
+        "elapsed_s": round(elapsed, 2),
+        "sent": sent,
+        "completed": total.total_count,
+        "errors": errors,
+        "offered_rps": round(offered, 1),
+        "throughput_rps": round(throughput, 1),
+        "saturated": throughput < offered * SATURATION_RATIO,
+        "latency_ms": _to_ms(total.summary()),
+        "endpoints": endpoints,
+    }
+
+
+def _to_ms(summary: Dict) -> Dict:
+    return {key: (value if key == "count" else round(value / 1000.0, 2)) for key, value in summary.items()}
+
+
+def print_report(report: Dict):
+    latency = report["latency_ms"]
+    flag = "🔴 SATURÉ" if report["saturated"] else "🟢"
+    print(f"\n📈 {report['target_rps']:g} req/s visés ({report['offered_rps']:g} offerts) → "
+          f"{report['throughput_rps']:g} req/s obtenus "
+          f"({report['completed']}/{report['sent']}, {report['errors']} erreurs) {flag}")
+    print(f"   {'endpoint':<12} {'req/s':>8} {'err':>5} {'p50':>9} {'p95':>9} {'p99':>9} {'p99.9':>9} {'max':>9}")
+    rows = list(report["endpoints"].items()) + [("TOTAL", {**report, "latency_ms": latency})]
+    for name, data in rows:
+        lat = data["latency_ms"]
+        print(f"   {name:<12} {data['throughput_rps']:>8.1f} {data['errors']:>5} "
+              f"{lat['p50']:>7.1f}ms {lat['p95']:>7.1f}ms {lat['p99']:>7.1f}ms "
+              f"{lat['p99.9']:>7.1f}ms {lat['max']:>7.1f}ms")
+
+
+def start_local_target(config: Optional[Dict] = None):
+    """
+    Services simulés + API Flask (serveur werkzeug multi-thread) dans ce processus
+
+    Returns:
+        (url de l'API, fonction d'arrêt)
+    """
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    from loadtest.fake_services import FakeServices
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    fake = FakeServices(config).start()
+    os.environ["RESPIRIA_BACKEND_URL"] = fake.backend_url
+    os.environ["UBIDOTS_API_URL"] = fake.ubidots_url
+    os.environ.setdefault("UBIDOTS_TOKEN", "fake-token")
+
+    from api import app as app_module
+    from api import data_collector
+    data_collector.UBIDOTS_API_URL = fake.ubidots_url
+    data_collector.UBIDOTS_TOKEN = os.environ["UBIDOTS_TOKEN"]
+    app_module.collector = data_collector.RespiriaDataCollector(base_url=fake.backend_url)
+
+    server = make_server("127.0.0.1", 0, app_module.app, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def stop():
+        server.shutdown()
+        fake.stop()
+
+    return f"http://127.0.0.1:{server.server_port}", stop
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """'predict=60,dashboard=40' -> {'predict': 60, 'dashboard': 40}"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = int(weight)
+    return mix
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Générateur de charge open-loop RESPIRIA AI")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--target", help="URL de l'API (ex: http://127.0.0.1:5000)")
+    target.add_argument("--local", action="store_true",
+                        help="Lance services simulés + Flask dans ce processus")
+    parser.add_argument("--rps", default="20", help="Débit(s) visé(s), ex: 25,50,100")
+    parser.add_argument("--duration", type=float, default=10.0, help="Durée par palier (s)")
+    parser.add_argument("--users", type=int, default=200, help="Utilisateurs simulés")
+    parser.add_argument("--workers", type=int, default=64, help="Requêtes simultanées max")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Timeout HTTP (s)")
+    parser.add_argument("--mix", type=parse_mix, default=None, help="Ex: predict=60,dashboard=40")
+    parser.add_argument("--constant", action="store_true", help="Arrivées régulières (pas Poisson)")
+    parser.add_argument("--fake-config", help="Configuration des services simulés (--local)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("-o", "--output", help="Rapport JSON")
+    args = parser.parse_args(argv)
+
+    stop = None
+    if args.local:
+        from loadtest.fake_services import load_config
+        url, stop = start_local_target(load_config(args.fake_config))
+    else:
+        url = args.target
+
+    generator = LoadGenerator(url, args.users, args.mix, args.workers, args.timeout, args.seed)
+    steps = [float(r) for r in args.rps.split(",")]
+    print(f"🚀 Charge open-loop sur {url} - paliers {steps} req/s, {args.duration:g}s chacun")
+
+    reports = []
+    try:
+        for rps in steps:
+            report = generator.run(rps, args.duration, poisson=not args.constant)
+            print_report(report)
+            reports.append(report)
+    finally:
+        if stop:
+            stop()
+
+    saturated = [r["target_rps"] for r in reports if r["saturated"]]
+    if saturated:
+        print(f"\n🔴 Saturation à partir de {min(saturated):g} req/s")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"target": url, "steps": reports}, f, indent=2)
+        print(f"📄 Rapport : {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,8 +17,8 @@ except ImportError:
 
 from api.respiria_ai_predictor import RespiriaAIPredictor
 
-# Initialiser le moteur IA
-predictor = RespiriaAIPredictor()
+# Moteur IA, créé au premier test (SCENARIOS est aussi chargé par evaluation/)
+predictor = None
 
 # Profils utilisateurs
 PROFILES = {
@@ -138,6 +138,10 @@ def test_profile(profile_id: int, scenario: dict):
     data = scenario["data"].copy()
     data["profile_id"] = profile_id
     
+    global predictor
+    if predictor is None:
+        predictor = RespiriaAIPredictor()
+    
     # Faire la prédiction
     result = predictor.predict(data)
     
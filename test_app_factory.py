@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+TEST DE LA FABRIQUE D'APPLICATION - RESPIRIA AI
+===============================================
+
+Démarrage paresseux : aucun service créé à l'import, création au premier usage
+"""
+
+import subprocess
+import sys
+
+from api import app as app_module
+
+
+def test_import_creates_no_services():
+    """L'import seul ne construit ni collecteur ni moteur IA"""
+    code = ("import api.app as m; "
+            "assert m.app is not None; "
+            "assert m.collector is None and m.ai_predictor is None; "
+            "print(m.app.test_client().get('/health').get_json()['services']['ai_predictor'])")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert output.stdout.strip().splitlines()[-1] == "lazy"
+
+
+def test_create_app_registers_routes():
+    """Chaque appel à create_app() renvoie une application complète"""
+    flask_app = app_module.create_app()
+    assert flask_app is not app_module.app
+    rules = {rule.rule for rule in flask_app.url_map.iter_rules()}
+    assert {"/health", "/api/v1/predict", "/metrics"} <= rules
+
+
+def test_services_created_once():
+    """init_services() est idempotent ; les accesseurs créent à la demande"""
+    predictor = app_module.get_predictor()
+    app_module.init_services()
+    assert app_module.get_predictor() is predictor
+    assert app_module.get_collector() is app_module.collector
+
+
+if __name__ == "__main__":
+    test_import_creates_no_services()
+    test_create_app_registers_routes()
+    test_services_created_once()
+    print("✅ Fabrique d'application OK")
@@ -14,13 +14,14 @@ except ImportError:
     print("⚠️ Module 'requests' non installé. Installez avec: pip install requests")
 
 import json
+import os
 import time
 from datetime import datetime
 from api.respiria_ai_predictor import RespiriaAIPredictor
 
 # Configuration
-BACKEND_URL = "https://respira-backend.onrender.com/api/v1"
-AI_API_URL = "http://localhost:5000"
+BACKEND_URL = os.environ.get("RESPIRIA_BACKEND_URL", "https://respira-backend.onrender.com/api/v1")
+AI_API_URL = os.environ.get("ML_API_URL", "http://localhost:5000")
 
 class RespiriaBackendTester:
     """Testeur complet pour les APIs RESPIRIA Backend + IA"""
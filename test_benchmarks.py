@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+TEST DU HARNAIS DE BENCHMARK - RESPIRIA AI
+==========================================
+
+Vérifie les percentiles, le résumé statistique et la détection de régression
+"""
+
+from benchmarks.harness import compare_to_baseline, measure_memory, percentile, run_benchmark, summarize
+
+
+def test_percentile_interpolation():
+    """Percentiles par interpolation linéaire"""
+    samples = [10, 20, 30, 40, 50]
+    assert percentile(samples, 0) == 10
+    assert percentile(samples, 50) == 30
+    assert percentile(samples, 100) == 50
+    assert percentile(samples, 25) == 20
+    assert percentile([7], 99) == 7
+
+
+def test_summarize_inner_loops():
+    """Les durées sont ramenées à un appel"""
+    stats = summarize([1000, 2000, 3000], inner_loops=10)
+    assert stats["min_ns"] == 100
+    assert stats["max_ns"] == 300
+    assert stats["p50_ns"] == 200
+    assert stats["samples"] == 3
+
+
+def test_run_benchmark_counts_samples():
+    """Nombre d'échantillons et statistiques présentes"""
+    stats = run_benchmark(lambda: sum(range(10)), warmup=2, iterations=25)
+    assert stats["samples"] == 25
+    assert stats["p99_ns"] >= stats["p50_ns"] > 0
+
+
+def test_measure_memory():
+    """Pic transitoire mesuré, rien de retenu pour une fonction sans état"""
+    stats = measure_memory(lambda: [0] * 10000, calls=5)
+    assert stats["peak_bytes"] >= 10000 * 8
+    assert stats["retained_bytes"] < 1000
+
+    cache = []
+    leaking = measure_memory(lambda: cache.append(bytearray(4096)), calls=5)
+    assert leaking["retained_bytes"] >= 4096
+
+
+def test_regression_detection():
+    """Une dégradation au-delà du seuil est signalée"""
+    baseline = {"benchmarks": {"a": {"p50_ns": 100.0}, "b": {"p50_ns": 100.0}}}
+    results = {"a": {"p50_ns": 120.0}, "b": {"p50_ns": 200.0}, "new": {"p50_ns": 1.0}}
+
+    comparisons = {c["name"]: c for c in compare_to_baseline(results, baseline, threshold=0.25)}
+    assert not comparisons["a"]["regression"]
+    assert comparisons["b"]["regression"]
+    assert "new" not in comparisons
+
+    relaxed = compare_to_baseline(results, baseline, threshold=0.25, thresholds={"b": 1.5})
+    assert not any(c["regression"] for c in relaxed)
+
+
+if __name__ == "__main__":
+    test_percentile_interpolation()
+    test_summarize_inner_loops()
+    test_run_benchmark_counts_samples()
+    test_measure_memory()
+    test_regression_detection()
+    print("✅ Harnais de benchmark OK")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+TEST DE LA NOTATION EN MASSE - RESPIRIA AI
+==========================================
+
+NDJSON/CSV → NDJSON par tranches (api/bulk_scoring.py) : lecture paresseuse,
+colonnes du dataset, erreurs par ligne, endpoint streaming et CLI
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+
+from api import bulk_scoring
+from api.respiria_ai_predictor import RespiriaAIPredictor
+
+DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'respiria_dataset.csv')
+
+
+def _predictor():
+    with contextlib.redirect_stdout(io.StringIO()):
+        return RespiriaAIPredictor()
+
+
+def test_input_consumed_chunk_by_chunk():
+    """Le premier bloc sort après une tranche lue, pas après toute l'entrée"""
+    consumed = [0]
+
+    def lines():
+        for i in range(100000):
+            consumed[0] += 1
+            yield json.dumps({'id': i, 'spo2': 90 + i % 8, 'profile_id': i % 4}).encode() + b'\n'
+
+    stream = bulk_scoring.stream_ndjson(_predictor(), lines(), chunk_size=50)
+    first = next(stream)
+    assert len(first.splitlines()) == 50
+    assert consumed[0] <= 51
+    assert json.loads(first.splitlines()[0])['id'] == 0
+
+
+def test_csv_dataset_columns():
+    """Colonnes du dataset renommées ; même score que predict()"""
+    predictor = _predictor()
+    csv_body = (b"user_profile,heart_rate_bpm,spo2,temperature_c,humidity_percent,eco2_ppm,smoke_detected\n"
+                b"2,125.0,86.5,31.0,80.0,1200,false\n"
+                b"1,70,97,,50,400,yes\n")
+    blocks = list(bulk_scoring.stream_ndjson(predictor, io.BytesIO(csv_body), 'csv', chunk_size=10))
+    lines = [json.loads(line) for block in blocks for line in block.splitlines()]
+    assert lines[-1]['summary']['rows'] == 2
+    expected = predictor.predict({'profile_id': 2, 'heart_rate': 125.0, 'spo2': 86.5, 'temperature': 31.0,
+                                  'humidity': 80.0, 'eco2': 1200, 'smoke_detected': False})
+    assert lines[0]['risk_score'] == expected['prediction']['risk_score']
+    assert lines[1]['risk_level'] == 'high'  # fumée
+
+
+def test_errors_stay_in_place():
+    """Ligne illisible ou profil invalide : erreur à sa place, le reste est noté"""
+    body = b'{"spo2": 84, "profile_id": 2}\nnot json\n\n{"profile_id": 9}\n[1]\n'
+    stats = {}
+    blocks = list(bulk_scoring.stream_ndjson(_predictor(), io.BytesIO(body), stats=stats))
+    lines = [json.loads(line) for block in blocks for line in block.splitlines()]
+    assert [line.get('success') for line in lines[:-1]] == [True, False, False, False]
+    assert [line['row'] for line in lines[:-1]] == [0, 1, 2, 3]
+    assert stats['rows'] == 4 and stats['failed'] == 3
+
+
+class BrittlePredictor:
+    """predict_batch qui échoue dès qu'une ligne est mal formée (ancien comportement)"""
+
+    def __init__(self, predictor):
+        self.predictor = predictor
+
+    def predict_batch(self, records):
+        if any(not isinstance(record.get('profile_id', 1), int) for record in records):
+            raise TypeError("unhashable type: 'list'")
+        return self.predictor.predict_batch(records)
+
+    def predict(self, record):
+        return self.predictor.predict(record)
+
+
+def test_poisoned_row_does_not_cut_stream():
+    """Profil non hachable au milieu de l'entrée : erreur à sa ligne, tranches voisines notées"""
+    body = b''.join(json.dumps({'id': i, 'spo2': 90, 'profile_id': [1] if i == 25 else 1}).encode() + b'\n'
+                    for i in range(50))
+    for predictor in (_predictor(), BrittlePredictor(_predictor())):
+        stats = {}
+        blocks = list(bulk_scoring.stream_ndjson(predictor, io.BytesIO(body), chunk_size=10, stats=stats))
+        lines = [json.loads(line) for block in blocks for line in block.splitlines()]
+        assert [line['id'] for line in lines[:-1]] == list(range(50))
+        assert [line['success'] for line in lines[:-1]] == [i != 25 for i in range(50)]
+        assert stats['rows'] == 50 and stats['failed'] == 1
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        from api import app as app_module
+    response = app_module.app.test_client().post('/api/v1/score/bulk?chunk_size=10', data=body,
+                                                 content_type='application/x-ndjson')
+    lines = [json.loads(line) for line in response.get_data().splitlines()]
+    assert lines[-1]['summary']['rows'] == 50 and lines[25]['success'] is False
+
+
+def test_bulk_endpoint_streams():
+    """POST /api/v1/score/bulk : réponse NDJSON en streaming"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        from api import app as app_module
+    client = app_module.app.test_client()
+    with open(DATASET, 'rb') as f:
+        response = client.post('/api/v1/score/bulk?chunk_size=500', data=f.read(), content_type='text/csv')
+    assert response.status_code == 200
+    assert response.is_streamed and response.mimetype == 'application/x-ndjson'
+    lines = response.get_data().splitlines()
+    assert json.loads(lines[-1])['summary']['rows'] == len(lines) - 1 == 2000
+    assert client.post('/api/v1/score/bulk?format=xml', data=b'').status_code == 400
+
+
+def test_cli_writes_ndjson():
+    """python -m api.bulk_scoring entree.ndjson -o sortie.ndjson"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'lectures.ndjson')
+        target = os.path.join(tmp, 'scores.ndjson')
+        with open(source, 'w') as f:
+            for i in range(25):
+                f.write(json.dumps({'user_id': f'u{i}', 'spo2': 88 + i % 10, 'profile_id': 1}) + '\n')
+        with contextlib.redirect_stderr(io.StringIO()):
+            assert bulk_scoring.main([source, '-o', target, '--chunk-size', '10', '--full']) == 0
+        with open(target) as f:
+            lines = [json.loads(line) for line in f]
+    assert len(lines) == 26 and lines[24]['user_id'] == 'u24'
+    assert 'recommendations' in lines[0]
+
+
+if __name__ == "__main__":
+    test_input_consumed_chunk_by_chunk()
+    test_csv_dataset_columns()
+    test_errors_stay_in_place()
+    test_poisoned_row_does_not_cut_stream()
+    test_bulk_endpoint_streams()
+    test_cli_writes_ndjson()
+    print("✅ Notation en masse OK")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+TEST DE LA RENOTATION HORS LIGNE - RESPIRIA AI
+==============================================
+
+Fichier CSV → tranches notées dans un pool de processus (api/dataset_scoring.py) :
+ordre conservé, mêmes résultats qu'en un seul processus, erreurs par ligne
+"""
+
+import contextlib
+import csv
+import io
+import json
+import os
+import tempfile
+
+from api import bulk_scoring, dataset_scoring
+from api.respiria_ai_predictor import RespiriaAIPredictor
+
+DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'respiria_dataset.csv')
+
+
+def _score(workers, chunk_size, suffix='.csv'):
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'scores' + suffix)
+        report = dataset_scoring.score_file(DATASET, output, workers=workers, chunk_size=chunk_size)
+        with open(output, encoding='utf-8') as f:
+            return report, f.read()
+
+
+def test_pool_keeps_order_and_results():
+    """Plusieurs processus et petites tranches = même fichier qu'en un processus"""
+    single, expected = _score(1, 5000)
+    pooled, content = _score(3, 170)
+    assert content == expected
+    assert single['rows'] == pooled['rows'] == 2000
+    assert pooled['failed'] == 0 and pooled['rows_per_sec'] > 0
+
+
+def test_scores_match_predictor():
+    """Colonnes de score = predict() sur la ligne du dataset"""
+    _, content = _score(2, 500)
+    rows = list(csv.DictReader(io.StringIO(content)))
+    with contextlib.redirect_stdout(io.StringIO()):
+        predictor = RespiriaAIPredictor()
+    with open(DATASET, newline='') as f:
+        source = list(csv.DictReader(f))
+    for i in (0, 1, 777, 1999):
+        record = bulk_scoring.normalize({k: bulk_scoring.parse_cell(k, v) for k, v in source[i].items() if v != ''})
+        result = predictor.predict(record)
+        assert rows[i]['user_profile'] == source[i]['user_profile']
+        assert float(rows[i]['risk_score']) == result['prediction']['risk_score']
+        assert rows[i]['risk_level'] == result['prediction']['risk_level']
+        assert rows[i]['factors'] == '|'.join(f['factor'] for f in result['risk_factors'])
+        assert rows[i]['error'] == ''
+
+
+def test_invalid_row_reports_error():
+    """Une lecture invalide garde sa place avec la colonne error remplie"""
+    chunk = (['user_profile', 'spo2'], [['1', '95'], ['1', 'abc'], ['2', '']])
+    scored = dataset_scoring.score_chunk(chunk)
+    assert len(scored) == 3
+    assert scored[0][2] is not None and scored[0][-1] is None
+    assert scored[1][2] is None and scored[1][-1]
+    assert scored[2][-1] is None
+
+
+def test_ndjson_output():
+    _, content = _score(1, 1000, suffix='.ndjson')
+    lines = content.splitlines()
+    assert len(lines) == 2000
+    first = json.loads(lines[0])
+    assert first['user_profile'] == '2' and first['risk_level'] in ('low', 'medium', 'high')
+
+
+if __name__ == "__main__":
+    test_pool_keeps_order_and_results()
+    test_scores_match_predictor()
+    test_invalid_row_reports_error()
+    test_ndjson_output()
+    print("✅ Renotation hors ligne OK")
@@ -1,5 +1,9 @@
 import requests
 from datetime import datetime
+import os
+
+# Surchargeable pour viser les services simulés (python -m loadtest.fake_services)
+UBIDOTS_API_URL = os.environ.get("UBIDOTS_API_URL", "https://industrial.api.ubidots.com/api/v1.6")
 
 UBIDOTS_TOKEN = "BBUS-IW4Xne31AviZZ0jAAojvf3FczCx8Vw"
 DEVICE_LABEL = "bracelet"
@@ -12,7 +16,7 @@ headers = {'X-Auth-Token': UBIDOTS_TOKEN, 'Content-Type': 'application/json'}
 
 # Méthode 1: Via datasources (ancien endpoint)
 print("\n[Méthode 1: API Datasources]")
-url = f"https://industrial.api.ubidots.com/api/v1.6/datasources/{DEVICE_LABEL}/"
+url = f"{UBIDOTS_API_URL}/datasources/{DEVICE_LABEL}/"
 print(f"URL: {url}")
 
 try:
@@ -25,7 +29,7 @@ try:
         print(f"  Variables: {data.get('number_of_variables', 0)}")
         
         # Récupérer les variables
-        vars_url = f"https://industrial.api.ubidots.com/api/v1.6/datasources/{DEVICE_LABEL}/variables/"
+        vars_url = f"{UBIDOTS_API_URL}/datasources/{DEVICE_LABEL}/variables/"
         vars_response = requests.get(vars_url, headers=headers, timeout=10)
         
         if vars_response.status_code == 200:
@@ -42,7 +46,7 @@ try:
                 
                 # Récupérer la dernière valeur
                 var_id = var.get('id')
-                val_url = f"https://industrial.api.ubidots.com/api/v1.6/variables/{var_id}/values/"
+                val_url = f"{UBIDOTS_API_URL}/variables/{var_id}/values/"
                 val_response = requests.get(val_url, headers=headers, params={'page_size': 1}, timeout=10)
                 
                 if val_response.status_code == 200:
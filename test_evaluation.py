@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+TEST DE L'ÉVALUATION UNIFIÉE - RESPIRIA AI
+==========================================
+
+Suites chargées sous une forme commune, métriques identiques aux scripts
+d'origine, balayage vectorisé = predict() ligne par ligne, indépendant du
+nombre de processus
+"""
+
+import json
+import tempfile
+import os
+
+from api import vector_scoring
+from evaluation import engine, run_evaluation
+from evaluation.suites import load_suites
+
+
+def test_suites_match_scripts():
+    """Précision des suites = celle des scripts (56 %, 4/8, 4/6)"""
+    report = engine.evaluate_suites(load_suites(["realistic", "precision", "model_accuracy"]))
+    suites = report["suites"]
+    assert suites["realistic"]["scenarios"] == 50
+    assert suites["realistic"]["accuracy"] == 0.56
+    assert suites["precision"]["passed"] == 4
+    assert suites["model_accuracy"]["passed"] == 4
+    confusion = report["overall"]["confusion"]
+    assert sum(sum(row.values()) for row in confusion.values()) == report["overall"]["labeled"] == 64
+
+
+def test_sweep_matches_scalar_predict():
+    """Tranche du balayage = predict() scénario par scénario"""
+    np = vector_scoring.np
+    rng = np.random.default_rng([5, 0])
+    columns = engine.random_columns(rng, 300)
+    profile_ids = rng.integers(0, 4, 300)
+    counts = engine.sweep_chunk((5, 0, 300))
+
+    predictor = engine.get_predictor()
+    levels = [[0, 0, 0] for _ in engine.PROFILE_IDS]
+    misses = [0] * len(engine.PROFILE_IDS)
+    for i, profile_id in enumerate(profile_ids.tolist()):
+        data = {factor: column[i].item() for factor, column in columns.items()}
+        data["profile_id"] = profile_id
+        level = predictor.predict(data)["prediction"]["risk_level"]
+        levels[profile_id][engine.LEVELS.index(level)] += 1
+        misses[profile_id] += engine.is_emergency(data) and level != "high"
+    assert counts["levels"] == levels
+    assert counts["emergency_misses"] == misses
+
+
+def test_sweep_independent_of_workers():
+    single = engine.sweep(20000, seed=3, workers=1, chunk_size=3000)
+    pooled = engine.sweep(20000, seed=3, workers=2, chunk_size=3000)
+    for key in ("elapsed_s", "scenarios_per_sec", "workers"):
+        single.pop(key)
+        pooled.pop(key)
+    assert single == pooled
+    assert sum(single["distribution"].values()) == 20000
+
+
+def test_cli_report():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "report.json")
+        assert run_evaluation.main(["-s", "standards", "--sweep", "5000", "--workers", "1", "-o", path]) == 0
+        with open(path, encoding="utf-8") as f:
+            report = json.load(f)
+    assert set(report) == {"meta", "suites", "overall", "sweep"}
+    assert report["suites"]["standards"]["scenarios"] == 200
+    assert report["sweep"]["scenarios"] == 5000
+
+
+if __name__ == "__main__":
+    test_suites_match_scripts()
+    test_sweep_matches_scalar_predict()
+    test_sweep_independent_of_workers()
+    test_cli_report()
+    print("✅ Évaluation unifiée OK")
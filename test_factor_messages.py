@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+TEST DES MESSAGES DE FACTEURS - RESPIRIA AI
+===========================================
+
+Gabarits précompilés par (facteur, statut) et cache borné des messages rendus
+"""
+
+from api import respiria_ai_predictor as predictor_module
+from api.respiria_ai_predictor import RespiriaAIPredictor
+
+
+def test_messages_use_exact_value():
+    """Deux valeurs de même partie entière donnent deux messages distincts"""
+    predictor = RespiriaAIPredictor()
+    first = predictor._generate_factor_message_fast('spo2', 87.2, 'critical')
+    second = predictor._generate_factor_message_fast('spo2', 87.9, 'critical')
+    assert first == "🚨 SpO2 critique (87.2%) - URGENCE MÉDICALE"
+    assert second == "🚨 SpO2 critique (87.9%) - URGENCE MÉDICALE"
+    assert predictor._generate_factor_message_fast('spo2', 87, 'critical') == "🚨 SpO2 critique (87%) - URGENCE MÉDICALE"
+    assert predictor._generate_factor_message_fast('spo2', 87.2, 'critical') is first
+
+
+def test_full_and_fast_templates():
+    """Variante complète, variante rapide, message constant et facteur inconnu"""
+    predictor = RespiriaAIPredictor()
+    assert predictor._generate_factor_message('spo2', 90, 'warning') == \
+        "⚠️ SpO2 préoccupant (90%) - Surveillance nécessaire"
+    assert predictor._generate_factor_message('pm25', 61.3, 'info') == "🟡 PM2.5 modéré (61.3 µg/m³)"
+    assert predictor._generate_factor_message_fast('smoke_detected', True, 'critical') == \
+        "🚨 FUMÉE DÉTECTÉE - ÉVACUEZ IMMÉDIATEMENT"
+    assert predictor._generate_factor_message_fast('unknown', 3, 'info') == "unknown: 3"
+
+
+def test_cache_bounded():
+    """Le cache de messages ne dépasse pas FACTOR_MESSAGE_CACHE_SIZE"""
+    predictor = RespiriaAIPredictor()
+    size = predictor_module.FACTOR_MESSAGE_CACHE_SIZE
+    for i in range(size + 50):
+        predictor._generate_factor_message_fast('eco2', 1000 + i, 'warning')
+    assert len(predictor._message_cache) == size
+    hits, misses = predictor.cache_stats["factor_message"]
+    assert misses == size + 50 and hits == 0
+
+
+if __name__ == "__main__":
+    test_messages_use_exact_value()
+    test_full_and_fast_templates()
+    test_cache_bounded()
+    print("✅ Messages de facteurs OK")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+TEST DES SERVICES SIMULÉS - RESPIRIA AI
+=======================================
+
+Le collecteur interroge le backend et Ubidots simulés (aucun accès réseau externe)
+"""
+
+import random
+
+import requests
+
+from api import data_collector
+from api.data_collector import RespiriaDataCollector
+from loadtest.fake_services import FakeServices, LatencyModel
+
+
+def test_collector_against_fake_backend():
+    """Météo, qualité d'air et capteurs via le backend simulé"""
+    config = {"payloads": {"weather": {"temperature": 31.5}, "max30102": {"spo2": 93.0}}}
+    with FakeServices(config) as fake:
+        collector = RespiriaDataCollector(base_url=fake.backend_url)
+
+        weather = collector.get_weather_data("Abidjan")
+        assert weather["status"] == "success"
+        assert weather["temperature"] == 31.5
+        assert weather["city"] == "Abidjan"
+
+        air = collector.get_air_quality_data("Abidjan")
+        assert air["status"] == "success"
+        assert air["pm25"] == 28.0
+
+        sensors = collector.get_ubidots_sensors("user-1")
+        assert sensors["status"] == "success"
+        assert sensors["spo2"] == 93.0
+
+        stats = requests.get(f"{fake.url}/__stats__", timeout=2).json()
+        assert stats["requests"]["sensors"] == 3
+
+
+def test_ubidots_direct_against_fake():
+    """Lecture directe Ubidots v1.6 (datasource -> variables -> valeurs)"""
+    with FakeServices({"payloads": {"ubidots_variables": {"spo2": 90.0, "bpm": 110.0}}}) as fake:
+        old_url, old_token = data_collector.UBIDOTS_API_URL, data_collector.UBIDOTS_TOKEN
+        data_collector.UBIDOTS_API_URL, data_collector.UBIDOTS_TOKEN = fake.ubidots_url, "fake-token"
+        try:
+            sensors = RespiriaDataCollector(base_url=fake.backend_url).get_ubidots_direct()
+        finally:
+            data_collector.UBIDOTS_API_URL, data_collector.UBIDOTS_TOKEN = old_url, old_token
+
+        assert sensors["status"] == "success"
+        assert sensors["spo2"] == 90.0
+        assert sensors["heart_rate"] == 110.0
+
+
+def test_simulated_errors_trigger_fallback():
+    """Un taux d'erreur de 100% déclenche les valeurs de repli"""
+    with FakeServices({"routes": {"weather": {"error_rate": 1.0}}}) as fake:
+        weather = RespiriaDataCollector(base_url=fake.backend_url).get_weather_data("Abidjan")
+        assert weather["status"] == "fallback"
+
+
+def test_ubidots_writes_are_recorded():
+    """Les écritures Ubidots sont mémorisées et relues"""
+    with FakeServices() as fake:
+        requests.post(f"{fake.ubidots_url}/devices/bracelet/", json={"risk_score": 42.0}, timeout=2)
+        writes = requests.get(f"{fake.url}/__writes__", timeout=2).json()["results"]
+        assert writes[0]["device"] == "bracelet"
+
+        values = requests.get(f"{fake.ubidots_url}/variables/var-risk_score/values/", timeout=2).json()
+        assert values["results"][0]["value"] == 42.0
+
+
+def test_latency_distributions():
+    """Les distributions de latence respectent leurs bornes"""
+    rng = random.Random(1)
+    uniform = LatencyModel({"distribution": "uniform", "min_ms": 10, "max_ms": 20}, rng)
+    assert all(0.010 <= uniform.sample() <= 0.020 for _ in range(100))
+
+    capped = LatencyModel({"distribution": "pareto", "scale_ms": 50, "alpha": 1.1, "cap_ms": 200}, rng)
+    assert all(0.050 <= capped.sample() <= 0.200 for _ in range(100))
+
+
+if __name__ == "__main__":
+    test_collector_against_fake_backend()
+    test_ubidots_direct_against_fake()
+    test_simulated_errors_trigger_fallback()
+    test_ubidots_writes_are_recorded()
+    test_latency_distributions()
+    print("✅ Services simulés OK")
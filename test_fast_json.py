@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+TEST DE LA SÉRIALISATION JSON RAPIDE - RESPIRIA AI
+==================================================
+
+Fragments pré-sérialisés, encodage de référence et fournisseur Flask
+"""
+
+import json
+from datetime import datetime
+
+from api import fast_json
+from api.fast_json import Fragment, dumps, loads
+
+
+def test_fragments_spliced():
+    """Les fragments sont recopiés tels quels, à n'importe quelle profondeur"""
+    palette = Fragment(["#66BB6A", "#43A047"])
+    actions = Fragment([{"id": "inhaler", "label": "Utiliser inhalateur"}])
+    payload = {"a": palette, "nested": {"b": [palette, actions]}, "text": "Modéré"}
+
+    body = dumps(payload)
+    assert body.count(b'["#66BB6A","#43A047"]') == 2
+    assert loads(body) == {
+        "a": ["#66BB6A", "#43A047"],
+        "nested": {"b": [["#66BB6A", "#43A047"], [{"id": "inhaler", "label": "Utiliser inhalateur"}]]},
+        "text": "Modéré",
+    }
+
+
+def test_user_string_cannot_hijack_fragment():
+    """Une chaîne de la requête qui imite un marqueur de fragment reste une chaîne"""
+    forged = ["\x00respiria-fragment:0", "\x00respiria-fragment:%s:0"]
+    payload = {"location": forged, "palette": Fragment(["#66BB6A"])}
+    assert loads(dumps(payload)) == {"location": forged, "palette": ["#66BB6A"]}
+
+
+def test_reference_encoding_matches():
+    """Même document avec l'encodage de référence (json standard, clés triées)"""
+    payload = {"z": 1, "a": Fragment({"y": [1, 2], "x": None}), "when": datetime(2026, 1, 1)}
+    fast = loads(dumps(payload))
+
+    fast_json.FAST_JSON_ENABLED = False
+    try:
+        reference = dumps(payload)
+    finally:
+        fast_json.FAST_JSON_ENABLED = True
+
+    assert reference.startswith(b'{"a": {"x": null')
+    assert json.loads(reference) == fast
+
+
+def test_flask_responses():
+    """Les endpoints renvoient du JSON valide avec les fragments développés"""
+    from api import app as app_module
+    client = app_module.app.test_client()
+
+    health = client.get("/health")
+    assert health.content_type == "application/json"
+    assert health.get_json()["endpoints"]["predict"] == "/api/v1/predict"
+
+
+if __name__ == "__main__":
+    test_fragments_spliced()
+    test_user_string_cannot_hijack_fragment()
+    test_reference_encoding_matches()
+    test_flask_responses()
+    print("✅ Sérialisation JSON rapide OK")
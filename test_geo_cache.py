@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+TEST DU CACHE GÉOGRAPHIQUE DE L'ENVIRONNEMENT - RESPIRIA AI
+===========================================================
+
+Geohash (encodage, voisines), station la plus proche, partage d'une
+cellule entre utilisateurs voisins, durée de vie (réponses de repli
+comprises), un seul appel en vol par clé, résolution renvoyée au client,
+puis intégration à /api/v1/environment (lat/lon, jeton jamais transmis)
+"""
+
+import contextlib
+import io
+import threading
+import time
+
+from api import geo_cache
+from api.geo_cache import (GeoEnvironmentCache, StationIndex, geohash_center, geohash_encode,
+                           geohash_neighbors, parse_coordinates)
+
+
+class CountingFetch:
+    def __init__(self, status="success", delay=0.0):
+        self.calls = []
+        self.status = status
+        self.delay = delay
+
+    def __call__(self, location, coordinates):
+        self.calls.append((location, coordinates))
+        time.sleep(self.delay)
+        weather = {"temperature": 28.0, "city": location, "status": self.status}
+        return weather, {"aqi": 60, "status": self.status}
+
+
+# Point rural loin de toute station (entre Daloa et San-Pédro)
+RURAL = (5.85, -6.05)
+
+
+def test_geohash_and_stations():
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    cell = geohash_encode(*RURAL)
+    neighbors = geohash_neighbors(cell)
+    assert len(set(neighbors)) == 8 and cell not in neighbors
+    assert all(len(neighbor) == len(cell) for neighbor in neighbors)
+    lat, lon = geohash_center(cell)
+    assert abs(lat - RURAL[0]) < 0.03 and abs(lon - RURAL[1]) < 0.03
+
+    index = StationIndex()
+    assert index.nearest(5.32, -3.97, 15)[0] == "Abidjan"   # Cocody / Plateau
+    assert index.nearest(*RURAL, 15) is None
+    assert parse_coordinates(None, "") is None
+    for lat, lon in ((95, 0), ("abc", 1), (5.3, None)):
+        try:
+            parse_coordinates(lat, lon)
+            raise AssertionError("coordonnées invalides acceptées")
+        except (TypeError, ValueError):
+            pass
+
+
+def test_users_share_stations_and_cells():
+    fetch = CountingFetch()
+    cache = GeoEnvironmentCache(fetch, ttl=600, clock=lambda: 0.0)
+    # 50 utilisateurs à Abidjan + la ville demandée par son nom : un seul appel
+    for user in range(50):
+        weather, _, info = cache.get("Abidjan", (5.30 + user * 0.002, -4.02 + user * 0.001))
+        assert info["key"] == "city:Abidjan"
+    cache.get("Abidjan")
+    assert fetch.calls == [("Abidjan", None)]
+
+    # Zone rurale : une cellule, interrogée en son centre
+    cell = geohash_encode(*RURAL)
+    for offset in (0.0, 0.005, -0.005):
+        _, _, info = cache.get(None, (RURAL[0] + offset, RURAL[1] + offset))
+        assert info["key"] == f"cell:{cell}" and info["location"] is None and info["cell"] == cell
+    assert fetch.calls[1:] == [(None, geohash_center(cell))]
+
+    # Cellule voisine encore fraîche et proche : réutilisée
+    lat_min, lat_max, _, _ = geo_cache.geohash_bounds(cell)
+    _, _, info = cache.get(None, (lat_max + 0.001, RURAL[1]))
+    assert (info["key"], info["cache"]) == (f"cell:{cell}", "neighbor") and len(fetch.calls) == 2
+    assert cache.stats() == {"hits": 52, "neighbor_hits": 1, "misses": 2, "entries": 2}
+
+
+def test_ttl_and_fallback():
+    now = [0.0]
+    fetch = CountingFetch(status="fallback")
+    cache = GeoEnvironmentCache(fetch, ttl=600, clock=lambda: now[0])
+    cache.get("Bouaké")
+    now[0] = geo_cache.FALLBACK_TTL + 1    # réponse de repli : conservée peu de temps
+    cache.get("Bouaké")
+    assert len(fetch.calls) == 2
+
+    fetch.status = "success"
+    now[0] = 100.0
+    cache.get("Man")
+    now[0] = 650.0
+    cache.get("Man")
+    now[0] = 701.0
+    cache.get("Man")
+    assert [call[0] for call in fetch.calls] == ["Bouaké", "Bouaké", "Man", "Man"]
+
+    # ttl 0 : pas de cache, mais la résolution reste décrite
+    direct = GeoEnvironmentCache(fetch, ttl=0)
+    _, _, info = direct.get(None, (7.70, -5.02))
+    assert info == {"key": "city:Bouaké", "location": "Bouaké", "cache": "off"}
+    direct.get(None, (7.70, -5.02))
+    assert fetch.calls[-2:] == [("Bouaké", None)] * 2
+
+
+def test_single_flight():
+    fetch = CountingFetch(delay=0.05)
+    cache = GeoEnvironmentCache(fetch)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(None, RURAL)[2]["key"]))
+               for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(fetch.calls) == 1 and len(set(results)) == 1 and len(results) == 16
+
+
+class GeoCollector:
+    """Collecteur en mémoire : compte les appels météo (ville ou coordonnées)"""
+
+    def __init__(self):
+        self.calls = []
+        self.tokens = []
+
+    def get_weather_data(self, location=None, auth_token=None, coordinates=None):
+        self.calls.append((location, coordinates))
+        self.tokens.append(auth_token)
+        return {'temperature': 27.0, 'humidity': 80.0, 'weather_main': 'Clouds', 'status': 'success',
+                'city': location or 'Gagnoa'}
+
+    def get_air_quality_data(self, location=None, auth_token=None, coordinates=None):
+        return {'aqi': 70, 'pm25': 20.0, 'pm10': 35.0, 'pollen_level': 2, 'status': 'success'}
+
+    def get_ubidots_direct(self):
+        return {'status': 'fallback'}
+
+    def get_ubidots_sensors(self, user_id, auth_token=None):
+        return {'spo2': 97.0, 'heart_rate': 72.0, 'status': 'success'}
+
+
+def test_environment_endpoint_coordinates():
+    with contextlib.redirect_stdout(io.StringIO()):
+        from api import app as app_module
+    old = app_module.collector
+    app_module.collector = collector = GeoCollector()
+    try:
+        client = app_module.app.test_client()
+        for lat, lon in ((5.33, -4.01), (5.36, -3.98)):
+            response = client.get(f'/api/v1/environment?lat={lat}&lon={lon}',
+                                  headers={'Authorization': 'Bearer jeton-utilisateur'})
+            assert response.status_code == 200 and response.get_json()['success'] is True
+        bouake = client.get('/api/v1/environment?lat=7.70&lon=-5.02').get_json()
+        assert bouake['location']['city'] == 'Bouaké' and bouake['resolution']['key'] == 'city:Bouaké'
+        rural = client.get(f'/api/v1/environment?lat={RURAL[0]}&lon={RURAL[1]}').get_json()
+        cell = geohash_encode(*RURAL)
+        assert rural['resolution']['cell'] == cell and rural['location']['city'] == 'Gagnoa'
+        assert collector.calls == [('Abidjan', None), ('Bouaké', None), (None, geohash_center(cell))]
+        assert collector.tokens == [None] * 3  # données partagées : jeton utilisateur jamais transmis
+        with contextlib.redirect_stdout(io.StringIO()):
+            predicted = client.post('/api/v1/predict', json={'user_id': 'u-geo', 'profile_id': 1,
+                                                             'lat': 7.68, 'lon': -5.04}).get_json()
+        assert predicted['environment']['location'] == 'Bouaké'
+        assert predicted['environment']['resolution'] == {'key': 'city:Bouaké', 'location': 'Bouaké', 'cache': 'hit'}
+        invalid = client.get('/api/v1/environment?lat=123&lon=0')
+        assert invalid.status_code == 400 and invalid.get_json()['code'] == 'INVALID_COORDINATES'
+    finally:
+        app_module.collector = old
+
+
+if __name__ == "__main__":
+    test_geohash_and_stations()
+    test_users_share_stations_and_cells()
+    test_ttl_and_fallback()
+    test_single_flight()
+    test_environment_endpoint_coordinates()
+    print("✅ Cache géographique de l'environnement OK")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+TEST DE L'HISTOGRAMME HDR - RESPIRIA AI
+=======================================
+
+Précision des percentiles, fusion et sérialisation
+"""
+
+import random
+
+from api.histogram import HdrHistogram
+
+
+def test_percentiles_within_relative_error():
+    """Erreur relative < 1% avec 2 chiffres significatifs"""
+    rng = random.Random(3)
+    values = sorted(int(rng.lognormvariate(9, 1.2)) + 1 for _ in range(20000))
+    histogram = HdrHistogram()
+    for value in values:
+        histogram.record(value)
+
+    for p in (50, 90, 99, 99.9):
+        exact = values[max(0, int(len(values) * p / 100) - 1)]
+        approx = histogram.value_at_percentile(p)
+        assert abs(approx - exact) / exact < 0.02, (p, exact, approx)
+
+    assert histogram.percentiles((50, 99)) == {
+        "p50": histogram.value_at_percentile(50),
+        "p99": histogram.value_at_percentile(99),
+    }
+
+
+def test_merge_and_roundtrip():
+    """Fusion de deux histogrammes et aller-retour to_dict/from_dict"""
+    a, b = HdrHistogram(), HdrHistogram()
+    for value in range(1, 1001):
+        a.record(value)
+        b.record(value * 10)
+
+    merged = HdrHistogram().merge(a).merge(b)
+    assert merged.total_count == 2000
+    assert merged.min_value == 1
+    assert merged.max_value == 10000
+
+    restored = HdrHistogram.from_dict(merged.to_dict())
+    assert restored.summary() == merged.summary()
+
+
+def test_values_are_clamped():
+    """Valeurs négatives et hors plage saturées"""
+    histogram = HdrHistogram(highest=1000)
+    histogram.record(-5)
+    histogram.record(10 ** 9)
+    assert histogram.min_value == 0
+    assert histogram.max_value == 1000
+    assert histogram.value_at_percentile(100) == 1000
+
+
+if __name__ == "__main__":
+    test_percentiles_within_relative_error()
+    test_merge_and_roundtrip()
+    test_values_are_clamped()
+    print("✅ Histogramme HDR OK")
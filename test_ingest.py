@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+TEST DE L'INGESTION POUSSÉE - RESPIRIA AI
+=========================================
+
+Format binaire RPK1 (aller-retour, lecture sans copie, blocs invalides),
+store par device (tampon circulaire, dernière valeur connue, éviction) et
+/api/v1/ingest → notation, puis /api/v1/predict/realtime sans Ubidots
+"""
+
+import contextlib
+import io
+import time
+from datetime import datetime
+
+import numpy as np
+
+from api import ingest
+from api.ingest import FIELDS, IngestError, ReadingStore, decode_binary, encode_block
+
+
+def test_binary_roundtrip_zero_copy():
+    timestamps = 1.7e9 + np.arange(5.0)
+    body = (encode_block("b-1", timestamps, {"spo2": [97, 96, 95, 94, 93], "tvoc": [1, 2, 3, 4, 5]},
+                         user_id="u-1", profile_id=2)
+            + encode_block("b-2", timestamps[:3], {"heart_rate": [70, 71, 72]}))
+    assert len(body) % 8 == 0
+    first, second = decode_binary(body)
+    assert (first.device, first.user_id, first.profile_id) == ("b-1", "u-1", 2)
+    assert first.values["spo2"].tolist() == [97, 96, 95, 94, 93] and set(first.values) == {"spo2", "tvoc"}
+    assert np.shares_memory(first.values["spo2"], np.frombuffer(body, dtype=np.uint8))
+    assert (second.user_id, second.profile_id, second.timestamps.size) == (None, None, 3)
+
+    for broken in (body[:20], b"XXXX" + body[4:], body[:-16]):
+        try:
+            decode_binary(broken)
+        except IngestError:
+            continue
+        raise AssertionError("bloc invalide accepté")
+
+
+def test_store_ring_latest_and_eviction():
+    now = [0.0]
+    store = ReadingStore(capacity=4, max_devices=2, clock=lambda: now[0])
+    nan = float("nan")
+    block = ingest.decode_document({"devices": [{
+        "device": "a", "user_id": "u-a", "profile_id": 3,
+        "t": [5, 1, 2, 3, 4, 6], "spo2": [95, 91, 92, 93, 94, nan], "heart_rate": [80, 1, 2, 3, 4, 81]}]})[0]
+    assert store.append(block) == 6
+
+    timestamps, values = store.series("a")
+    assert timestamps.tolist() == [3, 4, 5, 6]
+    assert values["spo2"][:3].tolist() == [93, 94, 95] and np.isnan(values["spo2"][3])
+    latest = store.latest("a")
+    assert latest["spo2"] == 95 and latest["heart_rate"] == 81 and "tvoc" not in latest
+    assert (latest["profile_id"], latest["status"], latest["source"]) == (3, "success", "ingest")
+
+    # Bloc en retard (reconnexion) : n'écrase pas la dernière lecture
+    late = ingest.Block("a", None, None, np.array([2.0, 2.5]), {"spo2": np.array([88, 89], dtype=np.float32)})
+    assert store.append(late) == 2
+    latest = store.latest("a")
+    assert latest["spo2"] == 95 and latest["timestamp"] == datetime.fromtimestamp(6).isoformat()
+
+    store.append(ingest.Block("b", None, None, np.array([1.0]), {"spo2": np.array([90], dtype=np.float32)}))
+    store.append(ingest.Block("c", None, None, np.array([1.0]), {"spo2": np.array([90], dtype=np.float32)}))
+    assert store.latest("a") is None and len(store) == 2  # "a" oublié (le moins récent)
+    now[0] = 1000.0
+    assert store.latest("c") is None  # périmé
+
+
+class NoUbidotsCollector:
+    """Collecteur sans accès Ubidots : le temps réel doit lire le store"""
+
+    def get_ubidots_latest(self, user_id):
+        raise AssertionError("Ubidots interrogé malgré une lecture poussée récente")
+
+
+def test_ingest_endpoint_scores_and_feeds_realtime():
+    with contextlib.redirect_stdout(io.StringIO()):
+        from api import app as app_module
+    client = app_module.app.test_client()
+    now = time.time()
+    body = (encode_block("ingest-high", [now - 1, now], {"spo2": [96, 84], "heart_rate": [80, 125],
+                                                         "tvoc": [20, 30]}, user_id="u-high", profile_id=2)
+            + encode_block("ingest-low", [now], {"spo2": [98], "heart_rate": [70]}, user_id="u-low"))
+    response = client.post('/api/v1/ingest', data=body, content_type='application/octet-stream')
+    assert response.status_code == 200, response.get_json()
+    result = response.get_json()
+    assert (result['devices'], result['samples']) == (2, 3)
+    levels = {score['device']: score['risk_level'] for score in result['scores']}
+    assert levels == {'ingest-high': 'HIGH', 'ingest-low': 'LOW'}
+
+    document = {"devices": [{"device": "ingest-json", "t": [now], "spo2": [97]}]}
+    assert client.post('/api/v1/ingest?score=false', json=document).get_json()['scores'] == []
+    assert client.post('/api/v1/ingest', data=b"RPK1", content_type='application/octet-stream').status_code == 400
+    assert client.post('/api/v1/ingest', data="x", content_type='text/plain').status_code == 415
+    bad_profile = {"devices": [{"device": "d", "t": [now], "profile_id": 9}]}
+    assert client.post('/api/v1/ingest', json=bad_profile).status_code == 400
+
+    old_collector = app_module.collector
+    app_module.collector = NoUbidotsCollector()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            realtime = client.post('/api/v1/predict/realtime',
+                                   json={'user_id': 'u-high', 'profile_id': 2, 'device_label': 'ingest-high'})
+        assert realtime.status_code == 200, realtime.get_json()
+        assert realtime.get_json()['sensors']['source'] == 'ingest'
+    finally:
+        app_module.collector = old_collector
+
+
+def test_msgpack_binary_columns():
+    if not ingest.MSGPACK_AVAILABLE:
+        return
+    document = {"devices": [{"device": "m-1", "t": np.array([1.7e9, 1.7e9 + 1]).tobytes(),
+                             "spo2": np.array([97, 95], dtype="<f4").tobytes()}]}
+    block, = ingest.decode_payload(ingest.msgpack.packb(document), "msgpack")
+    assert block.values["spo2"].tolist() == [97, 95] and set(block.values) <= set(FIELDS)
+
+
+if __name__ == "__main__":
+    test_binary_roundtrip_zero_copy()
+    test_store_ring_latest_and_eviction()
+    test_ingest_endpoint_scores_and_feeds_realtime()
+    test_msgpack_binary_columns()
+    print("✅ Ingestion poussée OK")
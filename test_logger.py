@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+TEST DE LA JOURNALISATION STRUCTURÉE - RESPIRIA AI
+==================================================
+
+Sortie JSON via file + thread, échantillonnage, coût des lignes désactivées
+"""
+
+import io
+import json
+import logging
+import queue
+
+from api.logger import (DroppingQueueHandler, SamplingFilter, configure_logging,
+                        get_logger, shutdown_logging)
+
+
+class _Expensive:
+    """Argument dont la conversion en texte est comptée"""
+    calls = 0
+
+    def __str__(self):
+        _Expensive.calls += 1
+        return "expensive"
+
+
+def test_json_output_through_queue():
+    """Une ligne JSON par événement, champs extra inclus"""
+    stream = io.StringIO()
+    configure_logging(level="INFO", fmt="json", stream=stream)
+    try:
+        get_logger("test").warning("Erreur API météo : %s", "timeout", extra={"upstream": "weather"})
+    finally:
+        shutdown_logging()
+
+    event = json.loads(stream.getvalue().strip())
+    assert event["level"] == "WARNING"
+    assert event["logger"] == "respiria.test"
+    assert event["msg"] == "Erreur API météo : timeout"
+    assert event["upstream"] == "weather"
+
+
+def test_disabled_lines_are_not_formatted():
+    """Sous le niveau configuré, les arguments ne sont jamais convertis"""
+    stream = io.StringIO()
+    configure_logging(level="INFO", stream=stream)
+    try:
+        _Expensive.calls = 0
+        get_logger("test").debug("valeur %s", _Expensive())
+    finally:
+        shutdown_logging()
+    assert _Expensive.calls == 0
+    assert stream.getvalue() == ""
+
+
+def test_sampling_is_per_request():
+    """Toutes les lignes DEBUG d'une requête partagent la même décision"""
+    sampler = SamplingFilter(0.5)
+
+    def record(level, request_id):
+        r = logging.LogRecord("respiria.app", level, __file__, 1, "msg", (), None)
+        r.request_id = request_id
+        return r
+
+    decisions = {rid: sampler.filter(record(logging.DEBUG, rid)) for rid in map(str, range(200))}
+    assert all(sampler.filter(record(logging.DEBUG, rid)) == kept for rid, kept in decisions.items())
+    assert 50 < sum(decisions.values()) < 150
+    assert sampler.filter(record(logging.WARNING, "0"))
+
+
+def test_full_queue_drops_instead_of_blocking():
+    """File pleine : l'enregistrement est abandonné et compté"""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    for _ in range(3):
+        handler.handle(logging.LogRecord("respiria", logging.INFO, __file__, 1, "msg", (), None))
+    assert handler.dropped == 2
+
+
+if __name__ == "__main__":
+    test_json_output_through_queue()
+    test_disabled_lines_are_not_formatted()
+    test_sampling_is_per_request()
+    test_full_queue_drops_instead_of_blocking()
+    print("✅ Journalisation structurée OK")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+TEST DES MÉTRIQUES PROMETHEUS - RESPIRIA AI
+===========================================
+
+Format d'exposition, shards par thread, agrégation multi-processus, /metrics
+"""
+
+import json
+import os
+import tempfile
+import threading
+
+from api.metrics import MetricsRegistry, upstream_call
+
+
+def test_histogram_and_counter_rendering():
+    """Buckets cumulatifs, somme, compte et échappement des labels"""
+    registry = MetricsRegistry(buckets=(0.01, 0.1), metrics_dir=None)
+    registry.describe("lat_seconds", "histogram", "Latence")
+    registry.observe("lat_seconds", 0.005, (("route", "/a"),))
+    registry.observe("lat_seconds", 0.05, (("route", "/a"),))
+    registry.observe("lat_seconds", 3.0, (("route", "/a"),))
+    registry.inc("hits_total", (("path", 'x"y'),), 2)
+
+    text = registry.render()
+    assert '# TYPE lat_seconds histogram' in text
+    assert 'lat_seconds_bucket{route="/a",le="0.01"} 1' in text
+    assert 'lat_seconds_bucket{route="/a",le="0.1"} 2' in text
+    assert 'lat_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'lat_seconds_count{route="/a"} 3' in text
+    assert 'hits_total{path="x\\"y"} 2' in text
+
+
+def test_thread_shards_are_merged():
+    """Chaque thread écrit dans son shard ; l'instantané les additionne"""
+    registry = MetricsRegistry(metrics_dir=None)
+
+    def work():
+        for _ in range(1000):
+            registry.inc("calls_total")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    counters, _ = registry.collect()
+    assert counters[("calls_total", ())] == 4000
+
+
+def test_multiprocess_snapshots_are_merged():
+    """Les instantanés des autres workers sont additionnés au scrape"""
+    with tempfile.TemporaryDirectory() as metrics_dir:
+        registry = MetricsRegistry(metrics_dir=metrics_dir)
+        registry.inc("respiria_upstream_calls_total", (("method", "get_weather_data"),), 3)
+
+        other_worker = {
+            "pid": 999999,
+            "buckets": list(registry.buckets),
+            "counters": [
+                ["respiria_upstream_calls_total", [["method", "get_weather_data"]], 1],
+                ["respiria_upstream_fallbacks_total", [["method", "get_weather_data"]], 2],
+            ],
+            "histograms": [],
+        }
+        with open(os.path.join(metrics_dir, "999999.json"), "w") as f:
+            json.dump(other_worker, f)
+
+        text = registry.render()
+        assert 'respiria_upstream_calls_total{method="get_weather_data"} 4' in text
+        assert 'respiria_upstream_fallback_ratio{method="get_weather_data"} 0.5' in text
+
+
+def test_upstream_call_counts_fallbacks():
+    """Le décorateur compte appels, replis et erreurs"""
+    from api import metrics
+
+    @upstream_call("fake_method")
+    def fetch(ok):
+        return {"status": "success"} if ok else {"status": "fallback", "error": "timeout"}
+
+    fetch(True)
+    fetch(False)
+    counters, histograms = metrics.registry.collect()
+    labels = (("method", "fake_method"),)
+    assert counters[("respiria_upstream_calls_total", labels)] == 2
+    assert counters[("respiria_upstream_fallbacks_total", labels)] == 1
+    assert counters[("respiria_upstream_errors_total", labels)] == 1
+    assert ("respiria_upstream_duration_seconds", labels) in histograms
+
+
+def test_metrics_endpoint():
+    """/metrics répond au format texte Prometheus"""
+    from api import app as app_module
+
+    client = app_module.app.test_client()
+    client.get("/health")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    text = response.get_data(as_text=True)
+    assert 'respiria_http_requests_total{method="GET",route="/health",status="200"}' in text
+    assert 'respiria_cache_misses_total{cache="aqi_score"}' in text
+
+
+if __name__ == "__main__":
+    test_histogram_and_counter_rendering()
+    test_thread_shards_are_merged()
+    test_multiprocess_snapshots_are_merged()
+    test_upstream_call_counts_fallbacks()
+    test_metrics_endpoint()
+    print("✅ Métriques Prometheus OK")
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+TEST DES NOTIFICATIONS D'ALERTE - RESPIRIA AI
+=============================================
+
+Machine à états (hystérésis), déduplication, débit par utilisateur, envoi
+groupé et reprise sur échec, puis intégration à /api/v1/predict
+"""
+
+import contextlib
+import io
+
+from api import notifications
+from api.notifications import AlertState, FCMSink, MemorySink, NotificationDispatcher
+from api.ui_registry import personalized_message
+from test_signal_filters import SpikeCollector
+
+
+def test_state_machine_hysteresis():
+    state = AlertState()
+    assert state.transition("MEDIUM", 55, True) == "alert"
+    assert state.transition("MEDIUM", 58, True) is None
+    assert state.transition("HIGH", 70, True) == "escalation"
+    # Oscille juste sous le seuil : pas de fin d'alerte
+    for score in (50, 62, 48, 61, 52):
+        assert state.transition("MEDIUM", score, score > 60) is None
+    outcomes = [state.transition("LOW", 20, False) for _ in range(notifications.NOTIFY_CLEAR_SAMPLES)]
+    assert outcomes[-1] == "resolved" and outcomes[:-1] == [None] * (len(outcomes) - 1)
+    assert state.level is None
+
+
+def test_dedup_rate_limit_and_batching():
+    now = [0.0]
+    sink = MemorySink()
+    dispatcher = NotificationDispatcher(sink, batch_size=100, dedup_window=600, user_rate_per_minute=1,
+                                        clock=lambda: now[0])
+    dispatcher._pid = notifications.os.getpid()  # pas de thread : traitement explicite
+
+    for user in range(250):
+        dispatcher.submit(f"u{user}", "HIGH", 80, True, profile_id=2, device=f"d{user}")
+    assert dispatcher.process() == 250
+    assert [len(batch) for batch in sink.batches] == [100, 100, 50]
+    first = sink.sent[0]
+    assert (first["kind"], first["user_id"], first["device"]) == ("alert", "u0", "d0")
+    assert first["title"].startswith("🚨")
+
+    # Fin d'alerte puis nouvelle alerte dans la fenêtre : dédupliquée
+    for _ in range(notifications.NOTIFY_CLEAR_SAMPLES):
+        dispatcher.submit("u0", "LOW", 10, False)
+    dispatcher.submit("u0", "HIGH", 80, True)
+    dispatcher.process()
+    assert [n["kind"] for n in sink.sent if n["user_id"] == "u0"] == ["alert", "resolved"]
+    assert dispatcher.counters["deduplicated"] == 1
+
+    # Débit : réserve de 3 notifications par utilisateur, puis 1 par minute
+    dispatcher = NotificationDispatcher(sink, dedup_window=0, user_rate_per_minute=1, clock=lambda: now[0])
+    dispatcher._pid = notifications.os.getpid()
+    for _ in range(2):
+        dispatcher.submit("u-flap", "HIGH", 80, True)
+        for _ in range(notifications.NOTIFY_CLEAR_SAMPLES):
+            dispatcher.submit("u-flap", "LOW", 10, False)
+    dispatcher.process()
+    assert [n["kind"] for n in sink.sent if n["user_id"] == "u-flap"] == ["alert", "resolved", "alert"]
+    assert dispatcher.counters["rate_limited"] == 1
+
+
+def test_rate_limited_alert_is_not_lost():
+    """Réserve vide dès la première alerte HIGH : l'alerte part quand la réserve revient"""
+    now = [0.0]
+    sink = MemorySink()
+    dispatcher = NotificationDispatcher(sink, dedup_window=0, user_rate_per_minute=1, clock=lambda: now[0])
+    dispatcher._pid = notifications.os.getpid()
+    state = dispatcher._state("u-empty")
+    state.bucket = notifications.TokenBucket(1 / 60, notifications.NOTIFY_USER_BURST, clock=lambda: now[0])
+    while state.bucket.try_acquire():
+        pass
+    dispatcher.submit("u-empty", "HIGH", 82, True)
+    dispatcher.submit("u-empty", "HIGH", 84, True)
+    dispatcher.process()
+    assert sink.sent == [] and state.level is None and dispatcher.counters["rate_limited"] == 2
+    now[0] = 61.0
+    dispatcher.submit("u-empty", "HIGH", 85, True)
+    dispatcher.process()
+    assert [(n["kind"], n["risk_level"]) for n in sink.sent] == [("alert", "HIGH")]
+
+    # Fin d'alerte refusée : l'utilisateur reste en alerte
+    now[0] = 90.0
+    for _ in range(notifications.NOTIFY_CLEAR_SAMPLES):
+        dispatcher.submit("u-empty", "LOW", 10, False)
+    dispatcher.process()
+    assert state.level == "HIGH" and len(sink.sent) == 1
+
+    # Escalade refusée : rejouée (et non oubliée) une fois la réserve revenue
+    now[0] = 200.0
+    dispatcher.submit("u-escalate", "MEDIUM", 60, True)
+    dispatcher.process()
+    escalate = dispatcher._state("u-escalate")
+    while escalate.bucket.try_acquire():
+        pass
+    dispatcher.submit("u-escalate", "HIGH", 80, True)
+    dispatcher.process()
+    assert escalate.level == "MEDIUM"
+    now[0] = 260.0
+    dispatcher.submit("u-escalate", "HIGH", 81, True)
+    dispatcher.process()
+    assert escalate.level == "HIGH"
+    assert [n["kind"] for n in sink.sent if n["user_id"] == "u-escalate"] == ["alert", "escalation"]
+
+
+class FlakySink(MemorySink):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def send(self, notifications):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("push indisponible")
+        super().send(notifications)
+
+
+def test_failed_batches_are_retried():
+    sink = FlakySink(failures=1)
+    dispatcher = NotificationDispatcher(sink)
+    dispatcher._pid = notifications.os.getpid()
+    dispatcher.submit("u", "HIGH", 90, True)
+    assert dispatcher.process() == 0 and dispatcher.pending_count() == 1
+    assert dispatcher.process() == 1 and dispatcher.counters["failed"] == 1
+
+    sink.failures = notifications.MAX_ATTEMPTS
+    dispatcher.submit("v", "HIGH", 90, True)
+    for _ in range(notifications.MAX_ATTEMPTS):
+        dispatcher.process()
+    assert dispatcher.pending_count() == 0 and dispatcher.counters["dropped"] == 1
+
+
+class FakeResponse:
+    def __init__(self, ok, status_code=None):
+        self.ok = ok
+        self.status_code = status_code or (200 if ok else 503)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise notifications.requests.HTTPError(f"{self.status_code} en échec")
+
+
+class FakeSession:
+    """Session FCM simulée : les sujets de failing échouent"""
+
+    def __init__(self, failing, valid_token=None):
+        self.failing = set(failing)
+        self.valid_token = valid_token
+        self.topics = []
+        self.tokens = []
+
+    def post(self, url, json, timeout, headers):
+        topic = json["message"]["topic"]
+        self.topics.append(topic)
+        self.tokens.append(headers["Authorization"])
+        if self.valid_token and headers["Authorization"] != f"Bearer {self.valid_token}":
+            return FakeResponse(False, 401)
+        return FakeResponse(topic not in self.failing)
+
+
+class FakeCredentials:
+    """Credentials google-auth simulés : jeton n° refreshes, invalide une fois expiré"""
+
+    def __init__(self):
+        self.refreshes = 0
+        self.token = None
+        self.valid = False
+
+    def refresh(self, request):
+        self.refreshes += 1
+        self.token = f"jeton-{self.refreshes}"
+        self.valid = True
+
+
+def test_fcm_partial_failure_retries_only_failed():
+    sink = FCMSink("projet", "jeton")
+    sink._session = session = FakeSession({"user_u1"})
+    dispatcher = NotificationDispatcher(sink)
+    dispatcher._pid = notifications.os.getpid()
+    for user in ("u0", "u1", "u2"):
+        dispatcher.submit(user, "HIGH", 82.0, True, profile_id=2)
+    assert dispatcher.process() == 2 and dispatcher.pending_count() == 1
+    session.failing.clear()
+    assert dispatcher.process() == 1
+    # u0 et u2 une seule fois : pas de doublon après l'échec de u1
+    assert session.topics == ["user_u0", "user_u1", "user_u2", "user_u1"]
+    assert dispatcher.counters["failed"] == 1 and dispatcher.counters["sent"] == 3
+
+    # Corps = message du prédicteur, transmis sans nouveau formatage
+    sent = NotificationDispatcher._build("alert", "u0", "HIGH", 82.0, 2, None, 0)
+    assert sent["body"] == personalized_message("HIGH", 82.0, 2)["description"]
+
+
+def test_fcm_token_refreshed_before_expiry_and_on_401():
+    credentials = FakeCredentials()
+    sink = FCMSink("projet", notifications.FCMToken(credentials=credentials))
+    sink._session = session = FakeSession(set(), valid_token="jeton-1")
+    note = NotificationDispatcher._build("alert", "u0", "HIGH", 82.0, 2, None, 0)
+    assert sink.send([note, note]) == [] and credentials.refreshes == 1
+    # Expiré (valid=False) : renouvelé avant l'envoi
+    credentials.valid = False
+    session.valid_token = "jeton-2"
+    assert sink.send([note]) == [] and credentials.refreshes == 2
+    # Révoqué côté serveur : 401, renouvellement, une seule reprise
+    session.valid_token = "jeton-3"
+    assert sink.send([note]) == [] and credentials.refreshes == 3
+    assert session.tokens[-2:] == ["Bearer jeton-2", "Bearer jeton-3"]
+    # Jeton statique : pas de renouvellement possible, le 401 est un échec
+    static = FCMSink("projet", "jeton-statique")
+    static._session = FakeSession(set(), valid_token="autre")
+    assert static.send([note]) == [note] and len(static._session.topics) == 1
+
+
+def test_predict_queues_notification():
+    with contextlib.redirect_stdout(io.StringIO()):
+        from api import app as app_module
+    sink = MemorySink()
+    dispatcher = NotificationDispatcher(sink)
+    dispatcher._pid = notifications.os.getpid()
+    old = notifications._dispatcher, notifications._configured, app_module.collector
+    notifications._dispatcher, notifications._configured = dispatcher, True
+    app_module.collector = SpikeCollector([80])
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = app_module.app.test_client().post('/api/v1/predict', json={
+                'user_id': 'u-notify', 'profile_id': 2, 'device_label': 'bracelet-notify'})
+        assert response.get_json()['prediction']['should_notify'] is True
+        assert dispatcher.process() == 1
+        assert (sink.sent[0]["user_id"], sink.sent[0]["device"]) == ("u-notify", "bracelet-notify")
+    finally:
+        notifications._dispatcher, notifications._configured, app_module.collector = old
+
+
+if __name__ == "__main__":
+    test_state_machine_hysteresis()
+    test_dedup_rate_limit_and_batching()
+    test_rate_limited_alert_is_not_lost()
+    test_failed_batches_are_retried()
+    test_fcm_partial_failure_retries_only_failed()
+    test_fcm_token_refreshed_before_expiry_and_on_401()
+    test_predict_queues_notification()
+    print("✅ Notifications d'alerte OK")
@@ -10,6 +10,83 @@ pour atteindre le standard médical de 75-80%
 from api.respiria_ai_predictor import RespiriaAIPredictor
 import json
 
+# Scénarios médicaux étendus avec résultats attendus
+SCENARIOS = [
+    {
+        "name": "URGENCE ABSOLUE - SpO2 critique",
+        "data": {
+            "profile_id": 2, "spo2": 82.0, "heart_rate": 125, 
+            "respiratory_rate": 38, "temperature": 25.0, "humidity": 60.0,
+            "aqi": 50.0, "pollen_level": 1, "smoke_detected": False, "medication_taken": True
+        },
+        "expected": {"risk_level": "high", "should_notify": True, "min_score": 80}
+    },
+    {
+        "name": "SITUATION NORMALE - Personne saine",
+        "data": {
+            "profile_id": 1, "spo2": 98.0, "heart_rate": 70, 
+            "respiratory_rate": 16, "temperature": 22.0, "humidity": 50.0,
+            "aqi": 40.0, "pollen_level": 1, "smoke_detected": False, "medication_taken": True
+        },
+        "expected": {"risk_level": "low", "should_notify": False, "max_score": 15}
+    },
+    {
+        "name": "URGENCE FUMÉE - Évacuation",
+        "data": {
+            "profile_id": 1, "spo2": 94.0, "heart_rate": 85, 
+            "respiratory_rate": 20, "temperature": 25.0, "humidity": 55.0,
+            "aqi": 80.0, "pollen_level": 2, "smoke_detected": True, "medication_taken": True
+        },
+        "expected": {"risk_level": "high", "should_notify": True, "min_score": 50}
+    },
+    {
+        "name": "CAS LIMITE - SpO2 92%",
+        "data": {
+            "profile_id": 1, "spo2": 92.0, "heart_rate": 80, 
+            "respiratory_rate": 18, "temperature": 20.0, "humidity": 45.0,
+            "aqi": 60.0, "pollen_level": 2, "smoke_detected": False, "medication_taken": True
+        },
+        "expected": {"risk_level": "medium", "should_notify": False, "max_score": 50}
+    },
+    {
+        "name": "ASTHMATIQUE SÉVÈRE - Stable",
+        "data": {
+            "profile_id": 2, "spo2": 95.0, "heart_rate": 75, 
+            "respiratory_rate": 18, "temperature": 24.0, "humidity": 55.0,
+            "aqi": 70.0, "pollen_level": 3, "smoke_detected": False, "medication_taken": True
+        },
+        "expected": {"risk_level": "medium", "should_notify": False, "max_score": 40}
+    },
+    {
+        "name": "QUALITÉ AIR MOYENNE",
+        "data": {
+            "profile_id": 1, "spo2": 96.0, "heart_rate": 72, 
+            "respiratory_rate": 17, "temperature": 28.0, "humidity": 65.0,
+            "aqi": 120.0, "pollen_level": 3, "smoke_detected": False, "medication_taken": True
+        },
+        "expected": {"risk_level": "medium", "should_notify": False, "max_score": 45}
+    },
+    {
+        "name": "DÉTRESSE RESPIRATOIRE",
+        "data": {
+            "profile_id": 2, "spo2": 89.0, "heart_rate": 115, 
+            "respiratory_rate": 32, "temperature": 22.0, "humidity": 50.0,
+            "aqi": 90.0, "pollen_level": 2, "smoke_detected": False, "medication_taken": False
+        },
+        "expected": {"risk_level": "high", "should_notify": True, "min_score": 75}
+    },
+    {
+        "name": "PRÉVENTION - Légère exposition",
+        "data": {
+            "profile_id": 1, "spo2": 97.0, "heart_rate": 78, 
+            "respiratory_rate": 19, "temperature": 30.0, "humidity": 75.0,
+            "aqi": 90.0, "pollen_level": 4, "smoke_detected": False, "medication_taken": True
+        },
+        "expected": {"risk_level": "medium", "should_notify": False, "max_score": 40}  # Corrigé: pollen 4 + AQI 90 = medium
+    }
+]
+
+
 def test_medical_precision():
     """Test complet de précision médicale"""
     print("🏥 ÉVALUATION DE PRÉCISION MÉDICALE - RESPIRIA AI")
@@ -19,81 +96,7 @@ def test_medical_precision():
     
     predictor = RespiriaAIPredictor()
     
-    # Scénarios médicaux étendus avec résultats attendus
-    scenarios = [
-        {
-            "name": "URGENCE ABSOLUE - SpO2 critique",
-            "data": {
-                "profile_id": 2, "spo2": 82.0, "heart_rate": 125, 
-                "respiratory_rate": 38, "temperature": 25.0, "humidity": 60.0,
-                "aqi": 50.0, "pollen_level": 1, "smoke_detected": False, "medication_taken": True
-            },
-            "expected": {"risk_level": "high", "should_notify": True, "min_score": 80}
-        },
-        {
-            "name": "SITUATION NORMALE - Personne saine",
-            "data": {
-                "profile_id": 1, "spo2": 98.0, "heart_rate": 70, 
-                "respiratory_rate": 16, "temperature": 22.0, "humidity": 50.0,
-                "aqi": 40.0, "pollen_level": 1, "smoke_detected": False, "medication_taken": True
-            },
-            "expected": {"risk_level": "low", "should_notify": False, "max_score": 15}
-        },
-        {
-            "name": "URGENCE FUMÉE - Évacuation",
-            "data": {
-                "profile_id": 1, "spo2": 94.0, "heart_rate": 85, 
-                "respiratory_rate": 20, "temperature": 25.0, "humidity": 55.0,
-                "aqi": 80.0, "pollen_level": 2, "smoke_detected": True, "medication_taken": True
-            },
-            "expected": {"risk_level": "high", "should_notify": True, "min_score": 50}
-        },
-        {
-            "name": "CAS LIMITE - SpO2 92%",
-            "data": {
-                "profile_id": 1, "spo2": 92.0, "heart_rate": 80, 
-                "respiratory_rate": 18, "temperature": 20.0, "humidity": 45.0,
-                "aqi": 60.0, "pollen_level": 2, "smoke_detected": False, "medication_taken": True
-            },
-            "expected": {"risk_level": "medium", "should_notify": False, "max_score": 50}
-        },
-        {
-            "name": "ASTHMATIQUE SÉVÈRE - Stable",
-            "data": {
-                "profile_id": 2, "spo2": 95.0, "heart_rate": 75, 
-                "respiratory_rate": 18, "temperature": 24.0, "humidity": 55.0,
-                "aqi": 70.0, "pollen_level": 3, "smoke_detected": False, "medication_taken": True
-            },
-            "expected": {"risk_level": "medium", "should_notify": False, "max_score": 40}
-        },
-        {
-            "name": "QUALITÉ AIR MOYENNE",
-            "data": {
-                "profile_id": 1, "spo2": 96.0, "heart_rate": 72, 
-                "respiratory_rate": 17, "temperature": 28.0, "humidity": 65.0,
-                "aqi": 120.0, "pollen_level": 3, "smoke_detected": False, "medication_taken": True
-            },
-            "expected": {"risk_level": "medium", "should_notify": False, "max_score": 45}
-        },
-        {
-            "name": "DÉTRESSE RESPIRATOIRE",
-            "data": {
-                "profile_id": 2, "spo2": 89.0, "heart_rate": 115, 
-                "respiratory_rate": 32, "temperature": 22.0, "humidity": 50.0,
-                "aqi": 90.0, "pollen_level": 2, "smoke_detected": False, "medication_taken": False
-            },
-            "expected": {"risk_level": "high", "should_notify": True, "min_score": 75}
-        },
-        {
-            "name": "PRÉVENTION - Légère exposition",
-            "data": {
-                "profile_id": 1, "spo2": 97.0, "heart_rate": 78, 
-                "respiratory_rate": 19, "temperature": 30.0, "humidity": 75.0,
-                "aqi": 90.0, "pollen_level": 4, "smoke_detected": False, "medication_taken": True
-            },
-            "expected": {"risk_level": "medium", "should_notify": False, "max_score": 40}  # Corrigé: pollen 4 + AQI 90 = medium
-        }
-    ]
+    scenarios = SCENARIOS
     
     correct_predictions = 0
     total_tests = len(scenarios)
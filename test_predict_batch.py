@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+TEST DE LA PRÉDICTION GROUPÉE - RESPIRIA AI
+===========================================
+
+RespiriaAIPredictor.predict_batch (calcul vectorisé) == predict() par ligne,
+et endpoint /api/v1/predict/batch (une collecte environnement par localisation)
+"""
+
+import contextlib
+import io
+import random
+import time
+
+from api import risk_bands, vector_scoring
+from api.respiria_ai_predictor import RespiriaAIPredictor
+
+RANGES = {
+    'spo2': (60, 101), 'heart_rate': (20, 230), 'respiratory_rate': (5, 55),
+    'temperature': (-25, 65), 'humidity': (-5, 105), 'eco2': (0, 11000), 'tvoc': (0, 6000),
+    'aqi': (0, 520), 'pm25': (0, 520), 'pm10': (0, 520), 'pressure': (880, 1120), 'wind_speed': (0, 210),
+}
+
+
+def random_readings(count, seed=11):
+    rng = random.Random(seed)
+    readings = []
+    for _ in range(count):
+        reading = {'profile_id': rng.choice([0, 1, 2, 3])}
+        for name, (low, high) in RANGES.items():
+            if rng.random() < 0.85:
+                value = rng.uniform(low, high)
+                reading[name] = int(value) if rng.random() < 0.4 else round(value, 1)
+        if rng.random() < 0.8:
+            reading['pollen_level'] = rng.randint(-1, 6)
+        if rng.random() < 0.8:
+            reading['smoke_detected'] = rng.random() < 0.1
+        if rng.random() < 0.8:
+            reading['medication_taken'] = rng.random() < 0.7
+        readings.append(reading)
+    return readings
+
+
+def comparable(result):
+    """Réponse sans les champs de temps"""
+    result = dict(result)
+    result.pop('timestamp', None)
+    result.pop('prediction_time_ms', None)
+    if 'metadata' in result:
+        metadata = dict(result['metadata'])
+        for key in ('prediction_time_ms', 'stages_ms', 'timestamp', 'batch_size', 'performance'):
+            metadata.pop(key, None)
+        result['metadata'] = metadata
+    return result
+
+
+def test_batch_matches_predict():
+    """Même résultat que predict() ligne par ligne, lignes invalides comprises"""
+    predictor = RespiriaAIPredictor()
+    readings = random_readings(500) + [{'profile_id': 9}, 'invalide', {}]
+    batch = predictor.predict_batch(readings)
+    assert len(batch) == len(readings)
+    for reading, result in zip(readings, batch):
+        assert comparable(result) == comparable(predictor.predict(reading)), reading
+    assert batch[-3]['success'] is False
+    assert batch[0]['metadata']['batch_size'] == 501
+
+
+def test_bands_shared_at_thresholds():
+    """Un seul barème : calculate_*_score et colonnes d'accord sur chaque seuil (et de part et d'autre)"""
+    for factor, bands in risk_bands.SCORE_BANDS.items():
+        values = sorted({threshold + delta for _, band in bands for _, threshold in band for delta in (-0.5, 0, 0.5)})
+        column = vector_scoring.column_score(factor, vector_scoring.np.array(values, dtype=float))
+        assert column.tolist() == [risk_bands.band_score(factor, value) for value in values], factor
+    for factor in risk_bands.FLAG_SCORES:
+        flags = vector_scoring.np.array([True, False])
+        assert vector_scoring.column_score(factor, flags).tolist() == [risk_bands.band_score(factor, flag)
+                                                                       for flag in (True, False)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        predictor = RespiriaAIPredictor()
+    assert predictor.calculate_spo2_score(87.9) == 40 and predictor.calculate_pressure_score(982.5) == 10
+    assert predictor.calculate_tvoc_score(500) == 8 and predictor.calculate_pollen_score(4) == 12
+
+
+def test_malformed_rows_fall_back_alone():
+    """Ligne mal formée (chaîne, liste, profil non hachable) : erreur pour elle seule"""
+    predictor = RespiriaAIPredictor()
+    good = {'profile_id': 2, 'spo2': 86}
+    bad = [{'profile_id': 1, 'spo2': 'abc'}, {'profile_id': 1, 'spo2': [90, 91]}, {'profile_id': [1], 'spo2': 90}]
+    batch = predictor.predict_batch(bad + [good])
+    assert [result['success'] for result in batch] == [False, False, False, True]
+    assert batch[-1]['metadata']['batch_size'] == 1
+    assert comparable(batch[-1]) == comparable(predictor.predict(good))
+
+
+class CountingCollector:
+    """Collecteur en mémoire qui compte les appels"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_weather_data(self, location=None, auth_token=None):
+        self.calls.append(('weather', location))
+        return {'temperature': 29.0, 'humidity': 78.0, 'pressure': 1009, 'wind_speed': 12.0}
+
+    def get_air_quality_data(self, location=None, auth_token=None):
+        self.calls.append(('air_quality', location))
+        return {'aqi': 87, 'pm25': 28.0, 'pm10': 41.0, 'pollen_level': 2}
+
+    def get_ubidots_sensors(self, user_id, auth_token=None):
+        self.calls.append(('sensors', user_id))
+        return {'spo2': 95.0, 'heart_rate': 88.0, 'status': 'success'}
+
+
+class SlowSensorCollector(CountingCollector):
+    """Capteurs backend lents (3 appels HTTP bloquants simulés par utilisateur)"""
+
+    def get_ubidots_sensors(self, user_id, auth_token=None):
+        time.sleep(0.1)
+        return super().get_ubidots_sensors(user_id, auth_token)
+
+
+def test_batch_sensors_fetched_concurrently_per_user():
+    """Lectures sans sensor_data : une collecte par utilisateur distinct, en parallèle"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        from api import app as app_module
+    old_collector = app_module.collector
+    app_module.collector = collector = SlowSensorCollector()
+    try:
+        readings = [{'user_id': f'u{i % 8}', 'profile_id': 1} for i in range(24)]
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = app_module.app.test_client().post('/api/v1/predict/batch', json={'readings': readings})
+        elapsed = time.perf_counter() - start
+        assert response.get_json()['succeeded'] == 24
+        assert sorted(c[1] for c in collector.calls if c[0] == 'sensors') == [f'u{i}' for i in range(8)]
+        assert elapsed < 0.5, elapsed  # 8 collectes de 0.1 s en série : 0.8 s
+    finally:
+        app_module.collector = old_collector
+
+
+def test_batch_endpoint():
+    """Une collecte par localisation ; erreurs par lecture sans échec du lot"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        from api import app as app_module
+    old_collector = app_module.collector
+    app_module.collector = collector = CountingCollector()
+    try:
+        client = app_module.app.test_client()
+        body = {'readings': [
+            {'user_id': 'u1', 'profile_id': 1, 'sensor_data': {'spo2': 86}},
+            {'user_id': 'u2', 'profile_id': 2, 'location': 'Bouaké'},
+            {'user_id': 'u3', 'profile_id': 0, 'sensor_data': {'spo2': 97}},
+            {'user_id': 'u4', 'profile_id': 7},
+        ]}
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = client.post('/api/v1/predict/batch', json=body)
+        assert response.status_code == 200
+        payload = response.get_json()
+        assert payload['count'] == 4 and payload['succeeded'] == 3 and payload['failed'] == 1
+        assert payload['metadata']['locations'] == 2
+        assert sorted(c for c in collector.calls if c[0] == 'weather') == [('weather', 'Abidjan'), ('weather', 'Bouaké')]
+        assert [c for c in collector.calls if c[0] == 'sensors'] == [('sensors', 'u2')]
+
+        first = payload['results'][0]
+        assert first['user_id'] == 'u1' and first['prediction']['risk_level'] in ('MEDIUM', 'HIGH')
+        assert first['sensors']['source'] == 'request'
+        assert payload['results'][1]['sensors']['source'] == 'ubidots'
+        assert payload['results'][3] == {'user_id': 'u4', 'success': False,
+                                         'error': 'profile_id invalide. Valeurs: 0, 1, 2, 3',
+                                         'code': 'INVALID_PROFILE'}
+
+        # Lecture mal formée mêlée à une lecture valide : erreur par lecture, lot servi
+        mixed = {'readings': [{'user_id': 'bad', 'profile_id': 1, 'sensor_data': {'spo2': [90, 91]}},
+                              {'user_id': 'good', 'profile_id': 1, 'sensor_data': {'spo2': 97}}]}
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = client.post('/api/v1/predict/batch', json=mixed)
+        assert response.status_code == 200
+        bad, good = response.get_json()['results']
+        assert (bad['user_id'], bad['success'], bad['code']) == ('bad', False, 'PREDICTION_ERROR')
+        assert good['success'] is True and good['prediction']['risk_level'] == 'LOW'
+        
+        assert client.post('/api/v1/predict/batch', json={}).status_code == 400
+        too_many = {'readings': [{'user_id': 'u', 'profile_id': 1}] * (app_module.BATCH_MAX_SIZE + 1)}
+        assert client.post('/api/v1/predict/batch', json=too_many).status_code == 413
+    finally:
+        app_module.collector = old_collector
+
+
+if __name__ == "__main__":
+    test_batch_matches_predict()
+    test_bands_shared_at_thresholds()
+    test_malformed_rows_fall_back_alone()
+    test_batch_endpoint()
+    test_batch_sensors_fetched_concurrently_per_user()
+    print("✅ Prédiction groupée OK")
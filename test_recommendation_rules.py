@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+TEST DU MOTEUR DE RÈGLES DE RECOMMANDATION - RESPIRIA AI
+========================================================
+
+Table de décision compilée (api/recommendation_rules.py) : bandes, ordre des
+messages, conditions annexes et évaluation par lot
+"""
+
+from api.recommendation_rules import RULE_TABLE, compile_rules, FACTORS
+
+
+def test_bands():
+    """Seuils inclusifs (>=) et stricts (>)"""
+    assert RULE_TABLE.band('spo2', 84.9) == 0
+    assert RULE_TABLE.band('spo2', 85) == 1
+    assert RULE_TABLE.band('spo2', 92) == 3
+    assert RULE_TABLE.band('respiratory_rate', 28) == 0
+    assert RULE_TABLE.band('respiratory_rate', 28.01) == 1
+    assert RULE_TABLE.band('pressure', 989.9) == 0
+    assert RULE_TABLE.band('pressure', 1030) == 1
+    assert RULE_TABLE.band('pressure', 1030.5) == 2
+    assert RULE_TABLE.band('smoke_detected', True) == 1
+
+
+def test_critical_reading():
+    """Urgences en tête, traitement manquant, valeur insérée dans le message"""
+    data = {'smoke_detected': True, 'spo2': 84, 'medication_taken': False, 'pressure': 985}
+    recs = RULE_TABLE.evaluate(data, 90.0, 2)
+    assert recs['immediate'][0] == "🚨 FUMÉE DÉTECTÉE - ÉVACUEZ LA ZONE IMMÉDIATEMENT"
+    assert "🚨 URGENCE CRITIQUE : SpO2 < 85% - Appelez le 15 IMMÉDIATEMENT" in recs['immediate']
+    assert recs['preventive'][0] == "💊 URGENT : Prenez votre traitement de fond immédiatement"
+    assert "🌀 Pression atypique (985 hPa) : migraines/gêne possible" in recs['environmental']
+    for messages in recs.values():
+        assert len(messages) == len(set(messages))
+
+
+def test_requires_and_unknown_profile():
+    """Règle de vent conditionnée au pollen ; profil inconnu = branches "sinon" """
+    windy = {'wind_speed': 30}
+    assert RULE_TABLE.evaluate(windy, 10.0, 1)['environmental'] == []
+    assert "💨 Vent modéré + pollen : portez un masque" in \
+        RULE_TABLE.evaluate(dict(windy, pollen_level=3), 10.0, 1)['environmental']
+    assert RULE_TABLE.evaluate({'spo2': 86}, 10.0, 7)['immediate'] == \
+        RULE_TABLE.evaluate({'spo2': 86}, 10.0, 0)['immediate']
+
+
+def test_batch_matches_scalar():
+    """evaluate_batch == evaluate ligne par ligne ; listes non partagées"""
+    rows = [
+        {'spo2': 84.0 + i % 16, 'pm25': (i * 7) % 80, 'pressure': 980 + (i * 3) % 60,
+         'wind_speed': (i * 5) % 50, 'pollen_level': i % 5, 'smoke_detected': i % 11 == 0}
+        for i in range(200)
+    ]
+    scores = [(i * 7.3) % 100 for i in range(200)]
+    profiles = [i % 5 for i in range(200)]
+    columns = {key: [row[key] for row in rows] for key in rows[0]}
+    batch = RULE_TABLE.evaluate_batch(columns, scores, profiles)
+    assert batch == [RULE_TABLE.evaluate(row, s, p) for row, s, p in zip(rows, scores, profiles)]
+    batch[0]['immediate'].append('x')
+    assert batch[5]['immediate'] is not batch[0]['immediate']
+
+
+def test_compile_custom_rules():
+    """Une table peut être compilée à partir d'autres règles"""
+    table = compile_rules(({'category': 'preventive', 'factor': 'humidity', 'bands': (1,),
+                            'profiles': (0,), 'message': 'humide', 'requires': {}},))
+    assert table.evaluate({'humidity': 85}, 0.0, 0)['preventive'] == ['humide']
+    assert table.evaluate({'humidity': 85}, 0.0, 1)['preventive'] == []
+    assert 'risk_score' == list(FACTORS)[-1]
+
+
+if __name__ == "__main__":
+    test_bands()
+    test_critical_reading()
+    test_requires_and_unknown_profile()
+    test_batch_matches_scalar()
+    test_compile_custom_rules()
+    print("✅ Moteur de règles de recommandation OK")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+TEST DE LA FRÉQUENCE RESPIRATOIRE PPG - RESPIRIA AI
+===================================================
+
+Estimation sur signal de substitution (pouls + modulations respiratoires),
+rejet du bruit seul, fenêtres glissantes vectorisées, tampons par device et
+intégration à /api/v1/sensors/ppg puis /api/v1/predict
+"""
+
+import contextlib
+import io
+
+import numpy as np
+
+from api.respiration import (MIN_WINDOW_S, RespirationMonitor, estimate_windows, rolling_estimates,
+                             synthetic_ppg)
+from test_signal_filters import SpikeCollector
+
+
+def test_estimates_respiratory_and_heart_rate():
+    for seed, (respiratory_rate, heart_rate) in enumerate([(9, 58), (16, 72), (24, 95), (32, 125)]):
+        samples = synthetic_ppg(32, heart_rate=heart_rate, respiratory_rate=respiratory_rate, noise=60, seed=seed)
+        estimate = estimate_windows(samples[None, :])[0]
+        assert abs(estimate["respiratory_rate"] - respiratory_rate) <= 1.5, estimate
+        assert abs(estimate["heart_rate"] - heart_rate) <= 3, estimate
+
+
+def test_noise_only_is_rejected():
+    samples = 80000 + np.random.default_rng(1).normal(0, 60, 800)
+    estimate = estimate_windows(samples[None, :])[0]
+    assert estimate["respiratory_rate"] is None and estimate["method"] is None
+
+
+def test_rolling_windows_follow_change():
+    samples = np.concatenate((synthetic_ppg(64, respiratory_rate=12, seed=2),
+                              synthetic_ppg(64, respiratory_rate=26, seed=3)))
+    estimates = rolling_estimates(samples, window_s=32, hop_s=8)
+    assert len(estimates) == 13 and estimates[-1]["end_s"] == 128.0
+    assert abs(estimates[0]["respiratory_rate"] - 12) <= 1.5
+    assert abs(estimates[-1]["respiratory_rate"] - 26) <= 1.5
+
+
+def test_monitor_buffers_per_device():
+    now = [0.0]
+    monitor = RespirationMonitor(max_devices=2, clock=lambda: now[0])
+    samples = synthetic_ppg(40, respiratory_rate=20, seed=4)
+    first = monitor.add_samples("a", samples[:int(MIN_WINDOW_S * 25) - 25])
+    assert first["estimate"] is None and not first["updated"]
+
+    # Paquets de 2 s : une estimation dès MIN_WINDOW_S, puis toutes les HOP_S secondes
+    updates = [monitor.add_samples("a", samples[i:i + 50])["updated"] for i in range(375, 975, 50)]
+    assert updates == [True, False] * 6
+    assert abs(monitor.latest("a")["respiratory_rate"] - 20) <= 1.5
+    assert monitor.add_samples("a", [float("nan")] * 10)["buffered_s"] == 32.0
+
+    monitor.add_samples("b", samples[:100])
+    monitor.add_samples("c", samples[:100])
+    assert monitor.latest("a") is None  # oublié (le moins récent)
+    monitor.add_samples("c", samples)
+    now[0] = 120.0
+    assert monitor.latest("c") is None  # périmée
+
+
+def test_ppg_endpoint_feeds_predict():
+    with contextlib.redirect_stdout(io.StringIO()):
+        from api import app as app_module
+    old_collector = app_module.collector
+    app_module.collector = SpikeCollector([98] * 2)
+    try:
+        client = app_module.app.test_client()
+        samples = synthetic_ppg(32, respiratory_rate=30, seed=5).tolist()
+        body = {'user_id': 'u-ppg', 'device_label': 'bracelet-ppg', 'sample_rate': 25}
+        assert client.post('/api/v1/sensors/ppg', json=dict(body, samples=[])).status_code == 400
+        assert client.post('/api/v1/sensors/ppg', json=dict(body, samples=['x'])).status_code == 400
+        assert client.post('/api/v1/sensors/ppg', json=dict(body, samples=[1.0] * 7000)).status_code == 413
+
+        response = client.post('/api/v1/sensors/ppg', json=dict(body, samples=samples)).get_json()
+        assert response['success'] and response['updated'] and response['buffered_s'] == 32.0
+        assert abs(response['estimate']['respiratory_rate'] - 30) <= 1.5
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = client.post('/api/v1/predict', json={'user_id': 'u-ppg', 'profile_id': 2,
+                                                          'device_label': 'bracelet-ppg'}).get_json()
+        assert result['sensors']['respiratory_rate'] == response['estimate']['respiratory_rate']
+    finally:
+        app_module.collector = old_collector
+
+
+if __name__ == "__main__":
+    test_estimates_respiratory_and_heart_rate()
+    test_noise_only_is_rejected()
+    test_rolling_windows_follow_change()
+    test_monitor_buffers_per_device()
+    test_ppg_endpoint_feeds_predict()
+    print("✅ Fréquence respiratoire PPG OK")
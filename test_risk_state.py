@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+TEST DU NIVEAU DE RISQUE STABILISÉ - RESPIRIA AI
+================================================
+
+Hystérésis (marge de sortie), durées minimales de montée / descente,
+descente sur plusieurs niveaux, oubli des utilisateurs inactifs et
+intégration à /api/v1/predict (RESPIRIA_RISK_STATE)
+"""
+
+import contextlib
+import io
+
+from api import risk_state
+from api.risk_state import RiskStateStore
+from test_signal_filters import SpikeCollector
+
+
+def level_of(score):
+    return "low" if score < 30 else "medium" if score < 60 else "high"
+
+
+def test_no_flapping_around_boundary():
+    store = RiskStateStore(exit_margin=5, dwell_down=60)
+    levels = [store.update("u", score, level_of(score), now=t) for t, score in enumerate([28, 31, 29, 32, 27])]
+    assert levels == ["low", "medium", "medium", "medium", "medium"]
+    assert store.update("u", 27, "low", now=100) == "medium"  # dans la marge (> 25)
+    assert store.update("u", 24, "low", now=101) == "low"
+
+
+def test_dwell_times_and_multi_level_descent():
+    store = RiskStateStore(exit_margin=5, dwell_up=10, dwell_down=60)
+    assert store.update("u", 20, "low", now=0) == "low"
+    assert store.update("u", 70, "high", now=1) == "low"     # montée pas encore confirmée
+    assert store.update("u", 65, "high", now=11) == "high"
+    assert store.update("u", 28, "low", now=30) == "high"    # durée minimale en HIGH
+    assert store.update("u", 28, "low", now=71) == "medium"  # 28 ≥ 25 : reste MEDIUM
+    assert store.update("u", 10, "low", now=140) == "low"
+
+    # Fumée : HIGH malgré un score faible, montée immédiate sans durée minimale
+    smoke = RiskStateStore(dwell_down=60)
+    smoke.update("s", 10, "low", now=0)
+    assert smoke.update("s", 15, "high", now=1) == "high"
+    assert smoke.update("s", 10, "low", now=62) == "low"
+
+
+def test_idle_users_evicted():
+    store = RiskStateStore(idle=100, max_users=3)
+    for user in ("a", "b", "c"):
+        store.update(user, 10, "low", now=0)
+    store.update("a", 10, "low", now=50)
+    store.update("d", 10, "low", now=60)   # borne atteinte : "b" (le plus ancien) oublié
+    assert store.level("b") is None and len(store) == 3
+    store.update("e", 10, "low", now=155)  # "c" et "a" inactifs depuis plus de 100 s
+    assert [store.level(user) for user in "acde"] == [None, None, "low", "low"]
+
+
+def test_predict_reports_stable_level():
+    with contextlib.redirect_stdout(io.StringIO()):
+        from api import app as app_module
+    old = risk_state.RISK_STATE_ENABLED, risk_state._store, app_module.collector
+    risk_state.RISK_STATE_ENABLED, risk_state._store = True, RiskStateStore(dwell_down=60)
+    app_module.collector = SpikeCollector([98] * 2)
+    try:
+        client = app_module.app.test_client()
+        body = {'user_id': 'u-stable', 'profile_id': 2}
+        with contextlib.redirect_stdout(io.StringIO()):
+            high = client.post('/api/v1/predict', json=dict(body, sensor_data={'spo2': 80})).get_json()
+            after = client.post('/api/v1/predict', json=dict(body, sensor_data={'spo2': 98})).get_json()
+        assert high['prediction']['risk_level'] == 'HIGH'
+        assert after['prediction']['risk_level'] == 'HIGH'  # instantané LOW, durée minimale non écoulée
+        assert risk_state._store.level('u-stable') == 'high'
+    finally:
+        risk_state.RISK_STATE_ENABLED, risk_state._store, app_module.collector = old
+
+
+if __name__ == "__main__":
+    test_no_flapping_around_boundary()
+    test_dwell_times_and_multi_level_descent()
+    test_idle_users_evicted()
+    test_predict_reports_stable_level()
+    print("✅ Niveau de risque stabilisé OK")
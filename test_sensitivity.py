@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+TEST DE L'ANALYSE DE ROBUSTESSE - RESPIRIA AI
+=============================================
+
+Monte Carlo sous bruit capteur (evaluation/sensitivity.py) : rescoring
+incrémental = predict() complet, indépendance vis-à-vis du nombre de
+processus, seuils candidats
+"""
+
+from api import vector_scoring
+from evaluation import sensitivity
+from evaluation.engine import LEVELS, get_predictor
+
+
+def test_incremental_rescoring_matches_predict():
+    """Basculements d'une tranche = niveaux predict() avant / après bruit SpO2"""
+    np = vector_scoring.np
+    size = 1500
+    counts = sensitivity.sensitivity_chunk((9, 2, 0, size, {"spo2": 1.0}, None))
+
+    rng = np.random.default_rng([9, 2, 0])
+    columns = sensitivity.realistic_columns(rng, size)
+    noisy_spo2 = columns["spo2"] + rng.uniform(-1.0, 1.0, size)
+    predictor = get_predictor()
+    up = down = 0
+    for i in range(size):
+        data = {factor: column[i].item() for factor, column in columns.items()}
+        data["profile_id"] = 2
+        before = LEVELS.index(predictor.predict(data)["prediction"]["risk_level"])
+        data["spo2"] = noisy_spo2[i].item()
+        after = LEVELS.index(predictor.predict(data)["prediction"]["risk_level"])
+        up += after > before
+        down += after < before
+    assert counts["spo2"][:2] == [up, down]
+    assert up + down > 0
+
+
+def test_independent_of_workers():
+    single = sensitivity.run_sensitivity(6000, seed=4, workers=1, chunk_size=1000)
+    pooled = sensitivity.run_sensitivity(6000, seed=4, workers=2, chunk_size=1000)
+    for key in ("elapsed_s", "samples_per_sec", "workers"):
+        single.pop(key)
+        pooled.pop(key)
+    assert single == pooled
+    assert single["samples"] == 4 * 6000
+    assert set(single["ranking"]) == set(sensitivity.NOISE)
+
+
+def test_candidate_thresholds():
+    """Seuil "medium" abaissé : plus de niveaux "high" sur les mêmes lectures"""
+    current = sensitivity.run_sensitivity(5000, profiles=[1])
+    candidate = sensitivity.run_sensitivity(5000, profiles=[1], thresholds={"low": 30, "medium": 45, "high": 100})
+    assert candidate["distribution"]["high"] > current["distribution"]["high"]
+    assert candidate["thresholds"]["medium"] == 45
+
+
+if __name__ == "__main__":
+    test_incremental_rescoring_matches_predict()
+    test_independent_of_workers()
+    test_candidate_thresholds()
+    print("✅ Analyse de robustesse OK")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+TEST DU DÉBRUITAGE DES CAPTEURS - RESPIRIA AI
+=============================================
+
+Plausibilité, aggravations transmises sans délai, rejet des pics,
+changement confirmé, EMA, relectures ignorées, devices bornés et
+intégration à /api/v1/predict (désaturation aiguë notée dès le premier
+échantillon)
+"""
+
+import contextlib
+import io
+
+from api import signal_filters
+from api.signal_filters import CONFIRM_SAMPLES, SIGNALS, SignalFilter, SignalFilterBank
+
+
+def test_spike_rejected_then_step_confirmed():
+    spo2 = SignalFilter(SIGNALS["spo2"], window=5, alpha=1.0)
+    for _ in range(5):
+        assert spo2.update(91) == (91.0, "ok")
+    assert spo2.update(99) == (91.0, "outlier")  # pic vers le haut : sens sans danger
+    assert spo2.update(91) == (91.0, "ok")
+
+    # Remontée réelle : acceptée après CONFIRM_SAMPLES échantillons consécutifs
+    outcomes = [spo2.update(97)[1] for _ in range(CONFIRM_SAMPLES)]
+    assert outcomes == ["outlier"] * (CONFIRM_SAMPLES - 1) + ["step"]
+    assert spo2.value == 97.0
+
+
+def test_worsening_never_held_or_smoothed():
+    spo2 = SignalFilter(SIGNALS["spo2"], window=5, alpha=0.5)
+    for _ in range(5):
+        spo2.update(98)
+    assert spo2.update(85) == (85.0, "worsening")   # désaturation aiguë : premier échantillon
+    assert spo2.update(84) == (84.0, "worsening")
+
+    heart_rate = SignalFilter(SIGNALS["heart_rate"], window=5, alpha=0.5)
+    heart_rate.update(72)
+    assert heart_rate.update(140) == (140.0, "worsening")
+    respiratory_rate = SignalFilter(SIGNALS["respiratory_rate"], window=5, alpha=0.5)
+    respiratory_rate.update(16)
+    assert respiratory_rate.update(30) == (30.0, "worsening")
+
+
+def test_plausibility_gate_and_fixed_buffers():
+    heart_rate = SignalFilter(SIGNALS["heart_rate"], window=5)
+    assert heart_rate.update(0) == (None, "implausible")
+    assert heart_rate.update("n/a") == (None, "implausible")
+    assert heart_rate.update(72)[1] == "ok"
+    assert heart_rate.update(float("nan")) == (72.0, "implausible")
+    for value in range(70, 1070):
+        heart_rate.update(70 + value % 3)
+    assert len(heart_rate.window) == 5 and len(heart_rate.pending) <= CONFIRM_SAMPLES
+
+
+def test_ema_smooths_small_noise():
+    temperature = SignalFilter(SIGNALS["temperature"], window=1, alpha=0.5)
+    temperature.update(25.0)
+    value, outcome = temperature.update(26.0)
+    assert outcome == "ok" and value == 25.5
+
+
+def test_bank_per_device_reset_and_bound():
+    now = [0.0]
+    bank = SignalFilterBank(max_devices=2, reset_after=60, clock=lambda: now[0])
+    for _ in range(5):
+        bank.apply("a", {"spo2": 92, "tvoc_ppb": 10, "smoke_detected": False})
+    spiked = bank.apply("a", {"spo2": 100, "tvoc_ppb": 10, "smoke_detected": True})
+    assert spiked["spo2"] == 92.0 and spiked["smoke_detected"] is True
+    assert spiked["signal_filter"] == {"spo2": "outlier", "tvoc_ppb": "ok"}
+    assert bank.apply("b", {"spo2": 70})["spo2"] == 70.0  # device distinct
+
+    bank.apply("c", {"spo2": 90})
+    assert list(bank._devices) == ["b", "c"]  # "a" oublié (le moins récent)
+    now[0] = 120.0
+    assert bank.apply("c", {"spo2": 75})["signal_filter"]["spo2"] == "ok"  # device muet : repart de zéro
+    assert bank.apply("x", {"spo2": 0}).get("spo2") is None
+
+
+def test_repeated_sample_does_not_advance():
+    bank = SignalFilterBank()
+    reading = {"spo2": 92, "temperature": 25.0, "timestamp": "2026-01-01T10:00:00"}
+    bank.apply("d", reading)
+    spiked = dict(reading, spo2=100, temperature=26.0, timestamp="2026-01-01T10:00:05")
+    assert bank.apply("d", spiked)["signal_filter"]["spo2"] == "outlier"
+    # Même échantillon relu par d'autres clients : ni confirmation ni pas d'EMA
+    for _ in range(CONFIRM_SAMPLES + 2):
+        repeated = bank.apply("d", spiked)
+        assert repeated["signal_filter"] == {"spo2": "repeat", "temperature": "repeat"}
+        assert repeated["spo2"] == 92.0 and repeated["temperature"] == 25.25
+    late = bank.apply("d", dict(spiked, timestamp="2026-01-01T09:59:00"))
+    assert late["signal_filter"]["spo2"] == "repeat"
+
+
+class SpikeCollector:
+    """Bracelet simulé : SpO2 stable puis un échantillon différent"""
+
+    def __init__(self, values):
+        self.values = list(values)
+
+    def get_weather_data(self, location=None, auth_token=None):
+        return {'temperature': 24.0, 'humidity': 55.0, 'pressure': 1013, 'wind_speed': 5.0}
+
+    def get_air_quality_data(self, location=None, auth_token=None):
+        return {'aqi': 30, 'pm25': 8.0, 'pm10': 15.0, 'pollen_level': 1}
+
+    def get_ubidots_direct(self):
+        return {'spo2': self.values.pop(0), 'heart_rate': 72.0, 'respiratory_rate': 15,
+                'temperature_sensor': 24.0, 'humidity_sensor': 55.0, 'eco2_ppm': 500.0,
+                'tvoc_ppb': 20.0, 'smoke_detected': False, 'status': 'success'}
+
+
+def test_predict_scores_acute_desaturation_immediately():
+    with contextlib.redirect_stdout(io.StringIO()):
+        from api import app as app_module
+    old = app_module.collector, signal_filters.SIGNAL_FILTERS_ENABLED, signal_filters._bank
+    app_module.collector = SpikeCollector([98, 98, 98, 98, 78])
+    signal_filters.SIGNAL_FILTERS_ENABLED, signal_filters._bank = True, SignalFilterBank()
+    try:
+        client = app_module.app.test_client()
+        body = {'user_id': 'u-desat', 'profile_id': 2, 'device_label': 'bracelet-desat'}
+        with contextlib.redirect_stdout(io.StringIO()):
+            responses = [client.post('/api/v1/predict', json=body).get_json() for _ in range(5)]
+        assert responses[0]['prediction']['risk_level'] != 'HIGH'
+        desaturated = responses[-1]
+        assert desaturated['sensors']['spo2'] == 78.0
+        assert desaturated['prediction']['risk_level'] == 'HIGH'
+    finally:
+        app_module.collector, signal_filters.SIGNAL_FILTERS_ENABLED, signal_filters._bank = old
+
+
+if __name__ == "__main__":
+    test_spike_rejected_then_step_confirmed()
+    test_worsening_never_held_or_smoothed()
+    test_plausibility_gate_and_fixed_buffers()
+    test_ema_smooths_small_noise()
+    test_bank_per_device_reset_and_bound()
+    test_repeated_sample_does_not_advance()
+    test_predict_scores_acute_desaturation_immediately()
+    print("✅ Débruitage des capteurs OK")
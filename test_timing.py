@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+TEST DE L'INSTRUMENTATION PAR ÉTAPE - RESPIRIA AI
+=================================================
+
+Server-Timing, étapes collecte → prédiction → rendu, histogrammes agrégés
+"""
+
+from api.timing import StageStats, StageTimer, stage
+from loadtest.fake_services import FakeServices
+
+
+def test_stages_only_recorded_with_active_timer():
+    """Sans timer actif, stage() ne mesure rien ; avec, les durées se cumulent"""
+    with stage("ignored"):
+        pass
+
+    timer = StageTimer().activate()
+    try:
+        with stage("scoring"):
+            sum(range(1000))
+        with stage("scoring"):
+            sum(range(1000))
+    finally:
+        timer.finish()
+
+    assert list(timer.stages) == ["scoring"]
+    assert timer.stages["scoring"] > 0
+    assert timer.total_ns >= timer.stages["scoring"]
+    assert timer.server_timing().startswith("scoring;dur=")
+    assert timer.server_timing().endswith(f"total;dur={timer.total_ns / 1e6:.3f}")
+
+
+def test_stage_stats_aggregation():
+    """Une requête par route alimente un histogramme par étape"""
+    stats = StageStats()
+    timer = StageTimer()
+    timer.add("weather", 2_000_000)
+    stats.record("/api/v1/predict", timer.finish())
+
+    snapshot = stats.snapshot()["/api/v1/predict"]
+    assert snapshot["weather"]["count"] == 1
+    assert 1980 <= snapshot["weather"]["p50"] <= 2020
+    assert snapshot["total"]["count"] == 1
+
+
+def test_predict_endpoint_server_timing():
+    """L'endpoint principal expose chaque étape dans Server-Timing"""
+    from api import app as app_module
+
+    with FakeServices() as fake:
+        old_collector = app_module.collector
+        app_module.collector = app_module.RespiriaDataCollector(base_url=fake.backend_url)
+        try:
+            client = app_module.app.test_client()
+            response = client.post("/api/v1/predict", json={"user_id": "u1", "profile_id": 1})
+            timings = client.get("/api/v1/timings").get_json()
+        finally:
+            app_module.collector = old_collector
+
+    assert response.status_code == 200
+    header = response.headers["Server-Timing"]
+    for name in ("weather", "air_quality", "sensor_max30102", "scoring",
+                 "recommendations", "confidence", "response", "json", "total"):
+        assert f"{name};dur=" in header, name
+
+    assert response.get_json()["success"] is True
+    assert timings["routes"]["/api/v1/predict"]["scoring"]["count"] >= 1
+
+
+if __name__ == "__main__":
+    test_stages_only_recorded_with_active_timer()
+    test_stage_stats_aggregation()
+    test_predict_endpoint_server_timing()
+    print("✅ Instrumentation par étape OK")
@@ -1,5 +1,9 @@
 import requests
 import json
+import os
+
+# Surchargeable pour viser les services simulés (python -m loadtest.fake_services)
+UBIDOTS_API_URL = os.environ.get("UBIDOTS_API_URL", "https://industrial.api.ubidots.com/api/v1.6")
 
 UBIDOTS_TOKEN = "BBUS-IW4Xne31AviZZ0jAAojvf3FczCx8Vw"
 
@@ -13,7 +17,7 @@ print("-" * 60)
 headers = {'X-Auth-Token': UBIDOTS_TOKEN, 'Content-Type': 'application/json'}
 
 try:
-    url = "https://industrial.api.ubidots.com/api/v1.6/devices/"
+    url = f"{UBIDOTS_API_URL}/devices/"
     response = requests.get(url, headers=headers, timeout=10)
     
     if response.status_code == 200:
@@ -36,7 +40,7 @@ except Exception as e:
 print("\n\n2. Détails du device 'bracelet':")
 print("-" * 60)
 try:
-    url = "https://industrial.api.ubidots.com/api/v1.6/devices/bracelet/"
+    url = f"{UBIDOTS_API_URL}/devices/bracelet/"
     response = requests.get(url, headers=headers, timeout=10)
     
     if response.status_code == 200:
@@ -65,7 +69,7 @@ print("\n\n3. Variables par ID de device:")
 print("-" * 60)
 DEVICE_ID = "696c16da6b8f94fd52f77962"  # ID du device bracelet
 try:
-    url = f"https://industrial.api.ubidots.com/api/v1.6/devices/{DEVICE_ID}/"
+    url = f"{UBIDOTS_API_URL}/devices/{DEVICE_ID}/"
     response = requests.get(url, headers=headers, timeout=10)
     
     if response.status_code == 200:
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+TEST DU RENVOI DU RISQUE VERS UBIDOTS - RESPIRIA AI
+===================================================
+
+Fusion par device, écriture multi-devices, limitation de débit (Ubidots simulé),
+renvoi depuis /predict et /predict/realtime seulement pour un device nommé
+"""
+
+import contextlib
+import io
+
+import requests
+
+from api.rate_limit import TokenBucket
+from api.ubidots_writeback import UbidotsWriteback
+from loadtest.fake_services import FakeServices
+from test_geo_cache import GeoCollector
+
+
+def _writes(fake):
+    return requests.get(f"{fake.url}/__writes__", timeout=2).json()["results"]
+
+
+def test_only_newest_value_per_device_is_sent():
+    """Plusieurs prédictions pour un device : une seule valeur (la plus récente) part"""
+    with FakeServices() as fake:
+        writeback = UbidotsWriteback(api_url=fake.ubidots_url, token="fake-token", max_requests_per_second=10)
+        writeback.submit("bracelet-1", 20.0, "low", timestamp_ms=1000)
+        writeback.submit("bracelet-1", 75.0, "high", timestamp_ms=3000)
+        writeback.submit("bracelet-1", 50.0, "medium", timestamp_ms=2000)  # arrivée tardive, ignorée
+        writeback.submit("bracelet-2", 40.0, "medium", timestamp_ms=1500)
+
+        assert writeback.flush() == 2
+        stats = requests.get(f"{fake.url}/__stats__", timeout=2).json()
+        assert stats["requests"]["ubidots_bulk_write"] == 1
+
+        by_device = {w["device"]: w["body"] for w in _writes(fake)}
+        assert by_device["bracelet-1"]["risk_score"]["value"] == 75.0
+        assert by_device["bracelet-1"]["risk_level"]["value"] == 2
+        assert by_device["bracelet-2"]["risk_level"]["value"] == 1
+        assert writeback.stats()["coalesced"] == 2
+        writeback.stop(flush=False)
+
+
+def test_rate_limit_defers_remaining_batches():
+    """Au-delà du débit autorisé, les lots restants attendent le tour suivant"""
+    with FakeServices() as fake:
+        writeback = UbidotsWriteback(api_url=fake.ubidots_url, token="fake-token",
+                                     batch_size=1, max_requests_per_second=0.001)
+        for index in range(3):
+            writeback.submit(f"device-{index}", 30.0, "medium")
+
+        assert writeback.flush() == 1
+        assert writeback.pending_count() == 2
+        assert writeback.stats()["deferred"] == 2
+        assert len(_writes(fake)) == 1
+        writeback.stop(flush=False)
+
+
+def test_failed_write_is_retried():
+    """Une erreur Ubidots remet la valeur en attente"""
+    with FakeServices({"routes": {"ubidots_bulk_write": {"error_rate": 1.0}}}) as fake:
+        writeback = UbidotsWriteback(api_url=fake.ubidots_url, token="fake-token", max_requests_per_second=10)
+        writeback.submit("bracelet", 80.0, "high")
+        assert writeback.flush() == 0
+        assert writeback.pending_count() == 1
+        assert writeback.stats()["failed"] == 1
+        writeback.stop(flush=False)
+
+
+def test_background_thread_flushes():
+    """Le thread d'envoi vide le tampon sans appel explicite"""
+    with FakeServices() as fake:
+        writeback = UbidotsWriteback(api_url=fake.ubidots_url, token="fake-token", interval=0.05)
+        writeback.submit("bracelet", 10.0, "low")
+        writeback.stop()  # réveille le thread et envoie le reste
+        assert _writes(fake)[0]["device"] == "bracelet"
+
+
+def test_token_bucket():
+    """Débit et réserve du seau à jetons"""
+    now = [0.0]
+    bucket = TokenBucket(rate=2.0, burst=2.0, clock=lambda: now[0])
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert abs(bucket.wait_time() - 0.5) < 1e-9
+    now[0] = 0.5
+    assert bucket.try_acquire()
+
+
+class RecordingWriteback:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, device, risk_score, risk_level, timestamp_ms=None):
+        self.submitted.append(device)
+
+
+class RealtimeCollector(GeoCollector):
+    def get_ubidots_latest(self, user_id):
+        return {'spo2': 96.0, 'heart_rate': 75.0, 'temperature': 27.0, 'humidity': 60.0, 'status': 'success'}
+
+
+def test_predict_writes_back_only_named_devices():
+    """Sans device_label : aucun renvoi (le device partagé par défaut n'est jamais écrasé)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        from api import app as app_module
+    recorder = RecordingWriteback()
+    old = app_module.collector, app_module.get_writeback
+    app_module.collector, app_module.get_writeback = RealtimeCollector(), lambda: recorder
+    try:
+        client = app_module.app.test_client()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for route in ('/api/v1/predict', '/api/v1/predict/realtime'):
+                for body in ({'user_id': 'u-wb', 'profile_id': 1},
+                             {'user_id': 'u-wb', 'profile_id': 1, 'device_label': 'bracelet-u-wb'}):
+                    assert client.post(route, json=body).status_code == 200, route
+        assert recorder.submitted == ['bracelet-u-wb', 'bracelet-u-wb']
+    finally:
+        app_module.collector, app_module.get_writeback = old
+
+
+if __name__ == "__main__":
+    test_only_newest_value_per_device_is_sent()
+    test_rate_limit_defers_remaining_batches()
+    test_failed_write_is_retried()
+    test_background_thread_flushes()
+    test_token_bucket()
+    test_predict_writes_back_only_named_devices()
+    print("✅ Renvoi Ubidots OK")
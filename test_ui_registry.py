@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+TEST DU REGISTRE D'INTERFACE - RESPIRIA AI
+==========================================
+
+Tables précalculées en lecture seule ; seul le score est formaté par requête
+"""
+
+from types import MappingProxyType
+
+from api.respiria_ai_predictor import RespiriaAIPredictor
+from api.ui_registry import MESSAGES, UI_CONFIGS, personalized_message
+
+
+def test_registry_read_only():
+    """Les tables partagées ne peuvent pas être modifiées par une requête"""
+    assert isinstance(UI_CONFIGS, MappingProxyType)
+    for target in (UI_CONFIGS, UI_CONFIGS['HIGH'], MESSAGES[('LOW', 1)]):
+        try:
+            target['color'] = '#000000'
+        except TypeError:
+            continue
+        raise AssertionError("registre modifiable")
+
+
+def test_personalized_message():
+    """Description formatée avec le score, profil ajouté, registre intact"""
+    message = personalized_message('MEDIUM', 42.4, 2)
+    assert message['title'] == '⚠️ Risque Modéré'
+    assert message['description'].startswith('Niveau de risque modéré (42%)')
+    assert message['profile'] == 'Sévère'
+
+    message['title'] = 'modifié'
+    assert personalized_message('MEDIUM', 42.4, 2)['title'] == '⚠️ Risque Modéré'
+    assert personalized_message('UNKNOWN', 10, 9)['profile'] == 'Inconnu'
+    assert personalized_message('UNKNOWN', 10, 9)['title'] == '✅ Risque Faible'
+
+
+def test_profile_context_lookup():
+    """Contexte du profil : copie du registre, alerte maximale pour le profil sévère"""
+    predictor = RespiriaAIPredictor()
+    context = predictor.get_profile_context(2, 'high')
+    assert context['alert_level'] == 'maximum'
+    assert predictor.get_profile_context(1, 'high')['alert_level'] == 'élevé'
+    assert context['name'] == 'Asthmatique sévère'
+
+    context['message'] = 'modifié'
+    assert predictor.get_profile_context(2, 'high')['message'].startswith('🆘')
+
+
+if __name__ == "__main__":
+    test_registry_read_only()
+    test_personalized_message()
+    test_profile_context_lookup()
+    print("✅ Registre d'interface OK")
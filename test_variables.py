@@ -1,5 +1,9 @@
 import requests
 from datetime import datetime
+import os
+
+# Surchargeable pour viser les services simulés (python -m loadtest.fake_services)
+UBIDOTS_API_URL = os.environ.get("UBIDOTS_API_URL", "https://industrial.api.ubidots.com/api/v1.6")
 
 UBIDOTS_TOKEN = "BBUS-IW4Xne31AviZZ0jAAojvf3FczCx8Vw"
 DEVICE_LABEL = "bracelet"
@@ -11,7 +15,7 @@ print("=" * 60)
 headers = {'X-Auth-Token': UBIDOTS_TOKEN, 'Content-Type': 'application/json'}
 
 # Récupérer les variables du device
-url = f"https://industrial.api.ubidots.com/api/v1.6/devices/{DEVICE_LABEL}/variables/"
+url = f"{UBIDOTS_API_URL}/devices/{DEVICE_LABEL}/variables/"
 print(f"\nURL: {url}")
 
 try: